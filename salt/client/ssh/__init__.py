@@ -305,14 +305,28 @@ class SSH:
         self.serial = salt.payload.Serial(opts)
         self.returners = salt.loader.returners(self.opts, {})
         self.fsclient = salt.fileclient.FSClient(self.opts)
-        self.thin = salt.utils.thin.gen_thin(
-            self.opts["cachedir"],
-            extra_mods=self.opts.get("thin_extra_mods"),
-            overwrite=self.opts["regen_thin"],
-            python2_bin=self.opts["python2_bin"],
-            python3_bin=self.opts["python3_bin"],
-            extended_cfg=self.opts.get("ssh_ext_alternatives"),
-        )
+        if self.opts.get("thin_chunks") and self.opts.get("ssh_ext_alternatives"):
+            log.warning(
+                "The thin can not be deployed in chunks along with "
+                "ssh_ext_alternatives, deploying the whole thin"
+            )
+            self.opts["thin_chunks"] = False
+        if self.opts.get("thin_chunks"):
+            salt.utils.thin.gen_thin_chunks(
+                self.opts["cachedir"],
+                extra_mods=self.opts.get("thin_extra_mods"),
+                overwrite=self.opts["regen_thin"],
+            )
+            self.thin = salt.utils.thin.thin_path(self.opts["cachedir"])
+        else:
+            self.thin = salt.utils.thin.gen_thin(
+                self.opts["cachedir"],
+                extra_mods=self.opts.get("thin_extra_mods"),
+                overwrite=self.opts["regen_thin"],
+                python2_bin=self.opts["python2_bin"],
+                python3_bin=self.opts["python3_bin"],
+                extended_cfg=self.opts.get("ssh_ext_alternatives"),
+            )
         self.mods = mod_data(self.fsclient)
 
     @property
@@ -965,6 +979,12 @@ class Single:
             arch, _, _ = self.shell.exec_cmd("powershell $ENV:PROCESSOR_ARCHITECTURE")
             self.arch = arch.strip()
         self.thin = thin if thin else salt.utils.thin.thin_path(opts["cachedir"])
+        if "_caller_cachedir" in self.opts:
+            self.thin_cachedir = self.opts["_caller_cachedir"]
+        else:
+            self.thin_cachedir = self.opts["cachedir"]
+        # The chunks are sent with scp, they are not supported over winrm
+        self.thin_chunks = bool(self.opts.get("thin_chunks")) and not self.winrm
 
     def __arg_comps(self):
         """
@@ -1011,13 +1031,23 @@ class Single:
             return False
         return True
 
-    def deploy(self):
+    def deploy(self, chunks=None):
         """
-        Deploy salt-thin
+        Deploy salt-thin, only the given chunks of it when it is deployed in
+        chunks
         """
-        self.shell.send(
-            self.thin, os.path.join(self.thin_dir, "salt-thin.tgz"),
-        )
+        if self.thin_chunks:
+            bundle = salt.utils.thin.gen_thin_bundle(self.thin_cachedir, chunks)
+            try:
+                self.shell.send(
+                    bundle, os.path.join(self.thin_dir, "salt-thin-chunks.tar"),
+                )
+            finally:
+                os.remove(bundle)
+        else:
+            self.shell.send(
+                self.thin, os.path.join(self.thin_dir, "salt-thin.tgz"),
+            )
         self.deploy_ext()
         return True
 
@@ -1272,11 +1302,16 @@ class Single:
         """
         sudo = "sudo" if self.target["sudo"] else ""
         sudo_user = self.target["sudo_user"]
-        if "_caller_cachedir" in self.opts:
-            cachedir = self.opts["_caller_cachedir"]
+        thin_chunks = {}
+        if self.thin_chunks:
+            manifest = salt.utils.thin.thin_chunks(self.thin_cachedir)
+            thin_code_digest = "'{}'".format(manifest["code_checksum"])
+            thin_sum = ""
+            thin_chunks = manifest["chunks"]
         else:
-            cachedir = self.opts["cachedir"]
-        thin_code_digest, thin_sum = salt.utils.thin.thin_sum(cachedir, "sha1")
+            thin_code_digest, thin_sum = salt.utils.thin.thin_sum(
+                self.thin_cachedir, "sha1"
+            )
         debug = ""
         if not self.opts.get("log_level"):
             self.opts["log_level"] = "info"
@@ -1300,6 +1335,7 @@ OPTIONS.wipe = {wipe}
 OPTIONS.tty = {tty}
 OPTIONS.cmd_umask = {cmd_umask}
 OPTIONS.code_checksum = {code_checksum}
+OPTIONS.thin_chunks = {thin_chunks}
 ARGS = {arguments}\n'''.format(
             config=self.minion_config,
             delimeter=RSTR,
@@ -1312,6 +1348,7 @@ ARGS = {arguments}\n'''.format(
             tty=self.tty,
             cmd_umask=self.cmd_umask,
             code_checksum=thin_code_digest,
+            thin_chunks=thin_chunks,
             arguments=self.argv,
         )
         py_code = SSH_PY_SHIM.replace("#%%OPTS", arg_str)
@@ -1453,10 +1490,14 @@ ARGS = {arguments}\n'''.format(
             shim_command = re.split(r"\r?\n", stdout, 1)[0].strip()
             log.debug("SHIM retcode(%s) and command: %s", retcode, shim_command)
             if (
-                "deploy" == shim_command
+                shim_command in ("deploy", "deploy_chunks")
                 and retcode == salt.defaults.exitcodes.EX_THIN_DEPLOY
             ):
-                self.deploy()
+                chunks = None
+                if "deploy_chunks" == shim_command:
+                    # The digests of the missing chunks follow the command
+                    chunks = re.split(r"\r?\n", stdout, 2)[1].split()
+                self.deploy(chunks=chunks)
                 stdout, stderr, retcode = self.shim_cmd(cmd_str)
                 if not re.search(RSTR_RE, stdout) or not re.search(RSTR_RE, stderr):
                     if not self.tty:
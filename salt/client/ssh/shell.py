@@ -108,6 +108,35 @@ class Shell:
             return line
         return errstr
 
+    def _mux_opts(self):
+        """
+        Return the options sharing a single persistent connection to the host
+        between all the ssh and scp commands run against it
+        """
+        if not self.opts.get("ssh_multiplex", False):
+            return []
+        control_dir = os.path.join(self.opts["cachedir"], "ssh_mux")
+        if not os.path.isdir(control_dir):
+            try:
+                os.makedirs(control_dir, 0o700)
+            except OSError as exc:
+                log.warning(
+                    "Unable to create the ssh control directory %s: %s",
+                    control_dir,
+                    exc,
+                )
+                return []
+        # %C hashes the connection, the socket path stays short enough
+        if self.opts.get("_ssh_version", (0,)) >= (6, 7):
+            control_path = os.path.join(control_dir, "%C")
+        else:
+            control_path = os.path.join(control_dir, "%r@%h:%p")
+        return [
+            "ControlMaster=auto",
+            "ControlPath={}".format(control_path),
+            "ControlPersist={}".format(self.opts.get("ssh_multiplex_persist", 60)),
+        ]
+
     def _key_opts(self):
         """
         Return options for the ssh command base for Salt to call
@@ -137,6 +166,7 @@ class Shell:
             options.append("User={}".format(self.user))
         if self.identities_only:
             options.append("IdentitiesOnly=yes")
+        options.extend(self._mux_opts())
 
         ret = []
         for option in options:
@@ -147,9 +177,9 @@ class Shell:
         """
         Return options to pass to ssh
         """
-        # TODO ControlMaster does not work without ControlPath
-        # user could take advantage of it if they set ControlPath in their
-        # ssh config.  Also, ControlPersist not widely available.
+        # ControlMaster does not work without ControlPath, it is set along
+        # with ControlPersist when ssh_multiplex is enabled or the user can
+        # set them in their ssh config.
         options = [
             "ControlMaster=auto",
             "StrictHostKeyChecking=no",
@@ -180,6 +210,7 @@ class Shell:
             options.append("User={}".format(self.user))
         if self.identities_only:
             options.append("IdentitiesOnly=yes")
+        options.extend(option for option in self._mux_opts() if option not in options)
 
         ret = []
         for option in options:
@@ -250,6 +281,10 @@ class Shell:
             command.append("-t -t")
         if self.passwd or self.priv:
             command.append(self.priv and self._key_opts() or self._passwd_opts())
+        else:
+            mux_opts = self._mux_opts()
+            if mux_opts:
+                command.append("".join("-o {} ".format(opt) for opt in mux_opts))
         if ssh != "scp" and self.remote_port_forwards:
             command.append(
                 " ".join(
@@ -10,6 +10,8 @@ separate file, for convenience of development.
 from __future__ import absolute_import, print_function
 
 import hashlib
+import io
+import json
 import os
 import shutil
 import stat
@@ -19,6 +21,8 @@ import tarfile
 import time
 
 THIN_ARCHIVE = "salt-thin.tgz"
+CHUNKS_ARCHIVE = "salt-thin-chunks.tar"
+CHUNKS_INDEX = "thin-chunks"
 EXT_ARCHIVE = "salt-ext_mods.tgz"
 
 # Keep these in sync with salt/defaults/exitcodes.py
@@ -179,6 +183,110 @@ def unpack_thin(thin_path):
     reset_time(OPTIONS.saltdir)
 
 
+def read_chunks_index():
+    """
+    Read the index of the thin chunks unpacked in the salt dir, it maps the
+    digest of every chunk to the paths it unpacked.
+    """
+    index_path = os.path.join(OPTIONS.saltdir, CHUNKS_INDEX)
+    if not os.path.isfile(index_path):
+        return None
+    try:
+        with open(index_path, "r") as fp_:
+            return json.load(fp_)
+    except ValueError:
+        return None
+
+
+def remove_chunk_paths(paths):
+    """
+    Remove the paths unpacked by a thin chunk.
+    """
+    for path in paths:
+        path = os.path.join(OPTIONS.saltdir, path)
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        elif os.path.lexists(path):
+            os.unlink(path)
+
+
+def update_chunks(index):
+    """
+    Remove the chunks no longer part of the thin and record the unpacked ones,
+    along with the code checksum once every chunk of the thin is unpacked.
+    """
+    keep = set()
+    for digest in OPTIONS.thin_chunks:
+        keep.update(index.get(digest, []))
+    for digest in list(index):
+        if digest not in OPTIONS.thin_chunks:
+            remove_chunk_paths([path for path in index.pop(digest) if path not in keep])
+    with open(os.path.join(OPTIONS.saltdir, CHUNKS_INDEX), "w") as fp_:
+        json.dump(index, fp_)
+    code_checksum_path = os.path.join(OPTIONS.saltdir, "code-checksum")
+    if len(index) == len(OPTIONS.thin_chunks):
+        with open(code_checksum_path, "w") as fp_:
+            fp_.write(OPTIONS.code_checksum + "\n")
+    elif os.path.exists(code_checksum_path):
+        os.unlink(code_checksum_path)
+
+
+def need_chunks():
+    """
+    Signal the thin chunks missing from the salt dir, or that salt thin needs
+    to be deployed when the salt dir was not deployed in chunks.
+    """
+    index = read_chunks_index()
+    if index is None:
+        need_deployment()
+    missing = [digest for digest in sorted(OPTIONS.thin_chunks) if digest not in index]
+    if not missing:
+        # Every chunk is unpacked, only the unused ones are left to remove
+        update_chunks(index)
+        return
+    # Delimiter emitted on stdout *only* to indicate shim message to master.
+    sys.stdout.write(
+        "{0}\ndeploy_chunks\n{1}\n".format(OPTIONS.delimiter, " ".join(missing))
+    )
+    sys.exit(EX_THIN_DEPLOY)
+
+
+def unpack_chunks(chunks_path):
+    """
+    Unpack the thin chunks sent by the master over the salt dir.
+    """
+    index = read_chunks_index() or {}
+    bundle = tarfile.open(chunks_path)
+    old_umask = os.umask(0o077)  # pylint: disable=blacklisted-function
+    try:
+        for member in bundle.getmembers():
+            digest = member.name.split(".")[0]
+            data = bundle.extractfile(member).read()
+            hash_obj = getattr(hashlib, OPTIONS.hashfunc)(data)
+            if OPTIONS.thin_chunks.get(digest) != hash_obj.hexdigest():
+                need_deployment()
+            chunk = tarfile.open(fileobj=io.BytesIO(data), mode="r:gz")
+            # The chunks unpack whole top level modules and packages
+            paths = sorted(
+                set(["/".join(name.split("/")[:2]) for name in chunk.getnames()])
+            )
+            remove_chunk_paths(paths)
+            chunk.extractall(path=OPTIONS.saltdir)
+            chunk.close()
+            index[digest] = paths
+    finally:
+        bundle.close()
+        os.umask(old_umask)  # pylint: disable=blacklisted-function
+    try:
+        os.unlink(chunks_path)
+    except OSError:
+        pass
+    update_chunks(index)
+    reset_time(OPTIONS.saltdir)
+    if len(index) != len(OPTIONS.thin_chunks):
+        need_chunks()
+
+
 def need_ext():
     """
     Signal that external modules need to be deployed.
@@ -273,7 +381,11 @@ def main(argv):  # pylint: disable=W0613
     Main program body
     """
     thin_path = os.path.join(OPTIONS.saltdir, THIN_ARCHIVE)
-    if os.path.isfile(thin_path):
+    chunks_path = os.path.join(OPTIONS.saltdir, CHUNKS_ARCHIVE)
+    if OPTIONS.thin_chunks and os.path.isfile(chunks_path):
+        unpack_chunks(chunks_path)
+        # Salt thin now is available to use
+    elif os.path.isfile(thin_path):
         if OPTIONS.checksum != get_hash(thin_path, OPTIONS.hashfunc):
             need_deployment()
         unpack_thin(thin_path)
@@ -305,7 +417,10 @@ def main(argv):  # pylint: disable=W0613
                     code_checksum_path
                 )
             )
-            need_deployment()
+            if OPTIONS.thin_chunks:
+                need_chunks()
+            else:
+                need_deployment()
         with open(code_checksum_path, "r") as vpo:
             cur_code_cs = vpo.readline().strip()
         if cur_code_cs != OPTIONS.code_checksum:
@@ -314,7 +429,10 @@ def main(argv):  # pylint: disable=W0613
                     cur_code_cs, OPTIONS.code_checksum
                 )
             )
-            need_deployment()
+            if OPTIONS.thin_chunks:
+                need_chunks()
+            else:
+                need_deployment()
         # Salt thin exists and is up-to-date - fall through and use it
 
     salt_call_path = os.path.join(OPTIONS.saltdir, "salt-call")
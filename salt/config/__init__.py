@@ -261,6 +261,9 @@ VALID_OPTS = immutabletypes.freeze(
         "hash_type": str,
         # Order of preference for optimized .pyc files (PY3 only)
         "optimization_order": list,
+        # Keep an index of the modules in the cachedir for the loader to start
+        # without scanning the module dirs and importing modules to find them
+        "loader_index": bool,
         # Refuse to load these modules
         "disable_modules": list,
         # Refuse to load these returners
@@ -292,6 +295,13 @@ VALID_OPTS = immutabletypes.freeze(
         "multiprocessing": bool,
         # Maximum number of concurrently active processes at any given point in time
         "process_count_max": int,
+        # The number of pre-forked processes executing the jobs of a minion, 0
+        # forks a new process for every job
+        "job_worker_pool": int,
+        # The number of jobs a job worker runs before it is replaced
+        "job_worker_pool_max_jobs": int,
+        # The number of jobs which can wait for a free job worker
+        "job_worker_pool_queue_size": int,
         # Whether or not the salt minion should run scheduled mine updates
         "mine_enabled": bool,
         # Whether or not scheduled mine updates should be accompanied by a job return for the job cache
@@ -304,6 +314,17 @@ VALID_OPTS = immutabletypes.freeze(
         "ipv6": (type(None), bool),
         # The chunk size to use when streaming files with the file server
         "file_buffer_size": int,
+        # The number of file_buffer_size chunks the minion asks for per file
+        # server request
+        "file_stream_window": int,
+        # The maximum number of file_buffer_size chunks served per request
+        "file_stream_max_window": int,
+        # Fetch changed files from the master as a delta against the cached copy
+        "file_delta_sync": bool,
+        # The largest file the master computes deltas for
+        "file_delta_max_size": int,
+        # Store identical cached files only once, keyed on their hash
+        "file_cache_dedup": bool,
         # The TCP port on which minion events should be published if ipc_mode is TCP
         "tcp_pub_port": int,
         # The TCP port on which minion events should be pulled if ipc_mode is TCP
@@ -376,6 +397,9 @@ VALID_OPTS = immutabletypes.freeze(
         "state_output_profile": bool,
         # When true, states run in the order defined in an SLS file, unless requisites re-order them
         "state_auto_order": bool,
+        # The number of independent units of states to run at the same time, 0
+        # or 1 runs the states one after the other
+        "state_concurrency": int,
         # Fire events as state chunks are processed by the state compiler
         "state_events": bool,
         # The number of seconds a minion should wait before retry when attempting authentication
@@ -439,6 +463,13 @@ VALID_OPTS = immutabletypes.freeze(
         "event_return_whitelist": list,
         # Events matching a tag in this list should never be sent to an event returner.
         "event_return_blacklist": list,
+        # Queue the events of every event returner in memory and flush them on a
+        # thread, spooling them to disk when the returner falls behind or fails
+        "event_return_async": bool,
+        # The number of events queued in memory for every event returner
+        "event_return_async_queue": int,
+        # The maximum size in bytes of the on-disk spool of every event returner
+        "event_return_spool_max_size": int,
         # default match type for filtering events tags: startswith, endswith, find, regex, fnmatch
         "event_match_type": str,
         # This pidfile to write out to when a daemon starts
@@ -600,6 +631,15 @@ VALID_OPTS = immutabletypes.freeze(
         # GPG data cache backend. Defaults to `disk` which stores caches in the master cache
         "gpg_cache_backend": str,
         "pillar_safe_render_error": bool,
+        # The number of external pillars to evaluate at the same time, 0 or 1
+        # evaluates them one after the other
+        "ext_pillar_concurrency": int,
+        # The number of seconds an external pillar may run when they are
+        # evaluated concurrently, 0 means no timeout
+        "ext_pillar_timeout": (int, float),
+        # Fire an event with the time each external pillar took after a
+        # minion's pillar is compiled
+        "ext_pillar_timing_events": bool,
         # When creating a pillar, there are several strategies to choose from when
         # encountering duplicate values
         "pillar_source_merging_strategy": str,
@@ -642,6 +682,9 @@ VALID_OPTS = immutabletypes.freeze(
         "fileserver_ignoresymlinks": bool,
         "fileserver_limit_traversal": bool,
         "fileserver_verify_config": bool,
+        # Keep an index of the directories of the file_roots to only list again
+        # the directories modified since the last file list refresh
+        "fileserver_list_index": bool,
         # Optionally apply '*' permissioins to any user. By default '*' is a fallback case that is
         # applied only if the user didn't matched by other matchers.
         "permissive_acl": bool,
@@ -683,6 +726,23 @@ VALID_OPTS = immutabletypes.freeze(
         # cachedir under the name of the minion and used to predetermine what minions are expected to
         # reply from executions.
         "minion_data_cache": bool,
+        # Keep an in-memory index of the minion data cache in each master worker
+        # to speed up grain, pillar and ipcidr targeting
+        "minion_data_index": bool,
+        # The number of seconds between syncs of the minion data index with the
+        # minion data cache
+        "minion_data_index_interval": int,
+        # Store the mine data in a cache bank per mine function instead of a
+        # single cache entry per minion
+        "mine_index": bool,
+        # The number of parsed minion public keys cached by every master worker
+        "minion_pub_key_cache_size": int,
+        # Keep the minion key states and the encrypted AES key replies of the
+        # auth requests in memory in every master worker
+        "auth_cache": bool,
+        # The number of auth requests per second the master answers, the others
+        # are told to retry later. 0 is unlimited
+        "auth_rate_limit": float,
         # The number of seconds between AES key rotations on the master
         "publish_session": int,
         # Defines a salt reactor. See http://docs.saltstack.com/en/latest/topics/reactor/
@@ -745,6 +805,12 @@ VALID_OPTS = immutabletypes.freeze(
         "grains_blacklist": list,
         # The number of minutes between the minion refreshing its cache of grains
         "grains_refresh_every": int,
+        # The number of grain functions to run at the same time, 0 or 1 runs
+        # them one after the other
+        "grains_concurrency": int,
+        # The number of seconds the results of the grain functions are cached
+        # for by grain module, overriding the ones declared by the modules
+        "grains_ttl": dict,
         # Use lspci to gather system data for grains on a minion
         "enable_lspci": bool,
         # The number of seconds for the salt client to wait for additional syndics to
@@ -759,6 +825,8 @@ VALID_OPTS = immutabletypes.freeze(
         "jinja_lstrip_blocks": bool,
         # If this is set to True the first newline after a Jinja block is removed
         "jinja_trim_blocks": bool,
+        # Keep the compiled Jinja templates on disk under the cachedir
+        "jinja_bytecode_cache": bool,
         # Cache minion ID to file
         "minion_id_caching": bool,
         # Always generate minion id in lowercase.
@@ -805,6 +873,11 @@ VALID_OPTS = immutabletypes.freeze(
         "ssh_scan_ports": str,
         "ssh_scan_timeout": float,
         "ssh_identities_only": bool,
+        # Share a single persistent connection per host between the ssh and scp
+        # commands of salt-ssh with the ControlMaster of OpenSSH
+        "ssh_multiplex": bool,
+        # The number of seconds the shared connections stay open once idle
+        "ssh_multiplex_persist": int,
         "ssh_log_file": str,
         "ssh_config_file": str,
         "ssh_merge_pillar": bool,
@@ -879,6 +952,9 @@ VALID_OPTS = immutabletypes.freeze(
         # Thin and minimal Salt extra modules
         "thin_extra_mods": str,
         "min_extra_mods": str,
+        # Deploy the Salt Thin in content addressed chunks, only the chunks
+        # missing from the targets are sent to them
+        "thin_chunks": bool,
         # Default returners minion should use. List or comma-delimited string
         "return": (str, list),
         # TLS/SSL connection options. This could be set to a dictionary containing arguments
@@ -990,6 +1066,8 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "grains_cache": False,
         "grains_cache_expiration": 300,
         "grains_deep_merge": False,
+        "grains_concurrency": 0,
+        "grains_ttl": {},
         "conf_file": os.path.join(salt.syspaths.CONFIG_DIR, "minion"),
         "sock_dir": os.path.join(salt.syspaths.SOCK_DIR, "minion"),
         "sock_pool_size": 1,
@@ -997,6 +1075,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "renderer": "jinja|yaml",
         "renderer_whitelist": [],
         "renderer_blacklist": [],
+        "jinja_bytecode_cache": False,
         "random_startup_delay": 0,
         "failhard": False,
         "autoload_dynamic_modules": True,
@@ -1008,6 +1087,8 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "pillar_source_merging_strategy": "smart",
         "pillar_merge_lists": False,
         "pillar_includes_override_sls": False,
+        "ext_pillar_concurrency": 0,
+        "ext_pillar_timeout": 0,
         # ``pillar_cache``, ``pillar_cache_ttl``, ``pillar_cache_backend``,
         # ``gpg_cache``, ``gpg_cache_ttl`` and ``gpg_cache_backend``
         # are not used on the minion but are unavoidably in the code path
@@ -1045,6 +1126,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "fileserver_backend": ["roots"],
         "fileserver_followsymlinks": True,
         "fileserver_ignoresymlinks": False,
+        "fileserver_list_index": False,
         "pillar_roots": {
             "base": [salt.syspaths.BASE_PILLAR_ROOTS_DIR, salt.syspaths.SPM_PILLAR_PATH]
         },
@@ -1099,6 +1181,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "unique_jid": False,
         "hash_type": "sha256",
         "optimization_order": [0, 1, 2],
+        "loader_index": False,
         "disable_modules": [],
         "disable_returners": [],
         "whitelist_modules": [],
@@ -1118,6 +1201,9 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "autosign_timeout": 120,
         "multiprocessing": True,
         "process_count_max": -1,
+        "job_worker_pool": 0,
+        "job_worker_pool_max_jobs": 100,
+        "job_worker_pool_queue_size": 10,
         "mine_enabled": True,
         "mine_return_job": False,
         "mine_interval": 60,
@@ -1125,6 +1211,9 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "ipc_write_buffer": _DFLT_IPC_WBUFFER,
         "ipv6": None,
         "file_buffer_size": 262144,
+        "file_stream_window": 1,
+        "file_delta_sync": False,
+        "file_cache_dedup": False,
         "tcp_pub_port": 4510,
         "tcp_pull_port": 4511,
         "tcp_authentication_retries": 5,
@@ -1155,6 +1244,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "state_auto_order": True,
         "state_events": False,
         "state_aggregate": False,
+        "state_concurrency": 0,
         "snapper_states": False,
         "snapper_states_config": "root",
         "acceptance_wait_time": 10,
@@ -1378,6 +1468,9 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "pillar_source_merging_strategy": "smart",
         "pillar_merge_lists": False,
         "pillar_includes_override_sls": False,
+        "ext_pillar_concurrency": 0,
+        "ext_pillar_timeout": 0,
+        "ext_pillar_timing_events": False,
         "pillar_cache": False,
         "pillar_cache_ttl": 3600,
         "pillar_cache_backend": "disk",
@@ -1411,6 +1504,8 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "file_recv": False,
         "file_recv_max_size": 100,
         "file_buffer_size": 1048576,
+        "file_stream_max_window": 8,
+        "file_delta_max_size": 10485760,
         "file_ignore_regex": [],
         "file_ignore_glob": [],
         "fileserver_backend": ["roots"],
@@ -1418,9 +1513,11 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "fileserver_ignoresymlinks": False,
         "fileserver_limit_traversal": False,
         "fileserver_verify_config": True,
+        "fileserver_list_index": False,
         "max_open_files": 100000,
         "hash_type": "sha256",
         "optimization_order": [0, 1, 2],
+        "loader_index": False,
         "conf_file": os.path.join(salt.syspaths.CONFIG_DIR, "master"),
         "open_mode": False,
         "auto_accept": False,
@@ -1438,6 +1535,12 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "master_job_cache": "local_cache",
         "job_cache_store_endtime": False,
         "minion_data_cache": True,
+        "minion_data_index": False,
+        "minion_data_index_interval": 60,
+        "mine_index": False,
+        "minion_pub_key_cache_size": 1000,
+        "auth_cache": False,
+        "auth_rate_limit": 0,
         "enforce_mine_cache": False,
         "ipc_mode": _DFLT_IPC_MODE,
         "ipc_write_buffer": _DFLT_IPC_WBUFFER,
@@ -1479,6 +1582,9 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "event_return_queue": 0,
         "event_return_whitelist": [],
         "event_return_blacklist": [],
+        "event_return_async": False,
+        "event_return_async_queue": 10000,
+        "event_return_spool_max_size": 104857600,
         "event_match_type": "startswith",
         "runner_returns": True,
         "serial": "msgpack",
@@ -1490,6 +1596,7 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "state_auto_order": True,
         "state_events": False,
         "state_aggregate": False,
+        "state_concurrency": 0,
         "search": "",
         "loop_interval": 60,
         "nodegroups": {},
@@ -1526,6 +1633,7 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "jinja_sls_env": {},
         "jinja_lstrip_blocks": False,
         "jinja_trim_blocks": False,
+        "jinja_bytecode_cache": False,
         "tcp_keepalive": True,
         "tcp_keepalive_idle": 300,
         "tcp_keepalive_cnt": -1,
@@ -1547,6 +1655,8 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "ssh_scan_ports": "22",
         "ssh_scan_timeout": 0.01,
         "ssh_identities_only": False,
+        "ssh_multiplex": False,
+        "ssh_multiplex_persist": 60,
         "ssh_log_file": os.path.join(salt.syspaths.LOGS_DIR, "ssh"),
         "ssh_config_file": os.path.join(salt.syspaths.HOME_DIR, ".ssh", "config"),
         "cluster_mode": False,
@@ -1576,6 +1686,7 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "memcache_debug": False,
         "thin_extra_mods": "",
         "min_extra_mods": "",
+        "thin_chunks": False,
         "ssl": None,
         "extmod_whitelist": {},
         "extmod_blacklist": {},
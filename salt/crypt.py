@@ -6,6 +6,7 @@ authenticating peers
 
 import base64
 import binascii
+import collections
 import copy
 import getpass
 import hashlib
@@ -227,6 +228,96 @@ def get_rsa_pub_key(path):
     return key
 
 
+# The process wide cache of public keys, see pub_key_cache
+_PUB_KEY_CACHE = None
+
+# Files and directories modified less than this many seconds ago are not
+# cached, file systems with a coarse timestamp resolution could otherwise hide
+# a second change made within the same tick.
+RACY_WINDOW = 2
+
+
+class PubKeyCache:
+    """
+    A least recently used cache of parsed public keys, looked up by path
+
+    A cached key is used as long as ``os.stat`` reports the same inode, size
+    and modification time for its file. Accepting, rejecting or deleting a
+    minion key moves or removes the file of the key, which invalidates the
+    cached key without reading the file. Key files modified less than
+    ``RACY_WINDOW`` seconds ago are read every time.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._keys = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def get(self, path):
+        """
+        Return the public key stored in ``path``, read from the file every
+        time when the size of the cache is 0 or less
+        """
+        if self.size <= 0:
+            return get_rsa_pub_key(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._keys.pop(path, None)
+            raise
+        state = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        cached = self._keys.get(path)
+        if cached is not None and cached[0] == state:
+            self._keys.move_to_end(path)
+            self.stats["hits"] += 1
+            return cached[1]
+        self.stats["misses"] += 1
+        key = get_rsa_pub_key(path)
+        if time.time() - stat.st_mtime_ns / 1e9 <= RACY_WINDOW:
+            # The file may be rewritten with the same size and mtime
+            self._keys.pop(path, None)
+            return key
+        self._keys[path] = (state, key)
+        self._keys.move_to_end(path)
+        while len(self._keys) > self.size:
+            self._keys.popitem(last=False)
+            self.stats["evictions"] += 1
+        return key
+
+    def clear(self):
+        """
+        Drop all cached keys
+        """
+        self._keys.clear()
+
+
+def pub_key_cache(opts):
+    """
+    Return the public key cache of this process
+    """
+    global _PUB_KEY_CACHE  # pylint: disable=global-statement
+    size = opts.get("minion_pub_key_cache_size", 0)
+    if _PUB_KEY_CACHE is None:
+        _PUB_KEY_CACHE = PubKeyCache(size)
+    elif _PUB_KEY_CACHE.size != size:
+        _PUB_KEY_CACHE.size = size
+        _PUB_KEY_CACHE.clear()
+    return _PUB_KEY_CACHE
+
+
+def pub_key_cache_stats():
+    """
+    Return the hit/miss/eviction counters of the public key cache of this
+    process, or None if it was not used yet.
+    """
+    if _PUB_KEY_CACHE is None:
+        return None
+    return dict(_PUB_KEY_CACHE.stats, keys=len(_PUB_KEY_CACHE))
+
+
 def sign_message(privkey_path, message, passphrase=None):
     """
     Use Crypto.Signature.PKCS1_v1_5 to sign a message. Returns the signature.
@@ -243,13 +334,19 @@ def sign_message(privkey_path, message, passphrase=None):
         return signer.sign(SHA.new(salt.utils.stringutils.to_bytes(message)))
 
 
-def verify_signature(pubkey_path, message, signature):
+def verify_signature(pubkey_path, message, signature, cache=None):
     """
     Use Crypto.Signature.PKCS1_v1_5 to verify the signature on a message.
     Returns True for valid signature.
+
+    The public key is looked up in ``cache`` when a :py:class:`PubKeyCache` is
+    passed.
     """
     log.debug("salt.crypt.verify_signature: Loading public key")
-    pubkey = get_rsa_pub_key(pubkey_path)
+    if cache is not None:
+        pubkey = cache.get(pubkey_path)
+    else:
+        pubkey = get_rsa_pub_key(pubkey_path)
     log.debug("salt.crypt.verify_signature: Verifying signature")
     if HAS_M2:
         md = EVP.MessageDigest("sha1")
@@ -644,6 +741,9 @@ class AsyncAuth:
                 except SaltClientError as exc:
                     error = exc
                     break
+                if creds == "busy":
+                    # The retry-after hint of the master was already honoured
+                    continue
                 if creds == "retry":
                     if self.opts.get("detect_mode") is True:
                         error = SaltClientError("Detect mode is on")
@@ -790,6 +890,16 @@ class AsyncAuth:
                         # to avoid overloading the system
                         time.sleep(random.randint(10, 20))
                         sys.exit(salt.defaults.exitcodes.EX_NOPERM)
+                # is the master deferring authentications?
+                elif payload["load"]["ret"] == "busy":
+                    retry_after = payload["load"].get("retry_after", 0)
+                    log.info(
+                        "The Salt Master is busy, retrying authentication in "
+                        "%s seconds",
+                        retry_after,
+                    )
+                    yield salt.ext.tornado.gen.sleep(retry_after)
+                    raise salt.ext.tornado.gen.Return("busy")
                 # has the master returned that its maxed out with minions?
                 elif payload["load"]["ret"] == "full":
                     raise salt.ext.tornado.gen.Return("full")
@@ -885,6 +995,8 @@ class AsyncAuth:
         payload = {}
         payload["cmd"] = "_auth"
         payload["id"] = self.opts["id"]
+        # Tell the master this minion honours its busy replies
+        payload["auth_busy"] = True
         if "autosign_grains" in self.opts:
             autosign_grains = {}
             for grain in self.opts["autosign_grains"]:
@@ -1288,6 +1400,9 @@ class SAuth(AsyncAuth):
         ) as channel:
             while True:
                 creds = self.sign_in(channel=channel)
+                if creds == "busy":
+                    # The retry-after hint of the master was already honoured
+                    continue
                 if creds == "retry":
                     if self.opts.get("caller"):
                         # We have a list of masters, so we should break
@@ -1391,6 +1506,16 @@ class SAuth(AsyncAuth):
                             "clean out the keys. The Salt Minion will now exit."
                         )
                         sys.exit(salt.defaults.exitcodes.EX_NOPERM)
+                # is the master deferring authentications?
+                elif payload["load"]["ret"] == "busy":
+                    retry_after = payload["load"].get("retry_after", 0)
+                    log.info(
+                        "The Salt Master is busy, retrying authentication in "
+                        "%s seconds",
+                        retry_after,
+                    )
+                    time.sleep(retry_after)
+                    return "busy"
                 # has the master returned that its maxed out with minions?
                 elif payload["load"]["ret"] == "full":
                     return "full"
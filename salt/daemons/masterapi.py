@@ -32,6 +32,7 @@ import salt.utils.gitfs
 import salt.utils.gzip_util
 import salt.utils.jid
 import salt.utils.mine
+import salt.utils.minion_index
 import salt.utils.minions
 import salt.utils.path
 import salt.utils.platform
@@ -418,6 +419,7 @@ class RemoteFuncs:
         """
         fs_ = salt.fileserver.Fileserver(self.opts)
         self._serve_file = fs_.serve_file
+        self._serve_file_delta = fs_.serve_file_delta
         self._file_find = fs_._find_file
         self._file_hash = fs_.file_hash
         self._file_list = fs_.file_list
@@ -581,12 +583,53 @@ class RemoteFuncs:
             match_type = "pillar_exact"
         if match_type.lower() == "compound":
             match_type = "compound_pillar_exact"
+        # The callers passing the generation they saw last only get the mine
+        # data changed since, along with the minions having mine data
+        generation = load.get("generation")
+        if generation is not None:
+            new_generation = salt.utils.mine.generation(
+                salt.utils.mine.MINE_GENERATION_GRACE
+            )
+            present = {}
+        use_index = self.opts.get("mine_index", False)
+        unchanged = set()
+        if use_index:
+            indexed = {
+                function: set(salt.utils.mine.list_index_minions(self.cache, function))
+                for function in functions_allowed
+            }
+            if generation is not None:
+                # The mine data of the functions which did not change since
+                # is not read at all
+                for function in functions_allowed:
+                    changed = salt.utils.mine.function_generation(self.cache, function)
+                    if changed is not None and changed <= generation:
+                        unchanged.add(function)
         checker = salt.utils.minions.CkMinions(self.opts)
         _res = checker.check_minions(load["tgt"], match_type, greedy=False)
         minions = _res["minions"]
         minion_side_acl = {}  # Cache minion-side ACL
         for minion in minions:
-            mine_data = self.cache.fetch("minions/{}".format(minion), "mine")
+            generations = {}
+            if use_index:
+                mine_data = {}
+                for function in unchanged:
+                    if minion in indexed[function]:
+                        present.setdefault(function, []).append(minion)
+                fetch = [
+                    func
+                    for func in functions_allowed
+                    if minion in indexed[func] and func not in unchanged
+                ]
+                if not fetch:
+                    continue
+                for function, item in salt.utils.mine.fetch_index(
+                    self.cache, minion, fetch
+                ).items():
+                    mine_data[function] = item["data"]
+                    generations[function] = item["generation"]
+            else:
+                mine_data = self.cache.fetch("minions/{}".format(minion), "mine")
             if not isinstance(mine_data, dict):
                 continue
             for function in functions_allowed:
@@ -620,11 +663,19 @@ class RemoteFuncs:
                     minion_side_acl, minion, function, load["id"]
                 ):
                     continue
+                if generation is not None:
+                    present.setdefault(function, []).append(minion)
+                    if generations.get(function, generation + 1) <= generation:
+                        continue
                 if _ret_dict:
                     ret.setdefault(function, {})[minion] = mine_result
                 else:
                     # There is only one function in functions_allowed.
                     ret[minion] = mine_result
+        if generation is not None:
+            if not _ret_dict:
+                present = present.get(functions_allowed[0], [])
+            return {"generation": new_generation, "data": ret, "minions": present}
         return ret
 
     def _mine(self, load, skip_verify=False):
@@ -640,6 +691,18 @@ class RemoteFuncs:
             cbank = "minions/{}".format(load["id"])
             ckey = "mine"
             new_data = load["data"]
+            if self.opts.get("mine_index", False):
+                clear = load.get("clear", False)
+                if self.cache.contains(cbank, ckey):
+                    # Move the mine data stored before the index was enabled
+                    data = self.cache.fetch(cbank, ckey)
+                    if isinstance(data, dict) and not clear:
+                        data.update(new_data)
+                        new_data = data
+                    clear = True
+                    self.cache.flush(cbank, ckey)
+                salt.utils.mine.store_index(self.cache, load["id"], new_data, clear)
+                return True
             if not load.get("clear", False):
                 data = self.cache.fetch(cbank, ckey)
                 if isinstance(data, dict):
@@ -659,6 +722,10 @@ class RemoteFuncs:
             cbank = "minions/{}".format(load["id"])
             ckey = "mine"
             try:
+                if self.opts.get("mine_index", False):
+                    salt.utils.mine.delete_index(self.cache, load["id"], load["fun"])
+                    if not self.cache.contains(cbank, ckey):
+                        return True
                 data = self.cache.fetch(cbank, ckey)
                 if not isinstance(data, dict):
                     return False
@@ -678,7 +745,12 @@ class RemoteFuncs:
         if self.opts.get("minion_data_cache", False) or self.opts.get(
             "enforce_mine_cache", False
         ):
-            return self.cache.flush("minions/{}".format(load["id"]), "mine")
+            cbank = "minions/{}".format(load["id"])
+            if self.opts.get("mine_index", False):
+                salt.utils.mine.delete_index(self.cache, load["id"])
+                if not self.cache.contains(cbank, "mine"):
+                    return True
+            return self.cache.flush(cbank, "mine")
         return True
 
     def _file_recv(self, load):
@@ -751,11 +823,9 @@ class RemoteFuncs:
         )
         data = pillar.compile_pillar()
         if self.opts.get("minion_data_cache", False):
-            self.cache.store(
-                "minions/{}".format(load["id"]),
-                "data",
-                {"grains": load["grains"], "pillar": data},
-            )
+            mdata = {"grains": load["grains"], "pillar": data}
+            self.cache.store("minions/{}".format(load["id"]), "data", mdata)
+            salt.utils.minion_index.update(self.opts, load["id"], mdata)
             if self.opts.get("minion_data_cache_events") is True:
                 self.event.fire_event(
                     {"comment": "Minion data cache refresh"},
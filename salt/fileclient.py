@@ -20,6 +20,7 @@ import salt.payload
 import salt.transport.client
 import salt.utils.atomicfile
 import salt.utils.data
+import salt.utils.filedelta
 import salt.utils.files
 import salt.utils.gzip_util
 import salt.utils.hashutils
@@ -155,6 +156,95 @@ class Client:
             cachedir = os.path.join(self.opts["cachedir"], cachedir)
         return cachedir
 
+    def _cas_loc(self, hash_data, cachedir=None):
+        """
+        Return the location of the file with the given hash in the content
+        addressed store of the cache, or None if the hash data is unusable
+        """
+        try:
+            hsum = hash_data["hsum"]
+            hash_type = hash_data["hash_type"]
+        except (KeyError, TypeError):
+            return None
+        if not (
+            isinstance(hsum, str)
+            and isinstance(hash_type, str)
+            and hsum.isalnum()
+            and hash_type.isalnum()
+        ):
+            return None
+        return salt.utils.path.join(
+            self.get_cachedir(cachedir), "cas", hash_type, hsum[:2], hsum
+        )
+
+    def _cas_link(self, src, dest):
+        """
+        Atomically replace ``dest`` with a hard link to ``src``
+        """
+        tmp = "{}.___cas".format(dest)
+        try:
+            if os.path.lexists(tmp):
+                os.remove(tmp)
+            os.link(src, tmp)
+            os.replace(tmp, dest)
+        except OSError as exc:
+            log.debug("Unable to link %s to %s: %s", dest, src, exc)
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def _cas_fetch(self, hash_data, dest, cachedir=None):
+        """
+        Put a copy of the file with the given hash from the content addressed
+        store at ``dest``. Returns True if the store had the file.
+        """
+        cas = self._cas_loc(hash_data, cachedir)
+        if cas is None or not os.path.isfile(cas):
+            return False
+        if (
+            salt.utils.hashutils.get_hash(cas, hash_data["hash_type"])
+            != hash_data["hsum"]
+        ):
+            log.warning("Removing corrupt file %s from the file cache", cas)
+            os.remove(cas)
+            return False
+        if os.path.isdir(dest):
+            salt.utils.files.rm_rf(dest)
+        return self._cas_link(cas, dest)
+
+    def _cas_store(self, hash_data, dest, cachedir=None):
+        """
+        Add the cached file ``dest`` to the content addressed store, sharing
+        the storage with identical files cached before
+        """
+        cas = self._cas_loc(hash_data, cachedir)
+        if cas is None or not os.path.isfile(dest):
+            return
+        if os.path.isfile(cas):
+            if os.path.samefile(cas, dest):
+                return
+            if (
+                salt.utils.hashutils.get_hash(cas, hash_data["hash_type"])
+                == hash_data["hsum"]
+            ):
+                self._cas_link(cas, dest)
+                return
+            os.remove(cas)
+        with salt.utils.files.set_umask(0o077):
+            try:
+                os.makedirs(os.path.dirname(cas))
+            except OSError as exc:
+                if exc.errno != errno.EEXIST:
+                    log.debug("Unable to create %s: %s", os.path.dirname(cas), exc)
+                    return
+        try:
+            os.link(dest, cas)
+        except OSError as exc:
+            log.debug("Unable to add %s to the file cache store: %s", dest, exc)
+
     def get_file(
         self, path, dest="", makedirs=False, saltenv="base", gzip=None, cachedir=None
     ):
@@ -1174,6 +1264,23 @@ class RemoteClient(Client):
             if hash_local == hash_server:
                 return dest2check
 
+        # Files in the minion cache are shared through the content addressed
+        # store, files at a given dest are never hard linked.
+        dedup = not dest and self.opts.get("file_cache_dedup", False)
+        if dedup and self._cas_fetch(hash_server, dest2check, cachedir):
+            log.debug("Found '%s' in the content addressed file cache", path)
+            return dest2check
+
+        if (
+            self.opts.get("file_delta_sync", False)
+            and dest2check
+            and os.path.isfile(dest2check)
+            and self._get_file_delta(path, dest2check, saltenv, hash_server)
+        ):
+            if dedup:
+                self._cas_store(hash_server, dest2check, cachedir)
+            return dest2check
+
         log.debug(
             "Fetching file from saltenv '%s', ** attempting ** '%s'", saltenv, path
         )
@@ -1184,6 +1291,10 @@ class RemoteClient(Client):
         if gzip:
             gzip = int(gzip)
             load["gzip"] = gzip
+        if self.opts.get("file_stream_window", 1) > 1:
+            # Ask for several chunks per round trip, masters which do not
+            # support it keep sending one chunk per request
+            load["window"] = self.opts["file_stream_window"]
 
         fn_ = None
         if dest:
@@ -1225,7 +1336,11 @@ class RemoteClient(Client):
                             data["dest"], saltenv, cachedir=cachedir
                         ) as cache_dest:
                             dest = cache_dest
-                            with salt.utils.files.fopen(cache_dest, "wb+") as ofile:
+                            # Replace the file instead of truncating it, it
+                            # may be linked to the content addressed store
+                            with salt.utils.atomicfile.atomic_open(
+                                cache_dest, "wb+"
+                            ) as ofile:
                                 ofile.write(data["data"])
                     if "hsum" in data and d_tries < 3:
                         # Master has prompted a file verification, if the
@@ -1291,6 +1406,8 @@ class RemoteClient(Client):
         if fn_:
             fn_.close()
             log.info("Fetching file from saltenv '%s', ** done ** '%s'", saltenv, path)
+            if dedup:
+                self._cas_store(hash_server, dest, cachedir)
         else:
             log.debug(
                 "In saltenv '%s', we are ** missing ** the file '%s'", saltenv, path
@@ -1298,6 +1415,54 @@ class RemoteClient(Client):
 
         return dest
 
+    def _get_file_delta(self, path, dest, saltenv, hash_server):
+        """
+        Update the older copy of a file at ``dest`` by fetching only the blocks
+        which changed on the master. Returns False if the master could not
+        provide a delta or the result does not match ``hash_server``.
+        """
+        try:
+            hsum = hash_server["hsum"]
+            hash_type = hash_server["hash_type"]
+        except (KeyError, TypeError):
+            return False
+        size = salt.utils.filedelta.block_size(os.path.getsize(dest))
+        load = {
+            "path": self._check_proto(path),
+            "saltenv": saltenv,
+            "cmd": "_serve_file_delta",
+            "block_size": size,
+            "signature": salt.utils.filedelta.signature(dest, size),
+        }
+        data = self.channel.send(load, raw=True)
+        if not isinstance(data, dict):
+            # The master does not support deltas
+            return False
+        data = decode_dict_keys_to_str(data)
+        if not data.get("ops"):
+            log.debug("No delta available for '%s', fetching the whole file", path)
+            return False
+        try:
+            with salt.utils.files.fopen(
+                dest, "rb"
+            ) as basis, salt.utils.atomicfile.atomic_open(dest, "wb") as ofile:
+                salt.utils.filedelta.patch(basis, data["ops"], size, ofile)
+                ofile.flush()
+                hsum_new = salt.utils.hashutils.get_hash(
+                    ofile.name, salt.utils.stringutils.to_str(hash_type)
+                )
+                if hsum_new != hsum:
+                    raise MinionError(
+                        "Hash mismatch after applying the delta to {}".format(dest)
+                    )
+        except (OSError, TypeError, ValueError, MinionError) as exc:
+            log.warning("Unable to apply the delta for '%s': %s", path, exc)
+            return False
+        log.info(
+            "Fetching file delta from saltenv '%s', ** done ** '%s'", saltenv, path
+        )
+        return True
+
     def file_list(self, saltenv="base", prefix=""):
         """
         List the files on the master
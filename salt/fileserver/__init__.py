@@ -300,6 +300,21 @@ def is_file_ignored(opts, fname):
     return False
 
 
+def serve_buffer_size(opts, load):
+    """
+    Return the number of bytes a ``serve_file`` call should read for the given
+    load. Clients in streaming mode ask for a ``window`` of several
+    ``file_buffer_size`` chunks per request, which is capped by the
+    ``file_stream_max_window`` config option.
+    """
+    try:
+        window = int(load.get("window", 1))
+    except (TypeError, ValueError):
+        window = 1
+    window = max(1, min(window, opts.get("file_stream_max_window", 1)))
+    return opts["file_buffer_size"] * window
+
+
 def clear_lock(clear_func, role, remote=None, lock_type="update"):
     """
     Function to allow non-fileserver functions to clear update locks
@@ -631,6 +646,30 @@ class Fileserver:
             return self.servers[fstr](load, fnd)
         return ret
 
+    def serve_file_delta(self, load):
+        """
+        Serve up the delta between a file and an older copy of it, for the
+        backends which support it
+        """
+        ret = {"ops": None, "dest": ""}
+
+        if "env" in load:
+            # "env" is not supported; Use "saltenv".
+            load.pop("env")
+
+        if "path" not in load or "saltenv" not in load:
+            return ret
+        if not isinstance(load["saltenv"], str):
+            load["saltenv"] = str(load["saltenv"])
+
+        fnd = self.find_file(load["path"], load["saltenv"])
+        if not fnd.get("back"):
+            return ret
+        fstr = "{}.serve_file_delta".format(fnd["back"])
+        if fstr in self.servers:
+            return self.servers[fstr](load, fnd)
+        return ret
+
     def __file_hash_and_stat(self, load):
         """
         Common code for hashing and stating files
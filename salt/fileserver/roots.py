@@ -18,9 +18,13 @@ configuration option.
 import errno
 import logging
 import os
+import time
 
 import salt.fileserver
+import salt.payload
+import salt.utils.atomicfile
 import salt.utils.event
+import salt.utils.filedelta
 import salt.utils.files
 import salt.utils.gzip_util
 import salt.utils.hashutils
@@ -31,6 +35,9 @@ import salt.utils.versions
 
 log = logging.getLogger(__name__)
 
+# The file list indexes of the saltenvs kept by this process
+_FILE_LIST_INDEXES = {}
+
 
 def find_file(path, saltenv="base", **kwargs):
     """
@@ -127,7 +134,7 @@ def serve_file(load, fnd):
     fpath = os.path.normpath(fnd["path"])
     with salt.utils.files.fopen(fpath, "rb") as fp_:
         fp_.seek(load["loc"])
-        data = fp_.read(__opts__["file_buffer_size"])
+        data = fp_.read(salt.fileserver.serve_buffer_size(__opts__, load))
         if gzip and data:
             data = salt.utils.gzip_util.compress(data, gzip)
             ret["gzip"] = gzip
@@ -135,6 +142,52 @@ def serve_file(load, fnd):
     return ret
 
 
+def serve_file_delta(load, fnd):
+    """
+    Return the operations which rebuild a file from the blocks of an older
+    copy of it, described by the signature the client sent
+    """
+    if "env" in load:
+        # "env" is not supported; Use "saltenv".
+        load.pop("env")
+
+    ret = {"ops": None, "dest": ""}
+    if "path" not in load or "saltenv" not in load or "signature" not in load:
+        return ret
+    if not fnd["path"]:
+        return ret
+    ret["dest"] = fnd["rel"]
+    try:
+        size = int(load.get("block_size"))
+    except (TypeError, ValueError):
+        return ret
+    if not (
+        salt.utils.filedelta.MIN_BLOCK_SIZE
+        <= size
+        <= salt.utils.filedelta.MAX_BLOCK_SIZE
+    ):
+        return ret
+    fpath = os.path.normpath(fnd["path"])
+    try:
+        fsize = os.path.getsize(fpath)
+    except OSError:
+        return ret
+    if fsize > __opts__.get("file_delta_max_size", 0):
+        return ret
+    with salt.utils.files.fopen(fpath, "rb") as fp_:
+        data = fp_.read()
+    try:
+        ret["ops"] = salt.utils.filedelta.delta(
+            data,
+            load["signature"],
+            size,
+            max_literal=min(len(data) // 2, salt.utils.filedelta.MAX_LITERAL),
+        )
+    except (TypeError, ValueError) as exc:
+        log.debug("Invalid file signature for %s: %s", fnd["rel"], exc)
+    return ret
+
+
 def update():
     """
     When we are asked to update (regular interval) lets reap the cache
@@ -296,6 +349,57 @@ def file_hash(load, fnd):
     return ret
 
 
+def _translate_sep(path):
+    """
+    Translate path separators for Windows masterless minions
+    """
+    return path.replace("\\", "/") if os.path.sep == "\\" else path
+
+
+def _list_item(fs_root, abs_path):
+    """
+    Return the path of a file or directory relative to the root dir of the
+    fileserver and its symlink destination, or None if it is not listed
+    """
+    log.trace("roots: Processing %s", abs_path)
+    is_link = salt.utils.path.islink(abs_path)
+    log.trace("roots: %s is %sa link", abs_path, "not " if not is_link else "")
+    if is_link and __opts__["fileserver_ignoresymlinks"]:
+        return None
+    rel_path = _translate_sep(os.path.relpath(abs_path, fs_root))
+    log.trace("roots: %s relative path is %s", abs_path, rel_path)
+    if salt.fileserver.is_file_ignored(__opts__, rel_path):
+        return None
+    if not is_link:
+        return rel_path, None
+    link_dest = salt.utils.path.readlink(abs_path)
+    log.trace("roots: %s symlink destination is %s", abs_path, link_dest)
+    if salt.utils.platform.is_windows() and link_dest.startswith("\\\\"):
+        # Symlink points to a network path. Since you can't
+        # join UNC and non-UNC paths, just assume the original
+        # path.
+        log.trace(
+            "roots: %s is a UNC path, using %s instead", link_dest, abs_path,
+        )
+        link_dest = abs_path
+    if link_dest.startswith(".."):
+        joined = os.path.join(abs_path, link_dest)
+    else:
+        joined = os.path.join(os.path.dirname(abs_path), link_dest)
+    rel_dest = _translate_sep(
+        os.path.relpath(
+            os.path.realpath(os.path.normpath(joined)), os.path.realpath(fs_root),
+        )
+    )
+    log.trace("roots: %s relative path is %s", abs_path, rel_dest)
+    if rel_dest.startswith(".."):
+        # Only count the link if it does not point
+        # outside of the root dir of the fileserver
+        # (i.e. the "path" variable)
+        return rel_path, None
+    return rel_path, link_dest
+
+
 def _file_lists(load, form):
     """
     Return a dict containing the file lists for files, dirs, emtydirs and symlinks
@@ -314,6 +418,9 @@ def _file_lists(load, form):
         else:
             return []
 
+    if __opts__.get("fileserver_list_index", False):
+        return _indexed_file_lists(saltenv).get(form, [])
+
     list_cachedir = os.path.join(__opts__["cachedir"], "file_lists", "roots")
     if not os.path.isdir(list_cachedir):
         try:
@@ -339,26 +446,12 @@ def _file_lists(load, form):
             """
             Add the files to the target set
             """
-
-            def _translate_sep(path):
-                """
-                Translate path separators for Windows masterless minions
-                """
-                return path.replace("\\", "/") if os.path.sep == "\\" else path
-
             for item in items:
                 abs_path = os.path.join(parent_dir, item)
-                log.trace("roots: Processing %s", abs_path)
-                is_link = salt.utils.path.islink(abs_path)
-                log.trace(
-                    "roots: %s is %sa link", abs_path, "not " if not is_link else ""
-                )
-                if is_link and __opts__["fileserver_ignoresymlinks"]:
-                    continue
-                rel_path = _translate_sep(os.path.relpath(abs_path, fs_root))
-                log.trace("roots: %s relative path is %s", abs_path, rel_path)
-                if salt.fileserver.is_file_ignored(__opts__, rel_path):
+                listed = _list_item(fs_root, abs_path)
+                if listed is None:
                     continue
+                rel_path, link_dest = listed
                 tgt.add(rel_path)
                 try:
                     if not os.listdir(abs_path):
@@ -368,39 +461,8 @@ def _file_lists(load, form):
                     # non-directory path raises an OSError on *NIX and a
                     # WindowsError on Windows.
                     pass
-                if is_link:
-                    link_dest = salt.utils.path.readlink(abs_path)
-                    log.trace(
-                        "roots: %s symlink destination is %s", abs_path, link_dest
-                    )
-                    if salt.utils.platform.is_windows() and link_dest.startswith(
-                        "\\\\"
-                    ):
-                        # Symlink points to a network path. Since you can't
-                        # join UNC and non-UNC paths, just assume the original
-                        # path.
-                        log.trace(
-                            "roots: %s is a UNC path, using %s instead",
-                            link_dest,
-                            abs_path,
-                        )
-                        link_dest = abs_path
-                    if link_dest.startswith(".."):
-                        joined = os.path.join(abs_path, link_dest)
-                    else:
-                        joined = os.path.join(os.path.dirname(abs_path), link_dest)
-                    rel_dest = _translate_sep(
-                        os.path.relpath(
-                            os.path.realpath(os.path.normpath(joined)),
-                            os.path.realpath(fs_root),
-                        )
-                    )
-                    log.trace("roots: %s relative path is %s", abs_path, rel_dest)
-                    if not rel_dest.startswith(".."):
-                        # Only count the link if it does not point
-                        # outside of the root dir of the fileserver
-                        # (i.e. the "path" variable)
-                        ret["links"][rel_path] = link_dest
+                if link_dest is not None:
+                    ret["links"][rel_path] = link_dest
 
         for path in __opts__["file_roots"][saltenv]:
             for root, dirs, files in salt.utils.path.os_walk(
@@ -424,6 +486,179 @@ def _file_lists(load, form):
     return []
 
 
+def _file_list_index_path(saltenv):
+    """
+    Return the path of the file list index of a saltenv
+    """
+    return os.path.join(
+        __opts__["cachedir"],
+        "roots",
+        "file_list_index",
+        "{}.p".format(salt.utils.files.safe_filename_leaf(saltenv)),
+    )
+
+
+def _load_file_list_index(saltenv, key):
+    """
+    Return the file list index of a saltenv written by this process or by
+    another one, or an empty index
+    """
+    path = _file_list_index_path(saltenv)
+    dirs = {}
+    try:
+        with salt.utils.files.fopen(path, "rb") as fp_:
+            index = salt.payload.Serial(__opts__).load(fp_)
+        if index.get("version") == 1 and index["key"] == key:
+            dirs = index["dirs"]
+    except Exception as exc:  # pylint: disable=broad-except
+        log.trace("roots: Unable to read the file list index %s: %s", path, exc)
+    return {"key": key, "time": 0, "dirs": dirs, "lists": {}}
+
+
+def _save_file_list_index(saltenv, index):
+    """
+    Write the file list index of a saltenv for the other processes
+    """
+    path = _file_list_index_path(saltenv)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with salt.utils.atomicfile.atomic_open(path, "wb") as fp_:
+            salt.payload.Serial(__opts__).dump(
+                {"version": 1, "key": index["key"], "dirs": index["dirs"]}, fp_
+            )
+    except Exception as exc:  # pylint: disable=broad-except
+        log.debug("roots: Unable to write the file list index %s: %s", path, exc)
+
+
+def _scan_dir(fs_root, root, mtime):
+    """
+    Return the file list index entry of a directory: the subdirectories to
+    walk, whether it is empty, and the listed paths of its items
+    """
+    try:
+        with os.scandir(root) as entries:
+            entries = list(entries)
+    except OSError as exc:
+        log.trace("roots: Unable to list %s: %s", root, exc)
+        return None
+    dirs = []
+    files = []
+    walk = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if not is_dir:
+            files.append(entry.name)
+            continue
+        dirs.append(entry.name)
+        try:
+            is_link = entry.is_symlink()
+        except OSError:
+            is_link = False
+        if __opts__["fileserver_followsymlinks"] or not is_link:
+            walk.append(entry.name)
+    items = []
+    for form, names in (("dirs", dirs), ("files", files)):
+        for name in names:
+            listed = _list_item(fs_root, os.path.join(root, name))
+            if listed is not None:
+                items.append([form, name, listed[0], listed[1]])
+    return {"mtime": mtime, "empty": not entries, "walk": walk, "items": items}
+
+
+def _walk_file_list_index(fs_root, old):
+    """
+    Return the file list index entries of the directories under a root dir of
+    the fileserver, and whether they changed. Only the directories modified
+    since their old entry was made are listed again.
+    """
+    new = {}
+    changed = False
+    # A directory modified in the last seconds could be modified again without
+    # its mtime changing on filesystems with a coarse timestamp resolution
+    recent = int((time.time() - 2) * 1000000000)
+    stack = [fs_root]
+    while stack:
+        root = stack.pop()
+        if root in new:
+            # Looping symlinks
+            continue
+        try:
+            mtime = os.stat(root).st_mtime_ns
+        except OSError:
+            continue
+        entry = old.get(root)
+        if entry is None or entry["mtime"] != mtime:
+            entry = _scan_dir(fs_root, root, mtime if mtime < recent else None)
+            if entry is None:
+                continue
+            changed = True
+        new[root] = entry
+        stack.extend(os.path.join(root, name) for name in entry["walk"])
+    return new, changed or len(new) != len(old)
+
+
+def _indexed_file_lists(saltenv):
+    """
+    Return the file lists of a saltenv from its file list index, refreshed
+    every :conf_master:`fileserver_list_cache_time` seconds by listing again
+    the directories modified since the last refresh
+    """
+    key = [
+        __opts__["file_roots"][saltenv],
+        __opts__["fileserver_followsymlinks"],
+        __opts__["fileserver_ignoresymlinks"],
+        __opts__["file_ignore_regex"],
+        __opts__["file_ignore_glob"],
+    ]
+    index = _FILE_LIST_INDEXES.get(saltenv)
+    if index is None or index["key"] != key:
+        index = _load_file_list_index(saltenv, key)
+    start = time.time()
+    if 0 <= start - index["time"] < __opts__.get("fileserver_list_cache_time", 20):
+        return index["lists"]
+
+    dirs = {}
+    changed = False
+    for path in __opts__["file_roots"][saltenv]:
+        dirs[path], path_changed = _walk_file_list_index(
+            path, index["dirs"].get(path, {})
+        )
+        changed = changed or path_changed
+    changed = changed or len(dirs) != len(index["dirs"])
+
+    ret = {"files": set(), "dirs": set(), "empty_dirs": set(), "links": {}}
+    for entries in dirs.values():
+        for root, entry in entries.items():
+            for form, name, rel_path, link_dest in entry["items"]:
+                ret[form].add(rel_path)
+                if form == "dirs":
+                    abs_path = os.path.join(root, name)
+                    if abs_path in entries:
+                        empty = entries[abs_path]["empty"]
+                    else:
+                        # Symlinked directories which are not walked
+                        try:
+                            empty = not os.listdir(abs_path)
+                        except OSError:
+                            empty = False
+                    if empty:
+                        ret["empty_dirs"].add(rel_path)
+                if link_dest is not None:
+                    ret["links"][rel_path] = link_dest
+    ret["files"] = sorted(ret["files"])
+    ret["dirs"] = sorted(ret["dirs"])
+    ret["empty_dirs"] = sorted(ret["empty_dirs"])
+
+    index = {"key": key, "time": start, "dirs": dirs, "lists": ret}
+    _FILE_LIST_INDEXES[saltenv] = index
+    if changed:
+        _save_file_list_index(saltenv, index)
+    return ret
+
+
 def file_list(load):
     """
     Return a list of all files on the file server in a specified
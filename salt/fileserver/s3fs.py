@@ -239,7 +239,7 @@ def serve_file(load, fnd):
 
     with salt.utils.files.fopen(cached_file_path, "rb") as fp_:
         fp_.seek(load["loc"])
-        data = fp_.read(__opts__["file_buffer_size"])
+        data = fp_.read(fs.serve_buffer_size(__opts__, load))
         if data and six.PY3 and not salt.utils.files.is_binary(cached_file_path):
             data = data.decode(__salt_system_encoding__)
         if gzip and data:
@@ -642,7 +642,7 @@ def serve_file(load, fnd):
     fpath = os.path.normpath(fnd["path"])
     with salt.utils.files.fopen(fpath, "rb") as fp_:
         fp_.seek(load["loc"])
-        data = fp_.read(__opts__["file_buffer_size"])
+        data = fp_.read(salt.fileserver.serve_buffer_size(__opts__, load))
         if data and not salt.utils.files.is_binary(fpath):
             data = data.decode(__salt_system_encoding__)
         if gzip and data:
@@ -23,6 +23,10 @@ __salt__ = {
     "cmd.run_all": salt.modules.cmdmod._run_all_quiet,
 }
 
+# The disks rarely change, the grains are only computed again once an hour
+# when the grains cache is enabled
+__grains_ttl__ = 3600
+
 log = logging.getLogger(__name__)
 
 
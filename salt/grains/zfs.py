@@ -36,6 +36,10 @@ __utils__ = {
     "zfs.to_size": salt.utils.zfs.to_size,
 }
 
+# The pools rarely change, the grains are only computed again once an hour
+# when the grains cache is enabled
+__grains_ttl__ = 3600
+
 log = logging.getLogger(__name__)
 
 
@@ -24,6 +24,7 @@ import salt.utils.files
 import salt.utils.json
 import salt.utils.kinds
 import salt.utils.master
+import salt.utils.mine
 import salt.utils.sdb
 import salt.utils.stringutils
 import salt.utils.user
@@ -469,6 +470,8 @@ class Key:
                 for minion in clist:
                     if minion not in minions and minion not in preserve_minions:
                         cache.flush("{}/{}".format(self.ACC, minion))
+                        if self.opts.get("mine_index", False):
+                            salt.utils.mine.delete_index(cache, minion)
 
     def check_master(self):
         """
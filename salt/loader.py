@@ -4,13 +4,16 @@ directories for python loadable code and organizes the code into the
 plugin interfaces used by Salt.
 """
 
+import concurrent.futures
 import contextvars
 import copy
 import functools
+import hashlib
 import importlib
 import importlib.machinery  # pylint: disable=no-name-in-module,import-error
 import importlib.util  # pylint: disable=no-name-in-module,import-error
 import inspect
+import json
 import logging
 import os
 import re
@@ -30,6 +33,7 @@ import salt.defaults.exitcodes
 import salt.loader_context
 import salt.syspaths
 import salt.utils.args
+import salt.utils.atomicfile
 import salt.utils.context
 import salt.utils.data
 import salt.utils.dictupdate
@@ -40,6 +44,7 @@ import salt.utils.odict
 import salt.utils.platform
 import salt.utils.stringutils
 import salt.utils.versions
+import salt.version
 from salt.exceptions import LoaderError
 from salt.template import check_render_pipe_str
 from salt.utils import entrypoints
@@ -85,6 +90,10 @@ LIBCLOUD_FUNCS_NOT_SUPPORTED = (
 # Will be set to pyximport module at runtime if cython is enabled in config.
 pyximport = None
 
+# The loader indexes read or written by this process, by path. Loaders of the
+# same module dirs share them instead of reading them again.
+LOADER_INDEXES = {}
+
 
 def static_loader(
     opts,
@@ -809,6 +818,59 @@ def _load_cached_grains(opts, cfn):
         return None
 
 
+def _grain_ttl(opts, funcs, key):
+    """
+    Returns the number of seconds the result of a grain function is cached
+    for. The grain modules declare it with ``__grains_ttl__``, the
+    ``grains_ttl`` option overrides it by module name.
+    """
+    module = key.split(".", 1)[0]
+    ttl = opts.get("grains_ttl") or {}
+    if module in ttl:
+        return ttl[module]
+    try:
+        return funcs[key].__globals__.get("__grains_ttl__", 0)
+    except AttributeError:
+        return 0
+
+
+def _load_cached_grain_funcs(opts, ffn):
+    """
+    Returns the results of the grain functions cached in ffn by function
+    name, an empty dict if there are none.
+    """
+    if opts.get("refresh_grains_cache", False) or not os.path.isfile(ffn):
+        return {}
+    try:
+        serial = salt.payload.Serial(opts)
+        with salt.utils.files.fopen(ffn, "rb") as fp_:
+            cached_funcs = salt.utils.data.decode(
+                serial.load(fp_), preserve_tuples=True
+            )
+    except Exception as exc:  # pylint: disable=broad-except
+        log.debug("Unable to load the grain functions cache %s: %s", ffn, exc)
+        return {}
+    if not isinstance(cached_funcs, dict):
+        return {}
+    for cached in cached_funcs.values():
+        if isinstance(cached.get("ret"), dict):
+            _format_cached_grains(cached["ret"])
+    return cached_funcs
+
+
+def _write_cached_grain_funcs(opts, ffn, results):
+    """
+    Write the results of the grain functions to ffn
+    """
+    with salt.utils.files.set_umask(0o077):
+        try:
+            serial = salt.payload.Serial(opts)
+            with salt.utils.atomicfile.atomic_open(ffn, "wb") as fp_:
+                serial.dump(results, fp_)
+        except Exception as exc:  # pylint: disable=broad-except
+            log.error("Unable to write the grain functions cache %s: %s", ffn, exc)
+
+
 def grains(opts, force_refresh=False, proxy=None, context=None):
     """
     Return the functions for the dynamic grains and the values for the static
@@ -874,73 +936,133 @@ def grains(opts, force_refresh=False, proxy=None, context=None):
     funcs = grain_funcs(opts, proxy=proxy, context=context or {})
     if force_refresh:  # if we refresh, lets reload grain modules
         funcs.clear()
-    # Run core grains
-    for key in funcs:
-        if not key.startswith("core."):
-            continue
+    # Run the core grains first, then the rest of the grains
+    keys = [key for key in funcs if key.startswith("core.")]
+    keys.extend(
+        key for key in funcs if not key.startswith("core.") and key != "_errors"
+    )
+
+    ffn = os.path.join(opts["cachedir"], "grains.funcs.cache.p")
+    cached_funcs = {}
+    if opts.get("grains_cache", False):
+        cached_funcs = _load_cached_grain_funcs(opts, ffn)
+    now = time.time()
+    results = {}
+    for key in keys:
+        ttl = _grain_ttl(opts, funcs, key)
+        cached = cached_funcs.get(key)
+        if ttl and cached and now - cached["time"] < ttl:
+            log.trace("Loading %s grain from the cache", key)
+            results[key] = cached
+
+    def _call(key):
+        """
+        Run a grain function and return its result along with the time it
+        was computed at and the time it took
+        """
         log.trace("Loading %s grain", key)
-        ret = funcs[key]()
-        if not isinstance(ret, dict):
-            continue
-        if blist:
-            for key in list(ret):
-                for block in blist:
-                    if salt.utils.stringutils.expr_match(key, block):
-                        del ret[key]
-                        log.trace("Filtering %s grain", key)
-            if not ret:
-                continue
-        if grains_deep_merge:
-            salt.utils.dictupdate.update(grains_data, ret)
+        start = time.time()
+        if key.startswith("core."):
+            ret = funcs[key]()
         else:
-            grains_data.update(ret)
+            try:
+                # Grains are loaded too early to take advantage of the injected
+                # __proxy__ variable.  Pass an instance of that LazyLoader
+                # here instead to grains functions if the grains functions take
+                # one parameter.  Then the grains can have access to the
+                # proxymodule for retrieving information from the connected
+                # device.
+                parameters = salt.utils.args.get_function_argspec(funcs[key]).args
+                kwargs = {}
+                if "proxy" in parameters:
+                    kwargs["proxy"] = proxy
+                if "grains" in parameters:
+                    kwargs["grains"] = grains_data
+                ret = funcs[key](**kwargs)
+            except Exception:  # pylint: disable=broad-except
+                if salt.utils.platform.is_proxy():
+                    log.info(
+                        "The following CRITICAL message may not be an error; the proxy may not be completely established yet."
+                    )
+                log.critical(
+                    "Failed to load grains defined in grain file %s in "
+                    "function %s, error:\n",
+                    key,
+                    funcs[key],
+                    exc_info=True,
+                )
+                ret = None
+        duration = time.time() - start
+        log.trace("Loaded %s grain in %.3f seconds", key, duration)
+        return {"ret": ret, "time": start, "duration": duration}
 
-    # Run the rest of the grains
-    for key in funcs:
-        if key.startswith("core.") or key == "_errors":
-            continue
+    def _independent(key):
+        """
+        Return True when the grain function does not take the grains
+        computed before it
+        """
+        if key.startswith("core."):
+            return True
         try:
-            # Grains are loaded too early to take advantage of the injected
-            # __proxy__ variable.  Pass an instance of that LazyLoader
-            # here instead to grains functions if the grains functions take
-            # one parameter.  Then the grains can have access to the
-            # proxymodule for retrieving information from the connected
-            # device.
-            log.trace("Loading %s grain", key)
             parameters = salt.utils.args.get_function_argspec(funcs[key]).args
-            kwargs = {}
-            if "proxy" in parameters:
-                kwargs["proxy"] = proxy
-            if "grains" in parameters:
-                kwargs["grains"] = grains_data
-            ret = funcs[key](**kwargs)
         except Exception:  # pylint: disable=broad-except
-            if salt.utils.platform.is_proxy():
-                log.info(
-                    "The following CRITICAL message may not be an error; the proxy may not be completely established yet."
-                )
-            log.critical(
-                "Failed to load grains defined in grain file %s in "
-                "function %s, error:\n",
-                key,
-                funcs[key],
-                exc_info=True,
+            # Run it in order, the error is logged when it is called
+            return False
+        return "grains" not in parameters
+
+    # The grain functions which do not take the grains computed before them
+    # run in a pool of threads, the other ones run in order once the grain
+    # functions before them are done
+    concurrency = opts.get("grains_concurrency", 0)
+    executor = None
+    futures = {}
+    if concurrency > 1:
+        independent = [key for key in keys if key not in results and _independent(key)]
+        if len(independent) > 1:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(concurrency, len(independent)),
+                thread_name_prefix="grains",
             )
-            continue
-        if not isinstance(ret, dict):
-            continue
-        if blist:
-            for key in list(ret):
-                for block in blist:
-                    if salt.utils.stringutils.expr_match(key, block):
-                        del ret[key]
-                        log.trace("Filtering %s grain", key)
-            if not ret:
+            for key in independent:
+                futures[key] = executor.submit(_call, key)
+    try:
+        for key in keys:
+            if key in futures:
+                results[key] = futures[key].result()
+            elif key not in results:
+                results[key] = _call(key)
+            ret = results[key]["ret"]
+            if not isinstance(ret, dict):
                 continue
-        if grains_deep_merge:
-            salt.utils.dictupdate.update(grains_data, ret)
-        else:
-            grains_data.update(ret)
+            if blist:
+                ret = copy.copy(ret)
+                for grain in list(ret):
+                    for block in blist:
+                        if salt.utils.stringutils.expr_match(grain, block):
+                            del ret[grain]
+                            log.trace("Filtering %s grain", grain)
+                if not ret:
+                    continue
+            if grains_deep_merge:
+                salt.utils.dictupdate.update(grains_data, ret)
+            else:
+                grains_data.update(ret)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    slowest = sorted(
+        (key for key in results if results[key]["time"] >= now),
+        key=lambda key: results[key]["duration"],
+        reverse=True,
+    )[:5]
+    if slowest:
+        log.debug(
+            "Slowest grain functions: %s",
+            ", ".join(
+                "{} ({:.3f}s)".format(key, results[key]["duration"]) for key in slowest
+            ),
+        )
 
     if opts.get("proxy_merge_grains_in_module", True) and proxy:
         try:
@@ -967,6 +1089,7 @@ def grains(opts, force_refresh=False, proxy=None, context=None):
     grains_data.update(opts["grains"])
     # Write cache if enabled
     if opts.get("grains_cache", False):
+        _write_cached_grain_funcs(opts, ffn, results)
         with salt.utils.files.set_umask(0o077):
             try:
                 if salt.utils.platform.is_windows():
@@ -1376,6 +1499,12 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             self.suffix_map[suffix] = (suffix, mode, kind)
             self.suffix_order.append(suffix)
 
+        # The persistent index of the file mapping, see _load_index
+        self._index_path = None
+        self._index_grains = None
+        self._index_virtual = {}
+        self._index_dirty = False
+
         self._lock = threading.RLock()
         with self._lock:
             self._refresh_file_mapping()
@@ -1488,7 +1617,20 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         # create mapping of filename (without suffix) to (path, suffix)
         # The files are added in order of priority, so order *must* be retained.
         self.file_mapping = salt.utils.odict.OrderedDict()
+        if not self._load_index():
+            # The listings are stamped before the scan, a change during the
+            # scan invalidates the index
+            stamps = self._get_index_stamps()
+            self._scan_file_mapping()
+            self._save_index(stamps)
+        for smod in self.static_modules:
+            f_noext = smod.split(".")[-1]
+            self.file_mapping[f_noext] = (smod, ".o", 0)
 
+    def _scan_file_mapping(self):
+        """
+        Scan the module dirs for the file mapping
+        """
         opt_match = []
 
         def _replace_pre_ext(obj):
@@ -1606,9 +1748,149 @@ class LazyLoader(salt.utils.lazy.LazyDict):
 
                 except OSError:
                     continue
-        for smod in self.static_modules:
-            f_noext = smod.split(".")[-1]
-            self.file_mapping[f_noext] = (smod, ".o", 0)
+
+    def _get_index_path(self):
+        """
+        Return the path of the persistent index of this loader, None if the
+        loader_index option is off.
+
+        The index only holds when the Salt version, the module dirs and the
+        options the file mapping is built from are the same.
+        """
+        if not self.opts.get("loader_index") or not self.opts.get("cachedir"):
+            return None
+        key = hashlib.sha256(
+            repr(
+                (
+                    salt.version.__version__,
+                    sys.implementation.cache_tag,
+                    self.tag,
+                    list(self.module_dirs),
+                    sorted(self.disabled),
+                    self.suffix_order,
+                    self.opts.get("optimization_order"),
+                )
+            ).encode()
+        ).hexdigest()
+        return os.path.join(
+            self.opts["cachedir"], "loader_index", "{}-{}.p".format(self.tag, key[:16]),
+        )
+
+    def _get_index_grains(self):
+        """
+        Return the hash of the grains, the virtual names of the modules are
+        only reused for the same grains
+        """
+        try:
+            grains = json.dumps(
+                self.opts.get("grains", {}), sort_keys=True, default=repr
+            )
+        except (TypeError, ValueError):
+            grains = repr(self.opts.get("grains", {}))
+        return hashlib.sha256(grains.encode()).hexdigest()
+
+    def _get_index_stamps(self, paths=None):
+        """
+        Return the modification times of the paths, of the module dirs and
+        their __pycache__ dirs by default. None if the index is off.
+        """
+        if paths is None:
+            if self._index_path is None:
+                return None
+            paths = [
+                path
+                for mod_dir in self.module_dirs
+                for path in (mod_dir, os.path.join(mod_dir, "__pycache__"))
+            ]
+        stamps = {}
+        for path in paths:
+            try:
+                stamps[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                stamps[path] = None
+        return stamps
+
+    def _load_index(self):
+        """
+        Fill the file mapping from the persistent index, returns False if
+        there is no index or if a module dir changed since it was written.
+
+        The module names provided by the files under another name, like their
+        ``__virtual__`` name, are restored too when the grains are the same.
+        """
+        self._index_path = self._get_index_path()
+        if self._index_path is None:
+            return False
+        self._index_grains = self._get_index_grains()
+        index = LOADER_INDEXES.get(self._index_path)
+        if index is None:
+            try:
+                with salt.utils.files.fopen(self._index_path, "rb") as fp_:
+                    index = salt.payload.Serial(self.opts).load(fp_)
+            except Exception as exc:  # pylint: disable=broad-except
+                log.trace(
+                    "Unable to read the loader index %s: %s", self._index_path, exc
+                )
+                return False
+            if not isinstance(index, dict) or index.get("version") != 1:
+                return False
+        stamps = index["stamps"]
+        if self._get_index_stamps(stamps) != stamps:
+            log.trace("The loader index %s is stale", self._index_path)
+            return False
+        LOADER_INDEXES[self._index_path] = index
+        for name, fpath, ext, opt_index in index["file_mapping"]:
+            self.file_mapping[name] = (fpath, ext, opt_index)
+        if index["grains"] != self._index_grains:
+            index["grains"] = self._index_grains
+            index["virtual"] = {}
+        self._index_virtual = index["virtual"]
+        return True
+
+    def _save_index(self, stamps=None):
+        """
+        Write the persistent index. The file mapping and its stamps are
+        replaced when given the stamps of a fresh scan.
+        """
+        if self._index_path is None:
+            return
+        if stamps is not None:
+            # Packages are directories, their __init__ could come and go
+            stamps.update(
+                self._get_index_stamps(
+                    [fpath for fpath, ext, _ in self.file_mapping.values() if not ext]
+                )
+            )
+            virtual = {}
+            index = LOADER_INDEXES.get(self._index_path)
+            if index is not None and index["grains"] == self._index_grains:
+                virtual = index["virtual"]
+            virtual.update(self._index_virtual)
+            self._index_virtual = virtual
+            LOADER_INDEXES[self._index_path] = {
+                "version": 1,
+                "stamps": stamps,
+                "file_mapping": [
+                    [name] + list(value) for name, value in self.file_mapping.items()
+                ],
+                "grains": self._index_grains,
+                "virtual": virtual,
+            }
+        self._index_dirty = False
+        index = LOADER_INDEXES.get(self._index_path)
+        if index is None:
+            return
+        with salt.utils.files.set_umask(0o077):
+            try:
+                os.makedirs(os.path.dirname(self._index_path), exist_ok=True)
+                with salt.utils.atomicfile.atomic_open(self._index_path, "wb") as fp_:
+                    salt.payload.Serial(self.opts).dump(
+                        dict(index, virtual=dict(index["virtual"])), fp_
+                    )
+            except Exception as exc:  # pylint: disable=broad-except
+                log.debug(
+                    "Unable to write the loader index %s: %s", self._index_path, exc
+                )
 
     def clear(self):
         """
@@ -1658,6 +1940,11 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         """
         Iterate over all file_mapping files in order of closeness to mod_name
         """
+        # do we know from the index which file provides it?
+        name = self._index_virtual.get(mod_name)
+        if name is not None and name in self.file_mapping:
+            yield name
+
         # do we have an exact match?
         if mod_name in self.file_mapping:
             yield mod_name
@@ -2052,6 +2339,15 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             )
 
         for tgt_mod in mod_names:
+            if (
+                self._index_path is not None
+                and tgt_mod != name
+                and tgt_mod not in self.loaded_modules
+                and self._index_virtual.get(tgt_mod) != name
+            ):
+                # Remember which file provides the module under another name
+                self._index_virtual[tgt_mod] = name
+                self._index_dirty = True
             self.loaded_modules[tgt_mod] = mod_dict[tgt_mod]
         return True
 
@@ -2108,6 +2404,8 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                         self._refresh_file_mapping()
                         reloaded = True
                     continue
+            if self._index_dirty:
+                self._save_index()
 
         return ret
 
@@ -2120,6 +2418,8 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                 if name in self.loaded_files or name in self.missing_modules:
                     continue
                 self._load_module(name)
+            if self._index_dirty:
+                self._save_index()
 
             self.loaded = True
 
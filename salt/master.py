@@ -46,6 +46,7 @@ import salt.utils.gzip_util
 import salt.utils.jid
 import salt.utils.job
 import salt.utils.master
+import salt.utils.minion_index
 import salt.utils.minions
 import salt.utils.platform
 import salt.utils.process
@@ -1071,14 +1072,18 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
         ) / self.stats[cmd]["runs"]
         if end - self.stat_clock > self.opts["master_stats_event_iter"]:
             # Fire the event with the stats and wipe the tracker
-            self.aes_funcs.event.fire_event(
-                {
-                    "time": end - self.stat_clock,
-                    "worker": self.name,
-                    "stats": self.stats,
-                },
-                tagify(self.name, "stats"),
-            )
+            data = {
+                "time": end - self.stat_clock,
+                "worker": self.name,
+                "stats": self.stats,
+            }
+            index_stats = salt.utils.minion_index.stats(self.opts)
+            if index_stats is not None:
+                data["minion_data_index"] = index_stats
+            pub_key_stats = salt.crypt.pub_key_cache_stats()
+            if pub_key_stats is not None:
+                data["minion_pub_key_cache"] = pub_key_stats
+            self.aes_funcs.event.fire_event(data, tagify(self.name, "stats"))
             self.stats = collections.defaultdict(lambda: {"mean": 0, "runs": 0})
             self.stat_clock = end
 
@@ -1221,6 +1226,7 @@ class AESFuncs(TransportMethods):
         "minion_publish",
         "revoke_auth",
         "_serve_file",
+        "_serve_file_delta",
         "_file_find",
         "_file_hash",
         "_file_hash_and_stat",
@@ -1264,6 +1270,7 @@ class AESFuncs(TransportMethods):
 
         self.fs_ = salt.fileserver.Fileserver(self.opts)
         self._serve_file = self.fs_.serve_file
+        self._serve_file_delta = self.fs_.serve_file_delta
         self._file_find = self.fs_._find_file
         self._file_hash = self.fs_.file_hash
         self._file_hash_and_stat = self.fs_.file_hash_and_stat
@@ -1289,7 +1296,7 @@ class AESFuncs(TransportMethods):
         pub_path = os.path.join(self.opts["pki_dir"], "minions", id_)
 
         try:
-            pub = salt.crypt.get_rsa_pub_key(pub_path)
+            pub = salt.crypt.pub_key_cache(self.opts).get(pub_path)
         except OSError:
             log.warning(
                 "Salt minion claiming to be %s attempted to communicate with "
@@ -1631,12 +1638,17 @@ class AESFuncs(TransportMethods):
         )
         data = pillar.compile_pillar()
         self.fs_.update_opts()
+        if self.opts.get("ext_pillar_timing_events", False):
+            timing = getattr(pillar, "ext_pillar_timing", None)
+            if timing:
+                self.event.fire_event(
+                    {"id": load["id"], "ext_pillar": timing},
+                    tagify(load["id"], "ext_pillar", "minion"),
+                )
         if self.opts.get("minion_data_cache", False):
-            self.masterapi.cache.store(
-                "minions/{}".format(load["id"]),
-                "data",
-                {"grains": load["grains"], "pillar": data},
-            )
+            mdata = {"grains": load["grains"], "pillar": data}
+            self.masterapi.cache.store("minions/{}".format(load["id"]), "data", mdata)
+            salt.utils.minion_index.update(self.opts, load["id"], mdata)
             if self.opts.get("minion_data_cache_events") is True:
                 self.event.fire_event(
                     {"Minion data cache refresh": load["id"]},
@@ -1712,7 +1724,10 @@ class AESFuncs(TransportMethods):
             )
             serialized_load = salt.serializers.msgpack.serialize(load)
             if not salt.crypt.verify_signature(
-                this_minion_pubkey, serialized_load, sig
+                this_minion_pubkey,
+                serialized_load,
+                sig,
+                cache=salt.crypt.pub_key_cache(self.opts),
             ):
                 log.info("Failed to verify event signature from minion %s.", load["id"])
                 if self.opts["drop_messages_signature_fail"]:
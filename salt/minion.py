@@ -1243,6 +1243,11 @@ class Minion(MinionBase):
         self.ready = False
         self.jid_queue = [] if jid_queue is None else jid_queue
         self.periodic_callbacks = {}
+        self.job_pool = None
+        # Bumped whenever the loaders, the grains or the pillar change, the
+        # job workers reload their modules when the generation of a job is
+        # newer than the one they loaded
+        self.loader_generation = 0
 
         if io_loop is None:
             install_zmq()
@@ -1568,6 +1573,8 @@ class Minion(MinionBase):
 
         if opt_in:
             self.opts = opts
+        else:
+            self.loader_generation += 1
 
         return functions, returners, errors, executors
 
@@ -1708,6 +1715,13 @@ class Minion(MinionBase):
                 self.schedule.functions = self.functions
                 self.schedule.returners = self.returners
 
+        job_pool = self._start_job_pool()
+        if job_pool is not None:
+            yield job_pool.submit(
+                data["jid"], self.opts, data, self.connected, self.loader_generation
+            )
+            return
+
         process_count_max = self.opts.get("process_count_max")
         if process_count_max > 0:
             process_count = len(salt.utils.minion.running(self.opts))
@@ -1756,6 +1770,64 @@ class Minion(MinionBase):
         process.name = "{}-Job-{}".format(process.name, data["jid"])
         self.subprocess_list.add(process)
 
+    def _start_job_pool(self):
+        """
+        Start the pool of pre-forked job workers if one is configured and
+        return it
+        """
+        if (
+            self.job_pool is None
+            and self.opts.get("job_worker_pool", 0) > 0
+            and self.opts.get("multiprocessing", True)
+        ):
+            # let python reconstruct the minion in the workers on windows
+            instance = None if sys.platform.startswith("win") else self
+            self.job_pool = salt.utils.process.JobWorkerPool(
+                self.io_loop,
+                functools.partial(self._pool_target, instance),
+                self.opts["job_worker_pool"],
+                max_jobs=self.opts.get("job_worker_pool_max_jobs", 0),
+                queue_size=self.opts.get("job_worker_pool_queue_size", 0),
+                name="ProcessPayload",
+                after_fork_methods=[(salt.utils.crypt.reinit_crypto, [], {})],
+            )
+            self.job_pool.start()
+        return self.job_pool
+
+    @classmethod
+    def _pool_target(cls, minion_instance, opts, data, connected, generation):
+        """
+        Run a job in a worker of the job worker pool
+        """
+        if minion_instance:
+            # The worker was forked earlier, use the current opts of the minion
+            # and reload the modules if they, the grains or the pillar changed
+            # since, the loaders hold on to the old opts otherwise
+            minion_instance.opts = opts
+            minion_instance.connected = connected
+            if minion_instance.loader_generation != generation:
+                log.debug(
+                    "Reloading the modules of job worker %s for jid %s",
+                    os.getpid(),
+                    data["jid"],
+                )
+                (
+                    minion_instance.functions,
+                    minion_instance.returners,
+                    minion_instance.function_errors,
+                    minion_instance.executors,
+                ) = minion_instance._load_modules(grains=opts["grains"])
+                minion_instance.loader_generation = generation
+        try:
+            cls._target(minion_instance, opts, data, connected)
+        finally:
+            # The worker outlives the job, do not leave it listed as running
+            fn_ = os.path.join(opts["cachedir"], "proc", data["jid"])
+            try:
+                os.remove(fn_)
+            except OSError:
+                pass
+
     def ctx(self):
         """
         Return a single context manager for the minion's data
@@ -2484,6 +2556,7 @@ class Minion(MinionBase):
                     current_schedule, new_schedule
                 )
                 self.opts["pillar"] = new_pillar
+                self.loader_generation += 1
             finally:
                 async_pillar.destroy()
         self.matchers_refresh()
@@ -3057,6 +3130,7 @@ class Minion(MinionBase):
         self.setup_beacons()
         self.setup_scheduler()
         self.add_periodic_callback("cleanup", self.cleanup_subprocesses)
+        self._start_job_pool()
 
         # schedule the stuff that runs every interval
         ping_interval = self.opts.get("ping_interval", 0) * 60
@@ -3182,6 +3256,8 @@ class Minion(MinionBase):
         if hasattr(self, "periodic_callbacks"):
             for cb in self.periodic_callbacks.values():
                 cb.stop()
+        if getattr(self, "job_pool", None) is not None:
+            self.job_pool.stop()
 
     # pylint: disable=W1701
     def __del__(self):
@@ -269,7 +269,7 @@ def send(name, *args, **kwargs):
     return _mine_store(mine_data)
 
 
-def get(tgt, fun, tgt_type="glob", exclude_minion=False):
+def get(tgt, fun, tgt_type="glob", exclude_minion=False, generation=None):
     """
     Get data from the mine.
 
@@ -282,6 +282,13 @@ def get(tgt, fun, tgt_type="glob", exclude_minion=False):
         Note that all pillar matches, whether using the compound matching system or
         the pillar matching system, will be exact matches, with globbing disabled.
     :param bool exclude_minion: Excludes the current minion from the result set.
+    :param int generation: The ``generation`` returned by a previous call. When
+        passed, a dict is returned with the new ``generation``, the mine ``data``
+        changed since the generation passed, and the ``minions`` having mine
+        data. With the :conf_master:`mine_index` disabled all the mine data is
+        returned.
+
+        .. versionadded:: 3004
 
     CLI Example:
 
@@ -350,6 +357,16 @@ def get(tgt, fun, tgt_type="glob", exclude_minion=False):
                 ret.setdefault(function, {})[__opts__["id"]] = res
             else:
                 ret[__opts__["id"]] = res
+        if generation is not None:
+            if _ret_dict:
+                minions = {function: list(ret[function]) for function in ret}
+            else:
+                minions = list(ret)
+            ret = {
+                "generation": salt.utils.mine.generation(),
+                "data": ret,
+                "minions": minions,
+            }
         return ret
 
     # Load from master
@@ -360,9 +377,14 @@ def get(tgt, fun, tgt_type="glob", exclude_minion=False):
         "fun": fun,
         "tgt_type": tgt_type,
     }
+    if generation is not None:
+        load["generation"] = generation
     ret = _mine_get(load, __opts__)
-    if exclude_minion and __opts__["id"] in ret:
-        del ret[__opts__["id"]]
+    data = ret
+    if generation is not None and isinstance(ret, dict):
+        data = ret.get("data", {})
+    if exclude_minion and __opts__["id"] in data:
+        del data[__opts__["id"]]
     return ret
 
 
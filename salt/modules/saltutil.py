@@ -111,15 +111,14 @@ def _sync(form, saltenv=None, extmod_whitelist=None, extmod_blacklist=None):
         mod_file = os.path.join(__opts__["cachedir"], "module_refresh")
         with salt.utils.files.fopen(mod_file, "a"):
             pass
-    if (
-        form == "grains"
-        and __opts__.get("grains_cache")
-        and os.path.isfile(os.path.join(__opts__["cachedir"], "grains.cache.p"))
-    ):
-        try:
-            os.remove(os.path.join(__opts__["cachedir"], "grains.cache.p"))
-        except OSError:
-            log.error("Could not remove grains cache!")
+    if form == "grains" and __opts__.get("grains_cache"):
+        for cache_file in ("grains.cache.p", "grains.funcs.cache.p"):
+            cache_file = os.path.join(__opts__["cachedir"], cache_file)
+            if os.path.isfile(cache_file):
+                try:
+                    os.remove(cache_file)
+                except OSError:
+                    log.error("Could not remove grains cache!")
     return ret
 
 
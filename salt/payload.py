@@ -30,6 +30,44 @@ except ImportError:
 
 log = logging.getLogger(__name__)
 
+# The garbage collector is only disabled while unpacking the messages of at
+# least this size, toggling it costs more than it saves on small messages
+GC_DISABLE_SIZE = 65536
+
+# The markers of the msgpack bin types, a message without them has no bytes
+# packed with use_bin_type=True
+_BIN_MARKERS = (b"\xc4", b"\xc5", b"\xc6")
+
+
+def _decode(data):
+    """
+    Return the bytes decoded when they are valid UTF-8, like
+    ``salt.transport.frame.decode_embedded_strs`` does
+    """
+    if isinstance(data, bytes):
+        try:
+            return data.decode()
+        except UnicodeError:
+            pass
+    return data
+
+
+def _decode_list_hook(data):
+    """
+    Decode the items of a list as it is unpacked
+    """
+    for idx, elem in enumerate(data):
+        if isinstance(elem, bytes):
+            data[idx] = _decode(elem)
+    return data
+
+
+def _decode_pairs_hook(pairs):
+    """
+    Build a dict with its keys and values decoded as it is unpacked
+    """
+    return {_decode(key): _decode(val) for key, val in pairs}
+
 
 def package(payload):
     """
@@ -90,17 +128,44 @@ class Serial:
                          set as. In this case, it will fail if any of
                          the contents cannot be converted.
         """
-        try:
+        decode = six.PY3 and encoding is None and not raw
 
-            def ext_type_decoder(code, data):
-                if code == 78:
-                    data = salt.utils.stringutils.to_unicode(data)
-                    return datetime.datetime.strptime(data, "%Y%m%dT%H:%M:%S.%f")
-                return data
+        def ext_type_decoder(code, data):
+            if code == 78:
+                data = salt.utils.stringutils.to_unicode(data)
+                return datetime.datetime.strptime(data, "%Y%m%dT%H:%M:%S.%f")
+            return _decode(data) if decode else data
 
-            gc.disable()  # performance optimization for msgpack
+        gc_disabled = False
+        try:
+            if len(msg) >= GC_DISABLE_SIZE and gc.isenabled():
+                gc_disabled = True
+                gc.disable()  # performance optimization for msgpack
             loads_kwargs = {"use_list": True, "ext_hook": ext_type_decoder}
-            if salt.utils.msgpack.version >= (0, 4, 0):
+            if decode and salt.utils.msgpack.version >= (0, 5, 2):
+                # The strings are decoded in the same pass as the unpacking.
+                # msgpack decodes them all at once when they are valid UTF-8
+                # and no bytes were packed with use_bin_type=True, they are
+                # decoded one by one by the hooks otherwise.
+                ret = None
+                if isinstance(msg, (bytes, bytearray)) and not any(
+                    marker in msg for marker in _BIN_MARKERS
+                ):
+                    try:
+                        ret = salt.utils.msgpack.unpackb(msg, raw=False, **loads_kwargs)
+                    except UnicodeDecodeError:
+                        pass
+                if ret is None:
+                    ret = _decode(
+                        salt.utils.msgpack.unpackb(
+                            msg,
+                            raw=True,
+                            list_hook=_decode_list_hook,
+                            object_pairs_hook=_decode_pairs_hook,
+                            **loads_kwargs
+                        )
+                    )
+            elif salt.utils.msgpack.version >= (0, 4, 0):
                 # msgpack only supports 'encoding' starting in 0.4.0.
                 # Due to this, if we don't need it, don't pass it at all so
                 # that under Python 2 we can still work with older versions
@@ -119,10 +184,12 @@ class Serial:
                     loads_kwargs.pop("raw", None)
                     loads_kwargs.pop("encoding", None)
                     ret = salt.utils.msgpack.loads(msg, **loads_kwargs)
+                if decode:
+                    ret = salt.transport.frame.decode_embedded_strs(ret)
             else:
                 ret = salt.utils.msgpack.loads(msg, **loads_kwargs)
-            if six.PY3 and encoding is None and not raw:
-                ret = salt.transport.frame.decode_embedded_strs(ret)
+                if decode:
+                    ret = salt.transport.frame.decode_embedded_strs(ret)
         except Exception as exc:  # pylint: disable=broad-except
             log.critical(
                 "Could not deserialize msgpack message. This often happens "
@@ -140,7 +207,8 @@ class Serial:
                 exc,
             )
         finally:
-            gc.enable()
+            if gc_disabled:
+                gc.enable()
         return ret
 
     def load(self, fn_):
@@ -4,12 +4,16 @@ Render the pillar data
 
 
 import collections
+import concurrent.futures
 import copy
 import fnmatch
 import inspect
 import logging
 import os
+import queue
 import sys
+import threading
+import time
 import traceback
 
 import salt.ext.tornado.gen
@@ -549,6 +553,8 @@ class Pillar:
         if not isinstance(self.extra_minion_data, dict):
             self.extra_minion_data = {}
             log.error("Extra minion data must be a dictionary")
+        # The time each external pillar took in the last compile
+        self.ext_pillar_timing = []
         self._closing = False
 
     def __valid_on_demand_ext_pillar(self, opts):
@@ -1123,7 +1129,6 @@ class Pillar:
             errors.append('The "ext_pillar" option is malformed')
             log.critical(errors[-1])
             return pillar, errors
-        ext = None
         # Bring in CLI pillar data
         if self.pillar_override:
             pillar = merge(
@@ -1134,6 +1139,7 @@ class Pillar:
                 self.opts.get("pillar_merge_lists", False),
             )
 
+        sources = []
         for run in self.opts["ext_pillar"]:
             if not isinstance(run, dict):
                 errors.append('The "ext_pillar" option is malformed')
@@ -1147,17 +1153,27 @@ class Pillar:
                         "Specified ext_pillar interface %s is unavailable", key
                     )
                     continue
-                try:
-                    ext = self._external_pillar_data(pillar, val, key)
-                except Exception as exc:  # pylint: disable=broad-except
-                    errors.append(
-                        "Failed to load ext_pillar {}: {}".format(key, exc.__str__(),)
-                    )
-                    log.error(
-                        "Exception caught loading ext_pillar '%s':\n%s",
-                        key,
-                        "".join(traceback.format_tb(sys.exc_info()[2])),
-                    )
+                sources.append((key, val))
+
+        results = None
+        concurrency = self.opts.get("ext_pillar_concurrency", 0)
+        if isinstance(concurrency, int) and concurrency > 1 and len(sources) > 1:
+            results = self._ext_pillar_concurrent(pillar, sources, concurrency)
+        self.ext_pillar_timing = []
+        for idx, (key, val) in enumerate(sources):
+            if results is None:
+                # Each external pillar gets the data merged so far
+                ext, error, duration = self._timed_external_pillar_data(
+                    pillar, val, key
+                )
+            else:
+                ext, error, duration = results[idx]
+            log.debug("ext_pillar %s took %.3f seconds", key, duration)
+            self.ext_pillar_timing.append(
+                {"ext_pillar": key, "duration": duration, "result": error is None}
+            )
+            if error is not None:
+                errors.append(error)
             if ext:
                 pillar = merge(
                     pillar,
@@ -1166,9 +1182,114 @@ class Pillar:
                     self.opts.get("renderer", "yaml"),
                     self.opts.get("pillar_merge_lists", False),
                 )
-                ext = None
         return pillar, errors
 
+    def _timed_external_pillar_data(self, pillar, val, key):
+        """
+        Run an external pillar, returns the external pillar data, the error
+        message if it failed and the time it took in seconds
+        """
+        start = time.time()
+        ext = error = None
+        try:
+            ext = self._external_pillar_data(pillar, val, key)
+        except Exception as exc:  # pylint: disable=broad-except
+            error = "Failed to load ext_pillar {}: {}".format(key, exc.__str__())
+            log.error(
+                "Exception caught loading ext_pillar '%s':\n%s",
+                key,
+                "".join(traceback.format_tb(sys.exc_info()[2])),
+            )
+        return ext, error, time.time() - start
+
+    def _ext_pillar_concurrent(self, pillar, sources, concurrency):
+        """
+        Run the external pillars in ``concurrency`` threads and return their
+        results in the order of the sources. Every external pillar gets its
+        own copy of ``pillar``, so they do not see the data of each other.
+
+        The threads share the loaded external pillar modules, so the modules
+        must be thread-safe. External pillars running longer than
+        ``ext_pillar_timeout`` seconds are reported as failed and abandoned.
+        Their threads are daemon threads left to finish in the background,
+        they do not hold up the exit of the process, and new threads take over
+        the external pillars still waiting to start.
+        """
+        timeout = self.opts.get("ext_pillar_timeout") or None
+        starts = {}
+        abandoned = set()
+        tasks = queue.Queue()
+        futures = []
+        for idx, (key, val) in enumerate(sources):
+            futures.append(concurrent.futures.Future())
+            tasks.put((idx, key, val, copy.deepcopy(pillar)))
+
+        def _worker():
+            while True:
+                try:
+                    idx, key, val, data = tasks.get_nowait()
+                except queue.Empty:
+                    return
+                starts[idx] = time.time()
+                futures[idx].set_running_or_notify_cancel()
+                try:
+                    futures[idx].set_result(
+                        self._timed_external_pillar_data(data, val, key)
+                    )
+                except BaseException as exc:  # pylint: disable=broad-except
+                    futures[idx].set_exception(exc)
+                if idx in abandoned:
+                    # The thread was replaced when the ext_pillar was abandoned
+                    log.warning(
+                        "Abandoned ext_pillar %s finished after %.3f seconds",
+                        key,
+                        time.time() - starts[idx],
+                    )
+                    return
+
+        def _start_worker():
+            thread = threading.Thread(target=_worker, name="ext_pillar")
+            thread.daemon = True
+            thread.start()
+
+        def _abandon_expired():
+            # The threads of the abandoned external pillars are replaced, so
+            # that the queued ones still start
+            now = time.time()
+            for idx, start in list(starts.items()):
+                if idx in abandoned or futures[idx].done() or now < start + timeout:
+                    continue
+                abandoned.add(idx)
+                log.error(
+                    "ext_pillar %s timed out after %s seconds, abandoning it, "
+                    "its thread keeps running in the background",
+                    sources[idx][0],
+                    timeout,
+                )
+                if not tasks.empty():
+                    _start_worker()
+
+        for _ in range(min(concurrency, len(sources))):
+            _start_worker()
+
+        results = []
+        for idx, (key, _) in enumerate(sources):
+            while True:
+                try:
+                    results.append(
+                        futures[idx].result(timeout=0.05 if timeout else None)
+                    )
+                    break
+                except concurrent.futures.TimeoutError:
+                    _abandon_expired()
+                    if idx in abandoned:
+                        error = "ext_pillar {} timed out after {} seconds".format(
+                            key, timeout
+                        )
+                        results.append((None, error, time.time() - starts[idx]))
+                        break
+        return results
+
     def compile_pillar(self, ext=True):
         """
         Render the pillar data and return
@@ -0,0 +1,478 @@
+"""
+Use SQLite databases on the master as the master job cache
+
+The :mod:`local_cache <salt.returners.local_cache>` job cache creates a
+directory and writes two files for every return of every minion, and cleaning
+it walks and stats every job directory. This job cache stores the jobs in one
+SQLite database per hour instead, named after the hour the job ids of the jobs
+start with. Expiring the jobs older than :conf_master:`keep_jobs` removes the
+databases of the hours which expired, the jobs are kept for up to one hour
+longer than :conf_master:`keep_jobs` hours.
+
+.. versionadded:: 3004
+
+:depends: sqlite3
+:platform: all
+
+To use it as the master job cache set the following in the master config:
+
+.. code-block:: yaml
+
+    master_job_cache: sqlite3_local_cache
+
+The databases are stored in the ``jobs_sqlite3`` directory of the
+:conf_master:`cachedir` of the master. The jobs of the default job cache can be
+copied to it with the :py:func:`jobs.migrate_job_cache
+<salt.runners.jobs.migrate_job_cache>` runner:
+
+.. code-block:: bash
+
+    salt-run jobs.migrate_job_cache source=local_cache target=sqlite3_local_cache
+"""
+
+import datetime
+import logging
+import os
+import threading
+
+import salt.exceptions
+import salt.payload
+import salt.utils.jid
+import salt.utils.minions
+
+# Better safe than sorry here. Even though sqlite3 is included in python
+try:
+    import sqlite3
+
+    HAS_SQLITE3 = True
+except ImportError:
+    HAS_SQLITE3 = False
+
+log = logging.getLogger(__name__)
+
+__virtualname__ = "sqlite3_local_cache"
+
+# The suffix of the databases, the sqlite journals of a database share its name
+DB_SUFFIX = ".db"
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS jids (
+           jid TEXT PRIMARY KEY,
+           load BLOB,
+           nocache INTEGER NOT NULL DEFAULT 0,
+           endtime TEXT
+       )""",
+    """CREATE TABLE IF NOT EXISTS minions (
+           jid TEXT NOT NULL,
+           syndic_id TEXT NOT NULL,
+           minions BLOB NOT NULL,
+           PRIMARY KEY (jid, syndic_id)
+       )""",
+    """CREATE TABLE IF NOT EXISTS returns (
+           jid TEXT NOT NULL,
+           id TEXT NOT NULL,
+           ret BLOB NOT NULL,
+           out BLOB,
+           PRIMARY KEY (jid, id)
+       )""",
+)
+
+# The open connections of every thread of this process, sqlite3 connections
+# may only be used by the thread which opened them
+_LOCAL = threading.local()
+
+
+def __virtual__():
+    if not HAS_SQLITE3:
+        return (
+            False,
+            "Could not import sqlite3_local_cache returner; sqlite3 is not installed.",
+        )
+    return __virtualname__
+
+
+def _db_dir():
+    """
+    Return the directory of the databases
+    """
+    return os.path.join(__opts__["cachedir"], "jobs_sqlite3")
+
+
+def _hour(jid=None):
+    """
+    Return the hour of a job id, or the current hour for anything else
+    """
+    if salt.utils.jid.is_jid(jid):
+        return jid[:10]
+    # Job ids are generated from the current utc time
+    return "{:%Y%m%d%H}".format(datetime.datetime.utcnow())
+
+
+def _expired():
+    """
+    Return the first hour which did not expire yet, or None if jobs are kept
+    forever
+    """
+    if not __opts__["keep_jobs"]:
+        return None
+    expired = datetime.datetime.utcnow() - datetime.timedelta(
+        hours=__opts__["keep_jobs"]
+    )
+    return "{:%Y%m%d%H}".format(expired)
+
+
+def _hours():
+    """
+    Return the hours of the databases from the newest to the oldest
+    """
+    try:
+        names = os.listdir(_db_dir())
+    except OSError:
+        return []
+    expired = _expired()
+    return sorted(
+        (
+            name[: -len(DB_SUFFIX)]
+            for name in names
+            if name.endswith(DB_SUFFIX)
+            and (expired is None or name[: -len(DB_SUFFIX)] >= expired)
+        ),
+        reverse=True,
+    )
+
+
+def _connections():
+    """
+    Return the open connections of the current thread, mapping the hour of a
+    database to the pid which opened it and the connection
+    """
+    try:
+        return _LOCAL.connections
+    except AttributeError:
+        _LOCAL.connections = {}
+        return _LOCAL.connections
+
+
+def _close(hour):
+    pid, conn = _connections().pop(hour, (None, None))
+    if conn is not None and pid == os.getpid():
+        conn.close()
+
+
+def _connect(hour, create=False):
+    """
+    Return a connection to the database of an hour, or None if it does not
+    exist and ``create`` is False
+    """
+    expired = _expired()
+    if expired is not None and hour < expired:
+        # Another process may have removed it already
+        _close(hour)
+        return None
+    pid, conn = _connections().get(hour, (None, None))
+    if conn is not None and pid == os.getpid():
+        return conn
+    # Connections must not be shared with forked processes
+    _connections().pop(hour, None)
+    path = os.path.join(_db_dir(), hour + DB_SUFFIX)
+    if not create and not os.path.isfile(path):
+        return None
+    os.makedirs(_db_dir(), exist_ok=True)
+    # The statements are committed right away, every return is a single write
+    conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    for sql in SCHEMA:
+        conn.execute(sql)
+    _connections()[hour] = (os.getpid(), conn)
+    return conn
+
+
+def _find(jid, create=False):
+    """
+    Return the connection to the database storing a job id
+    """
+    if salt.utils.jid.is_jid(jid):
+        return _connect(_hour(jid), create=create)
+    # Job ids which are not made of a time can be in any database
+    for hour in _hours():
+        conn = _connect(hour)
+        if conn is None:
+            continue
+        if conn.execute("SELECT 1 FROM jids WHERE jid = ?", (jid,)).fetchone():
+            return conn
+    if create:
+        return _connect(_hour(), create=True)
+    return None
+
+
+def prep_jid(nocache=False, passed_jid=None, recurse_count=0):
+    """
+    Return a job id and store it in the database of its hour
+
+    This is the function responsible for making sure jids don't collide (unless
+    it is passed a jid).
+    """
+    if recurse_count >= 5:
+        err = "prep_jid could not store a jid after {} tries.".format(recurse_count)
+        log.error(err)
+        raise salt.exceptions.SaltCacheError(err)
+    if passed_jid is None:  # this can be a None or an empty string.
+        jid = salt.utils.jid.gen_jid(__opts__)
+    else:
+        jid = passed_jid
+
+    conn = _find(jid, create=True)
+    if conn is None:
+        # The hour of the job expired already
+        return jid
+    cur = conn.execute(
+        "INSERT OR IGNORE INTO jids (jid, nocache) VALUES (?, ?)",
+        (jid, int(bool(nocache))),
+    )
+    if not cur.rowcount:
+        # Someone else is using the jid, we need a new one
+        if passed_jid is None:
+            return prep_jid(nocache=nocache, recurse_count=recurse_count + 1)
+        if nocache:
+            conn.execute("UPDATE jids SET nocache = 1 WHERE jid = ?", (jid,))
+    return jid
+
+
+def returner(load):
+    """
+    Return data to the job cache
+    """
+    serial = salt.payload.Serial(__opts__)
+
+    # if a minion is returning a standalone job, get a jobid
+    if load["jid"] == "req":
+        load["jid"] = prep_jid(nocache=load.get("nocache", False))
+
+    conn = _find(load["jid"], create=True)
+    if conn is None:
+        return
+    row = conn.execute(
+        "SELECT nocache FROM jids WHERE jid = ?", (load["jid"],)
+    ).fetchone()
+    if row is None:
+        conn.execute("INSERT OR IGNORE INTO jids (jid) VALUES (?)", (load["jid"],))
+    elif row[0]:
+        return
+
+    ret = {key: load[key] for key in ("return", "retcode", "success") if key in load}
+    out = serial.dumps(load["out"]) if "out" in load else None
+    try:
+        conn.execute(
+            "INSERT INTO returns (jid, id, ret, out) VALUES (?, ?, ?, ?)",
+            (load["jid"], load["id"], serial.dumps(ret), out),
+        )
+    except sqlite3.IntegrityError:
+        # Minion has already returned this jid and it should be dropped
+        log.error(
+            "An extra return was detected from minion %s, please verify "
+            "the minion, this could be a replay attack",
+            load["id"],
+        )
+        return False
+
+
+def save_load(jid, clear_load, minions=None):
+    """
+    Save the load to the specified jid
+
+    The master job cache saves the load of every return as well, the first
+    load saved for a job is kept.
+
+    minions argument is to provide a pre-computed list of matched minions for
+    the job, for cases when this function can't compute that list itself (such
+    as for salt-ssh)
+    """
+    serial = salt.payload.Serial(__opts__)
+    conn = _find(jid, create=True)
+    if conn is None:
+        return
+    # Upserts need SQLite 3.24, older releases are still shipped
+    conn.execute("INSERT OR IGNORE INTO jids (jid) VALUES (?)", (jid,))
+    conn.execute(
+        "UPDATE jids SET load = ? WHERE jid = ? AND load IS NULL",
+        (serial.dumps(clear_load), jid),
+    )
+
+    # if you have a tgt, save that for the UI etc
+    if "tgt" in clear_load and clear_load["tgt"] != "":
+        if minions is None:
+            ckminions = salt.utils.minions.CkMinions(__opts__)
+            # Retrieve the minions list
+            _res = ckminions.check_minions(
+                clear_load["tgt"], clear_load.get("tgt_type", "glob")
+            )
+            minions = _res["minions"]
+        # save the minions to a cache so we can see in the UI
+        save_minions(jid, minions)
+
+
+def save_minions(jid, minions, syndic_id=None):
+    """
+    Save/update the list of minions for a given job
+    """
+    # Ensure we have a list for Python 3 compatibility
+    minions = list(minions)
+
+    log.debug(
+        "Adding minions for job %s%s: %s",
+        jid,
+        " from syndic master '{}'".format(syndic_id) if syndic_id else "",
+        minions,
+    )
+    serial = salt.payload.Serial(__opts__)
+    conn = _find(jid, create=True)
+    if conn is None:
+        return
+    conn.execute(
+        "INSERT OR REPLACE INTO minions (jid, syndic_id, minions) VALUES (?, ?, ?)",
+        (jid, syndic_id or "", serial.dumps(minions)),
+    )
+
+
+def get_load(jid):
+    """
+    Return the load data that marks a specified jid
+    """
+    conn = _find(jid)
+    if conn is None:
+        return {}
+    row = conn.execute("SELECT load FROM jids WHERE jid = ?", (jid,)).fetchone()
+    if row is None or row[0] is None:
+        return {}
+    serial = salt.payload.Serial(__opts__)
+    ret = serial.loads(row[0]) or {}
+    all_minions = set()
+    for (minions,) in conn.execute("SELECT minions FROM minions WHERE jid = ?", (jid,)):
+        all_minions.update(serial.loads(minions))
+    if all_minions:
+        ret["Minions"] = sorted(all_minions)
+    return ret
+
+
+def get_jid(jid):
+    """
+    Return the information returned when the specified job id was executed
+    """
+    ret = {}
+    conn = _find(jid)
+    if conn is None:
+        return ret
+    serial = salt.payload.Serial(__opts__)
+    for minion, ret_data, out in conn.execute(
+        "SELECT id, ret, out FROM returns WHERE jid = ?", (jid,)
+    ):
+        ret[minion] = serial.loads(ret_data)
+        if out is not None:
+            ret[minion]["out"] = serial.loads(out)
+    return ret
+
+
+def _loads(hour, newest_first=False):
+    """
+    Yield the job ids and loads stored in the database of an hour
+    """
+    conn = _connect(hour)
+    if conn is None:
+        return
+    serial = salt.payload.Serial(__opts__)
+    sql = "SELECT jid, load, endtime FROM jids WHERE load IS NOT NULL ORDER BY jid"
+    if newest_first:
+        sql += " DESC"
+    for jid, load, endtime in conn.execute(sql):
+        try:
+            job = serial.loads(load)
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Failed to deserialize the load of job %s", jid)
+            continue
+        yield jid, job, endtime
+
+
+def get_jids():
+    """
+    Return a dict mapping all job ids to job information
+    """
+    ret = {}
+    for hour in _hours():
+        for jid, job, endtime in _loads(hour):
+            ret[jid] = salt.utils.jid.format_jid_instance(jid, job)
+            if __opts__.get("job_cache_store_endtime") and endtime:
+                ret[jid]["EndTime"] = endtime
+    return ret
+
+
+def get_jids_filter(count, filter_find_job=True):
+    """
+    Return a list of all jobs information filtered by the given criteria.
+    :param int count: show not more than the count of most recent jobs
+    :param bool filter_find_jobs: filter out 'saltutil.find_job' jobs
+    """
+    ret = []
+    # The databases and their jobs are read from the newest to the oldest so
+    # that only the jobs which are returned are read
+    for hour in _hours():
+        if len(ret) >= count:
+            break
+        for jid, job, _ in _loads(hour, newest_first=True):
+            job = salt.utils.jid.format_jid_instance_ext(jid, job)
+            if filter_find_job and job["Function"] == "saltutil.find_job":
+                continue
+            ret.append(job)
+            if len(ret) >= count:
+                break
+    ret.reverse()
+    return ret
+
+
+def clean_old_jobs():
+    """
+    Remove the databases of the hours older than keep_jobs
+    """
+    expired = _expired()
+    if expired is None:
+        return
+    try:
+        names = os.listdir(_db_dir())
+    except OSError:
+        return
+    for name in names:
+        # The database, its journal and its shared memory file
+        hour = name.split(".", 1)[0]
+        if hour >= expired:
+            continue
+        _close(hour)
+        try:
+            os.remove(os.path.join(_db_dir(), name))
+        except OSError as err:
+            log.error("Unable to remove %s: %s", name, err)
+
+
+def update_endtime(jid, time):
+    """
+    Update (or store) the end time for a given job
+    """
+    conn = _find(jid, create=True)
+    if conn is None:
+        return
+    conn.execute("INSERT OR IGNORE INTO jids (jid) VALUES (?)", (jid,))
+    conn.execute("UPDATE jids SET endtime = ? WHERE jid = ?", (str(time), jid))
+
+
+def get_endtime(jid):
+    """
+    Retrieve the stored endtime for a given job
+
+    Returns False if no endtime is present
+    """
+    conn = _find(jid)
+    if conn is None:
+        return False
+    row = conn.execute("SELECT endtime FROM jids WHERE jid = ?", (jid,)).fetchone()
+    if row is None or row[0] is None:
+        return False
+    return row[0]
@@ -14,7 +14,7 @@ import salt.utils.args
 import salt.utils.files
 import salt.utils.jid
 import salt.utils.master
-from salt.exceptions import SaltClientError
+from salt.exceptions import SaltClientError, SaltInvocationError
 
 try:
     import dateutil.parser as dateutil_parser
@@ -533,6 +533,75 @@ def last_run(
         return False
 
 
+def migrate_job_cache(source="local_cache", target=None, display_progress=False):
+    """
+    .. versionadded:: 3004
+
+    Copy the jobs stored in one master job cache to another one, for instance
+    when switching the :conf_master:`master_job_cache`.
+
+    source : local_cache
+        The returner to copy the jobs from.
+
+    target
+        The returner to copy the jobs to, defaults to the
+        :conf_master:`master_job_cache`.
+
+    display_progress : False
+        If ``True``, fire progress events.
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run jobs.migrate_job_cache target=sqlite3_local_cache
+    """
+    if target is None:
+        target = __opts__["master_job_cache"]
+    if source == target:
+        raise SaltInvocationError(
+            "The jobs cannot be copied to the job cache they are stored in"
+        )
+    mminion = salt.minion.MasterMinion(__opts__)
+    returners = mminion.returners
+    for returner, funs in (
+        (source, ("get_jids", "get_load", "get_jid")),
+        (target, ("prep_jid", "save_load", "returner")),
+    ):
+        for fun in funs:
+            if "{}.{}".format(returner, fun) not in returners:
+                raise NotImplementedError(
+                    "'{}.{}' returner function not implemented yet.".format(
+                        returner, fun
+                    )
+                )
+
+    count = 0
+    for jid in sorted(returners["{}.get_jids".format(source)]()):
+        load = returners["{}.get_load".format(source)](jid)
+        if not load:
+            continue
+        if display_progress:
+            __jid_event__.fire_event(
+                {"message": "Copying JID {}".format(jid)}, "progress"
+            )
+        returners["{}.prep_jid".format(target)](passed_jid=jid)
+        returners["{}.save_load".format(target)](
+            jid, load, minions=load.pop("Minions", [])
+        )
+        for minion, ret in returners["{}.get_jid".format(source)](jid).items():
+            ret.update({"jid": jid, "id": minion})
+            returners["{}.returner".format(target)](ret)
+        get_endtime = "{}.get_endtime".format(source)
+        update_endtime = "{}.update_endtime".format(target)
+        if get_endtime in returners and update_endtime in returners:
+            endtime = returners[get_endtime](jid)
+            if endtime:
+                returners[update_endtime](jid, endtime)
+        count += 1
+    return {"jobs": count, "source": source, "target": target}
+
+
 def _get_returner(returner_types):
     """
     Helper to iterate over returner_types and pick the first one
@@ -12,15 +12,20 @@ The data sent to the state calls is as follows:
 """
 
 
+import bisect
 import copy
 import datetime
 import fnmatch
+import heapq
 import logging
+import multiprocessing.connection
 import os
 import random
 import re
+import shutil
 import site
 import sys
+import tempfile
 import time
 import traceback
 
@@ -50,6 +55,7 @@ from salt.exceptions import CommandExecutionError, SaltRenderError, SaltReqTimeo
 
 # pylint: disable=import-error,no-name-in-module,redefined-builtin
 from salt.ext.six.moves import map, range, reload_module
+from salt.serializers import DeserializationError
 from salt.serializers.msgpack import deserialize as msgpack_deserialize
 from salt.serializers.msgpack import serialize as msgpack_serialize
 from salt.template import compile_template, compile_template_str
@@ -208,6 +214,90 @@ def trim_req(req):
     return req
 
 
+class RequisiteIndex:
+    """
+    Index of a list of low chunks by ``__id__``, ``name`` and ``__sls__``, used
+    to find the chunks a requisite refers to without matching the requisite
+    against every chunk. Requisites with glob characters are only matched
+    against the distinct indexed values.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.size = len(chunks)
+        # The index can only be used if it matches like fnmatch, which
+        # requires string values
+        self.usable = True
+        self._ids = {}
+        self._names = {}
+        self._sls = {}
+        # Sorted values of each index and the results of glob lookups, built
+        # when the first glob requisite is looked up
+        self._sorted = {}
+        self._globs = {}
+        for pos, chunk in enumerate(chunks):
+            for index, key in (
+                (self._ids, "__id__"),
+                (self._names, "name"),
+                (self._sls, "__sls__"),
+            ):
+                value = chunk.get(key)
+                if not isinstance(value, str):
+                    self.usable = False
+                    return
+                index.setdefault(os.path.normcase(value), []).append(pos)
+
+    def valid_for(self, chunks):
+        """
+        Return True if the index was built from the given list of chunks
+        """
+        return chunks is self.chunks and len(chunks) == self.size
+
+    def _lookup(self, index, pattern):
+        pattern = os.path.normcase(pattern)
+        glob = len(pattern)
+        for char in "*?[":
+            pos = pattern.find(char)
+            if pos != -1:
+                glob = min(glob, pos)
+        if glob == len(pattern):
+            return index.get(pattern, [])
+        cache_key = (id(index), pattern)
+        if cache_key in self._globs:
+            return self._globs[cache_key]
+        values = self._sorted.get(id(index))
+        if values is None:
+            values = self._sorted[id(index)] = sorted(index)
+        # Only the values starting with the literal prefix of the glob can
+        # match it
+        prefix = pattern[:glob]
+        ret = []
+        for value in values[bisect.bisect_left(values, prefix) :]:
+            if not value.startswith(prefix):
+                break
+            if fnmatch.fnmatchcase(value, pattern):
+                ret.extend(index[value])
+        self._globs[cache_key] = ret
+        return ret
+
+    def match(self, req_key, req_val):
+        """
+        Return the chunks matched by the requisite ``{req_key: req_val}`` in
+        the order of the chunk list
+        """
+        if req_key == "sls":
+            positions = sorted(self._lookup(self._sls, req_val))
+            return [self.chunks[pos] for pos in positions]
+        positions = set(self._lookup(self._names, req_val))
+        positions.update(self._lookup(self._ids, req_val))
+        ret = []
+        for pos in sorted(positions):
+            chunk = self.chunks[pos]
+            if req_key == "id" or chunk["state"] == req_key:
+                ret.append(chunk)
+        return ret
+
+
 def state_args(id_, state, high):
     """
     Return a set of the arguments passed to the named state
@@ -774,6 +864,16 @@ class State:
         self.mod_init = set()
         self.pre = {}
         self.__run_num = 0
+        self._req_index = None
+        # The number of parallel state processes not reconciled yet
+        self._parallel_procs = 0
+        # Set in the processes running concurrent state units, the events are
+        # fired by the parent once the results have been renumbered
+        self._defer_events = False
+        # The states given an order by state_auto_order, and the states which
+        # set an order themselves, concurrent runs keep to the latter
+        self._auto_orders = set()
+        self._explicit_orders = set()
         self.jid = jid
         self.instance_id = str(id(self))
         self.inject_globals = {}
@@ -1611,6 +1711,12 @@ class State:
                     for fun in funcs:
                         live["fun"] = fun
                         chunks.append(live)
+        self._explicit_orders = {
+            (chunk["__id__"], chunk["state"])
+            for chunk in chunks
+            if "order" in chunk
+            and (chunk["__id__"], chunk["state"]) not in self._auto_orders
+        }
         chunks = self.order_chunks(chunks)
         return chunks
 
@@ -2032,6 +2138,7 @@ class State:
             target=self._call_parallel_target, args=(name, cdata, low)
         )
         proc.start()
+        self._parallel_procs += 1
         ret = {
             "name": name,
             "result": None,
@@ -2459,6 +2566,7 @@ class State:
         """
         Iterate over a list of chunks and call them, checking for requires.
         """
+        self._req_index = None
         # Check for any disabled states
         disabled = {}
         if "state_runs_disabled" in self.opts["grains"]:
@@ -2481,6 +2589,10 @@ class State:
                         self.__run_num += 1
                         chunks.remove(low)
                         break
+        concurrency = self._state_concurrency(chunks)
+        if concurrency:
+            running = self.call_chunks_concurrent(chunks, concurrency)
+            return dict(list(disabled.items()) + list(running.items()))
         running = {}
         for low in chunks:
             if "__FAILHARD__" in running:
@@ -2503,6 +2615,278 @@ class State:
         ret = dict(list(disabled.items()) + list(running.items()))
         return ret
 
+    def _state_concurrency(self, chunks):
+        """
+        Return the number of state units to run concurrently, or 0 if the
+        chunks are to be run one after the other
+        """
+        concurrency = self.opts.get("state_concurrency", 0)
+        if not isinstance(concurrency, int) or concurrency < 2 or len(chunks) < 2:
+            return 0
+        if self.opts.get("state_aggregate") or any(
+            "aggregate" in low for low in chunks
+        ):
+            # Aggregation merges chunks into each other at runtime, which
+            # does not work when the chunks run in different processes
+            log.debug("State aggregation is enabled, not running states concurrently")
+            return 0
+        return concurrency
+
+    def _state_units(self, chunks):
+        """
+        Split the chunks into the units which are run concurrently. Chunks
+        linked by prereq requisites are run in the same unit as they have to
+        run in test mode in between each other. States which set an ``order``
+        themselves are barriers, they run after all of the states before them
+        and before all of the states after them. Returns the list of units,
+        each a list of chunks in chunk order, and the set of units each unit
+        depends on.
+        """
+        requisites = (
+            "require",
+            "require_any",
+            "watch",
+            "watch_any",
+            "onfail",
+            "onfail_any",
+            "onfail_all",
+            "onchanges",
+            "onchanges_any",
+            "prereq",
+            "prerequired",
+        )
+        positions = {id(low): pos for pos, low in enumerate(chunks)}
+        parents = list(range(len(chunks)))
+
+        def _find(pos):
+            while parents[pos] != pos:
+                parents[pos] = parents[parents[pos]]
+                pos = parents[pos]
+            return pos
+
+        edges = []
+        for pos, low in enumerate(chunks):
+            for requisite in requisites:
+                for req in low.get(requisite) or ():
+                    if isinstance(req, str):
+                        req = {"id": req}
+                    for chunk in self._find_requisite_chunks(trim_req(req), chunks):
+                        req_pos = positions[id(chunk)]
+                        if req_pos == pos:
+                            continue
+                        if requisite.startswith("prereq"):
+                            parents[_find(req_pos)] = _find(pos)
+                        else:
+                            edges.append((pos, req_pos))
+        barrier = None
+        for pos, low in enumerate(chunks):
+            if (low.get("__id__"), low.get("state")) in self._explicit_orders:
+                # The states back to the previous barrier run first, the ones
+                # before it already ran before the previous barrier
+                start = 0 if barrier is None else barrier
+                edges.extend((pos, req_pos) for req_pos in range(start, pos))
+                barrier = pos
+            elif barrier is not None:
+                edges.append((pos, barrier))
+        unit_of = {}
+        units = []
+        for pos, low in enumerate(chunks):
+            root = _find(pos)
+            if root not in unit_of:
+                unit_of[root] = len(units)
+                units.append([])
+            units[unit_of[root]].append(low)
+        deps = [set() for _ in units]
+        for pos, req_pos in edges:
+            unit = unit_of[_find(pos)]
+            req_unit = unit_of[_find(req_pos)]
+            if unit != req_unit:
+                deps[unit].add(req_unit)
+        return units, deps
+
+    def call_chunks_concurrent(self, chunks, concurrency):
+        """
+        Call the chunks, running up to ``concurrency`` units of chunks which do
+        not depend on each other at the same time. Every unit is started once
+        all of the units it depends on have finished, in the order of the
+        chunks, and runs in a separate process. The results are numbered in
+        the order the units would run in one after the other.
+        """
+        units, deps = self._state_units(chunks)
+        run_num = self.__run_num
+        pending = list(range(len(units)))
+        done = set()
+        procs = {}
+        running = {}
+        stop = False
+        troot = tempfile.mkdtemp(prefix="state-", dir=self.opts["cachedir"])
+        try:
+            while pending or procs:
+                if not stop:
+                    for unit in list(pending):
+                        if len(procs) >= concurrency:
+                            break
+                        if not deps[unit].issubset(done):
+                            continue
+                        if self.check_pause(units[unit][0]) == "kill":
+                            stop = True
+                            break
+                        pending.remove(unit)
+                        path = os.path.join(troot, str(unit))
+                        proc = salt.utils.process.Process(
+                            target=self._call_state_unit_target,
+                            args=(units[unit], running, chunks, path),
+                        )
+                        proc.start()
+                        procs[unit] = (proc, path)
+                if not procs:
+                    if pending and not stop:
+                        # The units depend on each other, run the rest one
+                        # after the other so the recursive requisites are
+                        # reported like they are without concurrency
+                        for unit in pending:
+                            self._call_state_unit(units[unit], running, chunks)
+                            if running.pop("__FAILHARD__", False):
+                                break
+                    break
+                sentinels = {proc.sentinel: unit for unit, (proc, _) in procs.items()}
+                for sentinel in multiprocessing.connection.wait(list(sentinels)):
+                    unit = sentinels[sentinel]
+                    proc, path = procs.pop(unit)
+                    proc.join()
+                    done.add(unit)
+                    if self._reconcile_state_unit(units[unit], path, running, chunks):
+                        stop = True
+        finally:
+            shutil.rmtree(troot, ignore_errors=True)
+        ranks = {}
+        for rank, unit in enumerate(self._state_unit_order(deps)):
+            for low in units[unit]:
+                ranks[_gen_tag(low)] = rank
+        for tag in sorted(
+            running,
+            key=lambda tag: (
+                ranks.get(tag, len(units)),
+                running[tag].get("__run_num__", 0),
+            ),
+        ):
+            running[tag]["__run_num__"] = run_num
+            run_num += 1
+        self.__run_num = run_num
+        return running
+
+    @staticmethod
+    def _state_unit_order(deps):
+        """
+        Return the units in the order they run in one after the other, the
+        first unit in chunk order whose dependencies have run goes next
+        """
+        dependents = [[] for _ in deps]
+        waiting = [len(unit_deps) for unit_deps in deps]
+        for unit, unit_deps in enumerate(deps):
+            for dep in unit_deps:
+                dependents[dep].append(unit)
+        ready = [unit for unit, count in enumerate(waiting) if not count]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            unit = heapq.heappop(ready)
+            order.append(unit)
+            for dependent in dependents[unit]:
+                waiting[dependent] -= 1
+                if not waiting[dependent]:
+                    heapq.heappush(ready, dependent)
+        # Units depending on each other are run in chunk order
+        order.extend(unit for unit, count in enumerate(waiting) if count)
+        return order
+
+    def _call_state_unit(self, lows, running, chunks):
+        """
+        Call the chunks of a state unit one after the other
+        """
+        for low in lows:
+            if _gen_tag(low) not in running:
+                running = self.call_chunk(low, running, chunks)
+                if "__FAILHARD__" in running or self.check_failhard(low, running):
+                    running["__FAILHARD__"] = True
+                    break
+            self.active = set()
+        while True:
+            if self.reconcile_procs(running):
+                break
+            time.sleep(0.01)
+        return running
+
+    def _call_state_unit_target(self, lows, running, chunks, path):
+        """
+        The target function of the process running a state unit, the new
+        results are written to ``path``
+        """
+        self._defer_events = True
+        self.active = set()
+        known = set(running)
+        known_pre = set(self.pre)
+        try:
+            running = self._call_state_unit(lows, running, chunks)
+            ret = {
+                "running": {
+                    tag: val for tag, val in running.items() if tag not in known
+                },
+                "pre": {
+                    tag: val for tag, val in self.pre.items() if tag not in known_pre
+                },
+            }
+        except Exception:  # pylint: disable=broad-except
+            ret = {"error": traceback.format_exc()}
+        try:
+            data = msgpack_serialize(ret)
+        except Exception:  # pylint: disable=broad-except
+            data = msgpack_serialize(salt.utils.data.simple_types_filter(ret))
+        with salt.utils.files.fopen(path, "wb+") as fp_:
+            fp_.write(data)
+
+    def _reconcile_state_unit(self, lows, path, running, chunks):
+        """
+        Add the results of a finished state unit to the running dict, numbered
+        in the order the units finished until all of the units are renumbered
+        once they have run. Returns True if the unit failed hard.
+        """
+        try:
+            with salt.utils.files.fopen(path, "rb") as fp_:
+                ret = msgpack_deserialize(fp_.read())
+        except (OSError, DeserializationError):
+            ret = {"error": "Concurrent state process failed to return"}
+        if "error" in ret:
+            log.error("Failed to run states concurrently: %s", ret["error"])
+            ret = {"running": {}, "pre": {}}
+            for low in lows:
+                tag = _gen_tag(low)
+                if tag not in running:
+                    ret["running"][tag] = {
+                        "result": False,
+                        "comment": "Concurrent state process failed to return",
+                        "name": low["name"],
+                        "changes": {},
+                        "__sls__": low["__sls__"],
+                    }
+        failhard = ret["running"].pop("__FAILHARD__", False)
+        self.pre.update(ret["pre"])
+        for tag in sorted(
+            ret["running"], key=lambda tag: ret["running"][tag].get("__run_num__", 0)
+        ):
+            ret["running"][tag]["__run_num__"] = self.__run_num
+            self.__run_num += 1
+            running[tag] = ret["running"][tag]
+        for low in lows:
+            tag = _gen_tag(low)
+            if tag not in ret["running"]:
+                continue
+            self.event(running[tag], len(chunks), fire_event=low.get("fire_event"))
+            if running[tag].get("__state_ran__", True):
+                # Pick up the modules refreshed by the state process
+                self.check_refresh(low, running[tag])
+        return failhard
+
     def check_failhard(self, low, running):
         """
         Check if the low data chunk should send a failhard signal
@@ -2567,6 +2951,9 @@ class State:
         """
         Check the running dict for processes and resolve them
         """
+        if not self._parallel_procs:
+            # No parallel state is running, skip the scan of the running dict
+            return True
         retset = set()
         for tag in running:
             proc = running[tag].get("proc")
@@ -2596,6 +2983,7 @@ class State:
                         }
                     running[tag].update(ret)
                     running[tag].pop("proc")
+                    self._parallel_procs -= 1
                 else:
                     retset.add(False)
         return False not in retset
@@ -2671,46 +3059,10 @@ class State:
                 for req in low[r_state]:
                     if isinstance(req, str):
                         req = {"id": req}
-                    req = trim_req(req)
-                    found = False
-                    for chunk in chunks:
-                        req_key = next(iter(req))
-                        req_val = req[req_key]
-                        if req_val is None:
-                            continue
-                        if req_key == "sls":
-                            # Allow requisite tracking of entire sls files
-                            if fnmatch.fnmatch(chunk["__sls__"], req_val):
-                                found = True
-                                reqs[r_state].append(chunk)
-                            continue
-                        try:
-                            if isinstance(req_val, str):
-                                if fnmatch.fnmatch(
-                                    chunk["name"], req_val
-                                ) or fnmatch.fnmatch(chunk["__id__"], req_val):
-                                    if req_key == "id" or chunk["state"] == req_key:
-                                        found = True
-                                        reqs[r_state].append(chunk)
-                            else:
-                                raise KeyError
-                        except KeyError as exc:
-                            raise SaltRenderError(
-                                "Could not locate requisite of [{}] present in state with name [{}]".format(
-                                    req_key, chunk["name"]
-                                )
-                            )
-                        except TypeError:
-                            # On Python 2, the above req_val, being an OrderedDict, will raise a KeyError,
-                            # however on Python 3 it will raise a TypeError
-                            # This was found when running tests.unit.test_state.StateCompilerTestCase.test_render_error_on_invalid_requisite
-                            raise SaltRenderError(
-                                "Could not locate requisite of [{}] present in state with name [{}]".format(
-                                    req_key, chunk["name"]
-                                )
-                            )
+                    found = self._find_requisite_chunks(trim_req(req), chunks)
                     if not found:
                         return "unmet", ()
+                    reqs[r_state].extend(found)
         fun_stats = set()
         for r_state, chunks in reqs.items():
             req_stats = set()
@@ -2803,6 +3155,53 @@ class State:
 
         return status, reqs
 
+    def _requisite_index(self, chunks):
+        """
+        Return the requisite index of the given chunks, building it on first
+        use in a run
+        """
+        if self._req_index is None or not self._req_index.valid_for(chunks):
+            self._req_index = RequisiteIndex(chunks)
+        return self._req_index
+
+    def _find_requisite_chunks(self, req, chunks):
+        """
+        Return the chunks matched by the trimmed requisite ``req``, in the order
+        they appear in ``chunks``
+        """
+        req_key = next(iter(req))
+        req_val = req[req_key]
+        if req_val is None:
+            return []
+        index = self._requisite_index(chunks)
+        if isinstance(req_val, str) and index.usable:
+            return index.match(req_key, req_val)
+        ret = []
+        for chunk in chunks:
+            if req_key == "sls":
+                # Allow requisite tracking of entire sls files
+                if fnmatch.fnmatch(chunk["__sls__"], req_val):
+                    ret.append(chunk)
+                continue
+            try:
+                if isinstance(req_val, str):
+                    if fnmatch.fnmatch(chunk["name"], req_val) or fnmatch.fnmatch(
+                        chunk["__id__"], req_val
+                    ):
+                        if req_key == "id" or chunk["state"] == req_key:
+                            ret.append(chunk)
+                else:
+                    raise KeyError
+            except (KeyError, TypeError):
+                # A req_val which is not a string, like an OrderedDict, raises
+                # a TypeError in fnmatch
+                raise SaltRenderError(
+                    "Could not locate requisite of [{}] present in state with name [{}]".format(
+                        req_key, chunk["name"]
+                    )
+                )
+        return ret
+
     def event(self, chunk_ret, length, fire_event=False):
         """
         Fire an event on the master bus
@@ -2818,6 +3217,8 @@ class State:
         chunk is evaluated an event will be set up to the master with the
         results.
         """
+        if self._defer_events:
+            return
         if not self.opts.get("local") and (
             self.opts.get("state_events", True) or fire_event
         ):
@@ -2885,30 +3286,13 @@ class State:
                     if isinstance(req, str):
                         req = {"id": req}
                     req = trim_req(req)
-                    found = False
-                    req_key = next(iter(req))
-                    req_val = req[req_key]
-                    for chunk in chunks:
-                        if req_val is None:
-                            continue
-                        if req_key == "sls":
-                            # Allow requisite tracking of entire sls files
-                            if fnmatch.fnmatch(chunk["__sls__"], req_val):
-                                if requisite == "prereq":
-                                    chunk["__prereq__"] = True
-                                reqs.append(chunk)
-                                found = True
-                            continue
-                        if fnmatch.fnmatch(chunk["name"], req_val) or fnmatch.fnmatch(
-                            chunk["__id__"], req_val
-                        ):
-                            if req_key == "id" or chunk["state"] == req_key:
-                                if requisite == "prereq":
-                                    chunk["__prereq__"] = True
-                                elif requisite == "prerequired":
-                                    chunk["__prerequired__"] = True
-                                reqs.append(chunk)
-                                found = True
+                    found = self._find_requisite_chunks(req, chunks)
+                    for chunk in found:
+                        if requisite == "prereq":
+                            chunk["__prereq__"] = True
+                        elif requisite == "prerequired" and "sls" not in req:
+                            chunk["__prerequired__"] = True
+                    reqs.extend(found)
                     if not found:
                         lost[requisite].append(req)
             if (
@@ -4214,6 +4598,8 @@ class BaseHighState:
                             continue
                         state[name][s_dec].append({"order": self.iorder})
                         self.iorder += 1
+                        if getattr(self, "state", None) is not None:
+                            self.state._auto_orders.add((name, s_dec))
         return state
 
     def _handle_state_decls(self, state, sls, saltenv, errors):
@@ -4,7 +4,9 @@ IPC transport classes
 
 
 import errno
+import fnmatch
 import logging
+import re
 import socket
 import time
 
@@ -24,6 +26,32 @@ from salt.ext.tornado.locks import Lock
 log = logging.getLogger(__name__)
 
 
+def _msgpack_kwargs():
+    # msgpack deprecated `encoding` starting with version 0.5.2
+    if salt.utils.msgpack.version >= (0, 5, 2):
+        # Under Py2 we still want raw to be set to True
+        return {"raw": False}
+    return {"encoding": "utf-8"}
+
+
+def tag_matcher(tags):
+    """
+    Return a function checking if a tag matches one of the passed tags. Tags
+    containing glob characters are matched with fnmatch, the others are
+    prefixes.
+    """
+    prefixes = tuple(tag for tag in tags if not re.search(r"[*?[]", tag))
+    globs = [fnmatch.translate(tag) for tag in tags if re.search(r"[*?[]", tag)]
+    regex = re.compile("|".join(globs)) if globs else None
+
+    def match(tag):
+        return tag.startswith(prefixes) or (
+            regex is not None and regex.match(tag) is not None
+        )
+
+    return match
+
+
 # 'tornado.concurrent.Future' doesn't support
 # remove_done_callback() which we would have called
 # in the timeout case. Due to this, we have this
@@ -273,13 +301,7 @@ class IPCClient:
         self.socket_path = socket_path
         self._closing = False
         self.stream = None
-        # msgpack deprecated `encoding` starting with version 0.5.2
-        if salt.utils.msgpack.version >= (0, 5, 2):
-            # Under Py2 we still want raw to be set to True
-            msgpack_kwargs = {"raw": False}
-        else:
-            msgpack_kwargs = {"encoding": "utf-8"}
-        self.unpacker = salt.utils.msgpack.Unpacker(**msgpack_kwargs)
+        self.unpacker = salt.utils.msgpack.Unpacker(**_msgpack_kwargs())
         self._connecting_future = None
 
     def connected(self):
@@ -511,6 +533,9 @@ class IPCMessagePublisher:
         self.io_loop = io_loop or IOLoop.current()
         self._closing = False
         self.streams = set()
+        # The tag matchers of the subscribers which asked for a subset of the
+        # messages, see IPCMessageSubscriber.subscribe
+        self.filters = {}
 
     def start(self):
         """
@@ -543,21 +568,50 @@ class IPCMessagePublisher:
         except StreamClosedError:
             log.trace("Client disconnected from IPC %s", self.socket_path)
             self.streams.discard(stream)
+            self.filters.pop(stream, None)
         except Exception as exc:  # pylint: disable=broad-except
             log.error("Exception occurred while handling stream: %s", exc)
             if not stream.closed():
                 stream.close()
             self.streams.discard(stream)
+            self.filters.pop(stream, None)
 
-    def publish(self, msg):
+    @salt.ext.tornado.gen.coroutine
+    def _read_subscriptions(self, stream):
+        """
+        Read the subscriptions sent by a subscriber
+        """
+        unpacker = salt.utils.msgpack.Unpacker(**_msgpack_kwargs())
+        while not stream.closed():
+            try:
+                wire_bytes = yield stream.read_bytes(4096, partial=True)
+            except StreamClosedError:
+                break
+            unpacker.feed(wire_bytes)
+            for framed_msg in unpacker:
+                body = framed_msg["body"]
+                if not isinstance(body, dict) or "subscribe" not in body:
+                    continue
+                if body["subscribe"] is None:
+                    self.filters.pop(stream, None)
+                else:
+                    self.filters[stream] = tag_matcher(body["subscribe"])
+
+    def publish(self, msg, tag=None):
         """
         Send message to all connected sockets
+
+        When the tag of the message is passed it is only sent to the
+        subscribers which subscribed to it.
         """
         if not self.streams:
             return
 
         pack = salt.transport.frame.frame_msg_ipc(msg, raw_body=True)
         for stream in self.streams:
+            if tag is not None and stream in self.filters:
+                if not self.filters[stream](tag):
+                    continue
             self.io_loop.spawn_callback(self._write, stream, pack)
 
     def handle_connection(self, connection, address):
@@ -576,8 +630,10 @@ class IPCMessagePublisher:
 
             def discard_after_closed():
                 self.streams.discard(stream)
+                self.filters.pop(stream, None)
 
             stream.set_close_callback(discard_after_closed)
+            self.io_loop.spawn_callback(self._read_subscriptions, stream)
         except Exception as exc:  # pylint: disable=broad-except
             log.error("IPC streaming error: %s", exc)
 
@@ -593,6 +649,7 @@ class IPCMessagePublisher:
         for stream in self.streams:
             stream.close()
         self.streams.clear()
+        self.filters.clear()
         if hasattr(self.sock, "close"):
             self.sock.close()
 
@@ -649,6 +706,35 @@ class IPCMessageSubscriber(IPCClient):
         self._read_stream_future = None
         self._saved_data = []
         self._read_in_progress = Lock()
+        self._tags = None
+        self._subscribed_stream = None
+
+    def subscribe(self, tags):
+        """
+        Ask the publisher to only send the messages whose tag matches one of
+        the passed prefixes or globs. Pass None to receive all messages.
+
+        The subscription is sent again whenever the subscriber reconnects.
+        Messages published before the publisher handled the subscription are
+        still received.
+        """
+        self._tags = list(tags) if tags is not None else None
+        self._subscribed_stream = None
+        if self.connected():
+            self._send_subscription()
+
+    def _send_subscription(self):
+        if self.stream is self._subscribed_stream:
+            return
+        self._subscribed_stream = self.stream
+        pack = salt.transport.frame.frame_msg_ipc({"subscribe": self._tags})
+        try:
+            future = self.stream.write(pack)
+        except StreamClosedError:
+            self._subscribed_stream = None
+            return
+        # A closed stream is handled by the next read
+        future.add_done_callback(lambda future: future.exception())
 
     @salt.ext.tornado.gen.coroutine
     def _read(self, timeout, callback=None):
@@ -657,6 +743,9 @@ class IPCMessageSubscriber(IPCClient):
         except salt.ext.tornado.gen.TimeoutError:
             raise salt.ext.tornado.gen.Return(None)
 
+        if self._tags is not None and self.connected():
+            self._send_subscription()
+
         exc_to_raise = None
         ret = None
         try:
@@ -5,6 +5,7 @@ import logging
 import multiprocessing
 import os
 import shutil
+import time
 
 import salt.crypt
 import salt.ext.tornado.gen
@@ -66,6 +67,95 @@ class AESPubClientMixin:
         raise salt.ext.tornado.gen.Return(payload)
 
 
+class KeyStates:
+    """
+    In-memory table of the minion keys in the key directories of the pki_dir
+
+    The listing of a key directory is reused as long as the modification time
+    of the directory is unchanged, keys are read again when their file changes.
+    """
+
+    # Listings of directories modified less than this many seconds ago are not
+    # reused
+    RACY_WINDOW = salt.crypt.RACY_WINDOW
+
+    def __init__(self):
+        self._listings = {}
+        self._keys = {}
+
+    def _listing(self, dirname):
+        try:
+            mtime = os.stat(dirname).st_mtime_ns
+        except OSError:
+            self._listings.pop(dirname, None)
+            return frozenset()
+        cached = self._listings.get(dirname)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        names = frozenset(
+            entry.name for entry in os.scandir(dirname) if entry.is_file()
+        )
+        if time.time() - mtime / 1e9 > self.RACY_WINDOW:
+            self._listings[dirname] = (mtime, names)
+        else:
+            self._listings.pop(dirname, None)
+        for path in [path for path in self._keys if os.path.dirname(path) == dirname]:
+            if os.path.basename(path) not in names:
+                del self._keys[path]
+        return names
+
+    def isfile(self, path):
+        """
+        Return True if the key file exists, the equivalent of os.path.isfile
+        """
+        dirname, name = os.path.split(path)
+        return name in self._listing(dirname)
+
+    def read(self, path):
+        """
+        Return the contents of the key file
+        """
+        stat = os.stat(path)
+        state = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        cached = self._keys.get(path)
+        if cached is not None and cached[0] == state:
+            return cached[1]
+        with salt.utils.files.fopen(path, "r") as fp_:
+            key = fp_.read()
+        self._keys[path] = (state, key)
+        return key
+
+
+class AuthRateLimiter:
+    """
+    Token bucket limiting the number of authentication requests per second a
+    worker answers
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = max(float(burst or rate), 1.0)
+        self.tokens = self.burst
+        self.stamp = time.monotonic()
+        self.deferred = self.stamp
+
+    def admit(self):
+        """
+        Return 0 if the request is admitted, else the number of seconds the
+        client has to wait before it retries. The retry times handed out are
+        spaced at the rate of the bucket, so the deferred clients come back
+        spread out instead of all at once.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        self.deferred = max(self.deferred, now) + 1 / self.rate
+        return self.deferred - now
+
+
 # TODO: rename?
 class AESReqServerMixin:
     """
@@ -113,6 +203,64 @@ class AESReqServerMixin:
 
         self.master_key = salt.crypt.MasterKeys(self.opts)
 
+        # the auth fast path, see the auth_cache and auth_rate_limit options
+        self.key_states = KeyStates() if self.opts.get("auth_cache") else None
+        self.auth_replies = {}
+        if self.opts.get("auth_rate_limit", 0) > 0:
+            self.auth_limiter = AuthRateLimiter(
+                self.opts["auth_rate_limit"] / max(self.opts["worker_threads"], 1)
+            )
+        else:
+            self.auth_limiter = None
+
+    def _key_isfile(self, path):
+        """
+        Check for a key file, through the key state table when it is enabled
+        """
+        if getattr(self, "key_states", None) is None:
+            return os.path.isfile(path)
+        return self.key_states.isfile(path)
+
+    def _read_key(self, path):
+        """
+        Read a key file, through the key state table when it is enabled
+        """
+        if getattr(self, "key_states", None) is None:
+            with salt.utils.files.fopen(path, "r") as fp_:
+                return fp_.read()
+        return self.key_states.read(path)
+
+    def _encrypt_aes(self, pub, load, aes):
+        """
+        Encrypt the AES key with the public key of the minion and sign it
+
+        When the auth_cache is enabled the reply is reused for the same minion
+        and public key until the AES key is rotated.
+        """
+        cache = getattr(self, "key_states", None) is not None and (
+            aes == salt.master.SMaster.secrets["aes"]["secret"].value
+        )
+        if cache:
+            if self.auth_replies.get("aes") != aes:
+                self.auth_replies = {"aes": aes, "minions": {}}
+            cached = self.auth_replies["minions"].get(load["id"])
+            if cached is not None and cached[0] == load["pub"]:
+                return cached[1], self.auth_replies["sig"]
+        if HAS_M2:
+            enc_aes = pub.public_encrypt(aes, RSA.pkcs1_oaep_padding)
+        else:
+            enc_aes = PKCS1_OAEP.new(pub).encrypt(aes)
+        if cache and "sig" in self.auth_replies:
+            sig = self.auth_replies["sig"]
+        else:
+            # Be aggressive about the signature
+            digest = salt.utils.stringutils.to_bytes(hashlib.sha256(aes).hexdigest())
+            sig = salt.crypt.private_encrypt(self.master_key.key, digest)
+        if cache:
+            self.auth_replies["sig"] = sig
+            self.auth_replies["minions"][load["id"]] = (load["pub"], enc_aes)
+        return enc_aes, sig
+
     def _encrypt_private(self, ret, dictkey, target):
         """
         The server equivalent of ReqChannel.crypted_transfer_decode_dictentry
@@ -122,7 +270,7 @@ class AESReqServerMixin:
         key = salt.crypt.Crypticle.generate_key_string()
         pcrypt = salt.crypt.Crypticle(self.opts, key)
         try:
-            pub = salt.crypt.get_rsa_pub_key(pubfn)
+            pub = salt.crypt.pub_key_cache(self.opts).get(pubfn)
         except (ValueError, IndexError, TypeError):
             return self.crypticle.dumps({})
         except OSError:
@@ -186,6 +334,24 @@ class AESReqServerMixin:
             return {"enc": "clear", "load": {"ret": False}}
         log.info("Authentication request from %s", load["id"])
 
+        if getattr(self, "auth_limiter", None) is not None:
+            retry_after = self.auth_limiter.admit()
+            if retry_after:
+                log.debug(
+                    "Deferring authentication of %s for %.2f seconds",
+                    load["id"],
+                    retry_after,
+                )
+                if not load.get("auth_busy"):
+                    # Older minions do not know the busy reply, they retry
+                    # after their acceptance_wait_time on the reply of a
+                    # pending key
+                    return {"enc": "clear", "load": {"ret": True}}
+                return {
+                    "enc": "clear",
+                    "load": {"ret": "busy", "retry_after": round(retry_after, 3)},
+                }
+
         # 0 is default which should be 'unlimited'
         if self.opts["max_minions"] > 0:
             # use the ConCache if enabled, else use the minion utils
@@ -239,7 +405,7 @@ class AESReqServerMixin:
             # open mode is turned on, nuts to checks and overwrite whatever
             # is there
             pass
-        elif os.path.isfile(pubfn_rejected):
+        elif self._key_isfile(pubfn_rejected):
             # The key has been rejected, don't place it in pending
             log.info(
                 "Public key rejected for %s. Key is present in " "rejection key dir.",
@@ -250,32 +416,29 @@ class AESReqServerMixin:
                 self.event.fire_event(eload, salt.utils.event.tagify(prefix="auth"))
             return {"enc": "clear", "load": {"ret": False}}
 
-        elif os.path.isfile(pubfn):
+        elif self._key_isfile(pubfn):
             # The key has been accepted, check it
-            with salt.utils.files.fopen(pubfn, "r") as pubfn_handle:
-                if pubfn_handle.read().strip() != load["pub"].strip():
-                    log.error(
-                        "Authentication attempt from %s failed, the public "
-                        "keys did not match. This may be an attempt to compromise "
-                        "the Salt cluster.",
-                        load["id"],
-                    )
-                    # put denied minion key into minions_denied
-                    with salt.utils.files.fopen(pubfn_denied, "w+") as fp_:
-                        fp_.write(load["pub"])
-                    eload = {
-                        "result": False,
-                        "id": load["id"],
-                        "act": "denied",
-                        "pub": load["pub"],
-                    }
-                    if self.opts.get("auth_events") is True:
-                        self.event.fire_event(
-                            eload, salt.utils.event.tagify(prefix="auth")
-                        )
-                    return {"enc": "clear", "load": {"ret": False}}
+            if self._read_key(pubfn).strip() != load["pub"].strip():
+                log.error(
+                    "Authentication attempt from %s failed, the public "
+                    "keys did not match. This may be an attempt to compromise "
+                    "the Salt cluster.",
+                    load["id"],
+                )
+                # put denied minion key into minions_denied
+                with salt.utils.files.fopen(pubfn_denied, "w+") as fp_:
+                    fp_.write(load["pub"])
+                eload = {
+                    "result": False,
+                    "id": load["id"],
+                    "act": "denied",
+                    "pub": load["pub"],
+                }
+                if self.opts.get("auth_events") is True:
+                    self.event.fire_event(eload, salt.utils.event.tagify(prefix="auth"))
+                return {"enc": "clear", "load": {"ret": False}}
 
-        elif not os.path.isfile(pubfn_pend):
+        elif not self._key_isfile(pubfn_pend):
             # The key has not been accepted, this is a new minion
             if os.path.isdir(pubfn_pend):
                 # The key path is a directory, error out
@@ -317,7 +480,7 @@ class AESReqServerMixin:
                     self.event.fire_event(eload, salt.utils.event.tagify(prefix="auth"))
                 return ret
 
-        elif os.path.isfile(pubfn_pend):
+        elif self._key_isfile(pubfn_pend):
             # This key is in the pending dir and is awaiting acceptance
             if auto_reject:
                 # We don't care if the keys match, this minion is being
@@ -424,7 +587,7 @@ class AESReqServerMixin:
         log.info("Authentication accepted from %s", load["id"])
         # only write to disk if you are adding the file, and in open mode,
         # which implies we accept any key from a minion.
-        if not os.path.isfile(pubfn) and not self.opts["open_mode"]:
+        if not self._key_isfile(pubfn) and not self.opts["open_mode"]:
             with salt.utils.files.fopen(pubfn, "w+") as fp_:
                 fp_.write(load["pub"])
         elif self.opts["open_mode"]:
@@ -449,7 +612,7 @@ class AESReqServerMixin:
         # The key payload may sometimes be corrupt when using auto-accept
         # and an empty request comes in
         try:
-            pub = salt.crypt.get_rsa_pub_key(pubfn)
+            pub = salt.crypt.pub_key_cache(self.opts).get(pubfn)
         except (ValueError, IndexError, TypeError) as err:
             log.error('Corrupt public key "%s": %s', pubfn, err)
             return {"enc": "clear", "load": {"ret": False}}
@@ -505,11 +668,6 @@ class AESReqServerMixin:
                     pass
             else:
                 aes = salt.master.SMaster.secrets["aes"]["secret"].value
-
-            if HAS_M2:
-                ret["aes"] = pub.public_encrypt(aes, RSA.pkcs1_oaep_padding)
-            else:
-                ret["aes"] = cipher.encrypt(aes)
         else:
             if "token" in load:
                 try:
@@ -529,13 +687,7 @@ class AESReqServerMixin:
                     pass
 
             aes = salt.master.SMaster.secrets["aes"]["secret"].value
-            if HAS_M2:
-                ret["aes"] = pub.public_encrypt(aes, RSA.pkcs1_oaep_padding)
-            else:
-                ret["aes"] = cipher.encrypt(aes)
-        # Be aggressive about the signature
-        digest = salt.utils.stringutils.to_bytes(hashlib.sha256(aes).hexdigest())
-        ret["sig"] = salt.crypt.private_encrypt(self.master_key.key, digest)
+        ret["aes"], ret["sig"] = self._encrypt_aes(pub, load, aes)
         eload = {"result": True, "act": "accept", "id": load["id"], "pub": load["pub"]}
         if self.opts.get("auth_events") is True:
             self.event.fire_event(eload, salt.utils.event.tagify(prefix="auth"))
@@ -388,7 +388,6 @@ class AsyncTCPReqChannel(salt.transport.client.ReqChannel):
             aes = cipher.decrypt(ret["key"])
         pcrypt = salt.crypt.Crypticle(self.opts, aes)
         data = pcrypt.loads(ret[dictkey])
-        data = salt.transport.frame.decode_embedded_strs(data)
         raise salt.ext.tornado.gen.Return(data)
 
     @salt.ext.tornado.gen.coroutine
@@ -413,7 +412,6 @@ class AsyncTCPReqChannel(salt.transport.client.ReqChannel):
             # upload the results to the master
             if data:
                 data = self.auth.crypticle.loads(data)
-                data = salt.transport.frame.decode_embedded_strs(data)
             raise salt.ext.tornado.gen.Return(data)
 
         if not self.auth.authenticated:
@@ -1579,7 +1577,6 @@ class PubServer(salt.ext.tornado.tcpserver.TCPServer):
                         self.opts, salt.master.SMaster.secrets["aes"]["secret"].value
                     )
                     load = crypticle.loads(body["load"])
-                    load = salt.transport.frame.decode_embedded_strs(load)
                     if not self.aes_funcs.verify_minion(load["id"], load["tok"]):
                         continue
                     client.id_ = load["id"]
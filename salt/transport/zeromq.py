@@ -65,6 +65,9 @@ except ImportError:
 
 log = logging.getLogger(__name__)
 
+# Maximum number of hashed publish topics kept by the publish daemon
+TOPIC_HASH_CACHE_SIZE = 100000
+
 
 def _get_master_uri(master_ip, master_port, source_ip=None, source_port=None):
     """
@@ -368,7 +371,6 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
             aes = cipher.decrypt(ret["key"])
         pcrypt = salt.crypt.Crypticle(self.opts, aes)
         data = pcrypt.loads(ret[dictkey])
-        data = salt.transport.frame.decode_embedded_strs(data)
         raise salt.ext.tornado.gen.Return(data)
 
     @salt.ext.tornado.gen.coroutine
@@ -401,8 +403,6 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
             # upload the results to the master
             if data:
                 data = self.auth.crypticle.loads(data, raw)
-            if not raw:
-                data = salt.transport.frame.decode_embedded_strs(data)
             raise salt.ext.tornado.gen.Return(data)
 
         if not self.auth.authenticated:
@@ -936,6 +936,16 @@ def _set_tcp_keepalive(zmq_socket, opts):
             zmq_socket.setsockopt(zmq.TCP_KEEPALIVE_INTVL, opts["tcp_keepalive_intvl"])
 
 
+def _topic_hash(topic):
+    """
+    Return the zmq topic used to publish to the minion with id ``topic``. zmq
+    filters are substring matches, so the id is hashed to avoid collisions.
+    """
+    return salt.utils.stringutils.to_bytes(
+        hashlib.sha1(salt.utils.stringutils.to_bytes(topic)).hexdigest()
+    )
+
+
 class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
     """
     Encapsulate synchronous operations for a publisher channel
@@ -947,10 +957,89 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
         self.opts = opts
         self.serial = salt.payload.Serial(self.opts)  # TODO: in init?
         self.ckminions = salt.utils.minions.CkMinions(self.opts)
+        # Hashed zmq topics of the minion ids, see topic_hash()
+        self._topic_hashes = {}
+        self._topic_hashes_mtime = None
 
     def connect(self):
         return salt.ext.tornado.gen.sleep(5)
 
+    def topic_hash(self, topic):
+        """
+        Return the hashed zmq topic for the minion id ``topic``, given as raw
+        bytes from the publish package
+        """
+        try:
+            return self._topic_hashes[topic]
+        except KeyError:
+            pass
+        htopic = _topic_hash(topic)
+        if len(self._topic_hashes) < TOPIC_HASH_CACHE_SIZE:
+            self._topic_hashes[topic] = htopic
+        return htopic
+
+    def refresh_topic_hashes(self):
+        """
+        Precompute the hashed topics of all accepted minions. The table is
+        only rebuilt when the accepted keys changed since the last call.
+        """
+        accepted = os.path.join(self.opts["pki_dir"], "minions")
+        try:
+            mtime = os.path.getmtime(accepted)
+        except OSError:
+            return
+        if mtime == self._topic_hashes_mtime:
+            return
+        self._topic_hashes = {}
+        self._topic_hashes_mtime = mtime
+        try:
+            minion_ids = os.listdir(accepted)
+        except OSError:
+            return
+        for minion_id in minion_ids:
+            if not minion_id.startswith("."):
+                self.topic_hash(salt.utils.stringutils.to_bytes(minion_id))
+        log.debug("Precomputed %d publish topics", len(self._topic_hashes))
+
+    def _publish_package(self, pub_sock, package):
+        """
+        Send a package pulled from the master workers to the minions. The
+        payload is passed through without decoding it.
+        """
+        unpacked_package = {
+            salt.utils.stringutils.to_str(key): value
+            for key, value in salt.payload.unpackage(package).items()
+        }
+        payload = unpacked_package["payload"]
+        log.trace("Accepted unpacked package from puller")
+        if not self.opts["zmq_filtering"]:
+            log.trace("Sending ZMQ-unfiltered data over publisher")
+            pub_sock.send(payload)
+            log.trace("Unfiltered data has been sent")
+            return
+        # if you have a specific topic list, use that
+        if "topic_lst" in unpacked_package:
+            log.trace("Sending filtered data over publisher")
+            self.refresh_topic_hashes()
+            # The payload frame is shared by all the topic sends instead of
+            # being copied for each of them
+            frame = zmq.Frame(payload)
+            for topic in unpacked_package["topic_lst"]:
+                pub_sock.send_multipart([self.topic_hash(topic), frame], copy=False)
+            log.trace("Filtered data has been sent")
+
+            # Syndic broadcast
+            if self.opts.get("order_masters"):
+                log.trace("Sending filtered data to syndic")
+                pub_sock.send_multipart([b"syndic", frame], copy=False)
+                log.trace("Filtered data has been sent to syndic")
+        # otherwise its a broadcast
+        else:
+            # TODO: constants file for "broadcast"
+            log.trace("Sending broadcasted data over publisher")
+            pub_sock.send_multipart([b"broadcast", payload])
+            log.trace("Broadcasted data has been sent")
+
     def _publish_daemon(self, log_queue=None):
         """
         Bind to the interface specified in the configuration file
@@ -1011,6 +1100,9 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
         with salt.utils.files.set_umask(0o177):
             pull_sock.bind(pull_uri)
 
+        if self.opts["zmq_filtering"]:
+            self.refresh_topic_hashes()
+
         try:
             while True:
                 # Catch and handle EINTR from when this process is sent
@@ -1020,51 +1112,7 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
                     package = pull_sock.recv()
                     log.debug("Publish daemon received payload. size=%d", len(package))
 
-                    unpacked_package = salt.payload.unpackage(package)
-                    unpacked_package = salt.transport.frame.decode_embedded_strs(
-                        unpacked_package
-                    )
-                    payload = unpacked_package["payload"]
-                    log.trace("Accepted unpacked package from puller")
-                    if self.opts["zmq_filtering"]:
-                        # if you have a specific topic list, use that
-                        if "topic_lst" in unpacked_package:
-                            for topic in unpacked_package["topic_lst"]:
-                                log.trace(
-                                    "Sending filtered data over publisher %s", pub_uri
-                                )
-                                # zmq filters are substring match, hash the topic
-                                # to avoid collisions
-                                htopic = salt.utils.stringutils.to_bytes(
-                                    hashlib.sha1(
-                                        salt.utils.stringutils.to_bytes(topic)
-                                    ).hexdigest()
-                                )
-                                pub_sock.send(htopic, flags=zmq.SNDMORE)
-                                pub_sock.send(payload)
-                                log.trace("Filtered data has been sent")
-
-                            # Syndic broadcast
-                            if self.opts.get("order_masters"):
-                                log.trace("Sending filtered data to syndic")
-                                pub_sock.send(b"syndic", flags=zmq.SNDMORE)
-                                pub_sock.send(payload)
-                                log.trace("Filtered data has been sent to syndic")
-                        # otherwise its a broadcast
-                        else:
-                            # TODO: constants file for "broadcast"
-                            log.trace(
-                                "Sending broadcasted data over publisher %s", pub_uri
-                            )
-                            pub_sock.send(b"broadcast", flags=zmq.SNDMORE)
-                            pub_sock.send(payload)
-                            log.trace("Broadcasted data has been sent")
-                    else:
-                        log.trace(
-                            "Sending ZMQ-unfiltered data over publisher %s", pub_uri
-                        )
-                        pub_sock.send(payload)
-                        log.trace("Unfiltered data has been sent")
+                    self._publish_package(pub_sock, package)
                 except zmq.ZMQError as exc:
                     if exc.errno == errno.EINTR:
                         continue
@@ -6,6 +6,7 @@ import functools
 import logging
 import os
 import re
+import struct
 import time
 
 import salt.config
@@ -32,6 +33,8 @@ class CacheFactory:
             return CacheDict(ttl, *args, **kwargs)
         elif backend == "disk":
             return CacheDisk(ttl, kwargs["minion_cache_path"], *args, **kwargs)
+        elif backend == "disk_log":
+            return CacheDiskLog(ttl, kwargs["minion_cache_path"], *args, **kwargs)
         else:
             log.error("CacheFactory received unrecognized cache type")
 
@@ -173,6 +176,230 @@ class CacheDisk(CacheDict):
             salt.utils.msgpack.dump(cache, fp_, use_bin_type=True)
 
 
+class CacheDiskLog(CacheDisk):
+    """
+    Disk-based cache which appends every change as a separate record to a log
+    file instead of rewriting the whole file on every change.
+
+    The log is only read when the cache is first used, and only the records
+    appended since are read after that, so changes made by other processes are
+    picked up. Values are only deserialized when they are looked up. Expired
+    entries are skipped when read, and the log is rewritten without the
+    replaced, deleted and expired entries once they make up most of it. Files
+    written by ``CacheDisk`` are converted when they are first read.
+    """
+
+    # The first bytes of a log, files without them are read as CacheDisk files
+    MAGIC = b"CacheDiskLog\x01\n"
+    # Logs smaller than this are never compacted
+    COMPACT_MIN_SIZE = 65536
+
+    def __init__(self, ttl, path, *args, **kwargs):
+        CacheDict.__init__(self, ttl, *args, **kwargs)
+        self._path = path
+        # Maps the keys to their timestamp, serialized value and record size,
+        # None until the log is read
+        self._entries = None
+        self._values = {}
+        self._inode = None
+        self._offset = 0
+        # The size of the records in the log which are no longer used
+        self._garbage = 0
+
+    @property
+    def _dict(self):
+        """
+        The live entries of the cache as a dictionary
+        """
+        self._refresh()
+        ret = {}
+        for key in list(self._entries):
+            try:
+                ret[key] = self[key]
+            except KeyError:
+                pass
+        return ret
+
+    def _reset(self, inode):
+        self._entries = {}
+        self._values = {}
+        self._inode = inode
+        self._offset = 0
+        self._garbage = 0
+
+    def _refresh(self):
+        """
+        Read the records appended to the log since it was last read
+        """
+        try:
+            fp_ = salt.utils.files.fopen(self._path, "rb")
+        except OSError:
+            if self._entries is None or self._inode is not None:
+                self._reset(None)
+            return
+        with fp_:
+            stat = os.fstat(fp_.fileno())
+            if (
+                self._entries is None
+                or stat.st_ino != self._inode
+                or stat.st_size < self._offset
+            ):
+                # The log was compacted or cleared since it was last read
+                self._reset(stat.st_ino)
+            if stat.st_size == self._offset:
+                return
+            fp_.seek(self._offset)
+            buf = fp_.read()
+        pos = 0
+        if self._offset == 0:
+            if not buf.startswith(self.MAGIC):
+                if self.MAGIC.startswith(buf):
+                    # A log which is just being created
+                    return
+                self._convert(buf, stat.st_mtime)
+                return
+            pos = len(self.MAGIC)
+        while pos + 4 <= len(buf):
+            (size,) = struct.unpack(">I", buf[pos : pos + 4])
+            if pos + 4 + size > len(buf):
+                # A record which is still being written
+                break
+            key, timestamp, data = salt.utils.msgpack.loads(
+                buf[pos + 4 : pos + 4 + size], raw=False, use_list=True
+            )
+            self._apply(key, timestamp, data, size + 4)
+            pos += 4 + size
+        self._offset += pos
+
+    def _apply(self, key, timestamp, data, size):
+        """
+        Apply a record of the log to the entries
+        """
+        old = self._entries.pop(key, None)
+        self._values.pop(key, None)
+        if old is not None:
+            self._garbage += old[2]
+        if data is None:
+            self._garbage += size
+        else:
+            self._entries[key] = (timestamp, data, size)
+
+    def _convert(self, buf, mtime):
+        """
+        Convert a file written by CacheDisk to a log
+        """
+        cache = salt.utils.data.decode(
+            salt.utils.msgpack.loads(buf, encoding=__salt_system_encoding__)
+        )
+        if "CacheDisk_cachetime" in cache:
+            data, cachetime = cache["CacheDisk_data"], cache["CacheDisk_cachetime"]
+        else:
+            data, cachetime = cache, {}
+        for key, val in data.items():
+            timestamp = cachetime.get(key, mtime)
+            val = salt.utils.msgpack.dumps(val, use_bin_type=True)
+            self._apply(key, timestamp, val, len(self._record(key, timestamp, val)))
+        self._offset = len(buf)
+        self._garbage = len(buf)
+        log.debug("Converting disk cache %s to a log", self._path)
+        self.compact()
+
+    @staticmethod
+    def _record(key, timestamp, data):
+        """
+        Return the log record of a serialized value, or of the deletion of the
+        key if ``data`` is None
+        """
+        record = salt.utils.msgpack.dumps([key, timestamp, data], use_bin_type=True)
+        return struct.pack(">I", len(record)) + record
+
+    def _append(self, key, data):
+        """
+        Append a record to the log
+        """
+        record = self._record(key, time.time(), data)
+        while True:
+            with salt.utils.files.flopen(self._path, "ab") as fp_:
+                try:
+                    if os.fstat(fp_.fileno()).st_ino != os.stat(self._path).st_ino:
+                        # The log was compacted while waiting for the lock
+                        continue
+                except OSError:
+                    continue
+                if not fp_.tell():
+                    fp_.write(self.MAGIC)
+                fp_.write(record)
+                break
+        self._refresh()
+        if self._offset > self.COMPACT_MIN_SIZE and self._garbage > self._offset // 2:
+            self.compact()
+
+    def _live(self, key):
+        """
+        Return the entry of a key, raise a KeyError if it is missing or expired
+        """
+        self._refresh()
+        timestamp, data, size = self._entries[key]
+        if time.time() - timestamp > self._ttl:
+            del self._entries[key]
+            self._values.pop(key, None)
+            self._garbage += size
+            raise KeyError(key)
+        return data
+
+    def __contains__(self, key):
+        try:
+            self._live(key)
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, key):
+        """
+        Check if the key is ttld out, then do the get
+        """
+        data = self._live(key)
+        if key not in self._values:
+            self._values[key] = salt.utils.msgpack.loads(data, raw=False, use_list=True)
+        return self._values[key]
+
+    def __setitem__(self, key, val):
+        """
+        Append the new value to the log
+        """
+        self._append(key, salt.utils.msgpack.dumps(val, use_bin_type=True))
+
+    def __delitem__(self, key):
+        """
+        Append the deletion to the log
+        """
+        self._live(key)
+        self._append(key, None)
+
+    def clear(self):
+        """
+        Clear the cache
+        """
+        self._refresh()
+        self._entries = {}
+        self._values = {}
+        self.compact()
+
+    def compact(self):
+        """
+        Rewrite the log with only the live entries
+        """
+        with salt.utils.files.flopen(self._path, "ab"):
+            self._refresh()
+            now = time.time()
+            with salt.utils.atomicfile.atomic_open(self._path, "wb") as fp_:
+                fp_.write(self.MAGIC)
+                for key, (timestamp, data, _) in self._entries.items():
+                    if now - timestamp <= self._ttl:
+                        fp_.write(self._record(key, timestamp, data))
+        self._refresh()
+
+
 class CacheCli:
     """
     Connection client for the ConCache. Should be used by all
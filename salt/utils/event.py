@@ -56,6 +56,9 @@ import fnmatch
 import hashlib
 import logging
 import os
+import queue
+import struct
+import threading
 import time
 from collections.abc import MutableMapping
 
@@ -258,6 +261,7 @@ class SaltEvent:
         self.puburi, self.pulluri = self.__load_uri(sock_dir, node)
         self.pending_tags = []
         self.pending_events = []
+        self.tag_filter = None
         self.__load_cache_regex()
         if listen and not self.cpub:
             # Only connect to the publisher at initialization time if
@@ -348,6 +352,19 @@ class SaltEvent:
             ):
                 self.pending_events.append(evt)
 
+    def filter_tags(self, tags):
+        """
+        Only receive the events whose tags match one of the passed tags.
+
+        The tags are prefixes or fnmatch globs. They are matched by the event
+        publisher, so the other events are never sent to this subscriber. Pass
+        None to receive all events again. Events fired before the publisher
+        received the filter may still be received.
+        """
+        self.tag_filter = list(tags) if tags is not None else None
+        if self.subscriber is not None:
+            self.subscriber.subscribe(self.tag_filter)
+
     def connect_pub(self, timeout=None):
         """
         Establish the publish connection
@@ -364,6 +381,8 @@ class SaltEvent:
                         kwargs={"io_loop": self.io_loop},
                         loop_kwarg="io_loop",
                     )
+                    if self.tag_filter is not None:
+                        self.subscriber.subscribe(self.tag_filter)
                 try:
                     self.subscriber.connect(timeout=timeout)
                     self.cpub = True
@@ -374,6 +393,8 @@ class SaltEvent:
                 self.subscriber = salt.transport.ipc.IPCMessageSubscriber(
                     self.puburi, io_loop=self.io_loop
                 )
+                if self.tag_filter is not None:
+                    self.subscriber.subscribe(self.tag_filter)
 
             # For the asynchronous case, the connect will be defered to when
             # set_event_handler() is invoked.
@@ -440,12 +461,19 @@ class SaltEvent:
         if serial is None:
             serial = salt.payload.Serial({"serial": "msgpack"})
 
+        mtag, mdata = cls.unpack_tag(raw)
+        data = serial.loads(mdata, encoding="utf-8")
+        return mtag, data
+
+    @staticmethod
+    def unpack_tag(raw):
+        """
+        Split the tag of a raw event from its still serialized data
+        """
         mtag, sep, mdata = raw.partition(
             salt.utils.stringutils.to_bytes(TAGEND)
         )  # split tag from data
-        mtag = salt.utils.stringutils.to_str(mtag)
-        data = serial.loads(mdata, encoding="utf-8")
-        return mtag, data
+        return salt.utils.stringutils.to_str(mtag), mdata
 
     def _get_match_func(self, match_type=None):
         if match_type is None:
@@ -556,8 +584,15 @@ class SaltEvent:
                 raw = self.subscriber.read(timeout=wait)
                 if raw is None:
                     break
-                mtag, data = self.unpack(raw, self.serial)
-                ret = {"data": data, "tag": mtag}
+                mtag, mdata = self.unpack_tag(raw)
+                if not match_func(mtag, tag) and not any(
+                    pmatch_func(mtag, ptag) for ptag, pmatch_func in self.pending_tags
+                ):
+                    # Nobody waits for this event, do not decode its data
+                    if wait:  # only update the wait timeout if we had one
+                        wait = timeout_at - time.time()
+                    continue
+                ret = {"data": self.serial.loads(mdata, encoding="utf-8"), "tag": mtag}
             except KeyboardInterrupt:
                 return {"tag": "salt/event/exit", "data": {}}
             except salt.ext.tornado.iostream.StreamClosedError:
@@ -1028,6 +1063,16 @@ class MinionEvent(SaltEvent):
         )
 
 
+def _publish_tag(publisher, package):
+    """
+    Return the tag of a raw event for the subscriptions of the publisher, None
+    when no subscriber filters the events
+    """
+    if not publisher.filters or not isinstance(package, bytes):
+        return None
+    return SaltEvent.unpack_tag(package)[0]
+
+
 class AsyncEventPublisher:
     """
     An event publisher class intended to run in an ioloop (within a single process)
@@ -1112,7 +1157,7 @@ class AsyncEventPublisher:
         Get something from epull, publish it out epub, and return the package (or None)
         """
         try:
-            self.publisher.publish(package)
+            self.publisher.publish(package, tag=_publish_tag(self.publisher, package))
             return package
         # Add an extra fallback in case a forked process leeks through
         except Exception:  # pylint: disable=broad-except
@@ -1219,7 +1264,7 @@ class EventPublisher(salt.utils.process.SignalHandlingProcess):
         Get something from epull, publish it out epub, and return the package (or None)
         """
         try:
-            self.publisher.publish(package)
+            self.publisher.publish(package, tag=_publish_tag(self.publisher, package))
             return package
         # Add an extra fallback in case a forked process leeks through
         except Exception:  # pylint: disable=broad-except
@@ -1246,6 +1291,259 @@ class EventPublisher(salt.utils.process.SignalHandlingProcess):
         super()._handle_signals(signum, sigframe)
 
 
+class EventReturnQueue:
+    """
+    A bounded in-memory queue of events flushed to one event returner by a
+    worker thread, used by the EventReturn when ``event_return_async`` is on.
+
+    Events which do not fit in the queue and batches the returner failed to
+    store are appended to segment files on disk. The spooled segments are
+    replayed once the returner stores events again, in between the live
+    batches while events keep coming. The spool survives restarts of the
+    master.
+    """
+
+    # The number of events after which a new spool segment is started, a
+    # segment is replayed in one call of the returner
+    spool_segment_events = 100
+    # The number of live batches stored in between the replayed segments
+    spool_replay_interval = 4
+
+    def __init__(self, opts, returner, func):
+        self.opts = opts
+        self.returner = returner
+        self.func = func
+        self.serial = salt.payload.Serial(opts)
+        self.batch_size = max(opts["event_return_queue"], 1)
+        self.max_seconds = opts.get("event_return_queue_max_seconds", 0)
+        self.queue = queue.Queue(opts["event_return_async_queue"])
+        self.spool_dir = os.path.join(opts["cachedir"], "event_return_spool", returner)
+        self.spool_max_size = opts["event_return_spool_max_size"]
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._seq = 0
+        self._overflow = []
+        self._spool_size = 0
+        # The segment the spooled events are appended to and its event count
+        self._segment = None
+        self._segment_events = 0
+        self.stats = {
+            "flushed": 0,
+            "failed": 0,
+            "spooled": 0,
+            "dropped": 0,
+            "flush_time": 0.0,
+            "flush_max": 0.0,
+            "flushes": 0,
+        }
+        if not os.path.isdir(self.spool_dir):
+            os.makedirs(self.spool_dir)
+        for name in os.listdir(self.spool_dir):
+            self._spool_size += os.path.getsize(os.path.join(self.spool_dir, name))
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._flush_loop, name="EventReturn-{}".format(self.returner)
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        """
+        Stop the worker thread and spool the events still in memory
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        events = self._overflow
+        self._overflow = []
+        while True:
+            try:
+                events.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        self._spool(events)
+
+    def put(self, event):
+        """
+        Queue an event, never blocks
+        """
+        if not self._overflow:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                pass
+        # Keep the order of the events once the queue overflowed
+        self._overflow.append(event)
+        if len(self._overflow) >= self.batch_size:
+            self._spool(self._overflow)
+            self._overflow = []
+
+    def _count(self, **counts):
+        with self._stats_lock:
+            for key, val in counts.items():
+                self.stats[key] += val
+
+    def _spool(self, events):
+        if not events:
+            return
+        data = self.serial.dumps(events)
+        record = struct.pack(">I", len(data)) + data
+        with self._lock:
+            if self._spool_size + len(record) > self.spool_max_size:
+                log.error(
+                    "The spool of event returner '%s' is full, dropping %s events",
+                    self.returner,
+                    len(events),
+                )
+                self._count(dropped=len(events))
+                return
+            if (
+                self._segment is None
+                or self._segment_events >= self.spool_segment_events
+            ):
+                self._seq += 1
+                name = "{:017d}-{:06d}".format(int(time.time() * 1e6), self._seq)
+                self._segment = os.path.join(self.spool_dir, name)
+                self._segment_events = 0
+            with salt.utils.files.fopen(self._segment, "ab") as fp_:
+                fp_.write(record)
+            self._segment_events += len(events)
+            self._spool_size += len(record)
+        self._count(spooled=len(events))
+
+    def _next_spooled(self):
+        """
+        Return the path and the events of the oldest spooled segment
+        """
+        with self._lock:
+            names = sorted(
+                name for name in os.listdir(self.spool_dir) if "." not in name
+            )
+            if not names:
+                return None, None
+            path = os.path.join(self.spool_dir, names[0])
+            if path == self._segment:
+                # The events spooled from now on go to a new segment
+                self._segment = None
+            with salt.utils.files.fopen(path, "rb") as fp_:
+                data = fp_.read()
+            events = []
+            offset = 0
+            try:
+                while offset < len(data):
+                    (size,) = struct.unpack_from(">I", data, offset)
+                    offset += 4
+                    if offset + size > len(data):
+                        raise ValueError("truncated batch")
+                    events.extend(self.serial.loads(data[offset : offset + size]))
+                    offset += size
+            except Exception as exc:  # pylint: disable=broad-except
+                # A batch was cut short when the master died writing it
+                log.error(
+                    "Event spool file %s is corrupt after %s events: %s",
+                    path,
+                    len(events),
+                    exc,
+                )
+            if events:
+                return path, events
+            self._spool_size -= len(data)
+            os.remove(path)
+            return None, None
+
+    def _unspool(self, path):
+        with self._lock:
+            self._spool_size -= os.path.getsize(path)
+            os.remove(path)
+
+    def _next_batch(self):
+        """
+        Return the next batch of queued events, waiting up to
+        ``event_return_queue_max_seconds`` for it to fill up
+        """
+        try:
+            events = [self.queue.get(timeout=1)]
+        except queue.Empty:
+            return []
+        deadline = time.time() + self.max_seconds
+        while len(events) < self.batch_size:
+            try:
+                events.append(self.queue.get(timeout=max(deadline - time.time(), 0)))
+            except queue.Empty:
+                break
+        return events
+
+    def _store(self, events):
+        start = time.time()
+        try:
+            self.func(events)
+        except Exception as exc:  # pylint: disable=broad-except
+            log.error(
+                "Could not store events - returner '%s' raised exception: %s",
+                self.returner,
+                exc,
+            )
+            self._count(failed=1)
+            return False
+        duration = time.time() - start
+        with self._stats_lock:
+            self.stats["flushed"] += len(events)
+            self.stats["flushes"] += 1
+            self.stats["flush_time"] += duration
+            self.stats["flush_max"] = max(self.stats["flush_max"], duration)
+        return True
+
+    def _flush_loop(self):
+        backoff = 0
+        live = 0
+        while not self._stop.is_set():
+            if backoff:
+                # The returner failed, do not hammer it while it recovers
+                if self._stop.wait(backoff):
+                    break
+            path = events = None
+            if self._spool_size and live >= self.spool_replay_interval:
+                # Drain the spool while events keep coming
+                live = 0
+                path, events = self._next_spooled()
+            if not events:
+                events = self._next_batch()
+                if events:
+                    live += 1
+                else:
+                    path, events = self._next_spooled()
+                    if not events:
+                        backoff = 0
+                        continue
+            if self._store(events):
+                backoff = 0
+                if path is not None:
+                    self._unspool(path)
+            else:
+                backoff = min(max(backoff * 2, 1), 60)
+                if path is None:
+                    self._spool(events)
+
+    def get_stats(self):
+        """
+        Return and reset the stats of the queue
+        """
+        with self._stats_lock:
+            stats = self.stats
+            self.stats = dict.fromkeys(stats, 0)
+        stats["flush_max"] = float(stats["flush_max"])
+        stats["flush_mean"] = (
+            stats.pop("flush_time") / stats["flushes"] if stats["flushes"] else 0.0
+        )
+        stats["queued"] = self.queue.qsize() + len(self._overflow)
+        stats["spool_size"] = self._spool_size
+        return stats
+
+
 class EventReturn(salt.utils.process.SignalHandlingProcess):
     """
     A dedicated process which listens to the master event bus and queues
@@ -1273,6 +1571,7 @@ class EventReturn(salt.utils.process.SignalHandlingProcess):
         local_minion_opts["file_client"] = "local"
         self.minion = salt.minion.MasterMinion(local_minion_opts)
         self.event_queue = []
+        self.queues = []
         self.stop = False
 
     # __setstate__ and __getstate__ are only used on Windows.
@@ -1296,6 +1595,9 @@ class EventReturn(salt.utils.process.SignalHandlingProcess):
         # Flush and terminate
         if self.event_queue:
             self.flush_events()
+        # Spool what the returner queues did not store yet
+        for event_queue in self.queues:
+            event_queue.stop()
         self.stop = True
         super()._handle_signals(signum, sigframe)
 
@@ -1351,6 +1653,9 @@ class EventReturn(salt.utils.process.SignalHandlingProcess):
             os.nice(self.opts["event_return_niceness"])
 
         self.event = get_event("master", opts=self.opts, listen=True)
+        if self.opts["event_return_async"]:
+            self._run_async()
+            return
         events = self.event.iter_events(full=True)
         self.event.fire_event({}, "salt/event_listen/start")
         try:
@@ -1409,6 +1714,67 @@ class EventReturn(salt.utils.process.SignalHandlingProcess):
 
                 self.flush_events()
 
+    def _run_async(self):
+        """
+        Queue the events for returners flushing them on their own threads
+        """
+        returners = self.opts["event_return"]
+        if not isinstance(returners, list):
+            returners = [returners]
+        for returner in returners:
+            event_return = "{}.event_return".format(returner)
+            if event_return not in self.minion.returners:
+                log.error(
+                    "Could not store return for event(s) - returner '%s' not found.",
+                    event_return,
+                )
+                continue
+            event_queue = EventReturnQueue(
+                self.opts, returner, self.minion.returners[event_return]
+            )
+            event_queue.start()
+            self.queues.append(event_queue)
+        if self.opts["event_return_whitelist"]:
+            # Let the publisher drop the events which are never returned
+            self.event.filter_tags(
+                self.opts["event_return_whitelist"] + ["salt/event/exit"]
+            )
+        self.event.fire_event({}, "salt/event_listen/start")
+        stat_clock = time.time()
+        try:
+            for event in self.event.iter_events(full=True):
+                if event["tag"] == "salt/event/exit":
+                    self.stop = True
+                if self._filter(event):
+                    for event_queue in self.queues:
+                        event_queue.put(event)
+                now = time.time()
+                if (
+                    self.opts["master_stats"]
+                    and now - stat_clock > self.opts["master_stats_event_iter"]
+                ):
+                    self._fire_stats(now - stat_clock)
+                    stat_clock = now
+                if self.stop:
+                    break
+        finally:
+            for event_queue in self.queues:
+                event_queue.stop()
+
+    def _fire_stats(self, duration):
+        """
+        Fire the queue depth, flush latency and drop counts of the returners
+        """
+        data = {
+            "time": duration,
+            "worker": self.__class__.__name__,
+            "returners": {
+                event_queue.returner: event_queue.get_stats()
+                for event_queue in self.queues
+            },
+        }
+        self.event.fire_event(data, tagify(self.__class__.__name__, "stats"))
+
     def _filter(self, event):
         """
         Take an event and run it through configured filters.
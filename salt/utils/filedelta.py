@@ -0,0 +1,138 @@
+"""
+Block level delta encoding of files, used to only transfer the changed parts of
+a file from the file server to a client which has an older version of it.
+
+This uses the rsync algorithm: the client sends a :py:func:`signature` of its
+copy, which is a weak rolling checksum and a strong hash of every block. The
+server slides a window over its version of the file, uses the rolling checksum
+to find blocks the client already has and returns a :py:func:`delta`, a list of
+operations which are either the index of a block of the client's copy or a
+literal chunk of new data. The client rebuilds the file with :py:func:`patch`.
+"""
+
+import hashlib
+import itertools
+import math
+
+# The smallest and the largest block size a signature may use
+MIN_BLOCK_SIZE = 2048
+MAX_BLOCK_SIZE = 131072
+# The default number of new bytes after which a delta is given up on. The
+# rolling checksum runs in Python for every byte not found in the old file,
+# this bounds the CPU time a delta takes to a fraction of a second.
+MAX_LITERAL = 262144
+
+
+def block_size(size):
+    """
+    Return the block size to use for a file of ``size`` bytes. Like rsync, the
+    block size grows with the square root of the file size.
+    """
+    size = int(math.sqrt(size)) // 1024 * 1024
+    return max(MIN_BLOCK_SIZE, min(MAX_BLOCK_SIZE, size))
+
+
+def weak_checksum(block):
+    """
+    Return the two 16 bit halves of the rolling checksum of ``block``
+    """
+    return sum(block) & 0xFFFF, sum(itertools.accumulate(block)) & 0xFFFF
+
+
+def strong_checksum(block):
+    """
+    Return the strong hash used to confirm a weak checksum match
+    """
+    return hashlib.sha256(block).hexdigest()[:32]
+
+
+def signature(path, size):
+    """
+    Return the list of ``[weak, strong]`` checksums of the ``size`` byte blocks
+    of the file at ``path``
+    """
+    ret = []
+    with open(path, "rb") as fp_:
+        while True:
+            block = fp_.read(size)
+            if not block:
+                break
+            low, high = weak_checksum(block)
+            ret.append([low | high << 16, strong_checksum(block)])
+    return ret
+
+
+def delta(data, sig, size, max_literal=MAX_LITERAL):
+    """
+    Return the list of operations which turn the file described by the
+    signature ``sig`` into ``data``. An operation is either the integer index
+    of a block of the old file or a bytes object with new data.
+
+    Returns None if more than ``max_literal`` bytes of ``data`` are not found
+    in the old file, as sending the whole file is cheaper then. Pass None to
+    not limit the new bytes.
+    """
+    blocks = {}
+    for idx, (weak, strong) in enumerate(sig):
+        blocks.setdefault(weak, {}).setdefault(strong, idx)
+    # The last block of the old file may be shorter than the block size and
+    # can only match the end of the new file
+    tail = len(data) % size
+    ops = []
+    literal = 0
+    start = pos = 0
+    end = len(data) - size
+    if end >= 0:
+        low, high = weak_checksum(data[:size])
+    while pos <= end:
+        candidates = blocks.get(low | high << 16)
+        if candidates:
+            idx = candidates.get(strong_checksum(data[pos : pos + size]))
+            if idx is not None:
+                if start < pos:
+                    ops.append(data[start:pos])
+                    literal += pos - start
+                ops.append(idx)
+                pos += size
+                start = pos
+                if pos <= end:
+                    low, high = weak_checksum(data[pos : pos + size])
+                continue
+        if max_literal is not None and literal + pos - start > max_literal:
+            return None
+        if pos < end:
+            old = data[pos]
+            low = (low - old + data[pos + size]) & 0xFFFF
+            high = (high - size * old + low) & 0xFFFF
+        pos += 1
+    if tail and start <= len(data) - tail:
+        block = data[len(data) - tail :]
+        low, high = weak_checksum(block)
+        idx = blocks.get(low | high << 16, {}).get(strong_checksum(block))
+        if idx is not None and idx == len(sig) - 1:
+            if start < len(data) - tail:
+                ops.append(data[start : len(data) - tail])
+                literal += len(data) - tail - start
+            ops.append(idx)
+            start = len(data)
+    if start < len(data):
+        ops.append(data[start:])
+        literal += len(data) - start
+    if max_literal is not None and literal > max_literal:
+        return None
+    return ops
+
+
+def patch(basis, ops, size, out):
+    """
+    Write the file described by the delta ``ops`` to the file object ``out``,
+    reading the referenced blocks from the file object ``basis``
+    """
+    for op in ops:
+        if isinstance(op, int):
+            basis.seek(op * size)
+            out.write(basis.read(size))
+        else:
+            if isinstance(op, str):
+                op = op.encode()
+            out.write(op)
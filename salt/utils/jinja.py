@@ -4,11 +4,15 @@ Jinja loading utils to enable a more powerful backend for jinja templates
 
 
 import atexit
+import collections
+import hashlib
 import logging
 import os.path
 import pipes
 import pprint
 import re
+import tempfile
+import threading
 import time
 import uuid
 import warnings
@@ -26,6 +30,7 @@ import salt.utils.stringutils
 import salt.utils.url
 import salt.utils.yaml
 from jinja2 import BaseLoader, Markup, TemplateNotFound, nodes
+from jinja2.bccache import Bucket, BytecodeCache
 from jinja2.environment import TemplateModule
 from jinja2.exceptions import TemplateRuntimeError
 from jinja2.ext import Extension
@@ -36,12 +41,146 @@ from salt.utils.versions import LooseVersion
 
 log = logging.getLogger(__name__)
 
-__all__ = ["SaltCacheLoader", "SerializerExtension"]
+__all__ = ["SaltBytecodeCache", "SaltCacheLoader", "SerializerExtension"]
 
 GLOBAL_UUID = uuid.UUID("91633EBF-1C86-5E33-935A-28061F4B480E")
 JINJA_VERSION = LooseVersion(jinja2.__version__)
 
 
+class SaltBytecodeCache(BytecodeCache):
+    """
+    A Jinja bytecode cache keeping the compiled templates of the process in
+    memory and, when a directory is given, on disk to skip the compilation
+    across restarts.
+
+    The options of the environment compiling a template are part of the key
+    of its bytecode, the environments of Salt set them as ``salt_options``.
+    A cached bytecode is only used while the source of the template is
+    unchanged.
+
+    The directory keeps ``size`` files at most, the least recently used ones
+    are removed when a new one is written.
+    """
+
+    def __init__(self, size=1024, directory=None):
+        self.size = size
+        self.directory = directory
+        self.memory = collections.OrderedDict()
+        self.lock = threading.Lock()
+        if directory is not None and not os.path.isdir(directory):
+            try:
+                os.makedirs(directory, 0o700)
+            except OSError as exc:
+                log.warning(
+                    "Unable to create the Jinja bytecode cache %s: %s", directory, exc,
+                )
+                self.directory = None
+
+    def get_bucket(self, environment, name, filename, source):
+        key = hashlib.sha256(
+            repr((name, filename, getattr(environment, "salt_options", None))).encode(
+                "utf-8", "surrogatepass"
+            )
+        ).hexdigest()
+        bucket = Bucket(environment, key, self.get_source_checksum(source))
+        self.load_bytecode(bucket)
+        return bucket
+
+    def _remember(self, bucket):
+        with self.lock:
+            self.memory[bucket.key] = (bucket.checksum, bucket.code)
+            self.memory.move_to_end(bucket.key)
+            while len(self.memory) > self.size:
+                self.memory.popitem(last=False)
+
+    def _path(self, bucket):
+        return os.path.join(self.directory, "{}.cache".format(bucket.key))
+
+    def load_bytecode(self, bucket):
+        with self.lock:
+            entry = self.memory.get(bucket.key)
+            if entry is not None:
+                self.memory.move_to_end(bucket.key)
+        if entry is not None and entry[0] == bucket.checksum:
+            bucket.code = entry[1]
+            return
+        if self.directory is None:
+            return
+        path = self._path(bucket)
+        try:
+            with salt.utils.files.fopen(path, "rb") as fp_:
+                bucket.load_bytecode(fp_)
+        except (OSError, EOFError, ValueError, TypeError):
+            bucket.reset()
+        if bucket.code is not None:
+            self._remember(bucket)
+            # Mark it as used for the pruning
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+    def dump_bytecode(self, bucket):
+        self._remember(bucket)
+        if self.directory is None:
+            return
+        # Written aside and renamed, other processes may be reading it
+        try:
+            fd_, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except OSError as exc:
+            log.debug("Unable to write the Jinja bytecode cache: %s", exc)
+            return
+        try:
+            with os.fdopen(fd_, "wb") as fp_:
+                bucket.write_bytecode(fp_)
+            os.replace(tmp, self._path(bucket))
+        except OSError as exc:
+            log.debug("Unable to write the Jinja bytecode cache: %s", exc)
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        self._prune()
+
+    def _prune(self):
+        """
+        Remove the least recently used files beyond the size of the cache
+        """
+        entries = []
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".cache"):
+                    try:
+                        entries.append((entry.stat().st_mtime, entry.path))
+                    except OSError:
+                        # Removed by another process
+                        pass
+        except OSError as exc:
+            log.debug("Unable to prune the Jinja bytecode cache: %s", exc)
+            return
+        if len(entries) <= self.size:
+            return
+        entries.sort()
+        for _, path in entries[: len(entries) - self.size]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+        if self.directory is None:
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(".cache"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
 class SaltCacheLoader(BaseLoader):
     """
     A special jinja Template Loader for salt.
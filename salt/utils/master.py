@@ -20,6 +20,7 @@ import salt.payload
 import salt.pillar
 import salt.utils.atomicfile
 import salt.utils.files
+import salt.utils.mine
 import salt.utils.minions
 import salt.utils.platform
 import salt.utils.stringutils
@@ -206,7 +207,7 @@ class MasterPillarUtil:
         for minion_id in minion_ids:
             if not salt.utils.verify.valid_id(self.opts, minion_id):
                 continue
-            mdata = self.cache.fetch("minions/{}".format(minion_id), "mine")
+            mdata = salt.utils.mine.fetch_mine(self.cache, self.opts, minion_id)
             if isinstance(mdata, dict):
                 mine_data[minion_id] = mdata
         return mine_data
@@ -537,7 +538,13 @@ class MasterPillarUtil:
                 if clear_mine:
                     # Delete the whole mine file
                     self.cache.flush(bank, "mine")
+                    if self.opts.get("mine_index", False):
+                        salt.utils.mine.delete_index(self.cache, minion_id)
                 elif clear_mine_func is not None:
+                    if self.opts.get("mine_index", False):
+                        salt.utils.mine.delete_index(
+                            self.cache, minion_id, clear_mine_func
+                        )
                     # Delete a specific function from the mine file
                     mine_data = self.cache.fetch(bank, "mine")
                     if isinstance(mine_data, dict):
@@ -7,6 +7,8 @@ This module contains routines used for the salt mine
 from __future__ import absolute_import, unicode_literals
 
 import logging
+import time
+import urllib.parse
 
 # Import salt libs
 import salt.utils.data
@@ -19,6 +21,16 @@ MINE_ITEM_ACL_ID = "__saltmine_acl__"
 MINE_ITEM_ACL_VERSION = 1
 MINE_ITEM_ACL_DATA = "__data__"
 
+# The cache bank of the mine index, with a bank per mine function holding the
+# mine data of every minion for this function
+MINE_INDEX_BANK = "mine"
+# The cache bank holding the generation of the latest change of every mine
+# function in the mine index
+MINE_GENERATION_BANK = "mine_generation"
+# The seconds a generation returned by the master is set back, the mine data
+# being written while it is read is returned again the next time
+MINE_GENERATION_GRACE = 5
+
 
 def minion_side_acl_denied(minion_acl_cache, mine_minion, mine_function, req_minion):
     """
@@ -114,3 +126,149 @@ def parse_function_definition(function_definition):
     )
 
     return (function_name, function_args, function_kwargs, minion_acl)
+
+
+def generation(grace=0):
+    """
+    Return the current generation of the mine data, the time in microseconds.
+
+    :param int grace: The seconds to set the generation back by.
+
+    :rtype: int
+    """
+    return int((time.time() - grace) * 1000000)
+
+
+def _index_bank(function):
+    """
+    Return the cache bank holding the mine data of ``function``
+    """
+    return "{}/{}".format(MINE_INDEX_BANK, urllib.parse.quote(function, safe=""))
+
+
+def function_generation(cache, function):
+    """
+    Return the generation of the latest change of the mine data of
+    ``function`` in the mine index, or None if it is not known.
+
+    :param cache: The master cache.
+    :param str function: The mine function.
+
+    :rtype: int
+    """
+    ret = cache.fetch(MINE_GENERATION_BANK, urllib.parse.quote(function, safe=""))
+    if isinstance(ret, int):
+        return ret
+    return None
+
+
+def list_index_functions(cache):
+    """
+    Return the mine functions in the mine index.
+
+    :param cache: The master cache.
+
+    :rtype: list
+    """
+    return [urllib.parse.unquote(function) for function in cache.list(MINE_INDEX_BANK)]
+
+
+def list_index_minions(cache, function):
+    """
+    Return the minions having mine data for ``function`` in the mine index.
+
+    :param cache: The master cache.
+    :param str function: The mine function.
+
+    :rtype: list
+    """
+    return cache.list(_index_bank(function))
+
+
+def fetch_index(cache, minion_id, functions=None):
+    """
+    Return the mine data of a minion from the mine index.
+
+    :param cache: The master cache.
+    :param str minion_id: The minion whose mine data to return.
+    :param list functions: The mine functions to return, all of them by default.
+
+    :rtype: dict
+    :return: The mine functions with a dict of their ``generation`` and
+        ``data``.
+    """
+    if functions is None:
+        functions = list_index_functions(cache)
+    ret = {}
+    for function in functions:
+        item = cache.fetch(_index_bank(function), minion_id)
+        if isinstance(item, dict) and "generation" in item:
+            ret[function] = item
+    return ret
+
+
+def store_index(cache, minion_id, mine_data, clear=False):
+    """
+    Store the mine data of a minion in the mine index. Only the functions whose
+    data changed are written, with a new generation.
+
+    :param cache: The master cache.
+    :param str minion_id: The minion whose mine data to store.
+    :param dict mine_data: The mine functions with their data.
+    :param bool clear: Remove the other mine functions of the minion.
+    """
+    if clear:
+        for function in list_index_functions(cache):
+            if function not in mine_data:
+                cache.flush(_index_bank(function), minion_id)
+    current = fetch_index(cache, minion_id, list(mine_data))
+    new_generation = generation()
+    for function, function_data in mine_data.items():
+        if function in current and current[function]["data"] == function_data:
+            continue
+        cache.store(
+            _index_bank(function),
+            minion_id,
+            {"generation": new_generation, "data": function_data},
+        )
+        # Stored after the data, the readers would otherwise skip the function
+        # before the data is there. Concurrent writers storing an older
+        # generation last are covered by MINE_GENERATION_GRACE.
+        cache.store(
+            MINE_GENERATION_BANK, urllib.parse.quote(function, safe=""), new_generation,
+        )
+
+
+def delete_index(cache, minion_id, function=None):
+    """
+    Remove the mine data of a minion from the mine index.
+
+    :param cache: The master cache.
+    :param str minion_id: The minion whose mine data to remove.
+    :param str function: The mine function to remove, all of them by default.
+    """
+    if function is None:
+        functions = list_index_functions(cache)
+    else:
+        functions = [function]
+    for function in functions:
+        cache.flush(_index_bank(function), minion_id)
+
+
+def fetch_mine(cache, opts, minion_id):
+    """
+    Return the mine data of a minion from the master cache, from the mine index
+    when :conf_master:`mine_index` is enabled.
+
+    :param cache: The master cache.
+    :param dict opts: The master opts.
+    :param str minion_id: The minion whose mine data to return.
+
+    :rtype: dict
+    """
+    if opts.get("mine_index", False):
+        return {
+            function: item["data"]
+            for function, item in fetch_index(cache, minion_id).items()
+        }
+    return cache.fetch("minions/{}".format(minion_id), "mine")
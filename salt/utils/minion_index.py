@@ -0,0 +1,409 @@
+"""
+In-memory index of the minion data cache used by the master for targeting.
+
+Grain, pillar and ipcidr targeting in :py:class:`salt.utils.minions.CkMinions`
+needs the cached grains and pillar of every accepted minion. Without an index
+each such publish fetches the ``data`` key of every ``minions/<id>`` bank from
+the cache driver. The :py:class:`MinionDataIndex` keeps that data in memory
+together with an inverted index (top level key -> value -> minion ids) and a
+sorted table of the minions' IP addresses, so that most lookups only need to
+verify a handful of candidates.
+
+The index is kept per process. Writes made through :py:func:`update` are
+applied immediately, changes made by other processes are picked up from the
+cache bank every ``minion_data_index_interval`` seconds.
+"""
+
+import bisect
+import logging
+import time
+
+import salt.cache
+import salt.utils.args
+import salt.utils.data
+from salt._compat import ipaddress
+from salt.defaults import DEFAULT_TARGET_DELIM
+from salt.exceptions import SaltCacheError
+
+log = logging.getLogger(__name__)
+
+# Characters which turn a subdict_match expression into a glob
+GLOB_CHARS = ("*", "?", "[")
+
+# Process wide indexes, keyed on the cache driver and cachedir
+_INDEXES = {}
+
+
+def _token(value):
+    """
+    Return the string form ``subdict_match`` compares ``value`` against
+    """
+    return str(value).lower()
+
+
+def _tokens(data, tokens=None):
+    """
+    Collect every string a non-glob ``subdict_match`` expression could be
+    compared against in ``data``: dict keys, scalar values and the string form
+    of containers nested in lists.
+    """
+    if tokens is None:
+        tokens = set()
+    if isinstance(data, dict):
+        for key, value in data.items():
+            tokens.add(_token(key))
+            _tokens(value, tokens)
+    elif isinstance(data, (list, tuple)):
+        for item in data:
+            if isinstance(item, (dict, list, tuple)):
+                tokens.add(_token(item))
+            _tokens(item, tokens)
+    else:
+        tokens.add(_token(data))
+    return tokens
+
+
+def _suffixes(expr, delimiter):
+    """
+    Return the lowercased match strings ``subdict_match`` may derive from the
+    part of ``expr`` after the top level key. Nested dicts are re-matched using
+    the default delimiter, so its suffixes are included as well.
+    """
+    ret = set()
+    splits = expr.split(delimiter)
+    for idx in range(1, len(splits)):
+        matchstr = delimiter.join(splits[idx:])
+        ret.add(matchstr.lower())
+        parts = matchstr.split(DEFAULT_TARGET_DELIM)
+        for sub in range(1, len(parts)):
+            ret.add(DEFAULT_TARGET_DELIM.join(parts[sub:]).lower())
+    return ret
+
+
+def _index_key(opts):
+    return (opts.get("cache", "localfs"), opts.get("cachedir"))
+
+
+def get_index(opts):
+    """
+    Return the index of the minion data cache configured in ``opts`` for the
+    current process, creating it if needed.
+    """
+    key = _index_key(opts)
+    if key not in _INDEXES:
+        _INDEXES[key] = MinionDataIndex(opts)
+    return _INDEXES[key]
+
+
+def enabled(opts):
+    """
+    Return True if the master is configured to use the minion data index
+    """
+    return bool(opts.get("minion_data_cache", False)) and bool(
+        opts.get("minion_data_index", False)
+    )
+
+
+def update(opts, minion_id, data):
+    """
+    Apply a write of ``minions/<minion_id>/data`` to this process' index
+    """
+    if enabled(opts):
+        get_index(opts).update(minion_id, data)
+
+
+def stats(opts):
+    """
+    Return the hit/miss/rebuild counters of this process' index, or None if
+    the index is disabled or was not used yet.
+    """
+    index = _INDEXES.get(_index_key(opts))
+    if not enabled(opts) or index is None:
+        return None
+    return dict(index.stats, minions=len(index))
+
+
+class MinionDataIndex:
+    """
+    Index of the ``minions/<id>/data`` entries of the minion data cache
+    """
+
+    def __init__(self, opts, cache=None):
+        self.opts = opts
+        self.cache = cache if cache is not None else salt.cache.factory(opts)
+        self.interval = opts.get("minion_data_index_interval", 60)
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "rebuilds": 0,
+            "refreshes": 0,
+            "updates": 0,
+        }
+        # Bumped on every change of the indexed data so callers can cache
+        # results derived from the index
+        self.generation = 0
+        self._clear()
+        self.built = False
+        self.last_refresh = 0
+
+    def _clear(self):
+        self.generation += 1
+        # minion id -> {"grains": {...}, "pillar": {...}}
+        self._data = {}
+        # minion id -> last updated stamp reported by the cache driver
+        self._updated = {}
+        # search type -> top level key -> set of minion ids
+        self._keys = {"grains": {}, "pillar": {}}
+        # search type -> top level key -> token -> set of minion ids
+        self._values = {"grains": {}, "pillar": {}}
+        # ip version -> sorted list of (int address, minion id, address)
+        self._addrs = {4: [], 6: []}
+
+    def __contains__(self, minion_id):
+        return minion_id in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def minions(self):
+        """
+        Return the set of minion ids which have data in the index
+        """
+        return set(self._data)
+
+    def _add(self, minion_id, data):
+        self.generation += 1
+        self._data[minion_id] = data
+        for search_type, keys in self._keys.items():
+            search_data = data.get(search_type)
+            if not isinstance(search_data, dict):
+                continue
+            values = self._values[search_type]
+            for key, value in search_data.items():
+                key = str(key)
+                keys.setdefault(key, set()).add(minion_id)
+                key_values = values.setdefault(key, {})
+                for token in _tokens(value):
+                    key_values.setdefault(token, set()).add(minion_id)
+        grains = data.get("grains")
+        if not isinstance(grains, dict):
+            return
+        for version in self._addrs:
+            for addr in grains.get("ipv{}".format(version)) or ():
+                try:
+                    num = int(ipaddress.ip_address(addr))
+                except ValueError:
+                    continue
+                bisect.insort(self._addrs[version], (num, minion_id, addr))
+
+    def _remove(self, minion_id):
+        data = self._data.pop(minion_id, None)
+        self._updated.pop(minion_id, None)
+        if data is None:
+            return
+        self.generation += 1
+        for search_type, keys in self._keys.items():
+            search_data = data.get(search_type)
+            if not isinstance(search_data, dict):
+                continue
+            values = self._values[search_type]
+            for key, value in search_data.items():
+                key = str(key)
+                key_minions = keys.get(key, set())
+                key_minions.discard(minion_id)
+                if not key_minions:
+                    keys.pop(key, None)
+                key_values = values.get(key, {})
+                for token in _tokens(value):
+                    token_minions = key_values.get(token, set())
+                    token_minions.discard(minion_id)
+                    if not token_minions:
+                        key_values.pop(token, None)
+                if not key_values:
+                    values.pop(key, None)
+        grains = data.get("grains")
+        if not isinstance(grains, dict):
+            return
+        for version, table in self._addrs.items():
+            for addr in grains.get("ipv{}".format(version)) or ():
+                try:
+                    entry = (int(ipaddress.ip_address(addr)), minion_id, addr)
+                except ValueError:
+                    continue
+                pos = bisect.bisect_left(table, entry)
+                if pos < len(table) and table[pos] == entry:
+                    del table[pos]
+
+    def _fetch(self, minion_id):
+        bank = "minions/{}".format(minion_id)
+        try:
+            if not self.cache.contains(bank, "data"):
+                return None, None
+            stamp = self.cache.updated(bank, "data")
+            return stamp, self.cache.fetch(bank, "data")
+        except SaltCacheError as exc:
+            log.debug("Unable to read minion data for %s: %s", minion_id, exc)
+            return None, None
+
+    def update(self, minion_id, data, stamp=None):
+        """
+        Replace the indexed data of ``minion_id``. Passing ``None`` as ``data``
+        removes the minion from the index.
+        """
+        if not self.built:
+            # The next lookup rebuilds the whole index anyway
+            return
+        self._remove(minion_id)
+        if isinstance(data, dict):
+            self._add(minion_id, data)
+            self._updated[minion_id] = stamp
+        self.stats["updates"] += 1
+
+    def rebuild(self):
+        """
+        Rebuild the whole index from the minion data cache
+        """
+        start = time.time()
+        self._clear()
+        for minion_id in self.cache.list("minions") or []:
+            stamp, data = self._fetch(minion_id)
+            if isinstance(data, dict):
+                self._add(minion_id, data)
+                self._updated[minion_id] = stamp
+        self.built = True
+        self.last_refresh = start
+        self.stats["rebuilds"] += 1
+        log.debug(
+            "Rebuilt minion data index with %d minions in %.3fs",
+            len(self._data),
+            time.time() - start,
+        )
+
+    def refresh(self):
+        """
+        Bring the index in line with the minion data cache, re-reading only the
+        entries whose updated stamp changed since the last refresh.
+        """
+        if not self.built:
+            return self.rebuild()
+        start = time.time()
+        # Stamps have a resolution of one second, entries written in the same
+        # second as the previous refresh are re-read to not miss a write.
+        horizon = int(self.last_refresh)
+        listed = set(self.cache.list("minions") or [])
+        for minion_id in set(self._data) - listed:
+            self._remove(minion_id)
+        for minion_id in listed:
+            bank = "minions/{}".format(minion_id)
+            try:
+                if not self.cache.contains(bank, "data"):
+                    self._remove(minion_id)
+                    continue
+                stamp = self.cache.updated(bank, "data")
+            except SaltCacheError:
+                continue
+            known = self._updated.get(minion_id)
+            if (
+                minion_id in self._data
+                and stamp is not None
+                and stamp == known
+                and stamp < horizon
+            ):
+                continue
+            stamp, data = self._fetch(minion_id)
+            self._remove(minion_id)
+            if isinstance(data, dict):
+                self._add(minion_id, data)
+                self._updated[minion_id] = stamp
+        self.last_refresh = start
+        self.stats["refreshes"] += 1
+
+    def ensure_fresh(self):
+        """
+        Build the index on first use and refresh it once the configured
+        interval has passed.
+        """
+        if not self.built:
+            self.rebuild()
+        elif time.time() - self.last_refresh >= self.interval:
+            self.refresh()
+
+    def _candidates(self, expr, delimiter, search_type, regex_match):
+        """
+        Return the set of minions that may match ``expr``, or None if every
+        indexed minion has to be checked.
+        """
+        top = expr.split(delimiter, 1)[0]
+        if top == "*":
+            return None
+        keys = self._keys[search_type]
+        if top not in keys:
+            try:
+                loaded = salt.utils.args.yamlify_arg(top)
+            except Exception:  # pylint: disable=broad-except
+                loaded = top
+            if loaded != top:
+                # The key may be matched as a non-string key
+                return None
+            return set()
+        if regex_match or any(char in expr[len(top) :] for char in GLOB_CHARS):
+            return keys[top]
+        values = self._values[search_type][top]
+        ret = set()
+        for token in _suffixes(expr, delimiter):
+            ret.update(values.get(token, ()))
+        return ret
+
+    def match(
+        self,
+        expr,
+        delimiter=DEFAULT_TARGET_DELIM,
+        search_type="grains",
+        regex_match=False,
+        exact_match=False,
+    ):
+        """
+        Return the set of indexed minions whose ``search_type`` data matches
+        ``expr`` as evaluated by :py:func:`salt.utils.data.subdict_match`
+        """
+        if delimiter not in expr:
+            return set()
+        candidates = self._candidates(expr, delimiter, search_type, regex_match)
+        if candidates is None:
+            self.stats["misses"] += 1
+            candidates = self._data
+        else:
+            self.stats["hits"] += 1
+        return {
+            minion_id
+            for minion_id in candidates
+            if salt.utils.data.subdict_match(
+                self._data[minion_id].get(search_type),
+                expr,
+                delimiter=delimiter,
+                regex_match=regex_match,
+                exact_match=exact_match,
+            )
+        }
+
+    def match_ipcidr(self, tgt):
+        """
+        Return the set of indexed minions with an address matching ``tgt``,
+        which is either an IP address or an IP network object.
+        """
+        self.stats["hits"] += 1
+        table = self._addrs[tgt.version]
+        if isinstance(tgt, (ipaddress.IPv4Address, ipaddress.IPv6Address)):
+            low = high = int(tgt)
+        else:
+            low = int(tgt.network_address)
+            high = int(tgt.broadcast_address)
+        ret = set()
+        pos = bisect.bisect_left(table, (low,))
+        while pos < len(table) and table[pos][0] <= high:
+            num, minion_id, addr = table[pos]
+            # Addresses are matched by their string form like CkMinions does
+            if low != high or addr == str(tgt):
+                ret.add(minion_id)
+            pos += 1
+        return ret
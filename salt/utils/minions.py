@@ -4,6 +4,7 @@ expected to return
 """
 
 
+import copy
 import fnmatch
 import logging
 import os
@@ -15,6 +16,7 @@ import salt.payload
 import salt.roster
 import salt.utils.data
 import salt.utils.files
+import salt.utils.minion_index
 import salt.utils.network
 import salt.utils.stringutils
 import salt.utils.versions
@@ -43,6 +45,28 @@ TARGET_REX = re.compile(
 )
 
 
+# Number of compiled compound targets and term results kept per CkMinions
+COMPOUND_CACHE_SIZE = 1000
+
+# Compound engines which only look at the accepted minion ids
+PKI_ENGINES = (None, "L", "E")
+
+# Relative cost of evaluating a compound term, per engine
+COMPOUND_COSTS = {
+    "L": 0,
+    None: 1,
+    "E": 1,
+    "G": 2,
+    "P": 2,
+    "I": 2,
+    "J": 2,
+    "S": 2,
+    "R": 3,
+}
+
+COMPOUND_OPERS = ("and", "or", "not", "(", ")")
+
+
 def _nodegroup_regex(nodegroup, words, opers):
     opers_set = set(opers)
     ret = words
@@ -197,6 +221,190 @@ def nodegroup_comp(nodegroup, nodegroups, skip=None, first_call=True):
         return ret
 
 
+class CompoundNode:
+    """
+    A node of a compiled compound target.
+
+    Terms have no ``oper`` and carry the target ``engine`` (None for plain
+    globs), ``pattern`` and ``delimiter``. Operator nodes have ``oper`` set to
+    ``and``, ``or`` or ``not`` and carry their operands in ``children``.
+    """
+
+    __slots__ = (
+        "oper",
+        "children",
+        "engine",
+        "pattern",
+        "delimiter",
+        "cost",
+        "list_terms",
+    )
+
+    def __init__(
+        self, oper=None, children=(), engine=None, pattern=None, delimiter=None
+    ):
+        self.oper = oper
+        self.children = list(children)
+        self.engine = engine
+        self.pattern = pattern
+        self.delimiter = delimiter
+        self.list_terms = []
+        if oper is None:
+            self.cost = COMPOUND_COSTS.get(engine, 1)
+        else:
+            self.cost = max(child.cost for child in self.children)
+
+    def __repr__(self):
+        if self.oper is None:
+            return "CompoundNode({}@{})".format(self.engine, self.pattern)
+        return "CompoundNode({}, {})".format(self.oper, self.children)
+
+
+class _CompoundParser:
+    """
+    Recursive descent parser for compound targets. ``not`` binds tighter than
+    ``and``, which binds tighter than ``or``. A ``not`` following a term
+    implies ``and``, and parentheses left open at the end are closed.
+    """
+
+    def __init__(self, words, expr):
+        self.words = words
+        self.expr = expr
+        self.pos = 0
+        # Non-negated list terms, their missing minions are reported
+        self.list_terms = []
+
+    def peek(self):
+        if self.pos < len(self.words):
+            return self.words[self.pos]
+        return None
+
+    def next(self):
+        word = self.peek()
+        self.pos += 1
+        return word
+
+    def parse(self):
+        if self.peek() in ("and", "or"):
+            log.error("Expression may begin with binary operator: %s", self.peek())
+            raise ValueError()
+        node = self.parse_or()
+        if self.peek() is not None:
+            if self.peek() == ")":
+                log.error(
+                    "Invalid compound expr (unexpected right parenthesis): %s",
+                    self.expr,
+                )
+            else:
+                log.error("Invalid compound target: %s", self.expr)
+            raise ValueError()
+        node.list_terms = self.list_terms
+        return node
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek() == "or":
+            self.next()
+            children.append(self.parse_and())
+        if len(children) == 1:
+            return children[0]
+        return CompoundNode("or", children)
+
+    def parse_and(self):
+        children = [self.parse_not()]
+        while self.peek() in ("and", "not"):
+            if self.peek() == "and":
+                self.next()
+            children.append(self.parse_not())
+        if len(children) == 1:
+            return children[0]
+        return CompoundNode("and", children)
+
+    def parse_not(self):
+        if self.peek() != "not":
+            return self.parse_atom()
+        self.next()
+        if self.peek() not in COMPOUND_OPERS and self.peek() is not None:
+            # Missing minions of negated lists are not reported
+            return CompoundNode("not", [self.parse_term(negated=True)])
+        return CompoundNode("not", [self.parse_not()])
+
+    def parse_atom(self):
+        word = self.peek()
+        if word == "(":
+            self.next()
+            if self.peek() in ("and", "or"):
+                log.error('Invalid beginning operator after "(": %s', self.peek())
+                raise ValueError()
+            node = self.parse_or()
+            if self.peek() == ")":
+                self.next()
+            elif self.peek() is not None:
+                log.error("Invalid compound target: %s", self.expr)
+                raise ValueError()
+            return node
+        if word is None or word in COMPOUND_OPERS:
+            log.error("Invalid compound target: %s", self.expr)
+            raise ValueError()
+        return self.parse_term()
+
+    def parse_term(self, negated=False):
+        word = self.next()
+        target_info = parse_target(word)
+        if not target_info["engine"]:
+            # The match is not explicitly defined, evaluate as a glob
+            return CompoundNode(pattern=word)
+        if target_info["engine"] not in COMPOUND_COSTS:
+            # If an unknown engine is called at any time, fail out
+            log.error(
+                'Unrecognized target engine "%s" for target expression "%s"',
+                target_info["engine"],
+                word,
+            )
+            raise ValueError()
+        node = CompoundNode(
+            engine=target_info["engine"],
+            pattern=target_info["pattern"],
+            delimiter=target_info["delimiter"],
+        )
+        if node.engine == "L" and not negated:
+            self.list_terms.append(node)
+        return node
+
+
+def compile_compound(expr, nodegroups=None):
+    """
+    Compile a compound target, given either as a string or a list of words,
+    into a tree of :py:class:`CompoundNode` objects. Nodegroups are expanded
+    in place. Returns None if the target is invalid.
+    """
+    if nodegroups is None:
+        nodegroups = {}
+    if isinstance(expr, str):
+        words = expr.split()
+    else:
+        # we make a shallow copy in order to not affect the passed in arg
+        words = list(expr)
+
+    expanded = []
+    while words:
+        word = words.pop(0)
+        if word not in COMPOUND_OPERS:
+            target_info = parse_target(word)
+            if target_info["engine"] == "N":
+                # if we encounter a node group, just evaluate it in-place
+                decomposed = nodegroup_comp(target_info["pattern"], nodegroups)
+                if decomposed:
+                    words = decomposed + words
+                continue
+        expanded.append(word)
+
+    try:
+        return _CompoundParser(expanded, expr).parse()
+    except ValueError:
+        return None
+
+
 class CkMinions:
     """
     Used to check what minions should respond from a target
@@ -211,6 +419,12 @@ class CkMinions:
         self.opts = opts
         self.serial = salt.payload.Serial(opts)
         self.cache = salt.cache.factory(opts)
+        # Compiled compound targets and memoized compound term results
+        self._compiled_compounds = {}
+        self._compound_nodegroups = None
+        self._compound_terms = {}
+        self._compound_terms_pki = None
+        self._compound_terms_generation = None
         # TODO: this is actually an *auth* check
         if self.opts.get("transport", "zeromq") in ("zeromq", "tcp"):
             self.acc = "minions"
@@ -221,8 +435,10 @@ class CkMinions:
         """
         Return minions found by looking at nodegroups
         """
+        # Compiled like a compound target holding only this nodegroup so the
+        # expansion is done once and cached with the compiled target
         return self._check_compound_minions(
-            nodegroup_comp(expr, self.opts["nodegroups"]), DEFAULT_TARGET_DELIM, greedy
+            ["N@{}".format(expr)], DEFAULT_TARGET_DELIM, greedy
         )
 
     def _check_glob_minions(self, expr, greedy):  # pylint: disable=unused-argument
@@ -286,6 +502,17 @@ class CkMinions:
             )
             return minions
 
+    def _minion_data_index(self):
+        """
+        Return the up to date minion data index of this process, or None if
+        the index is not enabled.
+        """
+        if not salt.utils.minion_index.enabled(self.opts):
+            return None
+        index = salt.utils.minion_index.get_index(self.opts)
+        index.ensure_fresh()
+        return index
+
     def _check_cache_minions(
         self, expr, delimiter, greedy, search_type, regex_match=False, exact_match=False
     ):
@@ -300,6 +527,25 @@ class CkMinions:
         def list_cached_minions():
             return self.cache.list("minions")
 
+        index = self._minion_data_index()
+        if index is not None:
+            matched = index.match(
+                expr,
+                delimiter,
+                search_type,
+                regex_match=regex_match,
+                exact_match=exact_match,
+            )
+            if greedy:
+                minions = [
+                    id_
+                    for id_ in self._pki_minions()
+                    if id_ in matched or id_ not in index
+                ]
+            else:
+                minions = list(matched)
+            return {"minions": minions, "missing": []}
+
         if greedy:
             minions = []
             for fn_ in salt.utils.data.sorted_ignorecase(
@@ -412,6 +658,17 @@ class CkMinions:
                     return {"minions": [], "missing": []}
             proto = "ipv{}".format(tgt.version)
 
+            index = self._minion_data_index()
+            if index is not None:
+                matched = index.match_ipcidr(tgt)
+                if greedy:
+                    minions = [
+                        id_ for id_ in minions if id_ in matched or id_ not in index
+                    ]
+                else:
+                    minions = list(matched)
+                return {"minions": minions, "missing": []}
+
             minions = set(minions)
             for id_ in cminions:
                 mdata = self.cache.fetch("minions/{}".format(id_), "data")
@@ -480,150 +737,107 @@ class CkMinions:
         if not isinstance(expr, str) and not isinstance(expr, (list, tuple)):
             log.error("Compound target that is neither string, list nor tuple")
             return {"minions": [], "missing": []}
-        minions = set(self._pki_minions())
+        pki_minions = self._pki_minions()
+        minions = set(pki_minions)
         log.debug("minions: %s", minions)
 
-        nodegroups = self.opts.get("nodegroups", {})
+        if not self.opts.get("minion_data_cache", False):
+            return {"minions": list(minions), "missing": []}
 
-        if self.opts.get("minion_data_cache", False):
-            ref = {
-                "G": self._check_grain_minions,
-                "P": self._check_grain_pcre_minions,
-                "I": self._check_pillar_minions,
-                "J": self._check_pillar_pcre_minions,
-                "L": self._check_list_minions,
-                "N": None,  # nodegroups should already be expanded
-                "S": self._check_ipcidr_minions,
-                "E": self._check_pcre_minions,
-                "R": self._all_minions,
-            }
-            if pillar_exact:
-                ref["I"] = self._check_pillar_exact_minions
-                ref["J"] = self._check_pillar_exact_minions
-
-            results = []
-            unmatched = []
-            opers = ["and", "or", "not", "(", ")"]
-            missing = []
-
-            if isinstance(expr, str):
-                words = expr.split()
-            else:
-                # we make a shallow copy in order to not affect the passed in arg
-                words = expr[:]
-
-            while words:
-                word = words.pop(0)
-                target_info = parse_target(word)
-
-                # Easy check first
-                if word in opers:
-                    if results:
-                        if results[-1] == "(" and word in ("and", "or"):
-                            log.error('Invalid beginning operator after "(": %s', word)
-                            return {"minions": [], "missing": []}
-                        if word == "not":
-                            if not results[-1] in ("&", "|", "("):
-                                results.append("&")
-                            results.append("(")
-                            results.append(str(set(minions)))
-                            results.append("-")
-                            unmatched.append("-")
-                        elif word == "and":
-                            results.append("&")
-                        elif word == "or":
-                            results.append("|")
-                        elif word == "(":
-                            results.append(word)
-                            unmatched.append(word)
-                        elif word == ")":
-                            if not unmatched or unmatched[-1] != "(":
-                                log.error(
-                                    "Invalid compound expr (unexpected "
-                                    "right parenthesis): %s",
-                                    expr,
-                                )
-                                return {"minions": [], "missing": []}
-                            results.append(word)
-                            unmatched.pop()
-                            if unmatched and unmatched[-1] == "-":
-                                results.append(")")
-                                unmatched.pop()
-                        else:  # Won't get here, unless oper is added
-                            log.error("Unhandled oper in compound expr: %s", expr)
-                            return {"minions": [], "missing": []}
-                    else:
-                        # seq start with oper, fail
-                        if word == "not":
-                            results.append("(")
-                            results.append(str(set(minions)))
-                            results.append("-")
-                            unmatched.append("-")
-                        elif word == "(":
-                            results.append(word)
-                            unmatched.append(word)
-                        else:
-                            log.error(
-                                "Expression may begin with" " binary operator: %s", word
-                            )
-                            return {"minions": [], "missing": []}
-
-                elif target_info and target_info["engine"]:
-                    if "N" == target_info["engine"]:
-                        # if we encounter a node group, just evaluate it in-place
-                        decomposed = nodegroup_comp(target_info["pattern"], nodegroups)
-                        if decomposed:
-                            words = decomposed + words
-                        continue
-
-                    engine = ref.get(target_info["engine"])
-                    if not engine:
-                        # If an unknown engine is called at any time, fail out
-                        log.error(
-                            'Unrecognized target engine "%s" for'
-                            ' target expression "%s"',
-                            target_info["engine"],
-                            word,
-                        )
-                        return {"minions": [], "missing": []}
-
-                    engine_args = [target_info["pattern"]]
-                    if target_info["engine"] in ("G", "P", "I", "J"):
-                        engine_args.append(target_info["delimiter"] or ":")
-                    engine_args.append(greedy)
-
-                    # ignore missing minions for lists if we exclude them with
-                    # a 'not'
-                    if "L" == target_info["engine"]:
-                        engine_args.append(results and results[-1] == "-")
-                    _results = engine(*engine_args)
-                    results.append(str(set(_results["minions"])))
-                    missing.extend(_results["missing"])
-                    if unmatched and unmatched[-1] == "-":
-                        results.append(")")
-                        unmatched.pop()
+        compiled = self._compile_compound(expr)
+        if compiled is None:
+            return {"minions": [], "missing": []}
 
+        ref = {
+            "G": self._check_grain_minions,
+            "P": self._check_grain_pcre_minions,
+            "I": self._check_pillar_minions,
+            "J": self._check_pillar_pcre_minions,
+            "L": self._check_list_minions,
+            "S": self._check_ipcidr_minions,
+            "E": self._check_pcre_minions,
+            "R": self._all_minions,
+            None: self._check_glob_minions,
+        }
+        if pillar_exact:
+            ref["I"] = self._check_pillar_exact_minions
+            ref["J"] = self._check_pillar_exact_minions
+
+        # Term results stay valid as long as neither the accepted minions nor
+        # the minion data index change. Without the index, grain and pillar
+        # lookups read the cache and are only reused within this evaluation.
+        index = self._minion_data_index()
+        generation = index.generation if index is not None else None
+        if (
+            self._compound_terms_pki != pki_minions
+            or self._compound_terms_generation != generation
+            or len(self._compound_terms) > COMPOUND_CACHE_SIZE
+        ):
+            self._compound_terms = {}
+            self._compound_terms_pki = pki_minions
+            self._compound_terms_generation = generation
+        local_terms = {}
+
+        def _term(term):
+            key = (term.engine, term.pattern, term.delimiter, greedy, pillar_exact)
+            if term.engine in PKI_ENGINES or index is not None:
+                memo = self._compound_terms
+            else:
+                memo = local_terms
+            if key not in memo:
+                engine_args = [term.pattern]
+                if term.engine in ("G", "P", "I", "J"):
+                    engine_args.append(term.delimiter or ":")
+                # Plain globs are always evaluated greedily
+                engine_args.append(greedy if term.engine else True)
+                memo[key] = ref[term.engine](*engine_args)
+            return memo[key]
+
+        def _eval(node):
+            if node.oper is None:
+                return set(_term(node)["minions"])
+            if node.oper == "not":
+                return minions - _eval(node.children[0])
+            if node.oper == "or":
+                ret = set()
+                for child in node.children:
+                    ret |= _eval(child)
+                return ret
+            # Evaluate the cheap children of an "and" first and skip the
+            # remaining ones as soon as the intersection is empty
+            ret = None
+            for child in sorted(node.children, key=lambda child: child.cost):
+                if ret is not None and not ret:
+                    break
+                if ret is None:
+                    ret = _eval(child)
                 else:
-                    # The match is not explicitly defined, evaluate as a glob
-                    _results = self._check_glob_minions(word, True)
-                    results.append(str(set(_results["minions"])))
-                    if unmatched and unmatched[-1] == "-":
-                        results.append(")")
-                        unmatched.pop()
-
-            # Add a closing ')' for each item left in unmatched
-            results.extend([")" for item in unmatched])
-
-            results = " ".join(results)
-            log.debug("Evaluating final compound matching expr: %s", results)
-            try:
-                minions = list(eval(results))  # pylint: disable=W0123
-                return {"minions": minions, "missing": missing}
-            except Exception:  # pylint: disable=broad-except
-                log.error("Invalid compound target: %s", expr)
-                return {"minions": [], "missing": []}
+                    ret &= _eval(child)
+            return ret
 
-        return {"minions": list(minions), "missing": []}
+        result = _eval(compiled)
+        missing = []
+        for term in compiled.list_terms:
+            missing.extend(_term(term)["missing"])
+        log.debug("Compound target %s matched %d minions", expr, len(result))
+        return {"minions": list(result), "missing": missing}
+
+    def _compile_compound(self, expr):
+        """
+        Return the compiled form of a compound target, reusing the result of
+        earlier compilations of the same target.
+        """
+        nodegroups = self.opts.get("nodegroups", {})
+        if (
+            self._compound_nodegroups != nodegroups
+            or len(self._compiled_compounds) > COMPOUND_CACHE_SIZE
+        ):
+            self._compiled_compounds = {}
+            self._compound_nodegroups = copy.deepcopy(nodegroups)
+        key = expr if isinstance(expr, str) else tuple(expr)
+        if key not in self._compiled_compounds:
+            self._compiled_compounds[key] = compile_compound(expr, nodegroups)
+        return self._compiled_compounds[key]
 
     def connected_ids(self, subset=None, show_ip=False):
         """
@@ -3,6 +3,7 @@ Functions for daemonizing and otherwise modifying running processes
 """
 
 
+import collections
 import contextlib
 import copy
 import errno
@@ -11,8 +12,10 @@ import io
 import json
 import logging
 import multiprocessing
+import multiprocessing.connection
 import multiprocessing.util
 import os
+import pickle
 import signal
 import socket
 import subprocess
@@ -28,7 +31,7 @@ import salt.utils.path
 import salt.utils.platform
 import salt.utils.versions
 from salt.ext.six.moves import queue, range
-from salt.ext.tornado import gen
+from salt.ext.tornado import gen, locks
 from salt.log.mixins import NewStyleClassMixIn
 
 log = logging.getLogger(__name__)
@@ -486,6 +489,245 @@ class ThreadPool:
                 log.debug(err, exc_info=True)
 
 
+class JobWorkerPool:
+    """
+    A pool of pre-forked worker processes running jobs one at a time
+
+    Every worker calls ``target`` with the arguments passed to :py:meth:`submit`
+    and is replaced by a new worker once it ran ``max_jobs`` jobs, which bounds
+    the memory a long lived worker can accumulate. At most ``size +
+    queue_size`` jobs are handed to the pool, submitting more jobs waits for
+    one of them to finish. The jobs are sent to idle workers one at a time, so
+    the job of a worker which dies is known and its slot is freed. The pool has
+    to be driven from ``io_loop``.
+    """
+
+    def __init__(
+        self,
+        io_loop,
+        target,
+        size,
+        max_jobs=0,
+        queue_size=0,
+        name="JobWorker",
+        after_fork_methods=None,
+    ):
+        self.io_loop = io_loop
+        self.target = target
+        self.size = size
+        self.max_jobs = max_jobs
+        self.queue_size = queue_size
+        self.name = name
+        self.after_fork_methods = after_fork_methods or []
+        # The number of submitted jobs which did not finish yet
+        self.pending = 0
+        # Maps the pids of the workers running a job to the job id
+        self.busy = {}
+        # The jobs waiting for an idle worker
+        self._jobs = collections.deque()
+        # The pids of the workers waiting for a job
+        self._idle = []
+        # Maps the pids of the workers to the number of jobs they were sent
+        self._counts = {}
+        self._workers = {}
+        self._workers_lock = threading.Lock()
+        self._slots = locks.Condition()
+        self._running = False
+        self._watcher = None
+
+    @property
+    def workers(self):
+        """
+        Return the worker processes
+        """
+        with self._workers_lock:
+            return [process for process, _, _ in self._workers.values()]
+
+    def start(self):
+        """
+        Fork the workers
+        """
+        if self._running:
+            return
+        self._running = True
+        for _ in range(self.size):
+            self._spawn()
+        self._watcher = threading.Thread(
+            target=self._watch, name="{}Watcher".format(self.name)
+        )
+        self._watcher.daemon = True
+        self._watcher.start()
+
+    def stop(self):
+        """
+        Stop the pool, the workers exit once they finished their current job
+        """
+        if not self._running:
+            return
+        if self._jobs:
+            log.warning(
+                "Dropping %s jobs waiting for a %s worker", len(self._jobs), self.name,
+            )
+            self.pending -= len(self._jobs)
+            self._jobs.clear()
+        with self._workers_lock:
+            workers = list(self._workers.values())
+        for _, _, writer in workers:
+            try:
+                writer.send(None)
+            except OSError:
+                pass
+        self._running = False
+
+    @gen.coroutine
+    def submit(self, jid, *args):
+        """
+        Hand a job to the workers, waiting while the pool is full
+        """
+        # Serialize the job right away, the arguments may change while the job
+        # waits for a worker
+        payload = pickle.dumps(args)
+        while self.pending >= self.size + self.queue_size:
+            log.warning(
+                "All %s job workers are busy while executing jid %s, waiting...",
+                self.size,
+                jid,
+            )
+            yield self._slots.wait()
+        self.pending += 1
+        self._jobs.append((jid, payload))
+        self._dispatch()
+
+    def _dispatch(self):
+        """
+        Send the waiting jobs to the idle workers
+        """
+        while self._jobs and self._idle and self._running:
+            pid = self._idle.pop(0)
+            with self._workers_lock:
+                worker = self._workers.get(pid)
+            if worker is None:
+                continue
+            jid, payload = self._jobs.popleft()
+            try:
+                worker[2].send((jid, payload))
+            except OSError:
+                # The worker died, it is replaced once its exit is noticed
+                self._jobs.appendleft((jid, payload))
+                continue
+            self.busy[pid] = jid
+            self._counts[pid] += 1
+
+    def _spawn(self):
+        reader, child_writer = multiprocessing.Pipe(duplex=False)
+        child_reader, writer = multiprocessing.Pipe(duplex=False)
+        process = SignalHandlingProcess(
+            target=self._worker,
+            name=self.name,
+            args=(self.target, child_reader, child_writer, self.max_jobs),
+        )
+        process._after_fork_methods.extend(self.after_fork_methods)
+        process.start()
+        child_reader.close()
+        child_writer.close()
+        with self._workers_lock:
+            self._workers[process.pid] = (process, reader, writer)
+        self._counts[process.pid] = 0
+        self._idle.append(process.pid)
+        log.debug("Started %s worker with PID %s", self.name, process.pid)
+        self._dispatch()
+
+    @staticmethod
+    def _worker(target, jobs, writer, max_jobs):
+        pid = os.getpid()
+        title = setproctitle.getproctitle() if HAS_SETPROCTITLE else None
+        count = 0
+        while not max_jobs or count < max_jobs:
+            try:
+                job = jobs.recv()
+            except EOFError:
+                break
+            if job is None:
+                break
+            jid, payload = job
+            try:
+                target(*pickle.loads(payload))
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Job %s failed in worker %s", jid, pid)
+            finally:
+                writer.send(("done", pid, jid))
+                if title is not None:
+                    setproctitle.setproctitle(title)
+            count += 1
+
+    def _watch(self):
+        """
+        Forward the messages of the workers and their exits to the io_loop
+        """
+        while self._running:
+            with self._workers_lock:
+                workers = list(self._workers.values())
+            waitables = {}
+            for worker in workers:
+                process, reader, _ = worker
+                waitables[reader] = waitables[process.sentinel] = worker
+            ready = multiprocessing.connection.wait(list(waitables), timeout=1)
+            exited = [waitables[obj] for obj in ready if not hasattr(obj, "recv")]
+            for obj in ready:
+                if hasattr(obj, "recv") and waitables[obj] not in exited:
+                    self._read(obj)
+            for process, reader, writer in exited:
+                # Read everything the worker sent before it exited so that
+                # the io_loop learns about its last job first
+                self._read(reader)
+                reader.close()
+                with self._workers_lock:
+                    self._workers.pop(process.pid, None)
+                self.io_loop.add_callback(self._exited, process, writer)
+        with self._workers_lock:
+            for _, reader, writer in self._workers.values():
+                reader.close()
+                writer.close()
+
+    def _read(self, reader):
+        while reader.poll():
+            try:
+                message = reader.recv()
+            except (EOFError, OSError):
+                break
+            self.io_loop.add_callback(self._message, *message)
+
+    def _message(self, kind, pid, jid):
+        if self.busy.pop(pid, None) is None:
+            return
+        self._finished()
+        if pid in self._counts and (
+            not self.max_jobs or self._counts[pid] < self.max_jobs
+        ):
+            # Workers which ran max_jobs jobs exit and are replaced instead
+            self._idle.append(pid)
+            self._dispatch()
+
+    def _exited(self, process, writer):
+        process.join()
+        writer.close()
+        self._counts.pop(process.pid, None)
+        if process.pid in self._idle:
+            self._idle.remove(process.pid)
+        jid = self.busy.pop(process.pid, None)
+        if jid is not None:
+            log.warning(
+                "%s worker %s exited while running job %s", self.name, process.pid, jid,
+            )
+            self._finished()
+        if self._running:
+            self._spawn()
+
+    def _finished(self):
+        self.pending -= 1
+        self._slots.notify()
+
+
 class ProcessManager:
     """
     A class which will manage processes that should be running
@@ -7,6 +7,7 @@ import fnmatch
 import glob
 import logging
 import os
+import re
 
 import salt.client
 import salt.defaults.exitcodes
@@ -28,6 +29,68 @@ REACTOR_INTERNAL_KEYWORDS = frozenset(
     ["__id__", "__sls__", "name", "order", "fun", "key", "state"]
 )
 
+GLOB_CHARS_RE = re.compile(r"[*?[]")
+
+
+class ReactorMap:
+    """
+    The reactor map compiled for the dispatch of the events.
+
+    The tags without glob characters are looked up in a dict, the globs are
+    stored in a trie by their literal prefix so only the globs sharing a
+    prefix with the tag are tried, and a single regex of all the globs
+    rejects the tags matching no glob at all. The reactors are returned in
+    the order of the map, like matching every entry with fnmatch does.
+    """
+
+    def __init__(self, react_map):
+        self.literals = {}
+        self.trie = {}
+        patterns = []
+        for index, ropt in enumerate(react_map or []):
+            if not isinstance(ropt, dict) or len(ropt) != 1:
+                continue
+            key, val = next(iter(ropt.items()))
+            if isinstance(val, str):
+                val = [val]
+            elif not isinstance(val, list):
+                continue
+            key = os.path.normcase(str(key))
+            match = GLOB_CHARS_RE.search(key)
+            if match is None:
+                self.literals.setdefault(key, []).append((index, val))
+                continue
+            pattern = fnmatch.translate(key)
+            patterns.append(pattern)
+            node = self.trie
+            for char in key[: match.start()]:
+                node = node.setdefault(char, {})
+            node.setdefault(None, []).append((index, re.compile(pattern), val))
+        self.globs = re.compile("|".join(patterns)) if patterns else None
+
+    def match(self, tag):
+        """
+        Return the reactors of the tag
+        """
+        tag = os.path.normcase(tag)
+        matches = list(self.literals.get(tag, ()))
+        if self.globs is not None and self.globs.match(tag):
+            node = self.trie
+            candidates = list(node.get(None, ()))
+            for char in tag:
+                node = node.get(char)
+                if node is None:
+                    break
+                candidates.extend(node.get(None, ()))
+            matches.extend(
+                (index, val) for index, regex, val in candidates if regex.match(tag)
+            )
+            matches.sort(key=lambda match: match[0])
+        reactors = []
+        for _, val in matches:
+            reactors.extend(val)
+        return reactors
+
 
 class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
     """
@@ -48,6 +111,11 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
         self.minion = salt.minion.MasterMinion(local_minion_opts)
         salt.state.Compiler.__init__(self, opts, self.minion.rend)
         self.is_leader = True
+        self._react_map = None
+        self._react_map_source = None
+        self._cached_files = salt.utils.cache.CacheDict(
+            opts.get("reactor_refresh_interval", 60)
+        )
 
     # We need __setstate__ and __getstate__ to avoid pickling errors since
     # 'self.rend' (from salt.state.Compiler) contains a function reference
@@ -77,7 +145,13 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
         react = {}
 
         if glob_ref.startswith("salt://"):
-            glob_ref = self.minion.functions["cp.cache_file"](glob_ref) or ""
+            # The fileserver is asked again for the file once the reactor
+            # configuration cache expires
+            if glob_ref not in self._cached_files:
+                self._cached_files[glob_ref] = (
+                    self.minion.functions["cp.cache_file"](glob_ref) or ""
+                )
+            glob_ref = self._cached_files[glob_ref]
         globbed_ref = glob.glob(glob_ref)
         if not globbed_ref:
             log.error(
@@ -99,38 +173,46 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
                 log.exception('Failed to render "%s": ', fn_)
         return react
 
+    def compiled_map(self):
+        """
+        Return the compiled reactor map, it is compiled again when the map
+        is changed, a map read from a file when the file changes
+        """
+        if isinstance(self.opts["reactor"], str):
+            try:
+                stat = os.stat(self.opts["reactor"])
+                source = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                source = None
+            if self._react_map is None or source != self._react_map_source:
+                react_map = []
+                try:
+                    with salt.utils.files.fopen(self.opts["reactor"]) as fp_:
+                        react_map = salt.utils.yaml.safe_load(fp_)
+                except OSError:
+                    log.error('Failed to read reactor map: "%s"', self.opts["reactor"])
+                except Exception:  # pylint: disable=broad-except
+                    log.error(
+                        'Failed to parse YAML in reactor map: "%s"',
+                        self.opts["reactor"],
+                    )
+                self._react_map = ReactorMap(react_map)
+                self._react_map_source = source
+        elif (
+            self._react_map is None
+            or self.opts["reactor"] is not self._react_map_source
+        ):
+            self._react_map = ReactorMap(self.opts["reactor"])
+            self._react_map_source = self.opts["reactor"]
+        return self._react_map
+
     def list_reactors(self, tag):
         """
         Take in the tag from an event and return a list of the reactors to
         process
         """
         log.debug("Gathering reactors for tag %s", tag)
-        reactors = []
-        if isinstance(self.opts["reactor"], str):
-            try:
-                with salt.utils.files.fopen(self.opts["reactor"]) as fp_:
-                    react_map = salt.utils.yaml.safe_load(fp_)
-            except OSError:
-                log.error('Failed to read reactor map: "%s"', self.opts["reactor"])
-            except Exception:  # pylint: disable=broad-except
-                log.error(
-                    'Failed to parse YAML in reactor map: "%s"', self.opts["reactor"]
-                )
-        else:
-            react_map = self.opts["reactor"]
-        for ropt in react_map:
-            if not isinstance(ropt, dict):
-                continue
-            if len(ropt) != 1:
-                continue
-            key = next(iter(ropt.keys()))
-            val = ropt[key]
-            if fnmatch.fnmatch(tag, key):
-                if isinstance(val, str):
-                    reactors.append(val)
-                elif isinstance(val, list):
-                    reactors.extend(val)
-        return reactors
+        return self.compiled_map().match(tag)
 
     def list_all(self):
         """
@@ -163,6 +245,7 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
                 return {"status": False, "comment": "Reactor already exists."}
 
         self.minion.opts["reactor"].append({tag: reaction})
+        self._react_map = None
         return {"status": True, "comment": "Reactor added."}
 
     def delete_reactor(self, tag):
@@ -174,10 +257,24 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
             _tag = next(iter(reactor.keys()))
             if _tag == tag:
                 self.minion.opts["reactor"].remove(reactor)
+                self._react_map = None
                 return {"status": True, "comment": "Reactor deleted."}
 
         return {"status": False, "comment": "Reactor does not exists."}
 
+    def filter_events(self, event):
+        """
+        Subscribe to the events of the reactor map only, a map read from a
+        file can change at any time so it gets all events
+        """
+        if not isinstance(self.opts.get("reactor"), list):
+            return
+        tags = ["*salt/reactors/manage*"]
+        for ropt in self.opts["reactor"]:
+            if isinstance(ropt, dict) and len(ropt) == 1:
+                tags.append(next(iter(ropt.keys())))
+        event.filter_tags(tags)
+
     def resolve_aliases(self, chunks):
         """
         Preserve backward compatibility by rewriting the 'state' key in the low
@@ -242,6 +339,7 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
             listen=True,
         ) as event:
             self.wrap = ReactWrap(self.opts)
+            self.filter_events(event)
 
             for data in event.iter_events(full=True):
                 # skip all events fired by ourselves
@@ -271,6 +369,7 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
                 if data["tag"].endswith("salt/reactors/manage/add"):
                     _data = data["data"]
                     res = self.add_reactor(_data["event"], _data["reactors"])
+                    self.filter_events(event)
                     event.fire_event(
                         {"reactors": self.list_all(), "result": res},
                         "salt/reactors/manage/add-complete",
@@ -278,6 +377,7 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
                 elif data["tag"].endswith("salt/reactors/manage/delete"):
                     _data = data["data"]
                     res = self.delete_reactor(_data["event"])
+                    self.filter_events(event)
                     event.fire_event(
                         {"reactors": self.list_all(), "result": res},
                         "salt/reactors/manage/delete-complete",
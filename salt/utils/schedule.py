@@ -12,6 +12,7 @@ Detailed tutorial about scheduling jobs can be found :ref:`here
 import copy
 import datetime
 import errno
+import heapq
 import itertools
 import logging
 import os
@@ -184,6 +185,13 @@ class Schedule:
             self._subprocess_list = salt.utils.process.SubprocessList()
         else:
             self._subprocess_list = _subprocess_list
+        # The jobs waiting for their next fire time, see _iter_due_jobs
+        self._queue = None
+        self._queue_sources = None
+        self._queue_always = set()
+        self._queue_order = {}
+        # The running jobs read during an evaluation of the schedule
+        self._running_jobs = None
 
     def __getnewargs__(self):
         return self.opts, self.functions, self.returners, self.intervals, None
@@ -239,10 +247,15 @@ class Schedule:
             return data
         if "jid_include" not in data or data["jid_include"]:
             jobcount = 0
-            if self.opts["__role"] == "master":
-                current_jobs = salt.utils.master.get_running_jobs(self.opts)
-            else:
-                current_jobs = salt.utils.minion.running(self.opts)
+            # The jobs are only read once for all the jobs starting at the
+            # same evaluation of the schedule
+            if self._running_jobs is None or self._running_jobs[0] is not now:
+                if self.opts["__role"] == "master":
+                    current_jobs = salt.utils.master.get_running_jobs(self.opts)
+                else:
+                    current_jobs = salt.utils.minion.running(self.opts)
+                self._running_jobs = (now, current_jobs)
+            current_jobs = self._running_jobs[1]
             for job in current_jobs:
                 if "schedule" in job:
                     log.debug(
@@ -323,6 +336,8 @@ class Schedule:
         elif name in self._get_schedule(include_opts=False):
             log.warning("Cannot delete job %s, it's in the pillar!", name)
 
+        self._queue = None
+
         # Fire the complete event back along with updated list of schedule
         with salt.utils.event.get_event("minion", opts=self.opts, listen=False) as evt:
             evt.fire_event(
@@ -346,6 +361,7 @@ class Schedule:
         self.enabled = True
         self.splay = None
         self.opts["schedule"] = {}
+        self._queue = None
 
     def delete_job_prefix(self, name, persist=True):
         """
@@ -359,6 +375,8 @@ class Schedule:
             if job.startswith(name):
                 log.warning("Cannot delete job %s, it's in the pillar!", job)
 
+        self._queue = None
+
         # Fire the complete event back along with updated list of schedule
         with salt.utils.event.get_event("minion", opts=self.opts, listen=False) as evt:
             evt.fire_event(
@@ -407,6 +425,8 @@ class Schedule:
             log.info("Added new job %s to scheduler", new_job)
             self.opts["schedule"].update(data)
 
+        self._queue = None
+
         # Fire the complete event back along with updated list of schedule
         with salt.utils.event.get_event("minion", opts=self.opts, listen=False) as evt:
             evt.fire_event(
@@ -428,6 +448,8 @@ class Schedule:
         elif name in self._get_schedule(include_opts=False):
             log.warning("Cannot modify job %s, it's in the pillar!", name)
 
+        self._queue = None
+
         # Fire the complete event back along with updated list of schedule
         with salt.utils.event.get_event("minion", opts=self.opts, listen=False) as evt:
             evt.fire_event(
@@ -449,6 +471,8 @@ class Schedule:
         elif name in self._get_schedule(include_opts=False):
             log.warning("Cannot modify job %s, it's in the pillar!", name)
 
+        self._queue = None
+
         with salt.utils.event.get_event("minion", opts=self.opts, listen=False) as evt:
             # Fire the complete event back along with updated list of schedule
             evt.fire_event(
@@ -471,6 +495,7 @@ class Schedule:
             return
 
         self.opts["schedule"][name] = schedule
+        self._queue = None
 
         if persist:
             self.persist()
@@ -514,6 +539,7 @@ class Schedule:
         Enable the scheduler.
         """
         self.opts["schedule"]["enabled"] = True
+        self._queue = None
 
         # Fire the complete event back along with updated list of schedule
         with salt.utils.event.get_event("minion", opts=self.opts, listen=False) as evt:
@@ -530,6 +556,7 @@ class Schedule:
         Disable the scheduler.
         """
         self.opts["schedule"]["enabled"] = False
+        self._queue = None
 
         # Fire the complete event back along with updated list of schedule
         with salt.utils.event.get_event("minion", opts=self.opts, listen=False) as evt:
@@ -551,6 +578,7 @@ class Schedule:
         if "schedule" in schedule:
             schedule = schedule["schedule"]
         self.opts.setdefault("schedule", {}).update(schedule)
+        self._queue = None
 
     def list(self, where):
         """
@@ -606,6 +634,8 @@ class Schedule:
         elif name in self._get_schedule(include_opts=False):
             log.warning("Cannot modify job %s, it's in the pillar!", name)
 
+        self._queue = None
+
         # Fire the complete event back along with updated list of schedule
         with salt.utils.event.get_event("minion", opts=self.opts, listen=False) as evt:
             evt.fire_event(
@@ -632,6 +662,8 @@ class Schedule:
         elif name in self._get_schedule(include_opts=False):
             log.warning("Cannot modify job %s, it's in the pillar!", name)
 
+        self._queue = None
+
         # Fire the complete event back along with updated list of schedule
         with salt.utils.event.get_event("minion", opts=self.opts, listen=False) as evt:
             evt.fire_event(
@@ -942,6 +974,77 @@ class Schedule:
                         # Let's make sure we exit the process!
                         sys.exit(salt.defaults.exitcodes.EX_GENERIC)
 
+    def _iter_due_jobs(self, schedule, now):
+        """
+        Yield the jobs of the schedule to evaluate now, in the order of the
+        schedule.
+
+        Evaluating a job running every so many seconds or on a cron
+        expression does nothing until its next fire time. Once evaluated
+        these jobs wait in a queue until their next fire time comes, the other
+        jobs are evaluated every time. A change of the schedule evaluates all
+        the jobs again.
+        """
+        sources = [
+            (source, len(source)) if isinstance(source, dict) else (None, 0)
+            for source in (
+                self.opts.get("schedule"),
+                self.opts.get("pillar", {}).get("schedule"),
+            )
+        ]
+        if self._queue is None or any(
+            source is not old_source or size != old_size
+            for (source, size), (old_source, old_size) in zip(
+                sources, self._queue_sources
+            )
+        ):
+            self._queue = []
+            self._queue_sources = sources
+            self._queue_always = set(schedule)
+            self._queue_order = {job: idx for idx, job in enumerate(schedule)}
+
+        due = set(self._queue_always)
+        while self._queue and self._queue[0][0] <= now:
+            due.add(heapq.heappop(self._queue)[1])
+
+        for job in sorted(due, key=self._queue_order.get):
+            if job not in schedule:
+                self._queue_always.discard(job)
+                continue
+            data = schedule[job]
+            # Until evaluated without errors
+            self._queue_always.add(job)
+            yield job, data
+            fire_time = self._get_job_fire_time(data)
+            if fire_time is not None:
+                self._queue_always.discard(job)
+                heapq.heappush(self._queue, (fire_time, job))
+
+    def _get_job_fire_time(self, data):
+        """
+        Return the time until which evaluating the job does nothing, None if
+        the job has to be evaluated every time.
+        """
+        if self.standalone or not self.enabled or not isinstance(data, dict):
+            return None
+        if not data.get("enabled", True):
+            return None
+        if "_seconds" not in data and "cron" not in data:
+            return None
+        if any(item in data for item in ("when", "once", "run_explicit")):
+            return None
+        # Changed by the next evaluation
+        for item in ("_run_on_start", "_continue", "_error", "_skipped"):
+            if data.get(item):
+                return None
+        if data.get("_splay"):
+            return data["_splay"]
+        if not isinstance(data.get("_next_fire_time"), datetime.datetime):
+            return None
+        return data["_next_fire_time"] - datetime.timedelta(
+            microseconds=data["_next_fire_time"].microsecond
+        )
+
     def eval(self, now=None):
         """
         Evaluate and execute the schedule
@@ -1450,8 +1553,24 @@ class Schedule:
         if "splay" in schedule:
             self.splay = schedule["splay"]
 
+        if not now:
+            now = datetime.datetime.now()
+        self._running_jobs = None
+
+        time_elements = ("seconds", "minutes", "hours", "days")
+        scheduling_elements = ("when", "cron", "once")
+
+        invalid_sched_combos = [
+            set(i) for i in itertools.combinations(scheduling_elements, 2)
+        ]
+
+        invalid_time_combos = []
+        for item in scheduling_elements:
+            all_items = itertools.chain([item], time_elements)
+            invalid_time_combos.append(set(itertools.combinations(all_items, 2)))
+
         _hidden = ["enabled", "skip_function", "skip_during_range", "splay"]
-        for job, data in schedule.items():
+        for job, data in self._iter_due_jobs(schedule, now):
 
             # Skip anything that is a global setting
             if job in _hidden:
@@ -1508,20 +1627,10 @@ class Schedule:
             ):
                 data["_run_on_start"] = True
 
-            if not now:
-                now = datetime.datetime.now()
-
             # Used for quick lookups when detecting invalid option
             # combinations.
             schedule_keys = set(data.keys())
 
-            time_elements = ("seconds", "minutes", "hours", "days")
-            scheduling_elements = ("when", "cron", "once")
-
-            invalid_sched_combos = [
-                set(i) for i in itertools.combinations(scheduling_elements, 2)
-            ]
-
             if any(i <= schedule_keys for i in invalid_sched_combos):
                 log.error(
                     'Unable to use "%s" options together. Ignoring.',
@@ -1529,11 +1638,6 @@ class Schedule:
                 )
                 continue
 
-            invalid_time_combos = []
-            for item in scheduling_elements:
-                all_items = itertools.chain([item], time_elements)
-                invalid_time_combos.append(set(itertools.combinations(all_items, 2)))
-
             if any(set(x) <= schedule_keys for x in invalid_time_combos):
                 log.error(
                     'Unable to use "%s" with "%s" options. Ignoring',
@@ -2,10 +2,12 @@
 Template render systems
 """
 import codecs
+import hashlib
 import logging
 import os
 import sys
 import tempfile
+import threading
 import traceback
 from pathlib import Path
 
@@ -50,6 +52,15 @@ TEMPLATE_DIRNAME = os.path.join(saltpath[0], "templates")
 SLS_ENCODING = "utf-8"  # this one has no BOM.
 SLS_ENCODER = codecs.getencoder(SLS_ENCODING)
 
+# The number of compiled Jinja templates kept by the process, the reactor and
+# the minion render the same templates over and over again
+JINJA_CODE_CACHE_SIZE = 1024
+
+# The Jinja environments shared by the renders and their bytecode caches
+_JINJA_ENVS = {}
+_JINJA_BYTECODE_CACHES = {}
+_JINJA_LOCK = threading.Lock()
+
 
 class AliasedLoader:
     """
@@ -377,6 +388,102 @@ def _get_jinja_error(trace, context=None):
     return line, out
 
 
+def _jinja_bytecode_cache(opts):
+    """
+    Return the bytecode cache of the process, it is also kept on disk under
+    the cachedir when ``jinja_bytecode_cache`` is enabled
+    """
+    directory = None
+    if opts.get("jinja_bytecode_cache", False) and opts.get("cachedir"):
+        directory = os.path.join(opts["cachedir"], "jinja")
+    with _JINJA_LOCK:
+        bytecode_cache = _JINJA_BYTECODE_CACHES.get(directory)
+        if bytecode_cache is None:
+            bytecode_cache = salt.utils.jinja.SaltBytecodeCache(
+                JINJA_CODE_CACHE_SIZE, directory
+            )
+            _JINJA_BYTECODE_CACHES[directory] = bytecode_cache
+    return bytecode_cache
+
+
+def _jinja_environment(opts, env_args, undefined):
+    """
+    Return a Jinja environment for a render.
+
+    The environment with the Salt filters, tests and globals is created once
+    per environment options and shared, every render gets an overlay of it
+    with its own loader and globals.
+    """
+    options = repr(
+        sorted((key, repr(value)) for key, value in env_args.items() if key != "loader")
+        + [("undefined", repr(undefined))]
+    )
+    bytecode_cache = _jinja_bytecode_cache(opts)
+    key = (options, bytecode_cache.directory)
+    # Modules loaded since the environment was created can add filters
+    registry = (
+        len(JinjaFilter.salt_jinja_filters),
+        len(JinjaTest.salt_jinja_tests),
+        len(JinjaGlobal.salt_jinja_globals),
+    )
+    with _JINJA_LOCK:
+        base_env = _JINJA_ENVS.get(key)
+    if base_env is None or base_env.salt_registry != registry:
+        base_env = jinja2.sandbox.SandboxedEnvironment(
+            **dict(
+                env_args,
+                loader=None,
+                undefined=undefined,
+                bytecode_cache=bytecode_cache,
+            )
+        )
+        base_env.salt_options = options
+        base_env.salt_registry = registry
+
+        indent_filter = base_env.filters.get("indent")
+        base_env.tests.update(JinjaTest.salt_jinja_tests)
+        base_env.filters.update(JinjaFilter.salt_jinja_filters)
+        if salt.utils.jinja.JINJA_VERSION >= LooseVersion("2.11"):
+            # Use the existing indent filter on Jinja versions where it's not broken
+            base_env.filters["indent"] = indent_filter
+        base_env.globals.update(JinjaGlobal.salt_jinja_globals)
+
+        # globals
+        base_env.globals["odict"] = OrderedDict
+        base_env.globals["show_full_context"] = salt.utils.jinja.show_full_context
+
+        base_env.tests["list"] = salt.utils.data.is_list
+        with _JINJA_LOCK:
+            _JINJA_ENVS[key] = base_env
+
+    jinja_env = base_env.overlay(loader=env_args["loader"])
+    # The loader of Salt sets the template paths in the globals
+    jinja_env.globals = dict(base_env.globals)
+    return jinja_env
+
+
+def _jinja_template(jinja_env, tmplstr):
+    """
+    Return the template of ``tmplstr``, the template is compiled once per
+    source and environment options and its code reused afterwards
+    """
+    bytecode_cache = jinja_env.bytecode_cache
+    bucket = bytecode_cache.get_bucket(
+        jinja_env,
+        hashlib.sha256(tmplstr.encode(SLS_ENCODING, "surrogatepass")).hexdigest(),
+        None,
+        tmplstr,
+    )
+    code = bucket.code
+    if code is None:
+        code = jinja_env.compile(tmplstr)
+        bucket.code = code
+        bytecode_cache.set_bucket(bucket)
+    return jinja_env.template_class.from_code(
+        jinja_env, code, jinja_env.make_globals(None), None
+    )
+
+
 def render_jinja_tmpl(tmplstr, context, tmplpath=None):
     opts = context["opts"]
     saltenv = context["saltenv"]
@@ -454,25 +561,9 @@ def render_jinja_tmpl(tmplstr, context, tmplpath=None):
         opt_jinja_env_helper(opt_jinja_env, "jinja_env")
 
     if opts.get("allow_undefined", False):
-        jinja_env = jinja2.sandbox.SandboxedEnvironment(**env_args)
+        jinja_env = _jinja_environment(opts, env_args, jinja2.Undefined)
     else:
-        jinja_env = jinja2.sandbox.SandboxedEnvironment(
-            undefined=jinja2.StrictUndefined, **env_args
-        )
-
-    indent_filter = jinja_env.filters.get("indent")
-    jinja_env.tests.update(JinjaTest.salt_jinja_tests)
-    jinja_env.filters.update(JinjaFilter.salt_jinja_filters)
-    if salt.utils.jinja.JINJA_VERSION >= LooseVersion("2.11"):
-        # Use the existing indent filter on Jinja versions where it's not broken
-        jinja_env.filters["indent"] = indent_filter
-    jinja_env.globals.update(JinjaGlobal.salt_jinja_globals)
-
-    # globals
-    jinja_env.globals["odict"] = OrderedDict
-    jinja_env.globals["show_full_context"] = salt.utils.jinja.show_full_context
-
-    jinja_env.tests["list"] = salt.utils.data.is_list
+        jinja_env = _jinja_environment(opts, env_args, jinja2.StrictUndefined)
 
     decoded_context = {}
     for key, value in context.items():
@@ -492,7 +583,7 @@ def render_jinja_tmpl(tmplstr, context, tmplpath=None):
             decoded_context[key] = salt.utils.data.decode(value)
 
     try:
-        template = jinja_env.from_string(tmplstr)
+        template = _jinja_template(jinja_env, tmplstr)
         template.globals.update(decoded_context)
         output = template.render(**decoded_context)
     except jinja2.exceptions.UndefinedError as exc:
@@ -4,6 +4,8 @@ Generate the salt thin tarball from the installed python files
 
 import contextvars
 import copy
+import hashlib
+import io
 import logging
 import os
 import shutil
@@ -11,6 +13,7 @@ import subprocess
 import sys
 import tarfile
 import tempfile
+import time
 import zipfile
 
 import jinja2
@@ -19,6 +22,7 @@ import salt
 import salt.exceptions
 import salt.ext.six as _six
 import salt.ext.tornado as tornado
+import salt.utils.atomicfile
 import salt.utils.files
 import salt.utils.hashutils
 import salt.utils.json
@@ -717,6 +721,241 @@ def thin_sum(cachedir, form="sha1"):
     return code_checksum, salt.utils.hashutils.get_hash(thintar, form)
 
 
+def thin_chunks_path(cachedir):
+    """
+    Return the path to the manifest of the thin chunks
+    """
+    return os.path.join(cachedir, "thin", "chunks.json")
+
+
+def _get_thin_chunk_members(top, site_pkg_dir):
+    """
+    Return the (path, arcname) pairs of the files of a top level module or
+    package, sorted by arcname
+    """
+    base, top_dirname = os.path.basename(top), os.path.dirname(top)
+    if not os.path.isdir(top):
+        # top is a single file module
+        if os.path.exists(top):
+            return [(top, os.path.join(site_pkg_dir, base))]
+        return []
+    members = []
+    for root, dirs, files in salt.utils.path.os_walk(top, followlinks=True):
+        for name in files:
+            if not name.endswith((".pyc", ".pyo")):
+                path = os.path.join(root, name)
+                arcname = os.path.join(site_pkg_dir, os.path.relpath(path, top_dirname))
+                members.append((path, arcname))
+    return sorted(members, key=lambda member: member[1])
+
+
+def _get_thin_chunk_fingerprint(members):
+    """
+    Return a fingerprint of the files of a chunk from their size and mtime,
+    it changes whenever the content of the chunk may have changed
+    """
+    hasher = hashlib.sha256()
+    for path, arcname in members:
+        stat = os.stat(path)
+        hasher.update(
+            salt.utils.stringutils.to_bytes(
+                "{}\0{}\0{}\0".format(arcname, stat.st_size, stat.st_mtime_ns)
+            )
+        )
+    return hasher.hexdigest()
+
+
+def _get_thin_chunk_digest(members):
+    """
+    Return the digest of the content of a chunk, the members are either
+    files or the bytes of the member
+    """
+    hasher = hashlib.sha256()
+    for source, arcname in members:
+        if isinstance(source, bytes):
+            digest = hashlib.sha256(source).hexdigest()
+        else:
+            digest = salt.utils.hashutils.get_hash(source, "sha256")
+        hasher.update(
+            salt.utils.stringutils.to_bytes("{}\0{}\0".format(arcname, digest))
+        )
+    return hasher.hexdigest()
+
+
+def _pack_thin_chunk(chunkdir, digest, members, sums):
+    """
+    Pack the members of a chunk unless the chunk of this digest exists and
+    return the sha1 of its tarball, the known ones are taken from ``sums``
+    """
+    chunk = os.path.join(chunkdir, "{}.tgz".format(digest))
+    if os.path.isfile(chunk):
+        if digest in sums:
+            return sums[digest]
+        return salt.utils.hashutils.get_hash(chunk, "sha1")
+    tmp_chunk = _get_thintar_prefix(chunk)
+    with tarfile.open(tmp_chunk, "w:gz", dereference=True) as tfp:
+        for source, arcname in members:
+            if isinstance(source, bytes):
+                info = tarfile.TarInfo(arcname)
+                info.size = len(source)
+                info.mode = 0o644
+                info.mtime = int(time.time())
+                tfp.addfile(info, io.BytesIO(source))
+            else:
+                tfp.add(source, arcname=arcname)
+    shutil.move(tmp_chunk, chunk)
+    return salt.utils.hashutils.get_hash(chunk, "sha1")
+
+
+def gen_thin_chunks(cachedir, extra_mods="", overwrite=False, so_mods="", absonly=True):
+    """
+    Generate the salt-thin as content addressed chunks and return their
+    manifest.
+
+    Every top level module or package is packed in its own chunk, the thin
+    metadata (salt-call, versions) in another one. The chunks are gzip
+    tarballs named after the digest of their content, the ones whose files
+    did not change since the last generation are reused without hashing or
+    packing them again. The manifest maps the digests of the chunks to the
+    sha1 of their tarballs and holds the code checksum of the whole thin, the
+    targets then only need the chunks they are missing.
+
+    The alternative Salt versions of ``ssh_ext_alternatives`` are not
+    supported, use :py:func:`gen_thin` for them.
+    """
+    if sys.version_info < (3,):
+        raise salt.exceptions.SaltSystemExit(
+            'The minimum required python version to run salt-ssh is "3".'
+        )
+    thindir = os.path.join(cachedir, "thin")
+    chunkdir = os.path.join(thindir, "chunks")
+    manifest_path = thin_chunks_path(cachedir)
+    if overwrite and os.path.isdir(chunkdir):
+        shutil.rmtree(chunkdir)
+    if not os.path.isdir(chunkdir):
+        os.makedirs(chunkdir)
+
+    previous = {}
+    if not overwrite and os.path.isfile(manifest_path):
+        try:
+            with salt.utils.files.fopen(manifest_path, "r") as fp_:
+                previous = salt.utils.json.load(fp_)
+        except (OSError, ValueError) as exc:
+            log.debug("Unable to read the thin chunks manifest: %s", exc)
+    previous_sums = previous.get("chunks", {})
+    previous_fingerprints = previous.get("fingerprints", {})
+
+    chunks = {}
+    fingerprints = {}
+    tops = get_tops(extra_mods=extra_mods, so_mods=so_mods)
+    for top in tops:
+        if absonly and not os.path.isabs(top):
+            continue
+        tempdir = None
+        if not os.path.isdir(os.path.dirname(top)):
+            # This is likely a compressed python .egg
+            tempdir = tempfile.mkdtemp()
+            with zipfile.ZipFile(os.path.dirname(top)) as egg:
+                egg.extractall(tempdir)
+            top = os.path.join(tempdir, os.path.basename(top))
+        try:
+            site_pkg_dir = (
+                _is_shareable(os.path.basename(top))
+                and "pyall"
+                or "py{}".format(sys.version_info.major)
+            )
+            members = _get_thin_chunk_members(top, site_pkg_dir)
+            if not members:
+                continue
+            fingerprint = _get_thin_chunk_fingerprint(members)
+            digest = previous_fingerprints.get(fingerprint)
+            if digest is None or not os.path.isfile(
+                os.path.join(chunkdir, "{}.tgz".format(digest))
+            ):
+                digest = _get_thin_chunk_digest(members)
+                log.debug('Packing "%s" to the %s thin chunk', top, digest)
+            chunks[digest] = _pack_thin_chunk(chunkdir, digest, members, previous_sums)
+            fingerprints[fingerprint] = digest
+        finally:
+            if tempdir is not None:
+                shutil.rmtree(tempdir)
+
+    meta = [
+        (_get_salt_call("pyall"), "salt-call"),
+        (
+            _get_supported_py_config(
+                tops={sys.version_info.major: tops}, extended_cfg=None
+            ),
+            "supported-versions",
+        ),
+        (salt.utils.stringutils.to_bytes(salt.version.__version__), "version"),
+        (
+            salt.utils.stringutils.to_bytes(str(sys.version_info.major)),
+            ".thin-gen-py-version",
+        ),
+    ]
+    digest = _get_thin_chunk_digest(meta)
+    chunks[digest] = _pack_thin_chunk(chunkdir, digest, meta, previous_sums)
+
+    manifest = {
+        "code_checksum": hashlib.sha256(
+            salt.utils.stringutils.to_bytes("\n".join(sorted(chunks)))
+        ).hexdigest(),
+        "chunks": chunks,
+        "fingerprints": fingerprints,
+    }
+    if manifest != previous:
+        with salt.utils.atomicfile.atomic_open(manifest_path, "w") as fp_:
+            salt.utils.json.dump(manifest, fp_)
+        for fname in os.listdir(chunkdir):
+            # The dot files are the chunks being packed
+            if fname.startswith(".") or fname[:-4] in chunks:
+                continue
+            if fname.endswith(".tgz"):
+                try:
+                    os.remove(os.path.join(chunkdir, fname))
+                except OSError as exc:
+                    log.debug("Unable to remove the thin chunk %s: %s", fname, exc)
+    return manifest
+
+
+def thin_chunks(cachedir):
+    """
+    Return the manifest of the current thin chunks
+    """
+    manifest_path = thin_chunks_path(cachedir)
+    if os.path.isfile(manifest_path):
+        try:
+            with salt.utils.files.fopen(manifest_path, "r") as fp_:
+                return salt.utils.json.load(fp_)
+        except (OSError, ValueError) as exc:
+            log.debug("Unable to read the thin chunks manifest: %s", exc)
+    return gen_thin_chunks(cachedir)
+
+
+def gen_thin_bundle(cachedir, digests=None):
+    """
+    Bundle the thin chunks to send to a target in an uncompressed tarball,
+    all of them or only the given digests, and return the path of the bundle.
+    The bundle is to be removed by the caller once sent.
+    """
+    manifest = thin_chunks(cachedir)
+    thindir = os.path.join(cachedir, "thin")
+    if digests is None:
+        digests = sorted(manifest["chunks"])
+    bundle = _get_thintar_prefix(os.path.join(thindir, "thin-chunks.tar"))
+    with tarfile.open(bundle, "w") as tfp:
+        for digest in digests:
+            if digest not in manifest["chunks"]:
+                log.warning("The thin chunk %s is unknown, skipping it", digest)
+                continue
+            tfp.add(
+                os.path.join(thindir, "chunks", "{}.tgz".format(digest)),
+                arcname="{}.tgz".format(digest),
+            )
+    return bundle
+
+
 def gen_min(
     cachedir,
     extra_mods="",
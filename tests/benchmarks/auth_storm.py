@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+"""
+Simulate an authentication storm of many minions against the master workers.
+
+All minions send their authentication request at once, like they do after a
+master restart or an AES key rotation. The requests are answered by a pool of
+processes running the ``_auth`` method of the master workers. Minions told to
+retry later by the :conf_master:`auth_rate_limit` come back when the master
+told them to. The time until all minions are authenticated, the throughput of
+the workers and the number of deferred requests are printed.
+
+Example:
+
+.. code-block:: bash
+
+    python tests/benchmarks/auth_storm.py --minions 2000 --workers 4 --auth-cache
+    python tests/benchmarks/auth_storm.py --minions 2000 --rate-limit 500
+"""
+
+import argparse
+import heapq
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import time
+
+import salt.config
+import salt.crypt
+import salt.transport.mixins.auth
+import salt.utils.files
+
+# The worker server of the current pool process
+SERVER = None
+
+
+def parse():
+    """
+    Parse the cli options
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "-m", "--minions", type=int, default=1000, help="The number of minions",
+    )
+    parser.add_argument(
+        "-k",
+        "--keys",
+        type=int,
+        default=10,
+        help="The number of distinct minion keys to generate and share",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=4, help="The number of master workers",
+    )
+    parser.add_argument(
+        "-r",
+        "--rate-limit",
+        type=float,
+        default=0,
+        help="The auth_rate_limit of the master",
+    )
+    parser.add_argument(
+        "-c",
+        "--auth-cache",
+        action="store_true",
+        default=False,
+        help="Enable the auth_cache of the master",
+    )
+    return parser.parse_args()
+
+
+def init_worker(opts):
+    global SERVER  # pylint: disable=global-statement
+    SERVER = salt.transport.mixins.auth.AESReqServerMixin()
+    SERVER.opts = opts
+    SERVER.post_fork(None, None)
+
+
+def authenticate(load):
+    ret = SERVER._auth(load)
+    if ret["enc"] == "pub":
+        return load["id"], None
+    if ret["load"]["ret"] == "busy":
+        return load["id"], ret["load"]["retry_after"]
+    raise RuntimeError("Authentication of {} failed: {}".format(load["id"], ret))
+
+
+def make_loads(opts, options):
+    """
+    Generate the minion keys, accept them and return the auth request of every
+    minion
+    """
+    master_key = salt.crypt.MasterKeys(opts)
+    keydir = os.path.join(opts["pki_dir"], "gen")
+    os.makedirs(keydir)
+    pubs = []
+    for idx in range(options.keys):
+        salt.crypt.gen_keys(keydir, "minion{}".format(idx), 2048)
+        with salt.utils.files.fopen(
+            os.path.join(keydir, "minion{}.pub".format(idx))
+        ) as fp_:
+            pubs.append(fp_.read())
+    master_pub = salt.crypt.get_rsa_pub_key(master_key.pub_path)
+    token = b"salty bacon"
+    if salt.transport.mixins.auth.HAS_M2:
+        token = master_pub.public_encrypt(
+            token, salt.transport.mixins.auth.RSA.pkcs1_oaep_padding
+        )
+    else:
+        token = salt.transport.mixins.auth.PKCS1_OAEP.new(master_pub).encrypt(token)
+    loads = {}
+    for idx in range(options.minions):
+        minion_id = "minion{}".format(idx)
+        pub = pubs[idx % len(pubs)]
+        with salt.utils.files.fopen(
+            os.path.join(opts["pki_dir"], "minions", minion_id), "w"
+        ) as fp_:
+            fp_.write(pub)
+        loads[minion_id] = {"cmd": "_auth", "id": minion_id, "pub": pub, "token": token}
+    return loads
+
+
+def run(options):
+    root = tempfile.mkdtemp(prefix="salt-auth-bench-")
+    try:
+        opts = salt.config.DEFAULT_MASTER_OPTS.copy()
+        opts.update(
+            {
+                "pki_dir": root,
+                "sock_dir": root,
+                "cachedir": root,
+                "keysize": 2048,
+                "auth_events": False,
+                "auth_cache": options.auth_cache,
+                "auth_rate_limit": options.rate_limit,
+                "worker_threads": options.workers,
+            }
+        )
+        for name in ("minions", "minions_pre", "minions_rejected", "minions_denied"):
+            os.makedirs(os.path.join(root, name))
+        loads = make_loads(opts, options)
+        # Share the AES key of the master with the workers
+        salt.transport.mixins.auth.AESReqServerMixin().pre_fork(None)
+
+        results = queue.Queue()
+        pending = [(0, minion_id) for minion_id in loads]
+        in_flight = replies = deferred = 0
+        pool = multiprocessing.Pool(options.workers, init_worker, (opts,))
+        try:
+            start = time.time()
+            while pending or in_flight:
+                now = time.time() - start
+                while pending and pending[0][0] <= now:
+                    _, minion_id = heapq.heappop(pending)
+                    pool.apply_async(
+                        authenticate, (loads[minion_id],), callback=results.put
+                    )
+                    in_flight += 1
+                try:
+                    timeout = pending[0][0] - now if pending else None
+                    minion_id, retry_after = results.get(
+                        timeout=max(timeout, 0) if timeout is not None else None
+                    )
+                except queue.Empty:
+                    continue
+                in_flight -= 1
+                replies += 1
+                if retry_after is not None:
+                    deferred += 1
+                    heapq.heappush(
+                        pending, (time.time() - start + retry_after, minion_id)
+                    )
+            elapsed = time.time() - start
+        finally:
+            pool.terminate()
+        print(
+            "{:>6} minions {:>8.2f}s {:>8.0f} replies/s {:>8} deferred".format(
+                options.minions, elapsed, replies / elapsed, deferred
+            )
+        )
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run(parse())
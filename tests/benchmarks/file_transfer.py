@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""
+Benchmark fetching a large file from the master file server.
+
+A file of the given size is served by the ``roots`` backend of a master file
+server and fetched with ``RemoteClient.get_file``, once with one chunk per
+request and once with the ``file_stream_window`` streaming mode. Every request
+goes through a channel which serializes and encrypts the load and the reply
+like the request server does, and optionally sleeps to emulate the network
+round trip to the master.
+
+Example:
+
+.. code-block:: bash
+
+    python tests/benchmarks/file_transfer.py --size 512 --window 8 --rtt 10
+"""
+# pylint: disable=resource-leakage
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import salt.config
+import salt.crypt
+import salt.fileclient
+import salt.fileserver
+import salt.payload
+
+
+def parse():
+    """
+    Parse the cli options
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "-s", "--size", type=int, default=256, help="The size of the file in MiB",
+    )
+    parser.add_argument(
+        "-w",
+        "--window",
+        type=int,
+        default=8,
+        help="The file_stream_window to compare the chunked transfer with",
+    )
+    parser.add_argument(
+        "-b",
+        "--buffer-size",
+        type=int,
+        default=1048576,
+        help="The file_buffer_size of the master",
+    )
+    parser.add_argument(
+        "--rtt",
+        type=float,
+        default=0,
+        help="The emulated round trip time to the master in milliseconds",
+    )
+    return parser.parse_args()
+
+
+class Channel:
+    """
+    Request channel which passes loads to a master file server through the
+    serialization and encryption a real request channel does.
+    """
+
+    def __init__(self, master_opts, rtt):
+        self.fs_chan = salt.fileserver.FSChan(master_opts)
+        self.serial = salt.payload.Serial(master_opts)
+        self.crypticle = salt.crypt.Crypticle(
+            master_opts, salt.crypt.Crypticle.generate_key_string()
+        )
+        self.rtt = rtt
+        self.requests = 0
+
+    def _transfer(self, data):
+        return self.serial.loads(
+            self.crypticle.loads(self.crypticle.dumps(self.serial.dumps(data)))
+        )
+
+    def send(self, load, tries=3, timeout=60, raw=False):
+        self.requests += 1
+        if self.rtt:
+            time.sleep(self.rtt / 1000.0)
+        return self._transfer(self.fs_chan.send(self._transfer(load)))
+
+    def close(self):
+        pass
+
+
+def fetch(root, master_opts, window, rtt):
+    minion_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+    minion_opts.update(
+        {
+            "cachedir": tempfile.mkdtemp(dir=root),
+            "file_stream_window": window,
+            "file_client": "local",
+        }
+    )
+    client = salt.fileclient.FSClient(minion_opts)
+    client.channel = Channel(master_opts, rtt)
+    start = time.time()
+    dest = client.get_file("salt://payload.bin", dest="")
+    elapsed = time.time() - start
+    if os.path.getsize(dest) != os.path.getsize(
+        os.path.join(root, "roots", "payload.bin")
+    ):
+        raise RuntimeError("Incomplete transfer of {}".format(dest))
+    shutil.rmtree(minion_opts["cachedir"])
+    return elapsed, client.channel.requests
+
+
+def run(options):
+    root = tempfile.mkdtemp(prefix="salt-file-bench-")
+    try:
+        os.makedirs(os.path.join(root, "roots"))
+        with open(os.path.join(root, "roots", "payload.bin"), "wb") as fp_:
+            for _ in range(options.size):
+                fp_.write(os.urandom(1048576))
+        master_opts = salt.config.DEFAULT_MASTER_OPTS.copy()
+        master_opts.update(
+            {
+                "cachedir": os.path.join(root, "cache"),
+                "file_roots": {"base": [os.path.join(root, "roots")]},
+                "file_buffer_size": options.buffer_size,
+                "file_stream_max_window": options.window,
+            }
+        )
+        print(
+            "Fetching {} MiB with a {} byte buffer, rtt {} ms".format(
+                options.size, options.buffer_size, options.rtt
+            )
+        )
+        for label, window in (("chunked", 1), ("stream", options.window)):
+            elapsed, requests = fetch(root, master_opts, window, options.rtt)
+            print(
+                "  {:<8} window {:<4} {:>6} requests {:>8.2f}s {:>8.1f} MiB/s".format(
+                    label, window, requests, elapsed, options.size / elapsed
+                )
+            )
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run(parse())
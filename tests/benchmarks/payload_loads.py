@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark the deserialization of typical Salt payloads.
+
+Every payload is packed like it travels between the master and the minions,
+and like the event bus packs it, then unpacked with ``Serial.loads``. For
+comparison the payloads are also unpacked the way ``Serial.loads`` used to,
+with msgpack returning bytes and ``decode_embedded_strs`` walking the result
+to decode them. The time per call of both and the speedup are printed.
+
+Example:
+
+.. code-block:: bash
+
+    python tests/benchmarks/payload_loads.py
+    python tests/benchmarks/payload_loads.py --number 50 --shape highstate
+"""
+
+import argparse
+import datetime
+import gc
+import os
+import timeit
+
+import salt.payload
+import salt.transport.frame
+import salt.utils.msgpack
+
+
+def publish():
+    return {
+        "fun": "test.ping",
+        "arg": [],
+        "tgt": "*",
+        "tgt_type": "glob",
+        "jid": "20210101000000000000",
+        "ret": "",
+        "user": "root",
+    }
+
+
+def list_pkgs():
+    pkgs = {
+        "package-{}".format(idx): "1.{}.{}-1".format(idx % 17, idx)
+        for idx in range(3000)
+    }
+    return {"id": "minion", "jid": "20210101000000000000", "return": pkgs}
+
+
+def highstate():
+    ret = {}
+    for idx in range(1000):
+        ret["file_|-file{0}_|-/etc/file{0}_|-managed".format(idx)] = {
+            "name": "/etc/file{}".format(idx),
+            "result": True,
+            "comment": "File /etc/file{} is in the correct state".format(idx),
+            "changes": {},
+            "__sls__": "files",
+            "__run_num__": idx,
+            "start_time": "10:00:00.000000",
+            "duration": 1.5,
+            "__id__": "file{}".format(idx),
+        }
+    return {"id": "minion", "jid": "20210101000000000000", "return": ret}
+
+
+def file_chunk():
+    return {
+        "data": os.urandom(65536),
+        "dest": "/srv/salt/file.bin",
+        "hash_type": "sha256",
+        "stamp": datetime.datetime(2021, 1, 1),
+    }
+
+
+SHAPES = {
+    "publish": publish,
+    "list_pkgs": list_pkgs,
+    "highstate": highstate,
+    "file_chunk": file_chunk,
+}
+
+
+def parse():
+    """
+    Parse the cli options
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "-n",
+        "--number",
+        type=int,
+        default=0,
+        help="The number of calls per payload, scaled to the payload by default",
+    )
+    parser.add_argument(
+        "-s",
+        "--shape",
+        choices=sorted(SHAPES),
+        action="append",
+        help="The payload shapes to run, all of them by default",
+    )
+    return parser.parse_args()
+
+
+def legacy_loads(msg):
+    """
+    Unpack the message like Serial.loads did before the strings were
+    decoded while unpacking
+    """
+    serial = salt.payload.Serial("msgpack")
+    gc.disable()
+    try:
+        ret = serial.loads(msg, raw=True)
+        return salt.transport.frame.decode_embedded_strs(ret)
+    finally:
+        gc.enable()
+
+
+def run(options):
+    serial = salt.payload.Serial("msgpack")
+    for name in options.shape or sorted(SHAPES):
+        data = SHAPES[name]()
+        for wire, use_bin_type in (("network", False), ("ipc", True)):
+            msg = serial.dumps(data, use_bin_type=use_bin_type)
+            assert serial.loads(msg) == legacy_loads(msg)
+            number = options.number or max(10, 2000000 // len(msg))
+            new = timeit.timeit(lambda: serial.loads(msg), number=number) / number
+            old = timeit.timeit(lambda: legacy_loads(msg), number=number) / number
+            print(
+                "{:>10} {:>7} {:>9} bytes {:>11.1f}us {:>11.1f}us legacy "
+                "{:>6.2f}x".format(
+                    name, wire, len(msg), new * 1e6, old * 1e6, old / new
+                )
+            )
+
+
+if __name__ == "__main__":
+    run(parse())
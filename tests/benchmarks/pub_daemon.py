@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+"""
+Benchmark the ZeroMQ publish daemon of the master.
+
+The publish daemon is started on localhost together with a number of
+simulated minions, each one a zmq SUB socket subscribed to its own topic like
+a minion with ``zmq_filtering`` enabled. Publishes are pushed to the daemon
+the same way the master workers do and the script reports the publish rate
+and the per-publish latency until every targeted minion received the payload.
+
+Example:
+
+.. code-block:: bash
+
+    python tests/benchmarks/pub_daemon.py --minions 2000 --publishes 200
+"""
+# pylint: disable=resource-leakage
+
+import argparse
+import hashlib
+import multiprocessing
+import os
+import resource
+import shutil
+import socket
+import statistics
+import tempfile
+import time
+
+import salt.config
+import salt.payload
+import salt.transport.zeromq
+import salt.utils.stringutils
+import zmq
+
+
+def parse():
+    """
+    Parse the cli options
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "-m",
+        "--minions",
+        type=int,
+        default=1000,
+        help="The number of simulated minions",
+    )
+    parser.add_argument(
+        "-p",
+        "--publishes",
+        type=int,
+        default=100,
+        help="The number of publishes to send",
+    )
+    parser.add_argument(
+        "-s",
+        "--size",
+        type=int,
+        default=1024,
+        help="The size of the published payload in bytes",
+    )
+    parser.add_argument(
+        "--broadcast",
+        action="store_true",
+        help="Publish to all minions instead of sending a list targeted job",
+    )
+    parser.add_argument(
+        "--no-filtering",
+        dest="zmq_filtering",
+        action="store_false",
+        help="Disable zmq_filtering on the master and the minions",
+    )
+    return parser.parse_args()
+
+
+def _free_port():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def _opts(root, minions, zmq_filtering):
+    opts = salt.config.DEFAULT_MASTER_OPTS.copy()
+    opts.update(
+        {
+            "interface": "127.0.0.1",
+            "publish_port": _free_port(),
+            "sock_dir": os.path.join(root, "sock"),
+            "pki_dir": os.path.join(root, "pki"),
+            "cachedir": os.path.join(root, "cache"),
+            "zmq_filtering": zmq_filtering,
+            "pub_hwm": 0,
+            "pub_server_niceness": None,
+        }
+    )
+    os.makedirs(opts["sock_dir"])
+    os.makedirs(os.path.join(opts["pki_dir"], "minions"))
+    for minion_id in minions:
+        with open(os.path.join(opts["pki_dir"], "minions", minion_id), "w"):
+            pass
+    return opts
+
+
+def _subscribers(context, opts, minions):
+    uri = "tcp://127.0.0.1:{}".format(opts["publish_port"])
+    socks = []
+    for minion_id in minions:
+        sock = context.socket(zmq.SUB)
+        sock.setsockopt(zmq.RCVHWM, 0)
+        if opts["zmq_filtering"]:
+            sock.setsockopt(zmq.SUBSCRIBE, b"broadcast")
+            sock.setsockopt(
+                zmq.SUBSCRIBE,
+                salt.utils.stringutils.to_bytes(
+                    hashlib.sha1(salt.utils.stringutils.to_bytes(minion_id)).hexdigest()
+                ),
+            )
+        else:
+            sock.setsockopt(zmq.SUBSCRIBE, b"")
+        sock.connect(uri)
+        socks.append(sock)
+    return socks
+
+
+def _receive_all(poller, socks, timeout=30):
+    """
+    Wait until every socket received one message
+    """
+    pending = set(socks)
+    deadline = time.time() + timeout
+    while pending:
+        if time.time() > deadline:
+            raise RuntimeError(
+                "{} minions did not receive the publish".format(len(pending))
+            )
+        for sock, _ in poller.poll(1000):
+            if sock in pending:
+                sock.recv_multipart()
+                pending.discard(sock)
+
+
+def _warm_up(push, poller, socks, package):
+    # Slow joiner: keep publishing until all subscriptions have propagated
+    deadline = time.time() + 60
+    pending = set(socks)
+    while pending and time.time() < deadline:
+        push.send(package)
+        for sock, _ in poller.poll(100):
+            while True:
+                try:
+                    sock.recv_multipart(zmq.NOBLOCK)
+                except zmq.Again:
+                    break
+            pending.discard(sock)
+    if pending:
+        raise RuntimeError("{} minions never connected".format(len(pending)))
+    # Drain the remaining warm up messages
+    time.sleep(0.5)
+    for sock in socks:
+        while True:
+            try:
+                sock.recv_multipart(zmq.NOBLOCK)
+            except zmq.Again:
+                break
+
+
+def run(options):
+    minions = ["minion{:06d}".format(idx) for idx in range(options.minions)]
+    root = tempfile.mkdtemp(prefix="salt-pub-bench-")
+    opts = _opts(root, minions, options.zmq_filtering)
+    channel = salt.transport.zeromq.ZeroMQPubServerChannel(opts)
+    daemon = multiprocessing.Process(target=channel._publish_daemon)
+    daemon.start()
+    # Every simulated minion holds a socket and a tcp connection
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, options.minions * 4 + 1024)
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+    context = zmq.Context()
+    context.set(zmq.MAX_SOCKETS, options.minions + 100)
+    try:
+        push = context.socket(zmq.PUSH)
+        push.setsockopt(zmq.LINGER, 0)
+        push.connect(
+            "ipc://{}".format(os.path.join(opts["sock_dir"], "publish_pull.ipc"))
+        )
+        socks = _subscribers(context, opts, minions)
+        poller = zmq.Poller()
+        for sock in socks:
+            poller.register(sock, zmq.POLLIN)
+
+        serial = salt.payload.Serial(opts)
+        int_payload = {"payload": os.urandom(options.size)}
+        if not options.broadcast:
+            int_payload["topic_lst"] = minions
+        package = serial.dumps(int_payload)
+        _warm_up(push, poller, socks, package)
+
+        latencies = []
+        start = time.time()
+        for _ in range(options.publishes):
+            sent = time.time()
+            push.send(package)
+            _receive_all(poller, socks)
+            latencies.append(time.time() - sent)
+        elapsed = time.time() - start
+    finally:
+        daemon.terminate()
+        daemon.join()
+        context.destroy(linger=0)
+        shutil.rmtree(root, ignore_errors=True)
+
+    latencies.sort()
+    print(
+        "{} publishes to {} minions ({} bytes, zmq_filtering={}, {})".format(
+            options.publishes,
+            options.minions,
+            options.size,
+            options.zmq_filtering,
+            "broadcast" if options.broadcast else "list",
+        )
+    )
+    print("  publishes/sec:  {:.1f}".format(options.publishes / elapsed))
+    print(
+        "  messages/sec:   {:.1f}".format(options.publishes * options.minions / elapsed)
+    )
+    print("  latency mean:   {:.2f} ms".format(statistics.mean(latencies) * 1000))
+    print("  latency median: {:.2f} ms".format(statistics.median(latencies) * 1000))
+    print(
+        "  latency p99:    {:.2f} ms".format(
+            latencies[int(len(latencies) * 0.99) - 1] * 1000
+        )
+    )
+
+
+if __name__ == "__main__":
+    run(parse())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+"""
+Measure the throughput of the reactor dispatching synthetic events.
+
+A reactor map of literal tags and globs is generated and synthetic events,
+most of them matching no reactor like on a busy master, are fed to the
+reactor. Every event is matched against the reactor map and the reactions of
+the matching events are rendered, they are not executed. The time spent
+matching and rendering and the number of events handled per second are
+printed. The ``--fnmatch`` option matches the events against every entry of
+the map with fnmatch instead of the compiled reactor map, for comparison.
+
+Example:
+
+.. code-block:: bash
+
+    python tests/benchmarks/reactor_dispatch.py --events 20000 --reactors 500
+    python tests/benchmarks/reactor_dispatch.py --events 20000 --fnmatch
+"""
+
+import argparse
+import fnmatch
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import salt.config
+import salt.utils.files
+import salt.utils.reactor
+
+REACTION = """\
+{% if data.get("id") %}
+notify_{{ data["id"] }}:
+  local.test.echo:
+    - tgt: {{ data["id"] }}
+    - args:
+      - text: {{ tag }}
+{% endif %}
+"""
+
+
+def parse():
+    """
+    Parse the cli options
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "-e", "--events", type=int, default=10000, help="The number of events",
+    )
+    parser.add_argument(
+        "-r",
+        "--reactors",
+        type=int,
+        default=200,
+        help="The number of entries of the reactor map",
+    )
+    parser.add_argument(
+        "-m",
+        "--match-ratio",
+        type=float,
+        default=0.05,
+        help="The ratio of the events matching a reactor",
+    )
+    parser.add_argument(
+        "-f",
+        "--fnmatch",
+        action="store_true",
+        default=False,
+        help="Match the events with fnmatch against every entry of the map",
+    )
+    return parser.parse_args()
+
+
+def make_map(root, count):
+    """
+    Write the reaction file and return a reactor map of literal tags and
+    globs, half of each
+    """
+    reaction = os.path.join(root, "reaction.sls")
+    with salt.utils.files.fopen(reaction, "w") as fp_:
+        fp_.write(REACTION)
+    react_map = []
+    for idx in range(count):
+        if idx % 2:
+            tag = "custom/app{}/deploy/*".format(idx)
+        else:
+            tag = "custom/app{}/restart".format(idx)
+        react_map.append({tag: [reaction]})
+    return react_map
+
+
+def make_events(options):
+    """
+    Return the synthetic events, the matching ones use the tags of the map
+    """
+    rand = random.Random(options.events)
+    events = []
+    for idx in range(options.events):
+        minion_id = "minion{}".format(idx % 1000)
+        if rand.random() < options.match_ratio:
+            app = rand.randrange(options.reactors)
+            if app % 2:
+                tag = "custom/app{}/deploy/{}".format(app, minion_id)
+            else:
+                tag = "custom/app{}/restart".format(app)
+        else:
+            tag = "salt/job/2021010100000{:07d}/ret/{}".format(idx, minion_id)
+        events.append((tag, {"id": minion_id, "return": True}))
+    return events
+
+
+def run(options):
+    root = tempfile.mkdtemp(prefix="salt-reactor-bench-")
+    try:
+        opts = salt.config.DEFAULT_MASTER_OPTS.copy()
+        opts.update(
+            {
+                "__role": "master",
+                "cachedir": root,
+                "sock_dir": root,
+                "pki_dir": root,
+                "file_roots": {"base": [root]},
+                "reactor": make_map(root, options.reactors),
+            }
+        )
+        reactor = salt.utils.reactor.Reactor(opts)
+        events = make_events(options)
+
+        def list_reactors(tag):
+            reactors = []
+            for ropt in opts["reactor"]:
+                key = next(iter(ropt.keys()))
+                if fnmatch.fnmatch(tag, key):
+                    reactors.extend(ropt[key])
+            return reactors
+
+        if not options.fnmatch:
+            list_reactors = reactor.list_reactors
+
+        matched = chunks = 0
+        matching = rendering = 0
+        for tag, data in events:
+            start = time.time()
+            reactors = list_reactors(tag)
+            matching += time.time() - start
+            if not reactors:
+                continue
+            matched += 1
+            start = time.time()
+            chunks += len(reactor.reactions(tag, data, reactors))
+            rendering += time.time() - start
+        elapsed = matching + rendering
+        print(
+            "{:>7} events {:>6} matched {:>6} chunks {:>8.3f}s matching "
+            "{:>8.3f}s rendering {:>9.0f} events/s".format(
+                len(events),
+                matched,
+                chunks,
+                matching,
+                rendering,
+                len(events) / elapsed,
+            )
+        )
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run(parse())
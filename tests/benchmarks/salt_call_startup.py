@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Measure the cold start of ``salt-call --local test.ping``.
+
+A throwaway minion configuration is written and ``salt-call --local
+test.ping`` is run in a fresh interpreter for every round, so every round pays
+for the imports and the loaders like a salt-call run from the shell does. The
+first round runs with an empty cache directory, the following rounds reuse it.
+The wall time of every round and the number of modules imported by the
+interpreter are printed. The ``--loader-index`` option turns on the
+:conf_minion:`loader_index`, for comparison.
+
+Example:
+
+.. code-block:: bash
+
+    python tests/benchmarks/salt_call_startup.py --rounds 5
+    python tests/benchmarks/salt_call_startup.py --rounds 5 --loader-index
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import salt.utils.files
+import salt.utils.yaml
+
+# Runs salt-call and reports the number of imported modules on stderr
+SCRIPT = """\
+import atexit
+import sys
+
+atexit.register(
+    lambda: sys.stderr.write("IMPORTED {} MODULES\\n".format(len(sys.modules)))
+)
+
+import salt.scripts
+
+sys.argv = ["salt-call"] + sys.argv[1:]
+salt.scripts.salt_call()
+"""
+
+
+def parse():
+    """
+    Parse the cli options
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "-r", "--rounds", type=int, default=5, help="The number of salt-call runs",
+    )
+    parser.add_argument(
+        "-i",
+        "--loader-index",
+        action="store_true",
+        default=False,
+        help="Turn on the loader index",
+    )
+    return parser.parse_args()
+
+
+def run(options):
+    root = tempfile.mkdtemp(prefix="salt-call-bench-")
+    try:
+        with salt.utils.files.fopen(os.path.join(root, "minion"), "w") as fp_:
+            salt.utils.yaml.safe_dump(
+                {
+                    "id": "bench",
+                    "root_dir": root,
+                    "pki_dir": os.path.join(root, "pki"),
+                    "cachedir": os.path.join(root, "cache"),
+                    "sock_dir": os.path.join(root, "sock"),
+                    "log_file": os.path.join(root, "minion.log"),
+                    "file_roots": {"base": [os.path.join(root, "srv")]},
+                    "pillar_roots": {"base": [os.path.join(root, "pillar")]},
+                    "loader_index": options.loader_index,
+                },
+                fp_,
+            )
+        env = os.environ.copy()
+        env["PYTHONPATH"] = os.pathsep.join(
+            [os.path.dirname(os.path.dirname(os.path.dirname(__file__)))]
+            + [path for path in env.get("PYTHONPATH", "").split(os.pathsep) if path]
+        )
+        cmd = [
+            sys.executable,
+            "-c",
+            SCRIPT,
+            "--local",
+            "--config-dir",
+            root,
+            "--out",
+            "quiet",
+            "test.ping",
+        ]
+        for idx in range(options.rounds):
+            start = time.time()
+            proc = subprocess.run(
+                cmd,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+                check=False,
+            )
+            elapsed = time.time() - start
+            if proc.returncode:
+                print(proc.stderr)
+                raise SystemExit(proc.returncode)
+            imported = [
+                line.split()[1]
+                for line in proc.stderr.splitlines()
+                if line.startswith("IMPORTED ")
+            ]
+            print(
+                "{:>5} {:>5} cache {:>8.3f}s {:>6} modules imported".format(
+                    idx,
+                    "cold" if idx == 0 else "warm",
+                    elapsed,
+                    imported[-1] if imported else "?",
+                )
+            )
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run(parse())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Benchmark requisite resolution in the state system.
+
+Synthetic high data with the given numbers of states is run through
+``State.call_high``. The states use the ``test`` state module so only the state
+system itself is measured. Every state requires the previous one, every tenth
+state watches one of the states of an earlier sls file, every twentieth state
+requires a whole sls file and every fiftieth state uses a glob requisite.
+
+Example:
+
+.. code-block:: bash
+
+    python tests/benchmarks/state_requisites.py --states 1000 5000 20000
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import salt.config
+import salt.state
+from salt.utils.odict import OrderedDict
+
+# The number of states per synthetic sls file
+STATES_PER_SLS = 100
+
+
+def parse():
+    """
+    Parse the cli options
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "-s",
+        "--states",
+        type=int,
+        nargs="+",
+        default=[1000, 5000, 20000],
+        help="The numbers of states to run",
+    )
+    return parser.parse_args()
+
+
+def make_high(count):
+    """
+    Return high data with ``count`` states
+    """
+    high = OrderedDict()
+    for idx in range(count):
+        sls = "sls{}".format(idx // STATES_PER_SLS)
+        args = [{"name": "name{}".format(idx)}, "succeed_with_changes"]
+        reqs = []
+        if idx:
+            reqs.append({"require": [{"test": "state{}".format(idx - 1)}]})
+        if idx % 10 == 0 and idx >= STATES_PER_SLS:
+            reqs.append({"watch": ["state{}".format(idx - STATES_PER_SLS)]})
+        if idx % 20 == 0 and idx >= STATES_PER_SLS:
+            reqs.append(
+                {"require": [{"sls": "sls{}".format(idx // STATES_PER_SLS - 1)}]}
+            )
+        if idx % 50 == 0 and idx >= STATES_PER_SLS:
+            reqs.append({"require": [{"id": "state{}?".format(idx // 10 - 1)}]})
+        high["state{}".format(idx)] = {
+            "test": args + reqs,
+            "__sls__": sls,
+            "__env__": "base",
+        }
+    return high
+
+
+def run(options):
+    root = tempfile.mkdtemp(prefix="salt-state-bench-")
+    try:
+        opts = salt.config.DEFAULT_MINION_OPTS.copy()
+        opts.update(
+            {
+                "cachedir": os.path.join(root, "cache"),
+                "file_client": "local",
+                "file_roots": {"base": [os.path.join(root, "states")]},
+                "pillar_roots": {"base": [os.path.join(root, "pillar")]},
+                "grains": {},
+                "state_events": False,
+                "local": True,
+            }
+        )
+        state = salt.state.State(opts)
+        for count in options.states:
+            high = make_high(count)
+            start = time.time()
+            ret = state.call_high(high)
+            elapsed = time.time() - start
+            failed = [tag for tag, data in ret.items() if data["result"] is False]
+            if failed:
+                raise RuntimeError(
+                    "{} states failed: {}".format(len(failed), failed[0])
+                )
+            print(
+                "{:>6} states {:>8.2f}s {:>8.0f} states/s".format(
+                    count, elapsed, count / elapsed
+                )
+            )
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run(parse())
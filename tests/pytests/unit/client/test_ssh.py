@@ -1,6 +1,12 @@
+import os
+import shutil
+
 import pytest
 import salt.client.ssh.client
+import salt.client.ssh.ssh_py_shim
+import salt.defaults.exitcodes
 import salt.utils.msgpack
+import salt.utils.thin
 from salt.client import ssh
 from tests.support.mock import MagicMock, patch
 
@@ -62,6 +68,121 @@ def test_cmd_block_python_version_error(ssh_target):
         assert "ERROR: Python version error. Recommendation(s) follow:" in ret[0]
 
 
+@pytest.mark.skip_on_windows(reason="SSH_PY_SHIM not set on windows")
+def test_deploy_thin_chunks(ssh_target, tmpdir, capsys):
+    """
+    Test the thin chunks missing from the target are the only ones deployed
+    """
+    opts, target = ssh_target
+    opts["thin_chunks"] = True
+    pkg = tmpdir.join("lib", "fakepkg")
+    pkg.join("__init__.py").write("VERSION = 1\n", ensure=True)
+    saltdir = tmpdir.join("saltdir")
+    saltdir.ensure(dir=True)
+    chunks_path = saltdir.join("salt-thin-chunks.tar").strpath
+    shim = salt.client.ssh.ssh_py_shim
+
+    def _send(local, remote, **kwargs):
+        # The target is the local salt dir
+        shutil.copy(local, saltdir.join(os.path.basename(remote)).strpath)
+
+    def _shim_options(manifest):
+        return patch.multiple(
+            shim.OPTIONS,
+            create=True,
+            saltdir=saltdir.strpath,
+            delimiter="_delimiter",
+            hashfunc="sha1",
+            code_checksum=manifest["code_checksum"],
+            thin_chunks=manifest["chunks"],
+        )
+
+    with patch("salt.utils.thin.get_tops", MagicMock(return_value=[pkg.strpath])):
+        manifest = salt.utils.thin.gen_thin_chunks(opts["cachedir"])
+        single = ssh.Single(
+            opts,
+            opts["argv"],
+            "localhost",
+            mods={},
+            fsclient=None,
+            thin=salt.utils.thin.thin_path(opts["cachedir"]),
+            mine=False,
+            winrm=False,
+            **target
+        )
+        with patch("salt.client.ssh.base64.encodebytes", lambda data: data):
+            assert "OPTIONS.thin_chunks = {}".format(manifest["chunks"]) in (
+                single._cmd_str()
+            )
+
+        # The salt dir was not deployed in chunks, all of them are needed
+        with _shim_options(manifest), pytest.raises(SystemExit) as exc:
+            shim.need_chunks()
+        assert exc.value.code == salt.defaults.exitcodes.EX_THIN_DEPLOY
+        assert capsys.readouterr().out.splitlines()[-1] == "deploy"
+        with patch.object(single.shell, "send", _send):
+            single.deploy()
+        with _shim_options(manifest):
+            shim.unpack_chunks(chunks_path)
+
+        pkg.join("__init__.py").write("VERSION = 2\n")
+        os.utime(pkg.join("__init__.py").strpath, (0, 0))
+        updated = salt.utils.thin.gen_thin_chunks(opts["cachedir"])
+        with _shim_options(updated), pytest.raises(SystemExit) as exc:
+            shim.need_chunks()
+        assert exc.value.code == salt.defaults.exitcodes.EX_THIN_DEPLOY
+        command, missing = capsys.readouterr().out.splitlines()[-2:]
+        assert command == "deploy_chunks"
+        assert missing.split() == [
+            digest for digest in updated["chunks"] if digest not in manifest["chunks"]
+        ]
+        with patch.object(single.shell, "send", _send):
+            single.deploy(chunks=missing.split())
+        with _shim_options(updated):
+            shim.unpack_chunks(chunks_path)
+            assert sorted(shim.read_chunks_index()) == sorted(updated["chunks"])
+
+    assert saltdir.join("py3", "fakepkg", "__init__.py").read() == "VERSION = 2\n"
+    assert saltdir.join("code-checksum").read().strip() == updated["code_checksum"]
+    assert saltdir.join("salt-call").check()
+    assert not os.path.exists(chunks_path)
+
+
+@pytest.mark.skip_on_windows(reason="SSH_PY_SHIM not set on windows")
+def test_cmd_block_deploy_chunks(ssh_target):
+    """
+    Test the chunks asked for by the shim are deployed
+    """
+    opts, target = ssh_target
+    single = ssh.Single(
+        opts,
+        opts["argv"],
+        "localhost",
+        mods={},
+        fsclient=None,
+        thin=salt.utils.thin.thin_path(opts["cachedir"]),
+        mine=False,
+        winrm=False,
+        **target
+    )
+    mock_shim = MagicMock(
+        side_effect=[
+            (
+                "{}\ndeploy_chunks\nabc def\n".format(ssh.RSTR),
+                "",
+                salt.defaults.exitcodes.EX_THIN_DEPLOY,
+            ),
+            ("{}\nstdout".format(ssh.RSTR), "{}\n".format(ssh.RSTR), 0),
+        ]
+    )
+    mock_deploy = MagicMock(return_value=True)
+    with patch.object(single, "_cmd_str", MagicMock(return_value="")), patch.object(
+        single, "shim_cmd", mock_shim
+    ), patch.object(single, "deploy", mock_deploy):
+        assert single.cmd_block() == ("stdout", "", 0)
+    mock_deploy.assert_called_once_with(chunks=["abc", "def"])
+
+
 @pytest.mark.parametrize(
     "test_opts",
     [
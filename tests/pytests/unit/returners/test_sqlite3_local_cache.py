@@ -0,0 +1,222 @@
+"""
+Unit tests for the sqlite3_local_cache master job cache
+"""
+
+import datetime
+import os
+import threading
+
+import pytest
+import salt.returners.local_cache as local_cache
+import salt.returners.sqlite3_local_cache as sqlite3_local_cache
+import salt.runners.jobs as jobs
+import salt.utils.jid
+from tests.support.mock import MagicMock, patch
+
+
+@pytest.fixture
+def configure_loader_modules(tmp_path):
+    opts = {
+        "cachedir": str(tmp_path),
+        "keep_jobs": 24,
+        "hash_type": "sha256",
+        "job_cache_store_endtime": True,
+        "master_job_cache": "sqlite3_local_cache",
+        "ext_job_cache": "",
+    }
+    return {
+        sqlite3_local_cache: {"__opts__": opts},
+        local_cache: {"__opts__": opts},
+        jobs: {"__opts__": opts},
+    }
+
+
+@pytest.fixture(autouse=True)
+def connections():
+    yield
+    for hour in list(sqlite3_local_cache._connections()):
+        sqlite3_local_cache._close(hour)
+
+
+def _jid(hours_ago=0):
+    return "{:%Y%m%d%H%M%S%f}".format(
+        datetime.datetime.utcnow() - datetime.timedelta(hours=hours_ago)
+    )
+
+
+def _save_job(returner, jid, minions=("minion1", "minion2")):
+    load = {"fun": "test.ping", "arg": [], "tgt": "*", "tgt_type": "glob", "jid": jid}
+    returner.prep_jid(passed_jid=jid)
+    returner.save_load(jid, load, minions=list(minions))
+    for minion in minions:
+        returner.returner(
+            {"jid": jid, "id": minion, "return": True, "retcode": 0, "out": "nested"}
+        )
+    return load
+
+
+def test_job():
+    jid = sqlite3_local_cache.prep_jid()
+    assert salt.utils.jid.is_jid(jid)
+    load = _save_job(sqlite3_local_cache, jid)
+
+    assert sqlite3_local_cache.get_load(jid) == dict(
+        load, Minions=["minion1", "minion2"]
+    )
+    assert sqlite3_local_cache.get_jid(jid) == {
+        "minion1": {"return": True, "retcode": 0, "out": "nested"},
+        "minion2": {"return": True, "retcode": 0, "out": "nested"},
+    }
+    # The load of a return does not replace the load of the job
+    sqlite3_local_cache.save_load(jid, {"fun": "test.ping", "id": "minion1"})
+    assert sqlite3_local_cache.get_load(jid)["tgt"] == "*"
+
+    # Duplicate returns are dropped
+    assert (
+        sqlite3_local_cache.returner({"jid": jid, "id": "minion1", "return": False})
+        is False
+    )
+    assert sqlite3_local_cache.get_jid(jid)["minion1"]["return"] is True
+
+    sqlite3_local_cache.save_minions(jid, ["minion3"], syndic_id="syndic")
+    assert sqlite3_local_cache.get_load(jid)["Minions"] == [
+        "minion1",
+        "minion2",
+        "minion3",
+    ]
+
+    assert sqlite3_local_cache.get_endtime(jid) is False
+    sqlite3_local_cache.update_endtime(jid, "2021, Jan 01 00:00:00.000000")
+    assert sqlite3_local_cache.get_endtime(jid) == "2021, Jan 01 00:00:00.000000"
+
+    assert sqlite3_local_cache.get_load("20000101000000000000") == {}
+    assert sqlite3_local_cache.get_jid("20000101000000000000") == {}
+
+
+def test_prep_jid_collision():
+    jid = _jid()
+    with patch("salt.utils.jid.gen_jid", MagicMock(side_effect=[jid, jid, _jid()])):
+        first = sqlite3_local_cache.prep_jid()
+        second = sqlite3_local_cache.prep_jid()
+    assert first == jid
+    assert second != jid
+
+
+def test_nocache():
+    jid = sqlite3_local_cache.prep_jid(nocache=True)
+    sqlite3_local_cache.returner({"jid": jid, "id": "minion1", "return": True})
+    assert sqlite3_local_cache.get_jid(jid) == {}
+
+
+def test_non_time_jid():
+    _save_job(sqlite3_local_cache, "custom", minions=["minion1"])
+    assert sqlite3_local_cache.get_load("custom")["fun"] == "test.ping"
+    assert list(sqlite3_local_cache.get_jid("custom")) == ["minion1"]
+
+
+def test_get_jids():
+    jids = [_jid(hours) for hours in (3, 2, 1, 0)]
+    for jid in jids:
+        _save_job(sqlite3_local_cache, jid)
+    find_job = _jid()
+    sqlite3_local_cache.save_load(
+        find_job, {"fun": "saltutil.find_job", "arg": [], "jid": find_job}
+    )
+
+    ret = sqlite3_local_cache.get_jids()
+    assert sorted(ret) == sorted(jids + [find_job])
+    assert ret[jids[0]]["Function"] == "test.ping"
+
+    ret = sqlite3_local_cache.get_jids_filter(3)
+    assert [job["JID"] for job in ret] == jids[1:]
+    ret = sqlite3_local_cache.get_jids_filter(2, filter_find_job=False)
+    assert [job["JID"] for job in ret] == [jids[3], find_job]
+
+
+def test_clean_old_jobs():
+    old, new = _jid(30), _jid()
+    with patch.dict(sqlite3_local_cache.__opts__, {"keep_jobs": 0}):
+        _save_job(sqlite3_local_cache, old)
+    _save_job(sqlite3_local_cache, new)
+    db_dir = os.path.join(sqlite3_local_cache.__opts__["cachedir"], "jobs_sqlite3")
+    assert len([name for name in os.listdir(db_dir) if name.endswith(".db")]) == 2
+
+    # Expired jobs are not returned even before they are cleaned
+    assert sqlite3_local_cache.get_load(old) == {}
+    assert list(sqlite3_local_cache.get_jids()) == [new]
+
+    sqlite3_local_cache.clean_old_jobs()
+    # The database of the old hour and its journal files are removed
+    assert all(name.startswith(new[:10]) for name in os.listdir(db_dir))
+    assert sqlite3_local_cache.get_jid(new)
+
+
+def test_migrate_job_cache():
+    jids = [_jid(1), _jid()]
+    for jid in jids:
+        _save_job(local_cache, jid)
+        local_cache.update_endtime(jid, "endtime")
+
+    returners = {}
+    for module in (local_cache, sqlite3_local_cache):
+        for fun in (
+            "prep_jid",
+            "returner",
+            "save_load",
+            "get_load",
+            "get_jid",
+            "get_jids",
+            "get_endtime",
+            "update_endtime",
+        ):
+            returners["{}.{}".format(module.__name__.split(".")[-1], fun)] = getattr(
+                module, fun
+            )
+    mminion = MagicMock(returners=returners)
+    with patch("salt.minion.MasterMinion", MagicMock(return_value=mminion)):
+        ret = jobs.migrate_job_cache()
+    assert ret == {
+        "jobs": 2,
+        "source": "local_cache",
+        "target": "sqlite3_local_cache",
+    }
+    for jid in jids:
+        assert sqlite3_local_cache.get_load(jid) == local_cache.get_load(jid)
+        assert sqlite3_local_cache.get_jid(jid) == local_cache.get_jid(jid)
+        assert sqlite3_local_cache.get_endtime(jid) == "endtime"
+
+
+def test_threads():
+    jid = sqlite3_local_cache.prep_jid()
+    _save_job(sqlite3_local_cache, jid, minions=("minion1",))
+    errors = []
+    rets = []
+
+    def _thread(minion):
+        # Every thread uses its own connections
+        try:
+            sqlite3_local_cache.returner(
+                {"jid": jid, "id": minion, "return": True, "retcode": 0}
+            )
+            rets.append(sqlite3_local_cache.get_jid(jid))
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+        finally:
+            for hour in list(sqlite3_local_cache._connections()):
+                sqlite3_local_cache._close(hour)
+
+    threads = [
+        threading.Thread(target=_thread, args=(minion,))
+        for minion in ("minion2", "minion3")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(rets) == 2
+    assert sorted(sqlite3_local_cache.get_jid(jid)) == [
+        "minion1",
+        "minion2",
+        "minion3",
+    ]
@@ -0,0 +1,139 @@
+"""
+Unit tests for the master side of the minion authentication
+"""
+
+import os
+
+import pytest
+import salt.config
+import salt.crypt
+import salt.master
+import salt.transport.mixins.auth as auth
+import salt.utils.files
+from tests.support.mock import MagicMock, patch
+
+
+@pytest.fixture
+def pki_dir(tmp_path):
+    for name in ("minions", "minions_pre", "minions_rejected", "minions_denied"):
+        (tmp_path / name).mkdir()
+    return tmp_path
+
+
+@pytest.fixture
+def minion_key(tmp_path_factory):
+    keydir = str(tmp_path_factory.mktemp("minion"))
+    salt.crypt.gen_keys(keydir, "minion", 2048)
+    with salt.utils.files.fopen(os.path.join(keydir, "minion.pub")) as fp_:
+        pub = fp_.read()
+    return os.path.join(keydir, "minion.pem"), pub
+
+
+@pytest.fixture
+def server(pki_dir):
+    opts = salt.config.DEFAULT_MASTER_OPTS.copy()
+    opts.update(
+        {
+            "pki_dir": str(pki_dir),
+            "sock_dir": str(pki_dir),
+            "cachedir": str(pki_dir),
+            "keysize": 2048,
+            "auth_events": False,
+            "auth_cache": True,
+        }
+    )
+    server = auth.AESReqServerMixin()
+    server.opts = opts
+    server.pre_fork(None)
+    with patch("salt.utils.event.get_master_event", MagicMock()):
+        server.post_fork(None, None)
+    return server
+
+
+def _accept(pki_dir, pub):
+    with salt.utils.files.fopen(str(pki_dir / "minions" / "minion"), "w") as fp_:
+        fp_.write(pub)
+
+
+def test_key_states(pki_dir):
+    key_states = auth.KeyStates()
+    path = str(pki_dir / "minions" / "minion")
+    assert not key_states.isfile(path)
+
+    with salt.utils.files.fopen(path, "w") as fp_:
+        fp_.write("key1")
+    assert key_states.isfile(path)
+    assert key_states.read(path) == "key1"
+    with salt.utils.files.fopen(path, "w") as fp_:
+        fp_.write("key2!")
+    assert key_states.read(path) == "key2!"
+
+    # The listing of a directory is reused until its mtime changes
+    os.utime(str(pki_dir / "minions"), (0, 0))
+    assert key_states.isfile(path)
+    with patch("os.scandir", MagicMock(side_effect=AssertionError)):
+        assert key_states.isfile(path)
+        assert not key_states.isfile(str(pki_dir / "minions" / "other"))
+    os.remove(path)
+    assert not key_states.isfile(path)
+    assert path not in key_states._keys
+
+
+def test_auth_rate_limiter():
+    with patch("time.monotonic", MagicMock(return_value=100)):
+        limiter = auth.AuthRateLimiter(10, burst=2)
+        assert limiter.admit() == 0
+        assert limiter.admit() == 0
+        # The deferred requests are spread at the rate of the bucket
+        assert limiter.admit() == pytest.approx(0.1)
+        assert limiter.admit() == pytest.approx(0.2)
+    with patch("time.monotonic", MagicMock(return_value=100.15)):
+        assert limiter.admit() == 0
+        assert limiter.admit() == pytest.approx(0.15)
+
+
+def test_auth_cache(server, pki_dir, minion_key):
+    key_path, pub = minion_key
+    _accept(pki_dir, pub)
+    load = {"cmd": "_auth", "id": "minion", "pub": pub}
+    ret = server._auth(load)
+    assert ret["enc"] == "pub"
+    aes = salt.master.SMaster.secrets["aes"]["secret"].value
+    key = salt.crypt.get_rsa_key(key_path, None)
+    if auth.HAS_M2:
+        assert key.private_decrypt(ret["aes"], auth.RSA.pkcs1_oaep_padding) == aes
+    else:
+        assert auth.PKCS1_OAEP.new(key).decrypt(ret["aes"]) == aes
+
+    # The reply is reused until the AES key is rotated
+    with patch("salt.crypt.private_encrypt", MagicMock()) as private_encrypt:
+        again = server._auth(load)
+    private_encrypt.assert_not_called()
+    assert again["aes"] == ret["aes"]
+    assert again["sig"] == ret["sig"]
+
+    salt.master.SMaster.secrets["aes"]["secret"].value = b"rotated"
+    try:
+        rotated = server._auth(load)
+    finally:
+        salt.master.SMaster.secrets["aes"]["secret"].value = aes
+    assert rotated["aes"] != ret["aes"]
+
+    # A different key for the same id is still denied
+    ret = server._auth(dict(load, pub=pub.replace("A", "B", 1)))
+    assert ret == {"enc": "clear", "load": {"ret": False}}
+    assert (pki_dir / "minions_denied" / "minion").exists()
+
+
+def test_auth_rate_limit(server, pki_dir, minion_key):
+    _accept(pki_dir, minion_key[1])
+    server.auth_limiter = auth.AuthRateLimiter(1)
+    load = {"cmd": "_auth", "id": "minion", "pub": minion_key[1], "auth_busy": True}
+    assert server._auth(load)["enc"] == "pub"
+    ret = server._auth(load)
+    assert ret["load"]["ret"] == "busy"
+    assert 0 < ret["load"]["retry_after"] <= 1
+
+    # Minions not advertising the busy reply get the reply of a pending key
+    load.pop("auth_busy")
+    assert server._auth(load) == {"enc": "clear", "load": {"ret": True}}
@@ -4,13 +4,16 @@
 
 import hashlib
 
+import pytest
 import salt.config
 import salt.exceptions
 import salt.ext.tornado.gen
 import salt.ext.tornado.ioloop
 import salt.log.setup
+import salt.payload
 import salt.transport.client
 import salt.transport.server
+import salt.transport.zeromq
 import salt.utils.platform
 import salt.utils.process
 import salt.utils.stringutils
@@ -251,3 +254,70 @@ def test_zeromq_async_pub_channel_filtering_decode_message(
             res = channel._decode_messages(message)
 
     assert res.result()["enc"] == "aes"
+
+
+@pytest.fixture
+def pub_server_opts(tmp_path):
+    pki_dir = tmp_path / "pki"
+    (pki_dir / "minions").mkdir(parents=True)
+    for minion_id in ("minion1", "minion2"):
+        (pki_dir / "minions" / minion_id).write_text("")
+    opts = salt.config.DEFAULT_MASTER_OPTS.copy()
+    opts.update({"pki_dir": str(pki_dir), "cachedir": str(tmp_path / "cache")},)
+    return opts
+
+
+def _package(**kwargs):
+    return salt.payload.Serial({}).dumps(kwargs)
+
+
+def test_pub_server_publish_package_unfiltered(pub_server_opts):
+    channel = salt.transport.zeromq.ZeroMQPubServerChannel(pub_server_opts)
+    pub_sock = MagicMock()
+    channel._publish_package(pub_sock, _package(payload=b"\xff\x00data"))
+    pub_sock.send.assert_called_once_with(b"\xff\x00data")
+
+
+def test_pub_server_publish_package_broadcast(pub_server_opts):
+    pub_server_opts["zmq_filtering"] = True
+    channel = salt.transport.zeromq.ZeroMQPubServerChannel(pub_server_opts)
+    pub_sock = MagicMock()
+    channel._publish_package(pub_sock, _package(payload=b"data"))
+    pub_sock.send_multipart.assert_called_once_with([b"broadcast", b"data"])
+
+
+def test_pub_server_publish_package_topics(pub_server_opts):
+    pub_server_opts["zmq_filtering"] = True
+    pub_server_opts["order_masters"] = True
+    channel = salt.transport.zeromq.ZeroMQPubServerChannel(pub_server_opts)
+    pub_sock = MagicMock()
+    channel._publish_package(
+        pub_sock,
+        _package(payload=b"\xff\x00data", topic_lst=["minion1", "other", "mïnion"]),
+    )
+    topics = []
+    for args, kwargs in pub_sock.send_multipart.call_args_list:
+        htopic, frame = args[0]
+        assert kwargs == {"copy": False}
+        assert frame.bytes == b"\xff\x00data"
+        topics.append(htopic)
+    assert topics == [
+        salt.utils.stringutils.to_bytes(
+            hashlib.sha1(salt.utils.stringutils.to_bytes(topic)).hexdigest()
+        )
+        for topic in ("minion1", "other", "mïnion")
+    ] + [b"syndic"]
+
+
+def test_pub_server_refresh_topic_hashes(pub_server_opts):
+    channel = salt.transport.zeromq.ZeroMQPubServerChannel(pub_server_opts)
+    channel.refresh_topic_hashes()
+    assert sorted(channel._topic_hashes) == [b"minion1", b"minion2"]
+    assert channel._topic_hashes[b"minion1"] == salt.utils.stringutils.to_bytes(
+        hashlib.sha1(b"minion1").hexdigest()
+    )
+    # Nothing is recomputed until the accepted keys change
+    with patch("salt.transport.zeromq._topic_hash") as topic_hash:
+        channel.refresh_topic_hashes()
+        channel.topic_hash(b"minion2")
+    topic_hash.assert_not_called()
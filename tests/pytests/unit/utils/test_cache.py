@@ -219,3 +219,67 @@ def test_everything(tmp_path):
     time.sleep(0.5)
     assert "foo" not in cd
     assert "foo" not in cd2
+
+
+def test_disk_log(tmp_path):
+    """
+    Make sure the log based disk cache can add, update, remove and expire
+    entries, and that other instances see the changes
+    """
+    path = str(tmp_path / "cachedir")
+
+    cd = cache.CacheDiskLog(0.3, path)
+    assert isinstance(cd, cache.CacheDisk)
+    assert "foo" not in cd
+    cd["foo"] = "bar"
+    cd["none"] = None
+    cd2 = cache.CacheDiskLog(0.3, path)
+    assert cd2["foo"] == "bar"
+    assert "none" in cd2
+    assert cd2["none"] is None
+    assert cd2._dict == {"foo": "bar", "none": None}
+
+    # Changes made after the log was read are picked up
+    cd["foo"] = {None: ["baz"]}
+    del cd["none"]
+    assert cd2["foo"] == {None: ["baz"]}
+    assert "none" not in cd2
+    with pytest.raises(KeyError):
+        del cd2["none"]
+
+    # test ttl
+    time.sleep(0.5)
+    assert "foo" not in cd
+    assert "foo" not in cache.CacheDiskLog(0.3, path)
+
+    cd["foo"] = "bar"
+    cd.clear()
+    assert "foo" not in cd2
+
+
+def test_disk_log_compact(tmp_path):
+    """
+    Make sure the log is compacted once most of it is no longer used
+    """
+    path = tmp_path / "cachedir"
+    cd = cache.CacheDiskLog(3600, str(path))
+    for idx in range(1000):
+        cd["foo"] = "x" * 100
+        cd["bar"] = idx
+    assert path.stat().st_size < cache.CacheDiskLog.COMPACT_MIN_SIZE * 2
+    cd2 = cache.CacheDiskLog(3600, str(path))
+    assert cd2["bar"] == 999
+    assert cd2["foo"] == "x" * 100
+
+
+def test_disk_log_convert(tmp_path):
+    """
+    Make sure files written by CacheDisk are converted to a log
+    """
+    path = tmp_path / "cachedir"
+    cd = cache.CacheDisk(3600, str(path))
+    cd["foo"] = {"bar": [1, 2]}
+    cd2 = cache.CacheDiskLog(3600, str(path))
+    assert cd2["foo"] == {"bar": [1, 2]}
+    assert path.read_bytes().startswith(cache.CacheDiskLog.MAGIC)
+    assert cache.CacheDiskLog(3600, str(path))["foo"] == {"bar": [1, 2]}
@@ -0,0 +1,91 @@
+import io
+import random
+
+import pytest
+import salt.utils.filedelta
+
+BLOCK_SIZE = 64
+
+
+@pytest.fixture
+def old():
+    rand = random.Random(42)
+    return bytes(rand.getrandbits(8) for _ in range(BLOCK_SIZE * 20 + 17))
+
+
+def _roundtrip(tmp_path, old, new, size=BLOCK_SIZE):
+    basis = tmp_path / "basis"
+    basis.write_bytes(old)
+    sig = salt.utils.filedelta.signature(str(basis), size)
+    ops = salt.utils.filedelta.delta(new, sig, size)
+    out = io.BytesIO()
+    with basis.open("rb") as fp_:
+        salt.utils.filedelta.patch(fp_, ops, size, out)
+    assert out.getvalue() == new
+    return ops
+
+
+def _literal(ops):
+    return sum(len(op) for op in ops if isinstance(op, bytes))
+
+
+def test_unchanged(tmp_path, old):
+    ops = _roundtrip(tmp_path, old, old)
+    assert ops == list(range(21))
+
+
+@pytest.mark.parametrize(
+    "edit",
+    [
+        lambda data: data[:100] + b"inserted" + data[100:],
+        lambda data: data[:100] + data[140:],
+        lambda data: data[:500] + b"XXXX" + data[504:],
+        lambda data: b"prefix" + data,
+        lambda data: data + b"suffix",
+        lambda data: data[:-17],
+        lambda data: data[BLOCK_SIZE * 3 :] + data[: BLOCK_SIZE * 3],
+    ],
+)
+def test_edits(tmp_path, old, edit):
+    new = edit(old)
+    ops = _roundtrip(tmp_path, old, new)
+    assert _literal(ops) < 2 * BLOCK_SIZE
+
+
+@pytest.mark.parametrize(
+    "new", [b"", b"short", b"x" * BLOCK_SIZE, b"x" * (BLOCK_SIZE * 3 + 1)]
+)
+def test_unrelated(tmp_path, old, new):
+    _roundtrip(tmp_path, old, new)
+
+
+def test_empty_basis(tmp_path, old):
+    ops = _roundtrip(tmp_path, b"", old)
+    assert ops == [old]
+
+
+def test_max_literal(tmp_path, old):
+    basis = tmp_path / "basis"
+    basis.write_bytes(old)
+    sig = salt.utils.filedelta.signature(str(basis), BLOCK_SIZE)
+    new = old[: len(old) // 2] + bytes(len(old) // 2)
+    assert salt.utils.filedelta.delta(new, sig, BLOCK_SIZE, max_literal=100) is None
+    assert salt.utils.filedelta.delta(new, sig, BLOCK_SIZE) is not None
+
+
+def test_max_literal_default(tmp_path, old):
+    basis = tmp_path / "basis"
+    basis.write_bytes(old)
+    sig = salt.utils.filedelta.signature(str(basis), BLOCK_SIZE)
+    # Large files with little in common with the old copy are given up on
+    new = old + bytes(salt.utils.filedelta.MAX_LITERAL + 1)
+    assert salt.utils.filedelta.delta(new, sig, BLOCK_SIZE) is None
+    assert salt.utils.filedelta.delta(new, sig, BLOCK_SIZE, max_literal=None)
+
+
+@pytest.mark.parametrize(
+    "size,expected",
+    [(0, 2048), (10 * 1024 ** 2, 3072), (100 * 1024 ** 2, 10240), (2 ** 40, 131072)],
+)
+def test_block_size(size, expected):
+    assert salt.utils.filedelta.block_size(size) == expected
@@ -0,0 +1,205 @@
+import pytest
+import salt.cache
+import salt.config
+import salt.utils.data
+import salt.utils.minion_index
+import salt.utils.minions
+from salt._compat import ipaddress
+
+MINION_DATA = {
+    "web1": {
+        "grains": {
+            "os": "Ubuntu",
+            "roles": ["web", "db"],
+            "ipv4": ["10.0.0.1", "127.0.0.1"],
+            "ipv6": ["::1"],
+            "nested": {"key": "value", "deep": {"k": "v:w"}},
+            "num": 42,
+        },
+        "pillar": {"env": "prod", "apps": {"nginx": {"port": 80}}},
+    },
+    "web2": {
+        "grains": {
+            "os": "Ubuntu",
+            "roles": ["web"],
+            "ipv4": ["10.0.1.1"],
+            "ipv6": ["fe80::1"],
+            "nested": {"key": "other"},
+            "num": 43,
+        },
+        "pillar": {"env": "dev"},
+    },
+    "db1": {
+        "grains": {
+            "os": "CentOS",
+            "roles": ["db"],
+            "ipv4": ["192.168.1.5"],
+            "nested": {"key": "value"},
+            "list_of_dicts": [{"a": "b"}],
+        },
+        "pillar": {"env": "prod", "apps": {"postgres": {"port": 5432}}},
+    },
+}
+
+EXPRESSIONS = [
+    "os:Ubuntu",
+    "os:ubuntu",
+    "os:Ubu*",
+    "os:*",
+    "roles:db",
+    "roles:w?b",
+    "nested:key:value",
+    "nested:deep:k:v:w",
+    "nested:key",
+    "nested:*:value",
+    "num:42",
+    "list_of_dicts:a:b",
+    "list_of_dicts:a",
+    "missing:foo",
+    "*:Ubuntu",
+    "os",
+]
+
+
+@pytest.fixture
+def opts(tmp_path):
+    cachedir = tmp_path / "cache"
+    pki_dir = tmp_path / "pki"
+    (pki_dir / "minions").mkdir(parents=True)
+    for minion_id in list(MINION_DATA) + ["nodata"]:
+        (pki_dir / "minions" / minion_id).write_text("")
+    opts = salt.config.DEFAULT_MASTER_OPTS.copy()
+    opts.update(
+        {
+            "cachedir": str(cachedir),
+            "pki_dir": str(pki_dir),
+            "minion_data_cache": True,
+            "minion_data_index": True,
+        }
+    )
+    return opts
+
+
+@pytest.fixture
+def cache(opts):
+    cache = salt.cache.factory(opts)
+    for minion_id, data in MINION_DATA.items():
+        cache.store("minions/{}".format(minion_id), "data", data)
+    return cache
+
+
+@pytest.fixture
+def index(opts, cache):
+    index = salt.utils.minion_index.MinionDataIndex(opts, cache=cache)
+    index.rebuild()
+    return index
+
+
+def _scan(search_type, expr, **kwargs):
+    return {
+        minion_id
+        for minion_id, data in MINION_DATA.items()
+        if salt.utils.data.subdict_match(data.get(search_type), expr, **kwargs)
+    }
+
+
+@pytest.mark.parametrize("expr", EXPRESSIONS)
+def test_match_grains(index, expr):
+    assert index.match(expr) == _scan("grains", expr)
+    assert index.match(expr, regex_match=True) == _scan(
+        "grains", expr, regex_match=True
+    )
+
+
+@pytest.mark.parametrize("expr", ["env:prod", "apps:nginx:port:80", "apps:*:port:80"])
+def test_match_pillar(index, expr):
+    assert index.match(expr, search_type="pillar") == _scan("pillar", expr)
+    assert index.match(expr, search_type="pillar", exact_match=True) == _scan(
+        "pillar", expr, exact_match=True
+    )
+
+
+def test_match_custom_delimiter(index):
+    assert index.match("nested|key|value", delimiter="|") == {"web1", "db1"}
+
+
+def test_stats(index):
+    index.match("os:Ubuntu")
+    index.match("*:Ubuntu")
+    assert index.stats["rebuilds"] == 1
+    assert index.stats["hits"] == 1
+    assert index.stats["misses"] == 1
+
+
+@pytest.mark.parametrize(
+    "tgt,expected",
+    [
+        ("10.0.0.0/8", {"web1", "web2"}),
+        ("10.0.0.0/24", {"web1"}),
+        ("10.0.1.1", {"web2"}),
+        ("192.168.0.0/16", {"db1"}),
+        ("172.16.0.0/12", set()),
+        ("::1", {"web1"}),
+        ("fe80::/10", {"web2"}),
+    ],
+)
+def test_match_ipcidr(index, tgt, expected):
+    try:
+        tgt = ipaddress.ip_address(tgt)
+    except ValueError:
+        tgt = ipaddress.ip_network(tgt)
+    assert index.match_ipcidr(tgt) == expected
+
+
+def test_update(index):
+    data = {"grains": {"os": "Debian", "ipv4": ["10.0.0.9"]}, "pillar": {}}
+    index.update("web2", data)
+    assert index.match("os:Ubuntu") == {"web1"}
+    assert index.match("os:Debian") == {"web2"}
+    assert index.match_ipcidr(ipaddress.ip_network("10.0.0.0/24")) == {
+        "web1",
+        "web2",
+    }
+    index.update("web2", None)
+    assert "web2" not in index
+    assert index.match("os:Debian") == set()
+    assert index.stats["updates"] == 2
+
+
+def test_refresh(index, cache):
+    cache.store(
+        "minions/new", "data", {"grains": {"os": "Ubuntu"}, "pillar": {}},
+    )
+    cache.flush("minions/db1")
+    index.refresh()
+    assert index.minions() == {"web1", "web2", "new"}
+    assert index.match("os:Ubuntu") == {"web1", "web2", "new"}
+    assert index.stats["refreshes"] == 1
+
+
+@pytest.mark.parametrize(
+    "tgt_type,expr",
+    [
+        ("grain", "os:Ubuntu"),
+        ("grain", "roles:db"),
+        ("grain_pcre", "os:(Ubuntu|CentOS)"),
+        ("pillar", "env:prod"),
+        ("pillar_exact", "env:prod"),
+        ("ipcidr", "10.0.0.0/8"),
+        ("ipcidr", "192.168.1.5"),
+    ],
+)
+@pytest.mark.parametrize("greedy", [True, False])
+def test_check_minions_with_index(opts, cache, tgt_type, expr, greedy):
+    salt.utils.minion_index._INDEXES.clear()
+    try:
+        with_index = salt.utils.minions.CkMinions(opts).check_minions(
+            expr, tgt_type, greedy=greedy
+        )
+        expected = salt.utils.minions.CkMinions(
+            dict(opts, minion_data_index=False)
+        ).check_minions(expr, tgt_type, greedy=greedy)
+        assert sorted(with_index["minions"]) == sorted(expected["minions"])
+        assert salt.utils.minion_index.stats(opts)["rebuilds"] == 1
+    finally:
+        salt.utils.minion_index._INDEXES.clear()
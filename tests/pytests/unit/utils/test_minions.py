@@ -1,3 +1,7 @@
+import pytest
+import salt.cache
+import salt.config
+import salt.utils.minion_index
 import salt.utils.minions
 import salt.utils.network
 from tests.support.mock import patch
@@ -20,3 +24,122 @@ def test_connected_ids():
         with patch_net, patch_list, patch_fetch:
             ret = ckminions.connected_ids()
             assert ret == {minion}
+
+
+@pytest.fixture
+def compound_opts(tmp_path):
+    pki_dir = tmp_path / "pki"
+    (pki_dir / "minions").mkdir(parents=True)
+    opts = salt.config.DEFAULT_MASTER_OPTS.copy()
+    opts.update(
+        {
+            "cachedir": str(tmp_path / "cache"),
+            "pki_dir": str(pki_dir),
+            "minion_data_cache": True,
+            "nodegroups": {
+                "webs": "G@os:Ubuntu and web*",
+                "all": ["L@db1,db2", "or", "N@webs"],
+            },
+        }
+    )
+    cache = salt.cache.factory(opts)
+    for minion_id, os_ in (("web1", "Ubuntu"), ("web2", "CentOS"), ("db1", "CentOS")):
+        (pki_dir / "minions" / minion_id).write_text("")
+        cache.store(
+            "minions/{}".format(minion_id),
+            "data",
+            {"grains": {"os": os_}, "pillar": {"role": minion_id[:-1]}},
+        )
+    return opts
+
+
+def test_compile_compound():
+    compiled = salt.utils.minions.compile_compound("web* or G@os:Ubuntu and not L@db1")
+    assert compiled.oper == "or"
+    glob, and_ = compiled.children
+    assert (glob.engine, glob.pattern) == (None, "web*")
+    assert and_.oper == "and"
+    assert and_.cost == 2
+    grain, not_ = and_.children
+    assert (grain.engine, grain.pattern, grain.delimiter) == ("G", "os:Ubuntu", None)
+    assert not_.oper == "not"
+    assert not_.children[0].engine == "L"
+    # Negated lists do not report missing minions
+    assert compiled.list_terms == []
+
+
+def test_compile_compound_nodegroups():
+    nodegroups = {"webs": "G@os:Ubuntu and web*", "all": ["L@db1", "or", "N@webs"]}
+    compiled = salt.utils.minions.compile_compound("N@all", nodegroups)
+    assert compiled.oper == "or"
+    assert compiled.children[0].pattern == "db1"
+    assert compiled.children[1].oper == "and"
+    assert len(compiled.list_terms) == 1
+
+
+@pytest.mark.parametrize(
+    "expr",
+    ["", "and web1", "web1 )", "( and web1 )", "web1 web2", "web1 or not", "web1 and"],
+)
+def test_compile_compound_invalid(expr):
+    assert salt.utils.minions.compile_compound(expr) is None
+
+
+@pytest.mark.parametrize(
+    "expr,minions,missing",
+    [
+        ("web*", ["web1", "web2"], []),
+        ("G@os:CentOS and not web2", ["db1"], []),
+        ("G@os:CentOS and ( web* or L@db1,db9 )", ["db1", "web2"], ["db9"]),
+        ("web1 not G@os:Ubuntu", [], []),
+        ("not L@db1,db9", ["web1", "web2"], []),
+        ("( I@role:db or G@os:Ubuntu", ["db1", "web1"], []),
+        ("N@all", ["db1", "web1"], ["db2"]),
+        ("web1 )", [], []),
+    ],
+)
+def test_check_compound_minions(compound_opts, expr, minions, missing):
+    ckminions = salt.utils.minions.CkMinions(compound_opts)
+    ret = ckminions.check_minions(expr, "compound")
+    assert sorted(ret["minions"]) == minions
+    assert sorted(ret["missing"]) == missing
+
+
+def test_check_nodegroup_minions(compound_opts):
+    ckminions = salt.utils.minions.CkMinions(compound_opts)
+    assert ckminions.check_minions("webs", "nodegroup")["minions"] == ["web1"]
+    assert ("N@webs",) in ckminions._compiled_compounds
+
+
+def test_compound_short_circuit(compound_opts):
+    ckminions = salt.utils.minions.CkMinions(compound_opts)
+    with patch.object(
+        ckminions, "_check_grain_minions", wraps=ckminions._check_grain_minions
+    ) as grain_check:
+        ret = ckminions.check_minions("G@os:Ubuntu and L@nope", "compound")
+    assert ret["minions"] == []
+    assert ret["missing"] == ["nope"]
+    grain_check.assert_not_called()
+
+
+def test_compound_term_cache(compound_opts):
+    compound_opts["minion_data_index"] = True
+    ckminions = salt.utils.minions.CkMinions(compound_opts)
+    salt.utils.minion_index._INDEXES.clear()
+    try:
+        with patch.object(
+            ckminions, "_check_grain_minions", wraps=ckminions._check_grain_minions
+        ) as grain_check:
+            for _ in range(3):
+                ret = ckminions.check_minions("G@os:CentOS and web*", "compound")
+                assert ret["minions"] == ["web2"]
+            assert grain_check.call_count == 1
+            # A change of the minion data invalidates the memoized results
+            salt.utils.minion_index.update(
+                compound_opts, "web1", {"grains": {"os": "CentOS"}, "pillar": {}}
+            )
+            ret = ckminions.check_minions("G@os:CentOS and web*", "compound")
+            assert sorted(ret["minions"]) == ["web1", "web2"]
+            assert grain_check.call_count == 2
+    finally:
+        salt.utils.minion_index._INDEXES.clear()
@@ -1,3 +1,6 @@
+import fnmatch
+import os
+
 import pytest
 import salt.utils.data
 import salt.utils.reactor as reactor
@@ -68,3 +71,99 @@ def test_run_master_reactor(master_config, master_reactor):
                 master_reactor.run()
                 calls = [call(9)]
                 os_nice_mock.assert_has_calls(calls)
+
+
+@pytest.mark.skip_on_windows(reason="Reactors unavailable on Windows")
+def test_filter_events(master_config, master_reactor):
+    """
+    Ensure that the reactor only subscribes to the events of its reactor map
+    """
+    event = MagicMock()
+    reactor = [{"salt/minion/*/start": ["/srv/reactor/start.sls"]}]
+    with patch.dict(master_config, {"reactor": reactor}):
+        master_reactor.filter_events(event)
+    event.filter_tags.assert_called_once_with(
+        ["*salt/reactors/manage*", "salt/minion/*/start"]
+    )
+
+    # A reactor map read from a file can change at any time
+    event = MagicMock()
+    with patch.dict(master_config, {"reactor": "/srv/reactor.conf"}):
+        master_reactor.filter_events(event)
+    event.filter_tags.assert_not_called()
+
+
+def test_reactor_map():
+    """
+    Ensure that the compiled reactor map matches like fnmatch does, in the
+    order of the map
+    """
+    react_map = [
+        {"salt/minion/*/start": ["/srv/reactor/start.sls"]},
+        {"salt/job/*/ret/*": "/srv/reactor/ret.sls"},
+        {"salt/minion/minion1/start": ["/srv/reactor/minion1.sls"]},
+        {"*/start": "/srv/reactor/any_start.sls"},
+        {"salt/key": ["/srv/reactor/key.sls"]},
+        {"salt/[ab]uth": ["/srv/reactor/auth.sls"]},
+        {"salt/k?y": ["/srv/reactor/key2.sls"]},
+        {"ignored": {"not": "a list"}},
+        {"two": "keys", "in": "one entry"},
+        "not a dict",
+    ]
+    tags = [
+        "salt/minion/minion1/start",
+        "salt/minion/minion2/start",
+        "salt/job/20210101/ret/minion1",
+        "salt/key",
+        "salt/auth",
+        "salt/kay",
+        "salt/minion",
+        "ignored",
+        "",
+    ]
+    compiled = reactor.ReactorMap(react_map)
+    for tag in tags:
+        expected = []
+        for ropt in react_map:
+            if isinstance(ropt, dict) and len(ropt) == 1:
+                key, val = next(iter(ropt.items()))
+                if fnmatch.fnmatch(tag, key) and isinstance(val, (str, list)):
+                    expected.extend([val] if isinstance(val, str) else val)
+        assert compiled.match(tag) == expected, tag
+    assert compiled.match("salt/minion/minion1/start") == [
+        "/srv/reactor/start.sls",
+        "/srv/reactor/minion1.sls",
+        "/srv/reactor/any_start.sls",
+    ]
+
+
+@pytest.mark.skip_on_windows(reason="Reactors unavailable on Windows")
+def test_list_reactors_compiled_once(master_config, master_reactor, tmp_path):
+    """
+    Ensure that the reactor map is only compiled again when it changes
+    """
+    reactor_map = [{"salt/key": ["/srv/reactor/key.sls"]}]
+    with patch.dict(master_config, {"reactor": reactor_map}):
+        assert master_reactor.list_reactors("salt/key") == ["/srv/reactor/key.sls"]
+        with patch.object(reactor, "ReactorMap", MagicMock()) as compile_map:
+            master_reactor.list_reactors("salt/key")
+        compile_map.assert_not_called()
+
+        master_reactor.minion.opts["reactor"] = reactor_map
+        master_reactor.add_reactor("salt/auth", ["/srv/reactor/auth.sls"])
+        assert master_reactor.list_reactors("salt/auth") == ["/srv/reactor/auth.sls"]
+
+    path = tmp_path / "reactor.conf"
+    path.write_text("- salt/key:\n  - /srv/reactor/key.sls\n")
+    with patch.dict(master_config, {"reactor": str(path)}):
+        assert master_reactor.list_reactors("salt/key") == ["/srv/reactor/key.sls"]
+        with patch("salt.utils.files.fopen", MagicMock()) as fopen:
+            master_reactor.list_reactors("salt/key")
+        fopen.assert_not_called()
+
+        path.write_text("- salt/key:\n  - /srv/reactor/new_key.sls\n")
+        os.utime(str(path), (0, 0))
+        assert master_reactor.list_reactors("salt/key") == ["/srv/reactor/new_key.sls"]
+
+        path.unlink()
+        assert master_reactor.list_reactors("salt/key") == []
@@ -1,3 +1,6 @@
+import os
+import tarfile
+
 import pytest
 import salt.exceptions
 import salt.utils.stringutils
@@ -76,3 +79,53 @@ def test_get_ext_tops(version):
     else:
         assert not [x for x in ret["namespace"]["dependencies"] if "distro" in x]
         assert [x for x in ret["namespace"]["dependencies"] if "msgpack" in x]
+
+
+def test_gen_thin_chunks(tmpdir):
+    """
+    Tests the thin chunks are only packed again when their content changed
+    """
+    pkg = tmpdir.join("lib", "fakepkg")
+    pkg.join("__init__.py").write("VERSION = 1\n", ensure=True)
+    pkg.join("sub", "mod.py").write("def func():\n    pass\n", ensure=True)
+    single = tmpdir.join("lib", "fakemod.py")
+    single.write("VALUE = True\n")
+    cachedir = tmpdir.join("cache").strpath
+    tops = [pkg.strpath, single.strpath]
+
+    with patch("salt.utils.thin.get_tops", MagicMock(return_value=tops)):
+        manifest = salt.utils.thin.gen_thin_chunks(cachedir)
+        assert len(manifest["chunks"]) == 3
+        with patch(
+            "salt.utils.thin._get_thin_chunk_digest",
+            MagicMock(wraps=salt.utils.thin._get_thin_chunk_digest),
+        ) as digest:
+            assert salt.utils.thin.gen_thin_chunks(cachedir) == manifest
+            # Only the metadata chunk is hashed, the unchanged files are not
+            assert digest.call_count == 1
+        assert salt.utils.thin.thin_chunks(cachedir) == manifest
+
+        pkg.join("__init__.py").write("VERSION = 2\n")
+        os.utime(pkg.join("__init__.py").strpath, (0, 0))
+        updated = salt.utils.thin.gen_thin_chunks(cachedir)
+
+    assert updated["code_checksum"] != manifest["code_checksum"]
+    changed = set(updated["chunks"]) - set(manifest["chunks"])
+    assert len(changed) == 1
+    assert sorted(os.listdir(os.path.join(cachedir, "thin", "chunks"))) == sorted(
+        "{}.tgz".format(digest) for digest in updated["chunks"]
+    )
+
+    bundle = salt.utils.thin.gen_thin_bundle(cachedir, sorted(changed))
+    try:
+        with tarfile.open(bundle) as tfp:
+            assert tfp.getnames() == ["{}.tgz".format(digest) for digest in changed]
+            with tarfile.open(
+                fileobj=tfp.extractfile(tfp.getmembers()[0]), mode="r:gz"
+            ) as chunk:
+                assert sorted(chunk.getnames()) == [
+                    "py3/fakepkg/__init__.py",
+                    "py3/fakepkg/sub/mod.py",
+                ]
+    finally:
+        os.remove(bundle)
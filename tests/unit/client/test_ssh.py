@@ -201,6 +201,49 @@ class SSHSingleTests(TestCase):
             "-o User=root  date +%s",
         )
 
+    def test_single_opts_multiplex(self):
+        """
+        Test the ssh commands share a persistent connection when ssh_multiplex
+        is enabled
+        """
+        opts = self.opts.copy()
+        opts.update(
+            {"ssh_multiplex": True, "ssh_multiplex_persist": 30, "_ssh_version": (8, 0)}
+        )
+        single = ssh.Single(
+            opts,
+            opts["argv"],
+            "localhost",
+            mods={},
+            fsclient=None,
+            thin=salt.utils.thin.thin_path(opts["cachedir"]),
+            mine=False,
+            **self.target
+        )
+
+        control_dir = os.path.join(self.tmp_cachedir, "ssh_mux")
+        mux_opts = (
+            "-o ControlMaster=auto "
+            "-o ControlPath={} "
+            "-o ControlPersist=30 ".format(os.path.join(control_dir, "%C"))
+        )
+        self.assertEqual(
+            single.shell._cmd_str("date +%s"),
+            "ssh login1 "
+            "-o KbdInteractiveAuthentication=no -o "
+            "PasswordAuthentication=yes -o GSSAPIAuthentication=no "
+            "-o ConnectTimeout=65 -o Port=22 "
+            "-o IdentityFile=/etc/salt/pki/master/ssh/salt-ssh.rsa "
+            "-o User=root " + mux_opts + " date +%s",
+        )
+        self.assertIn(mux_opts, single.shell._cmd_str("/tmp/thin", ssh="scp"))
+        self.assertTrue(os.path.isdir(control_dir))
+
+        single.shell.priv = single.shell.passwd = None
+        self.assertEqual(
+            single.shell._cmd_str("date +%s"), "ssh login1 " + mux_opts + " date +%s"
+        )
+
     def test_run_with_pre_flight(self):
         """
         test Single.run() when ssh_pre_flight is set
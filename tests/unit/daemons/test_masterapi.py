@@ -1,5 +1,7 @@
 import io
+import shutil
 import stat
+import tempfile
 from functools import wraps
 
 import pytest
@@ -986,3 +988,83 @@ class RemoteFuncsTestCase(TestCase):
                 }
             )
         self.assertDictEqual(ret, {})
+
+    @pytest.mark.slow_test
+    def test_mine_index(self):
+        """
+        Asserts that with the ``mine_index`` enabled the mine data is moved to
+        and served from the index, and that callers passing a generation only
+        get the mine data changed since.
+        """
+        cachedir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cachedir, ignore_errors=True)
+        self.funcs.opts.update({"cachedir": cachedir, "mine_index": True})
+        self.funcs.cache = salt.cache.Cache(self.funcs.opts)
+        self.funcs.cache.store(
+            "minions/webserver", "mine", {"ip_addr": "2001:db8::1:3"}
+        )
+        self.assertTrue(
+            self.funcs._mine({"id": "webserver", "data": {"ip4_addr": "127.0.0.1"}})
+        )
+        self.assertTrue(
+            self.funcs._mine({"id": "dbserver", "data": {"ip4_addr": "127.0.0.2"}})
+        )
+        self.assertFalse(self.funcs.cache.contains("minions/webserver", "mine"))
+        self.assertEqual(
+            sorted(salt.utils.mine.list_index_functions(self.funcs.cache)),
+            ["ip4_addr", "ip_addr"],
+        )
+
+        load = {
+            "id": "requester_minion",
+            "tgt": "*server",
+            "fun": "ip4_addr",
+            "tgt_type": "glob",
+        }
+        with patch(
+            "salt.utils.minions.CkMinions._check_glob_minions",
+            MagicMock(
+                return_value={"minions": ["webserver", "dbserver"], "missing": []}
+            ),
+        ):
+            self.assertDictEqual(
+                self.funcs._mine_get(dict(load)),
+                {"webserver": "127.0.0.1", "dbserver": "127.0.0.2"},
+            )
+            ret = self.funcs._mine_get(dict(load, generation=0))
+            self.assertDictEqual(
+                ret["data"], {"webserver": "127.0.0.1", "dbserver": "127.0.0.2"}
+            )
+            self.assertEqual(sorted(ret["minions"]), ["dbserver", "webserver"])
+
+            # Only the changed mine data is returned, the generation returned
+            # being set back by the grace period
+            generation = salt.utils.mine.generation()
+            self.funcs._mine(
+                {"id": "dbserver", "data": {"ip4_addr": "127.0.0.3"}, "clear": True}
+            )
+            self.funcs._mine({"id": "webserver", "data": {"ip4_addr": "127.0.0.1"}})
+            ret = self.funcs._mine_get(dict(load, generation=generation))
+            self.assertDictEqual(ret["data"], {"dbserver": "127.0.0.3"})
+            self.assertEqual(sorted(ret["minions"]), ["dbserver", "webserver"])
+            self.assertLess(ret["generation"], salt.utils.mine.generation())
+
+            # The entries of a mine function which did not change are not read
+            generation = salt.utils.mine.generation()
+            with patch("salt.utils.mine.fetch_index") as fetch_index:
+                ret = self.funcs._mine_get(dict(load, generation=generation))
+            fetch_index.assert_not_called()
+            self.assertDictEqual(ret["data"], {})
+            self.assertEqual(sorted(ret["minions"]), ["dbserver", "webserver"])
+
+            self.assertTrue(
+                self.funcs._mine_delete({"id": "webserver", "fun": "ip4_addr"})
+            )
+            ret = self.funcs._mine_get(dict(load, generation=generation))
+            self.assertEqual(ret["minions"], ["dbserver"])
+            self.assertTrue(self.funcs._mine_flush({"id": "dbserver"}))
+            self.assertDictEqual(self.funcs._mine_get(dict(load)), {})
+        self.assertDictEqual(
+            salt.utils.mine.fetch_mine(self.funcs.cache, self.funcs.opts, "webserver"),
+            {"ip_addr": "2001:db8::1:3"},
+        )
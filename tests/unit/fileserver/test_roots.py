@@ -8,9 +8,11 @@ import pathlib
 import shutil
 import tempfile
 import textwrap
+import time
 
 import salt.fileclient
 import salt.fileserver.roots as roots
+import salt.utils.filedelta
 import salt.utils.files
 import salt.utils.hashutils
 import salt.utils.platform
@@ -86,6 +88,53 @@ class RootsTest(TestCase, AdaptedConfigurationTestCaseMixin, LoaderModuleMockMix
 
             self.assertDictEqual(ret, {"data": data, "dest": "testfile"})
 
+    def test_serve_file_window(self):
+        opts = {"file_buffer_size": 8, "file_stream_max_window": 4}
+        with patch.dict(roots.__opts__, opts):
+            load = {
+                "saltenv": "base",
+                "path": str(self.tmp_dir / "testfile"),
+                "loc": 8,
+                "window": 16,
+            }
+            fnd = {"path": str(self.tmp_dir / "testfile"), "rel": "testfile"}
+            ret = roots.serve_file(load, fnd)
+
+            with salt.utils.files.fopen(
+                os.path.join(RUNTIME_VARS.BASE_FILES, "testfile"), "rb"
+            ) as fp_:
+                data = fp_.read()
+
+            self.assertDictEqual(ret, {"data": data[8:40], "dest": "testfile"})
+
+    def test_serve_file_delta(self):
+        data = os.urandom(8192)
+        path = self.tmp_dir / "deltafile"
+        basis = self.tmp_dir / "basis"
+        with salt.utils.files.fopen(str(path), "wb") as fp_:
+            fp_.write(data)
+        with salt.utils.files.fopen(str(basis), "wb") as fp_:
+            fp_.write(data[:2048] + bytes(2048) + data[4096:])
+        self.addCleanup(os.remove, str(path))
+        self.addCleanup(os.remove, str(basis))
+        load = {
+            "saltenv": "base",
+            "path": str(path),
+            "block_size": 2048,
+            "signature": salt.utils.filedelta.signature(str(basis), 2048),
+        }
+        fnd = {"path": str(path), "rel": "deltafile"}
+        with patch.dict(roots.__opts__, {"file_delta_max_size": len(data)}):
+            ret = roots.serve_file_delta(load, fnd)
+        self.assertDictEqual(
+            ret, {"ops": [0, data[2048:4096], 2, 3], "dest": "deltafile"}
+        )
+
+        # Files larger than file_delta_max_size are sent whole
+        with patch.dict(roots.__opts__, {"file_delta_max_size": len(data) - 1}):
+            ret = roots.serve_file_delta(load, fnd)
+        self.assertIsNone(ret["ops"])
+
     def test_envs(self):
         opts = {"file_roots": copy.copy(self.opts["file_roots"])}
         opts["file_roots"][UNICODE_ENVNAME] = opts["file_roots"]["base"]
@@ -166,6 +215,72 @@ class RootsTest(TestCase, AdaptedConfigurationTestCaseMixin, LoaderModuleMockMix
         self.assertIn("top.sls", ret2)
         self.assertIn("dynamo.sls", ret2)
 
+    def test_file_list_index(self):
+        """
+        Test that the file lists from the file list index match the walked
+        ones, and that only the modified directories are listed again
+        """
+        root = pathlib.Path(tempfile.mkdtemp(dir=RUNTIME_VARS.TMP))
+        self.addCleanup(salt.utils.files.rm_rf, str(root))
+        (root / "sub" / "deep").mkdir(parents=True)
+        (root / "empty").mkdir()
+        (root / "top.sls").write_text("")
+        (root / "ignored.swp").write_text("")
+        (root / "sub" / "init.sls").write_text("")
+        (root / "sub" / "deep" / "file.txt").write_text("")
+        if not salt.utils.platform.is_windows():
+            (root / "link.sls").symlink_to(str(root / "top.sls"))
+            (root / "linked").symlink_to(str(root / "sub"))
+        old = time.time() - 3600
+        for path in (root, root / "sub", root / "sub" / "deep", root / "empty"):
+            os.utime(str(path), (old, old))
+        opts = {
+            "file_roots": {"base": [str(root)]},
+            "file_ignore_glob": ["*.swp"],
+            "fileserver_list_cache_time": 0,
+        }
+        self.addCleanup(roots._FILE_LIST_INDEXES.clear)
+
+        def _lists():
+            load = {"saltenv": "base"}
+            return [
+                roots.file_list(load),
+                roots.dir_list(load),
+                roots.file_list_emptydirs(load),
+                roots.symlink_list(load),
+            ]
+
+        with patch.dict(roots.__opts__, opts):
+            walked = _lists()
+            with patch.dict(roots.__opts__, {"fileserver_list_index": True}):
+                self.assertEqual(_lists(), walked)
+                self.assertIn("sub/deep/file.txt", walked[0])
+                self.assertNotIn("ignored.swp", walked[0])
+                self.assertIn("empty", walked[2])
+
+                (root / "sub" / "new.sls").write_text("")
+                (root / "empty" / "file.txt").write_text("")
+                with patch.object(
+                    roots, "_scan_dir", MagicMock(wraps=roots._scan_dir)
+                ) as scan_dir:
+                    ret = _lists()[:3]
+                modified = [str(root / "empty"), str(root / "sub")]
+                if not salt.utils.platform.is_windows():
+                    # The followed symlink to the sub directory
+                    modified.append(str(root / "linked"))
+                self.assertEqual(
+                    sorted({call[0][1] for call in scan_dir.call_args_list}),
+                    sorted(modified),
+                )
+                self.assertIn("sub/new.sls", ret[0])
+                self.assertIn("empty/file.txt", ret[0])
+                self.assertNotIn("empty", ret[2])
+
+                # Another process starts from the index written to the cachedir
+                roots._FILE_LIST_INDEXES.clear()
+                indexed = _lists()
+            self.assertEqual(indexed, _lists())
+
     @skipIf(
         salt.utils.platform.is_windows(),
         "Windows does not support this master function",
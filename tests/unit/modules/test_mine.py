@@ -252,6 +252,29 @@ class MineTestCase(TestCase, LoaderModuleMockMixin):
             )
             self.assertEqual(mine.get("*", "foo.bar", exclude_minion=True), {})
 
+    def test_get_master_generation(self):
+        """
+        Tests the generation-parameter for mine.get
+        """
+        _mine_get_ret = {
+            "generation": 2,
+            "data": {"webserver": "value", "dbserver": "value"},
+            "minions": ["webserver", "dbserver"],
+        }
+        mock_mine_get = MagicMock(return_value=_mine_get_ret)
+        with patch.object(mine, "_mine_get", mock_mine_get), patch.dict(
+            mine.__opts__, {"file_client": "remote", "id": "webserver"}
+        ):
+            self.assertEqual(
+                mine.get("*", "foo.bar", exclude_minion=True, generation=1),
+                {
+                    "generation": 2,
+                    "data": {"dbserver": "value"},
+                    "minions": ["webserver", "dbserver"],
+                },
+            )
+        self.assertEqual(mock_mine_get.call_args[0][0]["generation"], 1)
+
     def test_update_local(self):
         """
         Tests the ``update``-function on the minion's local cache.
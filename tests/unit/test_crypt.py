@@ -1,6 +1,7 @@
 import os
 import shutil
 import tempfile
+import time
 
 import pytest
 import salt.utils.files
@@ -310,6 +311,87 @@ class TestBadCryptodomePubKey(TestCase):
         assert key.can_encrypt()
 
 
+class TestPubKeyCache(TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.test_dir)
+        self.key_path = os.path.join(self.test_dir, "minion")
+        self._write(self.key_path, PUBKEY_DATA)
+
+    def _write(self, path, data):
+        with salt.utils.files.fopen(path, "w") as fd:
+            fd.write(data)
+        # Recently modified keys are not cached
+        mtime = time.time() - crypt.RACY_WINDOW - 1
+        os.utime(path, (mtime, mtime))
+
+    def test_get(self):
+        cache = crypt.PubKeyCache(1)
+        key = cache.get(self.key_path)
+        self.assertIs(cache.get(self.key_path), key)
+        self.assertEqual(cache.stats, {"hits": 1, "misses": 1, "evictions": 0})
+
+        # A replaced key file is read again
+        new_path = os.path.join(self.test_dir, "new")
+        self._write(new_path, TestBadCryptodomePubKey.TEST_KEY)
+        os.rename(new_path, self.key_path)
+        self.assertIsNot(cache.get(self.key_path), key)
+        self.assertEqual(cache.stats["misses"], 2)
+
+        # The least recently used key is dropped
+        other_path = os.path.join(self.test_dir, "other")
+        self._write(other_path, PUBKEY_DATA)
+        cache.get(other_path)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.stats["evictions"], 1)
+
+        # A removed key is not returned
+        os.remove(other_path)
+        self.assertRaises(OSError, cache.get, other_path)
+        self.assertEqual(len(cache), 0)
+
+    def test_get_recent(self):
+        cache = crypt.PubKeyCache(1)
+        with salt.utils.files.fopen(self.key_path, "w") as fd:
+            fd.write(PUBKEY_DATA)
+        key = cache.get(self.key_path)
+        self.assertEqual(len(cache), 0)
+
+        # A key rewritten in place with the same size is read again
+        stat = os.stat(self.key_path)
+        with salt.utils.files.fopen(self.key_path, "w") as fd:
+            fd.write(PUBKEY_DATA)
+        os.utime(self.key_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertIsNot(cache.get(self.key_path), key)
+        self.assertEqual(cache.stats, {"hits": 0, "misses": 2, "evictions": 0})
+
+    def test_get_disabled(self):
+        cache = crypt.PubKeyCache(0)
+        key = cache.get(self.key_path)
+        self.assertIsNot(cache.get(self.key_path), key)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats, {"hits": 0, "misses": 0, "evictions": 0})
+
+    def test_verify_signature(self):
+        cache = crypt.PubKeyCache(10)
+        for _ in range(2):
+            self.assertTrue(
+                crypt.verify_signature(self.key_path, MSG, SIG, cache=cache)
+            )
+        self.assertEqual(cache.stats["hits"], 1)
+
+    def test_pub_key_cache(self):
+        with patch("salt.crypt._PUB_KEY_CACHE", None):
+            self.assertIsNone(crypt.pub_key_cache_stats())
+            cache = crypt.pub_key_cache({"minion_pub_key_cache_size": 10})
+            self.assertIs(crypt.pub_key_cache({"minion_pub_key_cache_size": 10}), cache)
+            cache.get(self.key_path)
+            self.assertEqual(
+                crypt.pub_key_cache_stats(),
+                {"hits": 0, "misses": 1, "evictions": 0, "keys": 1},
+            )
+
+
 class TestM2CryptoRegression47124(TestCase):
 
     SIGNATURE = (
@@ -352,6 +352,89 @@ class FileclientCacheTest(
                 log.debug("content = %s", content)
                 self.assertTrue(saltenv in content)
 
+    def test_get_file_stream_window(self):
+        """
+        Ensure a file is fetched with several chunks per request when
+        file_stream_window is set, capped by file_stream_max_window
+        """
+        patched_opts = {x: y for x, y in self.minion_opts.items()}
+        patched_opts.update(self.MOCKED_OPTS)
+        patched_opts.update(
+            {
+                "file_buffer_size": 4,
+                "file_stream_window": 8,
+                "file_stream_max_window": 4,
+            }
+        )
+
+        with patch.dict(fileclient.__opts__, patched_opts):
+            client = fileclient.get_file_client(fileclient.__opts__, pillar=False)
+            send = MagicMock(side_effect=client.channel.send)
+            with patch.object(client.channel, "send", send):
+                dest = client.cache_file("salt://foo.txt", "base", cachedir=None)
+            with salt.utils.files.fopen(dest) as fp_:
+                content = fp_.read()
+            self.assertEqual(content, "This is a test file in the 'base' saltenv.\n")
+            loads = [
+                call[0][0]
+                for call in send.call_args_list
+                if call[0][0]["cmd"] == "_serve_file"
+            ]
+            self.assertTrue(all(load["window"] == 8 for load in loads))
+            # 16 bytes per request plus the final empty reply
+            self.assertEqual(len(loads), len(content) // 16 + 2)
+
+    def test_get_file_delta(self):
+        """
+        Ensure a changed file is updated with a delta against the cached copy
+        """
+        patched_opts = {x: y for x, y in self.minion_opts.items()}
+        patched_opts.update(self.MOCKED_OPTS)
+        patched_opts.update({"file_delta_sync": True, "file_delta_max_size": 65536})
+        data = os.urandom(16384)
+        path = os.path.join(self.FS_ROOT, "base", "delta.bin")
+        with salt.utils.files.fopen(path, "wb") as fp_:
+            fp_.write(data)
+
+        with patch.dict(fileclient.__opts__, patched_opts):
+            client = fileclient.get_file_client(fileclient.__opts__, pillar=False)
+            dest = client.cache_file("salt://delta.bin", "base")
+            with salt.utils.files.fopen(path, "wb") as fp_:
+                fp_.write(data[:8192] + b"changed" + data[8192:])
+            send = MagicMock(side_effect=client.channel.send)
+            with patch.object(client.channel, "send", send):
+                self.assertEqual(client.cache_file("salt://delta.bin", "base"), dest)
+            cmds = [call[0][0]["cmd"] for call in send.call_args_list]
+            self.assertIn("_serve_file_delta", cmds)
+            self.assertNotIn("_serve_file", cmds)
+            with salt.utils.files.fopen(dest, "rb") as fp_:
+                self.assertEqual(fp_.read(), data[:8192] + b"changed" + data[8192:])
+
+    def test_cache_file_dedup(self):
+        """
+        Ensure identical files cached from different saltenvs share storage
+        """
+        patched_opts = {x: y for x, y in self.minion_opts.items()}
+        patched_opts.update(self.MOCKED_OPTS)
+        patched_opts["file_cache_dedup"] = True
+        for saltenv in SALTENVS:
+            path = os.path.join(self.FS_ROOT, saltenv, "same.txt")
+            with salt.utils.files.fopen(path, "w") as fp_:
+                fp_.write("The same in every saltenv\n")
+
+        with patch.dict(fileclient.__opts__, patched_opts):
+            client = fileclient.get_file_client(fileclient.__opts__, pillar=False)
+            base = client.cache_file("salt://same.txt", "base")
+            send = MagicMock(side_effect=client.channel.send)
+            with patch.object(client.channel, "send", send):
+                dev = client.cache_file("salt://same.txt", "dev")
+            cmds = [call[0][0]["cmd"] for call in send.call_args_list]
+            self.assertNotIn("_serve_file", cmds)
+            self.assertNotEqual(base, dev)
+            self.assertTrue(os.path.samefile(base, dev))
+            with salt.utils.files.fopen(dev) as fp_:
+                self.assertEqual(fp_.read(), "The same in every saltenv\n")
+
     def test_cache_file_with_alternate_cachedir_and_absolute_path(self):
         """
         Ensure file is cached to correct location when an alternate cachedir is
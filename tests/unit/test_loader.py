@@ -16,6 +16,7 @@ import shutil
 import sys
 import tempfile
 import textwrap
+import time
 
 import pytest
 import salt.config
@@ -1679,6 +1680,109 @@ class LoaderLoadCachedGrainsTest(TestCase):
         assert isinstance(osrelease_info, tuple), osrelease_info
 
 
+class LoaderGrainFunctionsTest(TestCase):
+    """
+    Test how the loader runs the grain functions
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.grains_dir = os.path.join(self.tmp_dir, "grains")
+        os.makedirs(self.grains_dir)
+        self.opts = salt.config.minion_config(None)
+        self.opts["cachedir"] = os.path.join(self.tmp_dir, "cache")
+        os.makedirs(self.opts["cachedir"])
+        self.opts["grains_dirs"] = [self.grains_dir]
+
+    def _write_grains(self, name, source):
+        with salt.utils.files.fopen(
+            os.path.join(self.grains_dir, "{}.py".format(name)), "w"
+        ) as fp_:
+            fp_.write(textwrap.dedent(source))
+
+    def _calls(self, name):
+        path = os.path.join(self.tmp_dir, name)
+        if not os.path.exists(path):
+            return 0
+        with salt.utils.files.fopen(path) as fp_:
+            return len(fp_.read())
+
+    @pytest.mark.slow_test
+    def test_grains_concurrency(self):
+        """
+        Test the grain functions run at the same time are merged in order and
+        the grain functions taking the grains run after the ones before them
+        """
+        self._write_grains(
+            "slowgrains",
+            """
+            import time
+
+            def slow_one():
+                time.sleep(1)
+                return {"slow_one": True, "shared": "one"}
+
+            def slow_two():
+                time.sleep(1)
+                return {"slow_two": True, "shared": "two"}
+
+            def zdepends(grains):
+                return {"zdepends": [grains.get("slow_one"), grains.get("slow_two")]}
+            """,
+        )
+        start = time.time()
+        serial = salt.loader.grains(self.opts)
+        serial_duration = time.time() - start
+        self.opts["grains_concurrency"] = 4
+        start = time.time()
+        concurrent = salt.loader.grains(self.opts)
+        self.assertLess(time.time() - start, serial_duration - 0.5)
+        self.assertEqual(concurrent, serial)
+        self.assertEqual(concurrent["shared"], "two")
+        self.assertEqual(concurrent["zdepends"], [True, True])
+
+    @pytest.mark.slow_test
+    def test_grains_ttl(self):
+        """
+        Test the grain functions are only run again once their TTL expired
+        """
+        for name, ttl in (("cachedgrains", 3600), ("volatilegrains", None)):
+            source = textwrap.dedent(
+                """
+                import os
+
+                def {name}():
+                    with open({path!r}, "a") as fp_:
+                        fp_.write("x")
+                    return {{"{name}": True}}
+                """
+            ).format(name=name, path=os.path.join(self.tmp_dir, name))
+            if ttl:
+                source += "\n__grains_ttl__ = {}\n".format(ttl)
+            self._write_grains(name, source)
+
+        self.opts["grains_cache"] = True
+        for _ in range(2):
+            grains = salt.loader.grains(self.opts, force_refresh=True)
+            self.assertTrue(grains["cachedgrains"])
+            self.assertTrue(grains["volatilegrains"])
+        self.assertEqual(self._calls("cachedgrains"), 1)
+        self.assertEqual(self._calls("volatilegrains"), 2)
+
+        self.opts["grains_ttl"] = {"cachedgrains": 0}
+        self.assertTrue(
+            salt.loader.grains(self.opts, force_refresh=True)["cachedgrains"]
+        )
+        self.assertEqual(self._calls("cachedgrains"), 2)
+
+        # Without the grains cache the TTL has no effect
+        self.opts["grains_cache"] = False
+        self.opts["grains_ttl"] = {}
+        salt.loader.grains(self.opts, force_refresh=True)
+        self.assertEqual(self._calls("cachedgrains"), 3)
+
+
 class LazyLoaderRefreshFileMappingTest(TestCase):
     """
     Test that _refresh_file_mapping is called using acquiring LazyLoader._lock
@@ -1754,3 +1858,93 @@ class LazyLoaderRefreshFileMappingTest(TestCase):
         loader = self.__init_loader()
         assert ".pyx" not in loader.suffix_map
         assert ".pyx" not in loader.suffix_order
+
+
+class LazyLoaderIndexTest(TestCase):
+    """
+    Test the persistent index of the loader
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.mod_dir = os.path.join(self.tmp_dir, "modules")
+        os.makedirs(self.mod_dir)
+        self.opts = {
+            "cachedir": os.path.join(self.tmp_dir, "cache"),
+            "grains": {"os": "Linux"},
+            "loader_index": True,
+            "optimization_order": [0, 1, 2],
+        }
+        self.addCleanup(salt.loader.LOADER_INDEXES.clear)
+        for name in ("aaa", "bbb", "ccc"):
+            self._write_module(name, "virtual" if name == "ccc" else name + "x")
+
+    def _write_module(self, name, virtualname):
+        with salt.utils.files.fopen(
+            os.path.join(self.mod_dir, "{}.py".format(name)), "w"
+        ) as fp_:
+            fp_.write(
+                textwrap.dedent(
+                    """
+                    def __virtual__():
+                        return "{}"
+
+                    def test():
+                        return "{}"
+                    """.format(
+                        virtualname, name
+                    )
+                )
+            )
+
+    def _loader(self):
+        return salt.loader.LazyLoader(
+            [self.mod_dir], self.opts, tag="indextest", loaded_base_name="indextest"
+        )
+
+    def test_index(self):
+        """
+        Test the virtual names known from the index are loaded without trying
+        the other files and new files are found
+        """
+        loader = self._loader()
+        self.assertEqual(loader["virtual.test"](), "ccc")
+        self.assertEqual(loader.loaded_files, {"aaa", "bbb", "ccc"})
+        self.assertEqual(
+            len(os.listdir(os.path.join(self.opts["cachedir"], "loader_index"))), 1
+        )
+
+        # Another process reads the index from the cache
+        salt.loader.LOADER_INDEXES.clear()
+        with patch.object(
+            salt.loader.LazyLoader, "_scan_file_mapping", autospec=True
+        ) as scan:
+            loader = self._loader()
+            self.assertEqual(loader["virtual.test"](), "ccc")
+        scan.assert_not_called()
+        self.assertEqual(loader.loaded_files, {"ccc"})
+
+        # Other grains do not reuse the virtual names
+        self.opts["grains"] = {"os": "Windows"}
+        loader = self._loader()
+        self.assertEqual(loader["virtual.test"](), "ccc")
+        self.assertEqual(loader.loaded_files, {"aaa", "bbb", "ccc"})
+
+        # A new module invalidates the file mapping
+        time.sleep(0.01)
+        self._write_module("ddd", "ddd")
+        loader = self._loader()
+        self.assertEqual(loader["ddd.test"](), "ddd")
+        self.assertIn("ddd", loader.file_mapping)
+
+    def test_index_disabled(self):
+        """
+        Test nothing is written without the loader_index option
+        """
+        self.opts["loader_index"] = False
+        loader = self._loader()
+        self.assertEqual(loader["virtual.test"](), "ccc")
+        self.assertFalse(
+            os.path.exists(os.path.join(self.opts["cachedir"], "loader_index"))
+        )
@@ -5,6 +5,8 @@
 import copy
 import logging
 import os
+import shutil
+import tempfile
 
 import pytest
 import salt.ext.tornado
@@ -13,6 +15,7 @@ import salt.minion
 import salt.syspaths
 import salt.utils.crypt
 import salt.utils.event as event
+import salt.utils.files
 import salt.utils.platform
 import salt.utils.process
 from salt._compat import ipaddress
@@ -326,6 +329,133 @@ class MinionTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
             finally:
                 minion.destroy()
 
+    @pytest.mark.slow_test
+    def test_job_worker_pool(self):
+        """
+        Tests that _handle_decoded_payload hands the jobs to the job worker pool
+        instead of forking a process per job when job_worker_pool is set.
+        """
+        submitted = salt.ext.tornado.concurrent.Future()
+        submitted.set_result(None)
+        pool = MagicMock()
+        pool.return_value.submit.return_value = submitted
+        with patch("salt.utils.process.JobWorkerPool", pool), patch(
+            "salt.utils.process.SignalHandlingProcess.start",
+            MagicMock(return_value=True),
+        ):
+            mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+            mock_opts["__role"] = "minion"
+            mock_opts["job_worker_pool"] = 4
+            mock_opts["process_count_max"] = 1
+
+            io_loop = salt.ext.tornado.ioloop.IOLoop()
+            minion = salt.minion.Minion(mock_opts, jid_queue=[], io_loop=io_loop)
+            try:
+                for jid in ("1", "2"):
+                    mock_data = {"fun": "foo.bar", "jid": jid}
+                    io_loop.run_sync(
+                        lambda data=mock_data: minion._handle_decoded_payload(data)
+                    )
+                    pool.return_value.submit.assert_called_with(
+                        jid,
+                        minion.opts,
+                        mock_data,
+                        minion.connected,
+                        minion.loader_generation,
+                    )
+                # The pool is started once and process_count_max does not apply
+                self.assertEqual(pool.call_count, 1)
+                self.assertEqual(pool.call_args[0][2], 4)
+                pool.return_value.start.assert_called_once_with()
+                salt.utils.process.SignalHandlingProcess.start.assert_not_called()
+            finally:
+                minion.destroy()
+            pool.return_value.stop.assert_called_once_with()
+
+    def test_pool_target(self):
+        """
+        Tests that a job worker runs the job with the options it was sent and
+        cleans up the proc file of the job.
+        """
+        with patch("salt.minion.Minion._target") as target:
+            mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+            mock_opts["cachedir"] = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, mock_opts["cachedir"])
+            minion = MagicMock(loader_generation=1)
+            proc_file = os.path.join(mock_opts["cachedir"], "proc", "123")
+            os.makedirs(os.path.dirname(proc_file), exist_ok=True)
+            with salt.utils.files.fopen(proc_file, "w"):
+                pass
+            data = {"fun": "foo.bar", "jid": "123"}
+            salt.minion.Minion._pool_target(minion, mock_opts, data, True, 1)
+            target.assert_called_once_with(minion, mock_opts, data, True)
+            self.assertIs(minion.opts, mock_opts)
+            self.assertFalse(os.path.exists(proc_file))
+            minion._load_modules.assert_not_called()
+
+    @pytest.mark.slow_test
+    def test_pool_target_pillar_refresh(self):
+        """
+        Tests that a job worker reloads its modules when the pillar was
+        refreshed after it was forked.
+        """
+        mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+        mock_opts["__role"] = "minion"
+        mock_opts["cachedir"] = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, mock_opts["cachedir"])
+        mock_opts["grains"] = {}
+        mock_opts["pillar"] = {"foo": "old"}
+        io_loop = salt.ext.tornado.ioloop.IOLoop()
+        minion = salt.minion.Minion(
+            copy.deepcopy(mock_opts), io_loop=io_loop, load_grains=False
+        )
+        # The worker is forked from the minion before the pillar refresh
+        worker = salt.minion.Minion(
+            copy.deepcopy(mock_opts), io_loop=io_loop, load_grains=False
+        )
+        try:
+            for _minion in (minion, worker):
+                (
+                    _minion.functions,
+                    _minion.returners,
+                    _minion.function_errors,
+                    _minion.executors,
+                ) = _minion._load_modules(grains={})
+            worker.loader_generation = minion.loader_generation
+            self.assertEqual(worker.functions.pack["__pillar__"]["foo"], "old")
+
+            new_pillar = salt.ext.tornado.concurrent.Future()
+            new_pillar.set_result({"foo": "new"})
+            async_pillar = MagicMock()
+            async_pillar.compile_pillar.return_value = new_pillar
+            minion.connected = True
+            with patch(
+                "salt.pillar.get_async_pillar", MagicMock(return_value=async_pillar)
+            ), patch("salt.utils.event.get_event", MagicMock()):
+                io_loop.run_sync(minion.pillar_refresh)
+            self.assertGreater(minion.loader_generation, worker.loader_generation)
+
+            pillars = []
+
+            def _target(minion_instance, opts, data, connected):
+                pillars.append(minion_instance.functions.pack["__pillar__"]["foo"])
+
+            data = {"fun": "test.ping", "jid": "123"}
+            with patch("salt.minion.Minion._target", side_effect=_target):
+                for _ in range(2):
+                    salt.minion.Minion._pool_target(
+                        worker,
+                        copy.deepcopy(minion.opts),
+                        data,
+                        True,
+                        minion.loader_generation,
+                    )
+            self.assertEqual(pillars, ["new", "new"])
+            self.assertEqual(worker.loader_generation, minion.loader_generation)
+        finally:
+            minion.destroy()
+            worker.destroy()
+
     @pytest.mark.slow_test
     def test_beacons_before_connect(self):
         """
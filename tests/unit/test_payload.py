@@ -9,6 +9,7 @@
 import copy
 import datetime
 import errno
+import gc
 import logging
 import threading
 import time
@@ -16,9 +17,11 @@ import time
 import pytest
 import salt.exceptions
 import salt.payload
+import salt.transport.frame
 import zmq
 from salt.utils import immutabletypes
 from salt.utils.odict import OrderedDict
+from tests.support.mock import patch
 from tests.support.unit import TestCase, skipIf
 
 log = logging.getLogger(__name__)
@@ -188,6 +191,52 @@ class PayloadTestCase(TestCase):
         del odata["repeating"][0][0][0][-1], data["repeating"][0][0][0][-1]
         self.assertDictEqual(odata, data)
 
+    def test_loads_decode(self):
+        """
+        The strings are decoded while unpacking like decode_embedded_strs
+        does, the bytes which are not valid UTF-8 are kept
+        """
+        payload = salt.payload.Serial("msgpack")
+        dtvalue = datetime.datetime(2001, 2, 3, 4, 5, 6, 7)
+        for idata in (
+            {"key": "val", b"bkey": [b"bval", "sval", {"n": 1}], "dt": dtvalue},
+            {"key": "val", "bin": b"\xff\xfe", b"\xff": [b"\x80", "s\xe9"]},
+            [b"one", "two", 3, None, [b"four"]],
+            b"bytes",
+            b"\xff",
+            None,
+        ):
+            for use_bin_type in (False, True):
+                sdata = payload.dumps(idata, use_bin_type=use_bin_type)
+                expected = salt.transport.frame.decode_embedded_strs(
+                    payload.loads(sdata, raw=True)
+                )
+                self.assertEqual(payload.loads(sdata), expected)
+        self.assertEqual(
+            payload.loads(
+                payload.dumps({"bin": b"\xff", "s": b"s"}, use_bin_type=True)
+            ),
+            {"bin": b"\xff", "s": "s"},
+        )
+
+    def test_loads_gc(self):
+        """
+        The garbage collector is only disabled for large messages, and kept
+        disabled when it was already
+        """
+        payload = salt.payload.Serial("msgpack")
+        with patch("gc.disable") as disable:
+            payload.loads(payload.dumps({"small": "message"}))
+            disable.assert_not_called()
+            payload.loads(payload.dumps({"large": "x" * salt.payload.GC_DISABLE_SIZE}))
+            disable.assert_called_once_with()
+        gc.disable()
+        try:
+            payload.loads(payload.dumps({"large": "x" * salt.payload.GC_DISABLE_SIZE}))
+            self.assertFalse(gc.isenabled())
+        finally:
+            gc.enable()
+
 
 class SREQTestCase(TestCase):
     port = 8845  # TODO: dynamically assign a port?
@@ -12,6 +12,8 @@ import os
 import shutil
 import tempfile
 import textwrap
+import threading
+import time
 
 import salt.config
 import salt.exceptions
@@ -376,6 +378,130 @@ class PillarTestCase(TestCase):
         finally:
             shutil.rmtree(tempdir, ignore_errors=True)
 
+    def _ext_pillar_concurrency_pillar(self, **opts):
+        """
+        Return a Pillar with three external pillars: a slow one, one which
+        reports the keys of the pillar data it was passed and a failing one
+        """
+
+        def slow(minion_id, pillar, *args, **kwargs):
+            time.sleep(0.5)
+            return {"slow": True, "shared": "slow"}
+
+        def keys(minion_id, pillar, *args, **kwargs):
+            return {"keys": sorted(pillar), "shared": "keys"}
+
+        def broken(minion_id, pillar, *args, **kwargs):
+            raise Exception("broken ext_pillar")
+
+        opts.update(
+            {
+                "optimization_order": [0, 1, 2],
+                "renderer": "yaml",
+                "renderer_blacklist": [],
+                "renderer_whitelist": [],
+                "state_top": "",
+                "pillar_roots": {"base": []},
+                "file_roots": {"base": []},
+                "extension_modules": "",
+                "ext_pillar": [{"slow": None}, {"keys": None}, {"broken": None}],
+            }
+        )
+        with patch(
+            "salt.loader.pillars",
+            MagicMock(return_value={"slow": slow, "keys": keys, "broken": broken}),
+        ):
+            return salt.pillar.Pillar(opts, {}, "mocked-minion", "base")
+
+    def test_ext_pillar_serial(self):
+        pillar = self._ext_pillar_concurrency_pillar()
+        ret, errors = pillar.ext_pillar({})
+        # Every external pillar gets the data merged before it
+        self.assertEqual(
+            ret, {"slow": True, "shared": "keys", "keys": ["shared", "slow"]}
+        )
+        self.assertEqual(
+            errors, ["Failed to load ext_pillar broken: broken ext_pillar"]
+        )
+        self.assertEqual(
+            [(item["ext_pillar"], item["result"]) for item in pillar.ext_pillar_timing],
+            [("slow", True), ("keys", True), ("broken", False)],
+        )
+        self.assertGreaterEqual(pillar.ext_pillar_timing[0]["duration"], 0.5)
+
+    def test_ext_pillar_concurrency(self):
+        pillar = self._ext_pillar_concurrency_pillar(ext_pillar_concurrency=3)
+        start = time.time()
+        ret, errors = pillar.ext_pillar({"base": True})
+        self.assertLess(time.time() - start, 1)
+        # The external pillars only get the data from before the external
+        # pillars, and are merged in the configured order
+        self.assertEqual(
+            ret, {"base": True, "slow": True, "shared": "keys", "keys": ["base"]}
+        )
+        self.assertEqual(
+            errors, ["Failed to load ext_pillar broken: broken ext_pillar"]
+        )
+        self.assertEqual(
+            [(item["ext_pillar"], item["result"]) for item in pillar.ext_pillar_timing],
+            [("slow", True), ("keys", True), ("broken", False)],
+        )
+
+    def test_ext_pillar_timeout(self):
+        pillar = self._ext_pillar_concurrency_pillar(
+            ext_pillar_concurrency=2, ext_pillar_timeout=0.1
+        )
+        ret, errors = pillar.ext_pillar({})
+        self.assertEqual(ret, {"shared": "keys", "keys": []})
+        self.assertEqual(
+            errors,
+            [
+                "ext_pillar slow timed out after 0.1 seconds",
+                "Failed to load ext_pillar broken: broken ext_pillar",
+            ],
+        )
+        self.assertEqual(
+            [(item["ext_pillar"], item["result"]) for item in pillar.ext_pillar_timing],
+            [("slow", False), ("keys", True), ("broken", False)],
+        )
+        # The abandoned external pillar does not hold up the exit
+        threads = [
+            thread for thread in threading.enumerate() if thread.name == "ext_pillar"
+        ]
+        self.assertTrue(threads)
+        self.assertTrue(all(thread.daemon for thread in threads))
+
+    def test_ext_pillar_timeout_queued(self):
+        blocked = threading.Event()
+        self.addCleanup(blocked.set)
+
+        def stuck(minion_id, pillar, *args, **kwargs):
+            blocked.wait(30)
+            return {}
+
+        opts = {
+            "optimization_order": [0, 1, 2],
+            "renderer": "yaml",
+            "renderer_blacklist": [],
+            "renderer_whitelist": [],
+            "state_top": "",
+            "pillar_roots": {"base": []},
+            "file_roots": {"base": []},
+            "extension_modules": "",
+            "ext_pillar": [{"stuck": None}] * 3,
+            "ext_pillar_concurrency": 2,
+            "ext_pillar_timeout": 0.1,
+        }
+        with patch("salt.loader.pillars", MagicMock(return_value={"stuck": stuck})):
+            pillar = salt.pillar.Pillar(opts, {}, "mocked-minion", "base")
+        start = time.time()
+        ret, errors = pillar.ext_pillar({})
+        # The external pillar waiting behind the stuck threads still starts
+        # and times out
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(ret, {})
+        self.assertEqual(errors, ["ext_pillar stuck timed out after 0.1 seconds"] * 3)
+
     def test_dynamic_pillarenv(self):
         opts = {
             "optimization_order": [0, 1, 2],
@@ -1373,6 +1499,47 @@ class PillarCacheTestCase(TestCase):
                 }
                 self.assertEqual(pillar.cache._dict, expected_cache)
 
+    def test_compile_pillar_disk_log_cache(self):
+        self.mock_master_default_opts.update(
+            {"pillar_cache_backend": "disk_log", "pillar_cache_ttl": 3600}
+        )
+        cache_dir = os.path.join(
+            self.mock_master_default_opts["cachedir"], "pillar_cache"
+        )
+        os.makedirs(cache_dir, exist_ok=True)
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+
+        pillar = salt.pillar.PillarCache(
+            self.mock_master_default_opts,
+            self.grains,
+            "mocked_minion",
+            "fake_env",
+            pillarenv="base",
+        )
+
+        with patch(
+            "salt.pillar.PillarCache.fetch_pillar",
+            side_effect=[{"foo": "bar"}, {"foo": "baz"}],
+        ):
+            self.assertEqual(pillar.compile_pillar(), {"foo": "bar"})
+            self.assertEqual(pillar.compile_pillar(), {"foo": "bar"})
+            pillar.pillarenv = "dev"
+            self.assertEqual(pillar.compile_pillar(), {"foo": "baz"})
+
+        # A new PillarCache reads the cached pillars back from disk
+        pillar = salt.pillar.PillarCache(
+            self.mock_master_default_opts,
+            self.grains,
+            "mocked_minion",
+            "fake_env",
+            pillarenv="dev",
+        )
+        self.assertEqual(
+            pillar.cache._dict,
+            {"mocked_minion": {"base": {"foo": "bar"}, "dev": {"foo": "baz"}}},
+        )
+        self.assertEqual(pillar.compile_pillar(), {"foo": "baz"})
+
     def test_compile_pillar_memory_cache(self):
         self.mock_master_default_opts.update(
             {"pillar_cache_backend": "memory", "pillar_cache_ttl": 3600}
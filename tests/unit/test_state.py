@@ -2,6 +2,8 @@
     :codeauthor: Nicole Thomas <nicole@saltstack.com>
 """
 
+import copy
+import fnmatch
 import os
 import shutil
 import tempfile
@@ -801,6 +803,254 @@ class StateCompilerTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
                 self.assertEqual(sub_state["__state_ran__"], True)
                 self.assertEqual(sub_state["__sls__"], "external")
 
+    def test_requisite_index(self):
+        """
+        Test that the requisite index matches the same chunks as matching
+        every requisite against every chunk
+        """
+        chunks = [
+            {"state": "pkg", "name": "nginx", "__id__": "nginx", "__sls__": "web"},
+            {"state": "file", "name": "/etc/nginx", "__id__": "conf", "__sls__": "web"},
+            {"state": "service", "name": "nginx", "__id__": "run", "__sls__": "web"},
+            {"state": "pkg", "name": "redis", "__id__": "redis", "__sls__": "db.redis"},
+            {"state": "pkg", "name": "nginx-x", "__id__": "x1", "__sls__": "db.x"},
+        ]
+        index = salt.state.RequisiteIndex(chunks)
+        self.assertTrue(index.usable)
+        reqs = [
+            ("pkg", "nginx"),
+            ("id", "nginx"),
+            ("service", "nginx"),
+            ("file", "conf"),
+            ("id", "run"),
+            ("pkg", "nginx*"),
+            ("id", "r*"),
+            ("id", "x?"),
+            ("id", "[cr]*"),
+            ("id", "*"),
+            ("pkg", "missing"),
+            ("sls", "web"),
+            ("sls", "db.*"),
+            ("sls", "db"),
+        ]
+        for req_key, req_val in reqs:
+            expected = []
+            for chunk in chunks:
+                if req_key == "sls":
+                    if fnmatch.fnmatch(chunk["__sls__"], req_val):
+                        expected.append(chunk)
+                elif fnmatch.fnmatch(chunk["name"], req_val) or fnmatch.fnmatch(
+                    chunk["__id__"], req_val
+                ):
+                    if req_key == "id" or chunk["state"] == req_key:
+                        expected.append(chunk)
+            self.assertEqual(index.match(req_key, req_val), expected)
+            # Glob results are cached, a second lookup must match as well
+            self.assertEqual(index.match(req_key, req_val), expected)
+
+        self.assertTrue(index.valid_for(chunks))
+        self.assertFalse(index.valid_for(list(chunks)))
+        self.assertFalse(index.valid_for(chunks + [{}]))
+
+        # Non string names can't be indexed
+        chunks.append(
+            {"state": "pkg", "name": 1, "__id__": "one", "__sls__": "db.redis"}
+        )
+        self.assertFalse(salt.state.RequisiteIndex(chunks).usable)
+
+    def test_check_requisite_index(self):
+        """
+        Test that check_requisite resolves requisites through the requisite
+        index and rebuilds the index for a new list of chunks
+        """
+        chunks = [
+            {
+                "state": "test",
+                "name": "a",
+                "__id__": "a",
+                "__sls__": "one",
+                "fun": "nop",
+            },
+            {
+                "state": "test",
+                "name": "b",
+                "__id__": "b",
+                "__sls__": "one",
+                "fun": "nop",
+            },
+            {
+                "state": "test",
+                "name": "c",
+                "__id__": "c",
+                "__sls__": "two",
+                "fun": "nop",
+            },
+        ]
+        low = {
+            "state": "test",
+            "name": "d",
+            "__id__": "d",
+            "__sls__": "two",
+            "fun": "nop",
+            "require": [{"sls": "one"}, {"test": "c"}],
+        }
+        running = {
+            salt.state._gen_tag(chunk): {"result": True, "changes": {}}
+            for chunk in chunks
+        }
+        with patch("salt.state.State._gather_pillar"):
+            minion_opts = self.get_temp_config("minion")
+            state_obj = salt.state.State(minion_opts)
+            status, reqs = state_obj.check_requisite(low, running, chunks)
+            self.assertEqual(status, "met")
+            self.assertEqual(reqs["require"], chunks)
+            index = state_obj._req_index
+            self.assertTrue(index.valid_for(chunks))
+
+            # A missing requisite is unmet
+            status, _ = state_obj.check_requisite(
+                dict(low, require=[{"test": "e"}]), running, chunks
+            )
+            self.assertEqual(status, "unmet")
+            self.assertIs(state_obj._req_index, index)
+
+            # A different list of chunks gets a new index
+            status, reqs = state_obj.check_requisite(low, running, chunks[:])
+            self.assertEqual(status, "met")
+            self.assertIsNot(state_obj._req_index, index)
+
+    def test_state_units(self):
+        """
+        Test splitting chunks into the units run by state_concurrency
+        """
+        chunks = [
+            {"state": "pkg", "name": "a", "__id__": "a", "__sls__": "one"},
+            {"state": "pkg", "name": "b", "__id__": "b", "__sls__": "one"},
+            {
+                "state": "file",
+                "name": "c",
+                "__id__": "c",
+                "__sls__": "one",
+                "require": [{"pkg": "a"}],
+            },
+            {
+                "state": "cmd",
+                "name": "d",
+                "__id__": "d",
+                "__sls__": "two",
+                "prereq": [{"file": "c"}],
+            },
+            {
+                "state": "service",
+                "name": "e",
+                "__id__": "e",
+                "__sls__": "two",
+                "watch": [{"sls": "one"}],
+                "onchanges": ["d"],
+            },
+        ]
+        chunks[2]["prerequired"] = [{"cmd": "d"}]
+        with patch("salt.state.State._gather_pillar"):
+            minion_opts = self.get_temp_config("minion")
+            state_obj = salt.state.State(minion_opts)
+            units, deps = state_obj._state_units(chunks)
+        self.assertEqual(
+            units, [[chunks[0]], [chunks[1]], [chunks[2], chunks[3]], [chunks[4]]]
+        )
+        self.assertEqual(deps, [set(), set(), {0}, {0, 1, 2}])
+
+    def test_call_high_concurrent(self):
+        """
+        Test that running states concurrently returns the same results as
+        running them one after the other, numbered after their requisites
+        """
+        high = OrderedDict()
+        for name, fun, reqs in (
+            ("a", "succeed_with_changes", {}),
+            ("b", "succeed_without_changes", {}),
+            ("c", "succeed_with_changes", {"require": [{"test": "a"}]}),
+            ("d", "succeed_with_changes", {"onchanges": [{"test": "b"}]}),
+            ("e", "succeed_with_changes", {"onchanges": [{"test": "c"}]}),
+            ("f", "fail_without_changes", {"require": [{"test": "b"}]}),
+            ("g", "succeed_with_changes", {"require": [{"test": "f"}]}),
+            ("h", "succeed_with_changes", {"watch": [{"test": "a"}]}),
+        ):
+            args = [fun] + [{key: val} for key, val in reqs.items()]
+            high[name] = {"test": args, "__sls__": "concurrent", "__env__": "base"}
+        results = []
+        with patch("salt.state.State._gather_pillar"):
+            for concurrency in (0, 4):
+                minion_opts = self.get_temp_config("minion")
+                minion_opts["state_concurrency"] = concurrency
+                state_obj = salt.state.State(minion_opts)
+                ret = state_obj.call_high(copy.deepcopy(high))
+                results.append(
+                    {
+                        tag.split("_|-")[1]: (val["result"], bool(val["changes"]))
+                        for tag, val in ret.items()
+                    }
+                )
+                run_nums = {
+                    tag.split("_|-")[1]: val["__run_num__"] for tag, val in ret.items()
+                }
+                self.assertEqual(sorted(run_nums.values()), list(range(len(high))))
+                for first, second in (
+                    ("a", "c"),
+                    ("b", "d"),
+                    ("c", "e"),
+                    ("b", "f"),
+                    ("f", "g"),
+                    ("a", "h"),
+                ):
+                    self.assertLess(run_nums[first], run_nums[second])
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[1]["d"], (True, False))
+        self.assertEqual(results[1]["e"], (True, True))
+        self.assertEqual(results[1]["g"], (False, False))
+
+    def test_call_high_concurrent_order(self):
+        """
+        Test that running states concurrently keeps to the order the states
+        set themselves, but not to the order given by state_auto_order
+        """
+        high = OrderedDict()
+        for name, order in (("a", None), ("b", "last"), ("c", 1), ("d", None)):
+            args = ["succeed_with_changes"]
+            if order is not None:
+                args.append({"order": order})
+            high[name] = {"test": args, "__sls__": "concurrent", "__env__": "base"}
+        with patch("salt.state.State._gather_pillar"):
+            minion_opts = self.get_temp_config("minion")
+            minion_opts["state_concurrency"] = 4
+            state_obj = salt.state.State(minion_opts)
+            chunks = state_obj.compile_high_data(copy.deepcopy(high))
+            units, deps = state_obj._state_units(chunks)
+            self.assertEqual(
+                [[low["name"] for low in unit] for unit in units],
+                [["c"], ["a"], ["d"], ["b"]],
+            )
+            self.assertEqual(deps, [set(), {0}, {0}, {0, 1, 2}])
+
+            ret = state_obj.call_high(copy.deepcopy(high))
+            run_nums = {
+                tag.split("_|-")[1]: val["__run_num__"] for tag, val in ret.items()
+            }
+            self.assertEqual(run_nums, {"c": 0, "a": 1, "d": 2, "b": 3})
+            start_times = {
+                tag.split("_|-")[1]: val["start_time"] for tag, val in ret.items()
+            }
+            self.assertLess(start_times["c"], start_times["a"])
+            self.assertLess(start_times["c"], start_times["d"])
+            self.assertLess(start_times["a"], start_times["b"])
+            self.assertLess(start_times["d"], start_times["b"])
+
+            # An order given by state_auto_order is not a barrier
+            state_obj._auto_orders.add(("c", "test"))
+            state_obj.compile_high_data(copy.deepcopy(high))
+            self.assertEqual(state_obj._explicit_orders, {("b", "test")})
+            units, deps = state_obj._state_units(chunks)
+            self.assertEqual(deps, [set(), set(), set(), {0, 1, 2}])
+
 
 class HighStateTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
     def setUp(self):
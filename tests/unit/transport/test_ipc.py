@@ -124,6 +124,34 @@ class IPCMessagePubSubCase(salt.ext.tornado.testing.AsyncTestCase):
         self.assertEqual(ret1, "TEST")
         self.assertEqual(ret2, "TEST")
 
+    def test_subscribe(self):
+        client1 = self.sub_channel
+        client2 = self._get_sub_channel()
+        client1.subscribe(["salt/job/", "salt/*/start"])
+        # The subscription is sent with the first read
+        self.assertIsNone(client1.read_sync(timeout=0.1))
+        self.io_loop.run_sync(lambda: salt.ext.tornado.gen.sleep(0.1))
+
+        for tag in ("salt/auth", "salt/job/1/ret/minion", "salt/minion/start"):
+            self.pub_channel.publish(tag, tag=tag)
+        self.assertEqual(client1.read_sync(), "salt/job/1/ret/minion")
+        self.assertEqual(client1.read_sync(), "salt/minion/start")
+        self.assertEqual(client2.read_sync(), "salt/auth")
+
+        # Subscribing to None gets all messages again
+        client1.subscribe(None)
+        self.io_loop.run_sync(lambda: salt.ext.tornado.gen.sleep(0.1))
+        self.pub_channel.publish("salt/auth", tag="salt/auth")
+        self.assertEqual(client1.read_sync(), "salt/auth")
+
+    def test_tag_matcher(self):
+        match = salt.transport.ipc.tag_matcher(["salt/job/", "*/ret/minion?"])
+        self.assertTrue(match("salt/job/1/new"))
+        self.assertTrue(match("salt/run/1/ret/minion1"))
+        self.assertFalse(match("salt/run/1/ret/minion"))
+        self.assertFalse(match("salt/auth"))
+        self.assertFalse(salt.transport.ipc.tag_matcher([])("salt/auth"))
+
     @salt.ext.tornado.testing.gen_test
     def test_async_reading_streamclosederror(self):
         client1 = self.sub_channel
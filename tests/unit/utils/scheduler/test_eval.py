@@ -919,3 +919,59 @@ class SchedulerEvalTest(SchedulerTestsBase):
         ret = self.schedule.job_status(job_name)
         self.assertNotIn("_last_run", ret)
         self.assertEqual(ret["_next_fire_time"], None)
+
+    def test_eval_queued_jobs(self):
+        """
+        verify that the jobs running every so many seconds are only evaluated
+        at their next fire time, until the schedule changes
+        """
+        job = {
+            "schedule": {
+                "job{}".format(idx): {
+                    "function": "test.ping",
+                    "seconds": 10 * (idx + 1),
+                }
+                for idx in range(3)
+            }
+        }
+        run_time = dateutil.parser.parse("11/29/2017 4:00pm")
+
+        # Add the jobs to the scheduler
+        self.schedule.opts.update(job)
+
+        # Evaluate to prime
+        self.schedule.eval(now=run_time)
+        with patch.object(self.schedule, "_run_job", MagicMock()) as run_job:
+            evaluated = []
+            iter_due_jobs = self.schedule._iter_due_jobs
+
+            def _iter_due_jobs(schedule, now):
+                for job_name, data in iter_due_jobs(schedule, now):
+                    evaluated.append(job_name)
+                    yield job_name, data
+
+            with patch.object(self.schedule, "_iter_due_jobs", _iter_due_jobs):
+                # Nothing to evaluate before the first fire time
+                self.schedule.eval(now=run_time + datetime.timedelta(seconds=5))
+                self.assertEqual(evaluated, [])
+
+                self.schedule.eval(now=run_time + datetime.timedelta(seconds=20))
+                self.assertEqual(evaluated, ["job0", "job1"])
+                self.assertEqual(run_job.call_count, 2)
+
+                # Disabling a job evaluates all the jobs again
+                del evaluated[:]
+                self.schedule.disable_job("job2", persist=False)
+                self.schedule.eval(now=run_time + datetime.timedelta(seconds=21))
+                self.assertEqual(evaluated, ["job0", "job1", "job2"])
+                ret = self.schedule.job_status("job2")
+                self.assertEqual(ret["_skip_reason"], "disabled")
+
+                # The disabled job is evaluated every time
+                del evaluated[:]
+                self.schedule.eval(now=run_time + datetime.timedelta(seconds=22))
+                self.assertEqual(evaluated, ["job2"])
+        ret = self.schedule.job_status("job0")
+        self.assertEqual(
+            ret["_next_fire_time"], run_time + datetime.timedelta(seconds=30)
+        )
@@ -9,6 +9,8 @@
 import hashlib
 import os
 import shutil
+import tempfile
+import threading
 import time
 
 import pytest
@@ -21,6 +23,7 @@ import zmq.eventloop.ioloop
 from salt.ext.tornado.testing import AsyncTestCase
 from saltfactories.utils.processes import terminate_process
 from tests.support.events import eventpublisher_process, eventsender_process
+from tests.support.mock import patch
 from tests.support.runtests import RUNTIME_VARS
 from tests.support.unit import TestCase, expectedFailure, skipIf
 
@@ -258,6 +261,39 @@ class TestSaltEvent(TestCase):
                 evt2 = me2.get_event(tag="evt1")
                 self.assertGotEvent(evt2, {"data": "foo1"})
 
+    @pytest.mark.slow_test
+    def test_event_filter_tags(self):
+        """Test the publisher only sends the events matching the tag filter"""
+        with eventpublisher_process(self.sock_dir):
+            with salt.utils.event.MasterEvent(self.sock_dir, listen=True) as me:
+                me.filter_tags(["salt/job/", "*/minion/start"])
+                # The filter is sent to the publisher with the first read
+                self.assertIsNone(me.get_event(wait=0.5, tag="nothing"))
+                me.fire_event({"data": "foo1"}, "salt/auth")
+                me.fire_event({"data": "foo2"}, "salt/job/1/new")
+                me.fire_event({"data": "foo3"}, "salt/minion/start")
+                evt = me.get_event(tag="")
+                self.assertGotEvent(evt, {"data": "foo2"})
+                evt = me.get_event(tag="")
+                self.assertGotEvent(evt, {"data": "foo3"})
+
+    @pytest.mark.slow_test
+    def test_event_lazy_unpack(self):
+        """Test the data of events nobody waits for is not decoded"""
+        with eventpublisher_process(self.sock_dir):
+            with salt.utils.event.MasterEvent(self.sock_dir, listen=True) as me:
+                me.subscribe("evt2")
+                me.fire_event({"data": "foo1"}, "evt1")
+                me.fire_event({"data": "foo2"}, "evt2")
+                me.fire_event({"data": "foo3"}, "evt3")
+                with patch.object(
+                    me.serial, "loads", side_effect=me.serial.loads
+                ) as loads:
+                    evt = me.get_event(tag="evt3")
+                self.assertGotEvent(evt, {"data": "foo3"})
+                self.assertEqual(loads.call_count, 2)
+                self.assertGotEvent(me.get_event(tag="evt2"), {"data": "foo2"})
+
     @expectedFailure
     def test_event_nested_sub_all(self):
         """Test nested event subscriptions do not drop events, get event for all tags"""
@@ -381,3 +417,114 @@ class TestEventReturn(TestCase):
         finally:
             if evt is not None:
                 terminate_process(evt.pid, kill_children=True)
+
+
+class TestEventReturnQueue(TestCase):
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.cachedir, ignore_errors=True)
+        self.opts = salt.config.DEFAULT_MASTER_OPTS.copy()
+        self.opts.update(
+            {
+                "cachedir": self.cachedir,
+                "event_return_queue": 2,
+                "event_return_async_queue": 4,
+            }
+        )
+        self.stored = []
+        self.fail = threading.Event()
+
+    def _event_return(self, events):
+        if self.fail.is_set():
+            raise Exception("returner down")
+        self.stored.extend(event["tag"] for event in events)
+
+    def _wait_stored(self, count):
+        for _ in range(100):
+            if len(self.stored) >= count:
+                return
+            time.sleep(0.05)
+
+    def _queue(self):
+        event_queue = salt.utils.event.EventReturnQueue(
+            self.opts, "test", self._event_return
+        )
+        self.addCleanup(event_queue.stop, 0)
+        return event_queue
+
+    def test_flush(self):
+        event_queue = self._queue()
+        event_queue.start()
+        for idx in range(3):
+            event_queue.put({"tag": "evt{}".format(idx), "data": {}})
+        self._wait_stored(3)
+        self.assertEqual(self.stored, ["evt0", "evt1", "evt2"])
+        stats = event_queue.get_stats()
+        self.assertEqual(stats["flushed"], 3)
+        self.assertEqual(stats["queued"], 0)
+        self.assertEqual(stats["dropped"], 0)
+
+    def test_spool(self):
+        event_queue = self._queue()
+        # Without a running worker the queue overflows to the spool, the
+        # batches are appended to one segment
+        for idx in range(8):
+            event_queue.put({"tag": "evt{}".format(idx), "data": {}})
+        self.assertEqual(len(os.listdir(event_queue.spool_dir)), 1)
+        self.assertEqual(event_queue.get_stats()["spooled"], 4)
+
+        # Failed batches are spooled too and everything is replayed once the
+        # returner recovers
+        self.fail.set()
+        event_queue.start()
+        time.sleep(0.5)
+        self.fail.clear()
+        self._wait_stored(8)
+        self.assertEqual(sorted(self.stored), ["evt{}".format(idx) for idx in range(8)])
+        self.assertEqual(os.listdir(event_queue.spool_dir), [])
+
+    def test_spool_replay(self):
+        event_queue = self._queue()
+        event_queue.spool_segment_events = 2
+        event_queue.spool_replay_interval = 1
+        for idx in range(4):
+            event_queue._spool([{"tag": "spool{}".format(idx), "data": {}}])
+        self.assertEqual(len(os.listdir(event_queue.spool_dir)), 2)
+        for idx in range(4):
+            event_queue.put({"tag": "live{}".format(idx), "data": {}})
+
+        # The spooled segments are replayed in between the live batches
+        event_queue.start()
+        self._wait_stored(8)
+        self.assertEqual(
+            self.stored,
+            [
+                "live0",
+                "live1",
+                "spool0",
+                "spool1",
+                "live2",
+                "live3",
+                "spool2",
+                "spool3",
+            ],
+        )
+        self.assertEqual(os.listdir(event_queue.spool_dir), [])
+        self.assertEqual(event_queue.get_stats()["spool_size"], 0)
+
+    def test_spool_full(self):
+        self.opts["event_return_spool_max_size"] = 1
+        event_queue = self._queue()
+        for idx in range(6):
+            event_queue.put({"tag": "evt{}".format(idx), "data": {}})
+        self.assertEqual(event_queue.get_stats()["dropped"], 2)
+
+    def test_stop(self):
+        event_queue = self._queue()
+        event_queue.put({"tag": "evt0", "data": {}})
+        event_queue.stop()
+        # The events still in memory are spooled for the next start
+        event_queue = self._queue()
+        event_queue.start()
+        self._wait_stored(1)
+        self.assertEqual(self.stored, ["evt0"])
@@ -21,11 +21,13 @@ import salt.utils.dateutils  # pylint: disable=unused-import
 import salt.utils.files
 import salt.utils.json
 import salt.utils.stringutils
+import salt.utils.templates
 import salt.utils.yaml
-from jinja2 import DictLoader, Environment, Markup, exceptions
+from jinja2 import DictLoader, Environment, Markup, StrictUndefined, exceptions
 from salt.exceptions import SaltRenderError
 from salt.utils.decorators.jinja import JinjaFilter
 from salt.utils.jinja import (
+    SaltBytecodeCache,
     SaltCacheLoader,
     SerializerExtension,
     ensure_sequence_filter,
@@ -353,6 +355,91 @@ class TestGetTemplate(TestCase):
             self.assertEqual(out, "Hey world !Hi Salt !" + os.linesep)
             self.assertEqual(fc.requests[0]["path"], "salt://macro")
 
+    def test_bytecode_cache(self):
+        """
+        The environments are shared by the renders, and the compiled
+        templates are kept on disk with ``jinja_bytecode_cache``
+        """
+        opts = {
+            "cachedir": self.tempdir,
+            "file_client": "remote",
+            "file_roots": self.local_opts["file_roots"],
+            "pillar_roots": self.local_opts["pillar_roots"],
+            "jinja_bytecode_cache": True,
+        }
+        filename = os.path.join(self.template_dir, "hello_include")
+        with salt.utils.files.fopen(filename) as fp_:
+            template = salt.utils.stringutils.to_unicode(fp_.read())
+
+        def render():
+            return render_jinja_tmpl(
+                template, dict(opts=opts, saltenv="test", salt=self.local_salt)
+            )
+
+        fc = MockFileClient()
+        with patch.object(SaltCacheLoader, "file_client", MagicMock(return_value=fc)):
+            self.assertEqual(render(), "Hey world !a b !")
+            cache_dir = os.path.join(self.tempdir, "jinja")
+            # The template and the included and imported ones
+            self.assertEqual(len(os.listdir(cache_dir)), 3)
+
+            # The paths set by the loader do not leak into the next render
+            env = salt.utils.templates._jinja_environment(
+                opts, {"loader": None}, StrictUndefined
+            )
+            self.assertNotIn("tplfile", env.globals)
+
+            with patch(
+                "jinja2.sandbox.SandboxedEnvironment.__init__",
+                MagicMock(side_effect=AssertionError),
+            ), patch(
+                "jinja2.sandbox.SandboxedEnvironment.compile",
+                MagicMock(side_effect=AssertionError),
+            ):
+                self.assertEqual(render(), "Hey world !a b !")
+
+            # A new process reads the compiled templates from the disk
+            with patch.dict(salt.utils.templates._JINJA_ENVS, clear=True), patch.dict(
+                salt.utils.templates._JINJA_BYTECODE_CACHES, clear=True
+            ):
+                with patch(
+                    "jinja2.sandbox.SandboxedEnvironment.compile",
+                    MagicMock(side_effect=AssertionError),
+                ):
+                    self.assertEqual(render(), "Hey world !a b !")
+
+                # A changed template is compiled again
+                with salt.utils.files.fopen(
+                    os.path.join(self.template_dir, "hello_import"), "a"
+                ) as fp_:
+                    fp_.write("changed")
+                self.assertEqual(render(), "Hey world !a b !\nchanged")
+
+    def test_bytecode_cache_prune(self):
+        """
+        The least recently used compiled templates are removed from the disk
+        """
+        cache_dir = os.path.join(self.tempdir, "jinja")
+        bytecode_cache = SaltBytecodeCache(2, cache_dir)
+        env = Environment()
+
+        def compile_template(source):
+            bucket = bytecode_cache.get_bucket(env, source, None, source)
+            if bucket.code is None:
+                bucket.code = env.compile(source)
+                bytecode_cache.set_bucket(bucket)
+            return os.path.basename(bytecode_cache._path(bucket))
+
+        first = compile_template("first")
+        second = compile_template("second")
+        os.utime(os.path.join(cache_dir, first), (0, 0))
+        os.utime(os.path.join(cache_dir, second), (1, 1))
+        # A template read from the disk is used again
+        bytecode_cache.memory.clear()
+        compile_template("first")
+        third = compile_template("third")
+        self.assertEqual(sorted(os.listdir(cache_dir)), sorted([first, third]))
+
     def test_macro_additional_log_for_generalexc(self):
         """
         If we failed in a macro because of e.g. a TypeError, get
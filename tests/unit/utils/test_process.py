@@ -3,13 +3,17 @@ import functools
 import io
 import multiprocessing
 import os
+import shutil
 import signal
 import sys
+import tempfile
 import threading
 import time
 import warnings
 
 import pytest
+import salt.ext.tornado.gen
+import salt.ext.tornado.ioloop
 import salt.utils.platform
 import salt.utils.process
 from salt.utils.versions import warn_until_date
@@ -228,6 +232,84 @@ class TestThreadPool(TestCase):
         self.assertEqual(pool._job_queue.qsize(), 1)
 
 
+def pool_job(path, jid):
+    with open(os.path.join(path, str(jid)), "w") as fp_:
+        fp_.write(str(os.getpid()))
+    if jid == "exit":
+        os._exit(1)
+
+
+class TestJobWorkerPool(TestCase):
+    def setUp(self):
+        self.io_loop = salt.ext.tornado.ioloop.IOLoop()
+        self.addCleanup(self.io_loop.close)
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+
+    def _run(self, pool, jids):
+        @salt.ext.tornado.gen.coroutine
+        def submit():
+            for jid in jids:
+                yield pool.submit(jid, self.path, jid)
+                # The pool never holds more than size + queue_size jobs
+                self.assertLessEqual(pool.pending, pool.size + pool.queue_size)
+            while pool.pending:
+                yield salt.ext.tornado.gen.sleep(0.01)
+
+        self.io_loop.run_sync(submit, timeout=60)
+        pids = {}
+        for jid in jids:
+            with open(os.path.join(self.path, str(jid))) as fp_:
+                pids[jid] = int(fp_.read())
+        return pids
+
+    @pytest.mark.slow_test
+    def test_pool(self):
+        pool = salt.utils.process.JobWorkerPool(
+            self.io_loop, pool_job, 2, max_jobs=3, queue_size=1
+        )
+        pool.start()
+        self.addCleanup(pool.stop)
+        workers = {process.pid for process in pool.workers}
+        self.assertEqual(len(workers), 2)
+
+        pids = self._run(pool, list(range(12)))
+        # The jobs ran in the pre-forked workers, which were replaced after
+        # running three jobs each
+        self.assertTrue(workers & set(pids.values()))
+        self.assertNotIn(os.getpid(), pids.values())
+        for pid in set(pids.values()):
+            self.assertLessEqual(list(pids.values()).count(pid), 3)
+        self.assertGreater(len(set(pids.values())), 2)
+        self.assertEqual(pool.busy, {})
+
+    @pytest.mark.slow_test
+    def test_pool_worker_exit(self):
+        pool = salt.utils.process.JobWorkerPool(self.io_loop, pool_job, 1)
+        pool.start()
+        self.addCleanup(pool.stop)
+        # A worker dying in a job frees its slot and is replaced
+        pids = self._run(pool, ["exit", 1, 2])
+        self.assertNotEqual(pids["exit"], pids[1])
+        self.assertEqual(pids[1], pids[2])
+        self.assertEqual(len(pool.workers), 1)
+
+    @pytest.mark.slow_test
+    def test_pool_worker_killed(self):
+        pool = salt.utils.process.JobWorkerPool(self.io_loop, pool_job, 1)
+        pool.start()
+        self.addCleanup(pool.stop)
+        worker = pool.workers[0]
+        os.kill(worker.pid, signal.SIGKILL)
+        worker.join()
+        # The jobs sent to the dead worker do not keep their slots
+        pids = self._run(pool, [1, 2, 3])
+        self.assertNotIn(worker.pid, pids.values())
+        self.assertEqual(pool.pending, 0)
+        self.assertEqual(pool.busy, {})
+        self.assertEqual(len(pool.workers), 1)
+
+
 class TestProcess(TestCase):
     def test_daemonize_if(self):
         # pylint: disable=assignment-from-none
@@ -83,6 +83,23 @@ class RenderTestCase(TestCase):
 
         assert res == expected
 
+    def test_render_jinja_code_cache(self):
+        tmpl = """{{ var }}-code-cache"""
+        ctx = dict(self.context, var="OK")
+        res = salt.utils.templates.render_jinja_tmpl(tmpl, ctx)
+        self.assertEqual(res, "OK-code-cache")
+
+        # The compiled template is reused with a different context
+        with patch("jinja2.sandbox.SandboxedEnvironment.compile") as compile_:
+            res = salt.utils.templates.render_jinja_tmpl(tmpl, dict(ctx, var="KO"))
+        compile_.assert_not_called()
+        self.assertEqual(res, "KO-code-cache")
+
+        # The environment options compiling the template are part of the key
+        ctx["opts"] = dict(ctx["opts"], jinja_env={"variable_start_string": "<<"})
+        res = salt.utils.templates.render_jinja_tmpl(tmpl, ctx)
+        self.assertEqual(res, "{{ var }}-code-cache")
+
     ### Tests for mako template
     def test_render_mako_sanity(self):
         tmpl = """OK"""